@@ -0,0 +1,111 @@
+"""Compare the desktop-audio pump's PCM conversion with FFmpeg's.
+
+Run from the repository root, with NumPy installed and FFmpeg on ``PATH``:
+
+    python scripts/benchmark_audio_convert.py
+
+A loopback device delivers audio in its own mix format, and every clip is
+stereo at 48 kHz. Either the pump converts each read before it goes into the
+named pipe (:mod:`sclip.core.pcm`), or the pipe carries the device's format
+and FFmpeg converts it. This measures both on the same synthetic PCM for a
+few formats real headsets use: the pump's converter fed the 1024-frame reads
+it gets in practice, and FFmpeg converting the same audio from a file.
+
+Both are given as CPU seconds per second of audio. FFmpeg's figure is what
+the conversion added to a run that only copies the same PCM through, so
+starting the process and reading the file are not counted against it. The
+last column is what the pipe has to carry per second in the device format;
+converted, it is always 192 kB/s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
+
+from sclip.core.desktop_audio import _READ_FRAMES  # noqa: E402
+from sclip.core.ffmpeg import JobClass, ResourceUsage, run_ffmpeg  # noqa: E402
+from sclip.core.pcm import PIPE_CHANNELS, PIPE_RATE, make_converter  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    raise SystemExit("NumPy is not installed; the pump has no converter to measure") from None
+
+# Channels and rate of each device format measured.
+_FORMATS: tuple[tuple[int, int], ...] = ((2, 44100), (6, 48000), (8, 48000), (2, 96000), (8, 96000))
+
+
+def _synthetic_pcm(channels: int, rate: int, seconds: float) -> bytes:
+    """A different tone on every channel, with some noise, as s16 interleaved."""
+    rng = numpy.random.default_rng(7)
+    t = numpy.arange(int(rate * seconds)) / rate
+    tones = [numpy.sin(2 * numpy.pi * (220 * (n + 1)) * t) for n in range(channels)]
+    signal = numpy.stack(tones, axis=1) * 6000 + rng.normal(0, 300, (len(t), channels))
+    return signal.astype(numpy.int16).tobytes()
+
+
+def _pump_cpu(pcm: bytes, channels: int, rate: int) -> float:
+    """CPU seconds the pump's converter spends on ``pcm``, read by read."""
+    convert = make_converter(channels, rate)
+    if convert is None:
+        return 0.0
+    read_bytes = _READ_FRAMES * channels * 2
+    started = time.process_time()
+    for offset in range(0, len(pcm), read_bytes):
+        convert(pcm[offset : offset + read_bytes])
+    return time.process_time() - started
+
+
+def _ffmpeg_usage(source: Path, channels: int, rate: int, *, convert: bool) -> ResourceUsage:
+    args = ["-f", "s16le", "-ar", str(rate), "-ac", str(channels), "-i", str(source)]
+    if convert:
+        args += ["-ac", str(PIPE_CHANNELS), "-ar", str(PIPE_RATE)]
+    args += ["-f", "s16le", "-y", str(source.with_suffix(".out"))]
+    result = run_ffmpeg(args, job=JobClass.SAVE, timeout=600.0)
+    if result.returncode != 0:
+        raise SystemExit(f"FFmpeg failed: {result.stderr.strip()[-300:]}")
+    return result.usage
+
+
+def _ffmpeg_cpu(source: Path, channels: int, rate: int, repeats: int) -> float:
+    """CPU seconds FFmpeg's conversion adds over copying the same PCM through."""
+    added = []
+    for _ in range(repeats):
+        baseline = _ffmpeg_usage(source, channels, rate, convert=False)
+        converted = _ffmpeg_usage(source, channels, rate, convert=True)
+        added.append(converted.beyond(baseline).cpu_seconds)
+    return max(0.0, sorted(added)[len(added) // 2])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--seconds", type=float, default=60.0, help="audio per format (default: 60)"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="FFmpeg runs per cell (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'device':>12}  {'pump ms/s':>10}  {'FFmpeg ms/s':>12}  {'pipe kB/s':>10}")
+    with tempfile.TemporaryDirectory(prefix="sclip-audio-bench-") as temp:
+        for channels, rate in _FORMATS:
+            pcm = _synthetic_pcm(channels, rate, args.seconds)
+            source = Path(temp) / f"{channels}ch-{rate}.pcm"
+            source.write_bytes(pcm)
+            pump = _pump_cpu(pcm, channels, rate) / args.seconds
+            ffmpeg = _ffmpeg_cpu(source, channels, rate, args.repeats) / args.seconds
+            print(
+                f"{channels:>3} ch {rate / 1000:>4.1f}k  {pump * 1000:>10.2f}  "
+                f"{ffmpeg * 1000:>12.2f}  {channels * rate * 2 / 1000:>10.0f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
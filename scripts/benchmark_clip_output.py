@@ -0,0 +1,181 @@
+"""Compare faststart and fragmented MP4 output for saved clips.
+
+Run from the repository root, with FFmpeg on ``PATH``:
+
+    python scripts/benchmark_clip_output.py
+
+A clip is saved by joining the replay buffer's MPEG-TS segments into an MP4.
+With ``+faststart`` FFmpeg writes the file and then rewrites all of it to move
+the index to the front; a fragmented MP4 is written once. This measures what
+that costs: for each window length it joins the newest segments of a
+synthetic buffer both ways, through the very :func:`join_segments` the app
+calls, and reports the time to a finished clip and the bytes FFmpeg wrote.
+
+The buffer is encoded once, at the longest window, from FFmpeg's ``testsrc2``
+pattern - busy enough that the encoder does real work, and the same on every
+machine. Shorter windows take the newest slice of it, as a save would.
+
+Bytes written are FFmpeg's own count of what it sent to the disk, read from
+``getrusage`` once each join has exited. Windows has no equivalent for a
+child that has already been reaped, so there the column reads ``n/a`` and the
+output size stands in: faststart writes about twice that, fragmented once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
+
+from sclip.core.ffmpeg import AUDIO_BITRATE, JobClass, run_ffmpeg  # noqa: E402
+from sclip.core.replay_buffer import (  # noqa: E402
+    SEGMENT_SECONDS,
+    BufferSpec,
+    build_segment_args,
+    join_segments,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# ``ru_oublock`` counts 512-byte blocks on every platform that has it.
+_BLOCK_BYTES = 512
+
+
+@dataclass(frozen=True, slots=True)
+class _Result:
+    window: int
+    fragmented: bool
+    seconds: float
+    output_bytes: int
+    written_bytes: int | None
+
+
+def _written_so_far() -> int | None:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_oublock * _BLOCK_BYTES
+
+
+def _encode_buffer(directory: Path, seconds: int, size: str, fps: int) -> list[Path]:
+    """Write ``seconds`` of synthetic capture as buffer-shaped segments."""
+    spec = BufferSpec(
+        capture_args=(
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={size}:rate={fps}:duration={seconds}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:duration={seconds}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-pix_fmt",
+            "yuv420p",
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{SEGMENT_SECONDS})",
+            "-c:a",
+            "aac",
+            "-b:a",
+            AUDIO_BITRATE,
+        ),
+        directory=directory,
+        seconds=seconds,
+        wrap=False,
+    )
+    result = run_ffmpeg(
+        build_segment_args(spec), job=JobClass.SAVE, timeout=max(600.0, seconds * 10.0)
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Encoding the test buffer failed: {result.stderr.strip()[-300:]}")
+    return sorted(directory.glob("part_*.ts"))
+
+
+def _join_once(segments: list[Path], scratch: Path, *, fragmented: bool) -> _Result:
+    destination = scratch / ("fragmented.mp4" if fragmented else "faststart.mp4")
+    spec = BufferSpec(capture_args=(), directory=scratch, seconds=0)
+    before = _written_so_far()
+    started = time.perf_counter()
+    if not join_segments(segments, destination, spec, scratch=scratch, fragmented=fragmented):
+        raise SystemExit(f"The {'fragmented' if fragmented else 'faststart'} join failed")
+    elapsed = time.perf_counter() - started
+    after = _written_so_far()
+    result = _Result(
+        window=len(segments) * SEGMENT_SECONDS,
+        fragmented=fragmented,
+        seconds=elapsed,
+        output_bytes=destination.stat().st_size,
+        written_bytes=None if before is None or after is None else after - before,
+    )
+    destination.unlink()
+    return result
+
+
+def _median(results: list[_Result]) -> _Result:
+    middle = sorted(results, key=lambda result: result.seconds)[len(results) // 2]
+    written = [r.written_bytes for r in results if r.written_bytes is not None]
+    return _Result(
+        window=middle.window,
+        fragmented=middle.fragmented,
+        seconds=statistics.median(r.seconds for r in results),
+        output_bytes=middle.output_bytes,
+        written_bytes=int(statistics.median(written)) if written else None,
+    )
+
+
+def _megabytes(value: int | None) -> str:
+    return "n/a" if value is None else f"{value / 1e6:.1f}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--windows",
+        default="30,120,600",
+        help="comma-separated window lengths in seconds (default: 30,120,600)",
+    )
+    parser.add_argument("--size", default="1920x1080", help="frame size (default: 1920x1080)")
+    parser.add_argument("--fps", type=int, default=60, help="frame rate (default: 60)")
+    parser.add_argument("--repeats", type=int, default=3, help="joins per cell (default: 3)")
+    args = parser.parse_args()
+
+    windows = sorted({int(value) for value in args.windows.split(",") if value.strip()})
+    with tempfile.TemporaryDirectory(prefix="sclip-clip-bench-") as temp:
+        root = Path(temp)
+        buffer_dir = root / "buffer"
+        buffer_dir.mkdir()
+        print(f"Encoding {windows[-1]}s of {args.size}@{args.fps} test footage...")
+        segments = _encode_buffer(buffer_dir, windows[-1], args.size, args.fps)
+
+        print()
+        print(
+            f"{'window':>7}  {'layout':<10}  {'time (s)':>9}  {'output MB':>10}  {'written MB':>10}"
+        )
+        for window in windows:
+            tail = segments[-max(1, window // SEGMENT_SECONDS) :]
+            for fragmented in (False, True):
+                runs = [_join_once(tail, root, fragmented=fragmented) for _ in range(args.repeats)]
+                result = _median(runs)
+                layout = "fragmented" if fragmented else "faststart"
+                print(
+                    f"{result.window:>6}s  {layout:<10}  {result.seconds:>9.2f}  "
+                    f"{_megabytes(result.output_bytes):>10}  "
+                    f"{_megabytes(result.written_bytes):>10}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
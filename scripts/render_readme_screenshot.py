@@ -49,7 +49,7 @@ from sclip.contracts import (  # noqa: E402
     Monitor,
     Settings,
 )
-from sclip.core.ffmpeg import find_ffmpeg, popen_kwargs  # noqa: E402
+from sclip.core.ffmpeg import JobClass, find_ffmpeg, popen_kwargs  # noqa: E402
 from sclip.ui import main_window as main_window_module  # noqa: E402
 from sclip.ui.main_window import MainWindow  # noqa: E402
 from sclip.ui.pages import capture_page, library_page, settings_page  # noqa: E402
@@ -230,7 +230,7 @@ def _run_ffmpeg(ffmpeg: Path, argv: list[str], *, timeout: float) -> bool:
             errors="replace",
             timeout=timeout,
             check=False,
-            **popen_kwargs(),
+            **popen_kwargs(job=JobClass.SAVE),
         )
     except (OSError, subprocess.TimeoutExpired) as exc:
         print(f"  FFmpeg call failed: {exc}", file=sys.stderr)
@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import logging
 import sys
+import threading
 import traceback
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -147,7 +148,9 @@ def _run(qt_app: QApplication, *, install_singleton_server: bool = True) -> int:
 
     settings_store = _build_settings_store()
     device_registry = _build_device_registry()
-    _apply_first_run_recommendation(settings_store, device_registry)
+    # Decided before anything else can write the settings file, since its
+    # absence is the only record that this is the first launch.
+    first_run = _is_first_run()
     hotkey_listener = HotkeyListener()
     engine = _build_capture_engine(settings_store, device_registry)
 
@@ -183,7 +186,17 @@ def _run(qt_app: QApplication, *, install_singleton_server: bool = True) -> int:
     qt_app.aboutToQuit.connect(_on_about_to_quit)
 
     window.show()
+    if first_run:
+        # Probing the hardware takes seconds on a bad day; the window opens on
+        # the built-in defaults and adopts the tuned settings once they exist.
+        logger.info("First launch detected; auto-configuring for this hardware")
+        window.tune_for_this_pc(lambda: _recommend_first_run_settings(device_registry))
     hotkey_listener.start()
+    # Joining a recording a crash left behind can take a while; the window
+    # should not wait for it. Each recovered file arrives as a saved clip.
+    threading.Thread(
+        target=engine.recover_recordings, name="sclip-recording-recovery", daemon=True
+    ).start()
 
     return qt_app.exec()
 
@@ -208,28 +221,31 @@ def _consume_flag(args: list[str], flags: frozenset[str]) -> bool:
     return found
 
 
-def _apply_first_run_recommendation(
-    settings_store: SettingsStore,
-    device_registry: DeviceRegistry,
-) -> None:
-    """On the very first launch, tune the settings to the detected hardware.
+def _is_first_run() -> bool:
+    """Whether S-Clip has never saved settings on this machine.
 
-    Presence of the settings file is the "has run before" signal. When it is
-    absent we probe the machine and persist a recommended configuration, so
-    the user opens straight into something sensible. Any failure here is
-    non-fatal - the app simply falls back to the built-in defaults.
+    Presence of the settings file is the "has run before" signal. Re-running
+    the hardware detection on every launch would silently discard whatever the
+    user had configured, so it only happens while the file is absent.
+    """
+    return not app_paths().settings_file.exists()
+
+
+def _recommend_first_run_settings(device_registry: DeviceRegistry) -> Settings | None:
+    """Settings tuned to the detected hardware, or ``None`` if detection failed.
+
+    Runs on a worker thread while the window is already up; the window saves
+    and applies the result (see :meth:`MainWindow.tune_for_this_pc`). Any
+    failure here is non-fatal - the app simply keeps the built-in defaults.
     """
-    if app_paths().settings_file.exists():
-        return
-    logger.info("First launch detected; auto-configuring for this hardware")
     try:
         from sclip.contracts import Settings
         from sclip.core.hardware import recommend_settings
 
-        recommended = recommend_settings(Settings(), device_registry)
-        settings_store.save(recommended)
+        return recommend_settings(Settings(), device_registry)
     except Exception:
         logger.exception("First-run hardware auto-configuration failed; using defaults")
+        return None
 
 
 def _build_settings_store() -> SettingsStore:
@@ -248,7 +264,7 @@ def _build_device_registry() -> DeviceRegistry:
     try:
         from sclip.core.devices import SystemDeviceRegistry
 
-        return SystemDeviceRegistry()
+        return SystemDeviceRegistry(app_paths().devices_file)
     except Exception:
         logger.exception("Could not build SystemDeviceRegistry; using empty stub")
         return _EmptyDeviceRegistry()
@@ -384,6 +400,13 @@ class _EmptyDeviceRegistry:
     def audio_devices(self) -> list[AudioDevice]:
         return []
 
+    def refresh(self) -> None:
+        pass
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        # Nothing is ever enumerated, so nothing can change.
+        pass
+
 
 class _DisabledCaptureEngine:
     """Engine stub that reports an error state and refuses to record.
@@ -411,13 +434,16 @@ class _DisabledCaptureEngine:
     def stop_replay_buffer(self) -> None:
         pass
 
-    def save_replay_clip(self) -> None:
+    def save_replay_clip(self, seconds: int | None = None) -> None:
         logger.error("Capture engine unavailable; cannot save replay clip")
 
     def telemetry(self) -> BufferTelemetry | None:
         # No engine means no rolling window to describe.
         return None
 
+    def recover_recordings(self) -> list[Path]:
+        return []
+
     def shutdown(self) -> None:
         pass
 
@@ -88,48 +88,96 @@ class Hotkey:
         return "+".join(parts)
 
 
+# How many extra clip hotkeys, each with its own length, the settings offer.
+MAX_CLIP_BINDINGS: int = 3
+
+
+@dataclass(frozen=True, slots=True)
+class ClipBinding:
+    """A hotkey that saves only the newest ``seconds`` of the replay buffer.
+
+    Sits alongside :attr:`Settings.clip_hotkey`, which always saves the whole
+    window: a quick ten-second clip and an occasional two-minute one come
+    from the same buffer, without a trim afterwards.
+    """
+
+    hotkey: Hotkey
+    seconds: int
+
+
 @dataclass(frozen=True, slots=True)
 class EncoderSpec:
-    """Description of one FFmpeg video encoder and the presets it accepts."""
+    """Description of one FFmpeg video encoder and the presets it accepts.
+
+    ``family`` is the compression format the encoder writes - one of
+    :data:`VIDEO_FAMILIES` - which is what decides how a clip is tagged in its
+    MP4 and whether it needs an H.264 copy to play everywhere.
+    """
 
     codec: str
     presets: tuple[str, ...]
     needs_gpu: bool = False
+    family: str = "h264"
+
+
+# Compression formats the encoders below produce, most compatible first.
+VIDEO_FAMILIES: tuple[str, ...] = ("h264", "hevc", "av1")
+
+# Roughly what each format needs, as a share of H.264's bytes, for the same
+# picture quality on screen content. Published comparisons put HEVC at around
+# 40 percent smaller and AV1 at around half. These are planning figures for
+# the telemetry's estimate, not a measurement; the benchmark measures the real
+# ratio on this machine.
+TYPICAL_SIZE_VS_H264: dict[str, float] = {"h264": 1.0, "hevc": 0.6, "av1": 0.5}
+
+_X26X_PRESETS: tuple[str, ...] = (
+    "ultrafast",
+    "superfast",
+    "veryfast",
+    "faster",
+    "fast",
+    "medium",
+    "slow",
+    "veryslow",
+)
+_NVENC_PRESETS: tuple[str, ...] = ("p1", "p2", "p3", "p4", "p5", "p6", "p7")
 
 
 ENCODERS: tuple[EncoderSpec, ...] = (
+    EncoderSpec(codec="libx264", presets=_X26X_PRESETS),
+    EncoderSpec(codec="h264_nvenc", presets=_NVENC_PRESETS, needs_gpu=True),
+    EncoderSpec(codec="hevc_nvenc", presets=_NVENC_PRESETS, needs_gpu=True, family="hevc"),
     EncoderSpec(
-        codec="libx264",
-        presets=(
-            "ultrafast",
-            "superfast",
-            "veryfast",
-            "faster",
-            "fast",
-            "medium",
-            "slow",
-            "veryslow",
-        ),
-    ),
-    EncoderSpec(
-        codec="h264_nvenc",
-        presets=("p1", "p2", "p3", "p4", "p5", "p6", "p7"),
+        codec="h264_amf",
+        presets=("speed", "balanced", "quality"),
         needs_gpu=True,
     ),
     EncoderSpec(
-        codec="hevc_nvenc",
-        presets=("p1", "p2", "p3", "p4", "p5", "p6", "p7"),
+        codec="h264_qsv",
+        presets=("veryfast", "faster", "fast", "medium", "slow"),
         needs_gpu=True,
     ),
     EncoderSpec(
-        codec="h264_amf",
+        codec="hevc_amf",
         presets=("speed", "balanced", "quality"),
         needs_gpu=True,
+        family="hevc",
     ),
     EncoderSpec(
-        codec="h264_qsv",
+        codec="hevc_qsv",
         presets=("veryfast", "faster", "fast", "medium", "slow"),
         needs_gpu=True,
+        family="hevc",
+    ),
+    EncoderSpec(codec="av1_nvenc", presets=_NVENC_PRESETS, needs_gpu=True, family="av1"),
+    # The software HEVC and AV1 encoders are there so the newer formats work
+    # on any machine, GPU or not. SVT-AV1 names its presets by number, 13 the
+    # fastest; below 4 it is far too slow for live capture to be worth listing.
+    EncoderSpec(codec="libx265", presets=_X26X_PRESETS, family="hevc"),
+    EncoderSpec(
+        codec="libsvtav1",
+        presets=tuple(str(level) for level in range(13, 3, -1)),
+        family="av1",
     ),
 )
 
@@ -142,6 +190,12 @@ def encoder_by_codec(codec: str) -> EncoderSpec | None:
     return None
 
 
+def encoder_family(codec: str) -> str:
+    """The compression format ``codec`` writes, assuming H.264 for an unknown one."""
+    spec = encoder_by_codec(codec)
+    return spec.family if spec is not None else "h264"
+
+
 # Friendly display names for every encoder codec S-Clip knows about. Codecs
 # not listed here fall back to the raw codec string in :func:`encoder_label`,
 # which is still readable enough for an uncommon or future encoder.
@@ -157,10 +211,22 @@ _ENCODER_LABELS: dict[str, str] = {
     "h264_amf": "AMD AMF (H.264)",
     "hevc_amf": "AMD AMF (HEVC)",
     "h264_qsv": "Intel Quick Sync (H.264)",
+    "hevc_qsv": "Intel Quick Sync (HEVC)",
+    "av1_nvenc": "NVIDIA NVENC (AV1)",
     "libx264": "Software x264 (CPU)",
+    "libx265": "Software x265 (CPU, HEVC)",
+    "libsvtav1": "Software SVT-AV1 (CPU, AV1)",
 }
 
 
+# Software scaling algorithms offered for the resize stage, fastest first.
+# These are FFmpeg ``swscale`` flag names and are passed through verbatim; the
+# GPU resize used by the hardware encoders has no such choice to make. Kept
+# here beside :data:`ENCODERS` because the settings page lists them and the
+# settings store validates against them, and neither should import FFmpeg code.
+SCALERS: tuple[str, ...] = ("fast_bilinear", "bilinear", "bicubic", "lanczos")
+
+
 def encoder_label(codec: str) -> str:
     """Return a human-friendly name for an encoder codec.
 
@@ -187,12 +253,54 @@ class Settings:
     audio_input: str = ""  # dshow microphone device name; "" means no microphone
     capture_audio: bool = True  # master switch - when off, no audio is captured
     capture_desktop_audio: bool = True  # capture system sound via WASAPI loopback
+    # Write the microphone and desktop audio as two tracks and mix them when a
+    # clip is saved, rather than mixing live for the whole session. The mix
+    # then takes ``microphone_level`` percent of the microphone, so the
+    # balance can still be changed for footage already captured.
+    separate_audio_tracks: bool = False
+    microphone_level: int = 100
     replay_buffer: bool = True
     replay_seconds: int = 30
+    # Minutes of replay kept past ``replay_seconds`` at reduced resolution and
+    # bitrate, transcoded in the background; 0 keeps only the full-quality
+    # window. Bounded so the two together reach an hour at most.
+    archive_minutes: int = 0
     monitor: str = "Monitor 1"
     clip_hotkey: Hotkey = field(default_factory=lambda: Hotkey(key="F5"))
     record_hotkey: Hotkey = field(default_factory=lambda: Hotkey(key="F6", ctrl=True))
+    # Extra clip hotkeys with lengths of their own; at most MAX_CLIP_BINDINGS.
+    clip_bindings: tuple[ClipBinding, ...] = ()
     output_dir: str = ""  # blank -> use platformdirs default
+    # Where the replay buffer's segments are kept; blank lets S-Clip choose a
+    # RAM disk with room to spare, or the profile drive. ``buffer_budget_mb``
+    # caps the disk the buffer may take, window and archive together; 0 leaves
+    # it to the free space. See :mod:`sclip.core.storage`.
+    buffer_dir: str = ""
+    buffer_budget_mb: int = 0
+    # Resize algorithm for CPU encoders when ``resolution`` is smaller than the
+    # captured display. One of :data:`SCALERS`.
+    scaler: str = "bilinear"
+    # Share of the logical cores a software encoder may use, as a percentage;
+    # the rest are left to the game. 0 leaves it to FFmpeg, which takes all
+    # of them. Hardware encoders ignore it. See :func:`sclip.core.ffmpeg.budget_cores`.
+    cpu_budget_percent: int = 0
+    # Drop repeated frames from the replay buffer while the screen is static,
+    # restoring a constant rate when a clip is saved. Off by default: it trades
+    # a re-encode at save time for a quieter encoder and smaller segments.
+    variable_frame_rate: bool = False
+    # Also write an H.264 copy of every clip saved from an HEVC or AV1 buffer,
+    # in the background, for sites and editors that cannot play the original.
+    h264_export: bool = False
+    # Write saved clips as fragmented MP4 rather than moving the index to the
+    # front afterwards, which rewrites the whole file. Off by default: a few
+    # older editors will not open a fragmented file. Manual recordings are
+    # always fragmented, whatever this says; see :mod:`sclip.core.recording`.
+    fragmented_mp4: bool = False
+    # Capture only part of the monitor, as ``WIDTHxHEIGHT+X+Y`` measured from
+    # its top-left corner; blank captures all of it. ``capture_window`` names
+    # a window by (part of) its title instead, and wins when it can be found.
+    capture_region: str = ""
+    capture_window: str = ""
     # True while S-Clip is managing the capture settings for the user. The
     # first launch turns this on and writes hardware-tuned values; saving the
     # Advanced settings form turns it off so the user's choices are respected.
@@ -226,6 +334,26 @@ class BufferTelemetry:
     ``buffered_seconds`` is derived from the same segment snapshot the save
     path uses - including the rule that discards the segment the muxer is still
     writing - which is what keeps the readout and the saved clip in agreement.
+
+    The frame counts are only filled in for a variable-frame-rate buffer, where
+    they show how much of the window the encoder was spared; a constant-rate
+    buffer reports zero for both. ``frames_dropped`` is different in kind: it
+    is FFmpeg's own count of frames it could not keep up with since the buffer
+    started, read from its progress line, and non-zero means the capture is
+    stuttering rather than that the screen was still.
+
+    A buffer with an archive tier reports it separately: the ``archived_*``
+    fields count the older, downscaled footage kept past the full-quality
+    window, and every other field describes the full-quality tier alone. A
+    full save joins both; see :attr:`total_seconds`.
+
+    ``storage_note`` is set when arming had to compromise: a window shortened
+    to fit the disk, or a drive only just fast enough; see
+    :mod:`sclip.core.storage`.
+
+    ``audio_drift_ppm`` is how far the desktop-audio device clock runs from
+    the wall clock, as the pump measures and corrects it; ``None`` without
+    desktop audio, or before enough of it has played to tell.
     """
 
     buffered_seconds: float  # what a save would actually produce right now
@@ -233,6 +361,43 @@ class BufferTelemetry:
     segment_count: int  # finished segments backing the figure above
     segment_capacity: int  # rotation slots the muxer cycles through
     bytes_on_disk: int
+    frames_encoded: int = 0  # pictures actually written to those segments
+    frames_skipped: int = 0  # repeats dropped before the encoder
+    video_family: str = "h264"  # compression format of the segments
+    frames_dropped: int = 0  # frames FFmpeg fell behind on this session
+    archived_seconds: float = 0.0  # downscaled footage older than the window
+    archived_bytes: int = 0
+    archive_window_seconds: int = 0  # the archive's configured length; 0 = none
+    storage_note: str = ""  # why the window is short of the settings, or the disk slow
+    audio_drift_ppm: float | None = None  # desktop-audio clock against the wall clock
+
+    @property
+    def total_seconds(self) -> float:
+        """Everything a full save would join: the window plus the archive."""
+        return self.buffered_seconds + self.archived_seconds
+
+    @property
+    def h264_equivalent_bytes(self) -> int:
+        """Estimated size of the same window had it been encoded as H.264.
+
+        Built from :data:`TYPICAL_SIZE_VS_H264`, so it is a planning figure:
+        for an H.264 buffer it is simply :attr:`bytes_on_disk`.
+        """
+        ratio = TYPICAL_SIZE_VS_H264.get(self.video_family, 1.0)
+        return round(self.bytes_on_disk / ratio) if ratio > 0 else self.bytes_on_disk
+
+    @property
+    def bytes_saved_vs_h264(self) -> int:
+        """Estimated disk the buffer's format saves over H.264; ``0`` for H.264."""
+        return max(0, self.h264_equivalent_bytes - self.bytes_on_disk)
+
+    @property
+    def skipped_fraction(self) -> float:
+        """Share of the window's frames that were dropped as repeats, ``0.0..1.0``."""
+        total = self.frames_encoded + self.frames_skipped
+        if total <= 0:
+            return 0.0
+        return self.frames_skipped / total
 
     @property
     def fill_fraction(self) -> float:
@@ -291,10 +456,12 @@ class CaptureEngine(Protocol):
 
     def stop_replay_buffer(self) -> None: ...
 
-    def save_replay_clip(self) -> None: ...
+    def save_replay_clip(self, seconds: int | None = None) -> None: ...
 
     def telemetry(self) -> BufferTelemetry | None: ...
 
+    def recover_recordings(self) -> list[Path]: ...
+
     def shutdown(self) -> None: ...
 
     def add_state_listener(self, listener: Callable[[CaptureState], None]) -> None: ...
@@ -315,20 +482,35 @@ class SettingsStore(Protocol):
 
 @runtime_checkable
 class DeviceRegistry(Protocol):
-    """Enumerates the monitors and audio devices the OS exposes."""
+    """Enumerates the monitors and audio devices the OS exposes.
+
+    ``refresh`` asks for a fresh look, typically because the OS announced a
+    hot-plug, and may finish in the background. Change listeners fire only
+    when what the registry reports actually differs afterwards, and may fire
+    on any thread.
+    """
 
     def monitors(self) -> list[Monitor]: ...
 
     def audio_devices(self) -> list[AudioDevice]: ...
 
+    def refresh(self) -> None: ...
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None: ...
+
 
 __all__ = [
     "ENCODERS",
+    "MAX_CLIP_BINDINGS",
+    "SCALERS",
+    "TYPICAL_SIZE_VS_H264",
+    "VIDEO_FAMILIES",
     "AudioDevice",
     "BufferTelemetry",
     "CaptureEngine",
     "CaptureMode",
     "CaptureState",
+    "ClipBinding",
     "DeviceRegistry",
     "EncoderSpec",
     "Hotkey",
@@ -336,5 +518,6 @@ __all__ = [
     "Settings",
     "SettingsStore",
     "encoder_by_codec",
+    "encoder_family",
     "encoder_label",
 ]
@@ -0,0 +1,296 @@
+"""The replay buffer's archive tier: older footage, kept smaller.
+
+The full-quality window is capped at ten minutes because every second of it
+is held at the capture's bitrate - at 1440p60 that is well over a gigabyte.
+Most of a long window is there just in case, and a just-in-case copy does not
+need every pixel. The archive tier keeps it at a fraction of the size instead:
+once a segment ages out of the full-quality window the ring hands it over
+here, and a background thread transcodes it, at idle priority and on
+the CPU, to at most :data:`ARCHIVE_MAX_HEIGHT` lines at a high CRF. An hour of
+archive then costs about what a few minutes of the window do.
+
+Each archived segment covers exactly the segment it was made from, so the
+tier is measured in segments just as the ring is, and trimmed to its length
+oldest first. A segment the transcoder has not reached yet is still full
+quality and is saved as such; if the transcoder falls so far behind that
+those pile up past :data:`_PENDING_LIMIT_SECONDS`, the oldest are dropped, so
+disk use stays bounded even on a machine with no CPU to spare.
+
+A save that reaches back into the archive has to re-encode, since the two
+tiers differ in size and possibly in codec; see
+:meth:`~sclip.core.replay_buffer.RollingBuffer.save_clip`. While a save is
+reading the tier's files, :meth:`ArchiveTier.held` keeps the transcoder from
+deleting any of them.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import math
+import re
+import subprocess
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from sclip.core.ffmpeg import (
+    FFmpegNotFoundError,
+    JobClass,
+    build_quality_args,
+    remove_quietly,
+    run_ffmpeg,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# The tallest frame the archive keeps. Smaller captures keep their own size.
+ARCHIVE_MAX_HEIGHT: int = 540
+
+# Quality of the archive's libx264 encode, on the slider's scale: well below
+# the window's, which together with the smaller frame is most of the saving.
+ARCHIVE_CRF: int = 30
+_ARCHIVE_PRESET: str = "veryfast"
+
+# Encoder threads per transcode. A 540-line frame does not need more, and the
+# fewer cores the archive touches, the less a game notices it.
+_ARCHIVE_THREADS: str = "2"
+
+# A two-second segment at 540 lines transcodes in well under a second; past
+# this the job has hung.
+_TRANSCODE_TIMEOUT: float = 60.0
+
+# Full-quality segments allowed to wait for the transcoder before the oldest
+# are dropped. Generous enough to ride out a long loading screen at full CPU.
+_PENDING_LIMIT_SECONDS: int = 120
+
+# How a segment is named while it waits, and once it has been archived. The
+# number is the tier's own sequence, so names sort in recording order.
+_PENDING_NAME: str = "raw_%06d.ts"
+_ARCHIVED_NAME: str = "arc_%06d.ts"
+_SEQUENCE = re.compile(r"^(?:raw|arc)_(\d+)\.ts$")
+
+
+def build_archive_args(source: Path, destination: Path, *, encoder: str = "libx264") -> list[str]:
+    """FFmpeg arguments that transcode one segment into the archive tier.
+
+    The audio is copied: it is a small part of the bitrate, and it keeps a
+    clip's sound the same quality on both sides of the tier boundary.
+    """
+    return [
+        "-y",
+        "-i",
+        str(source),
+        "-map",
+        "0",
+        "-vf",
+        f"scale=-2:'min(ih,{ARCHIVE_MAX_HEIGHT})'",
+        "-c:v",
+        encoder,
+        "-preset",
+        _ARCHIVE_PRESET,
+        *build_quality_args(encoder, ARCHIVE_CRF),
+        "-threads",
+        _ARCHIVE_THREADS,
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "copy",
+        "-f",
+        "mpegts",
+        str(destination),
+    ]
+
+
+class ArchiveTier:
+    """The downscaled tail of a replay buffer, and the thread that fills it.
+
+    ``collect`` is called from the tier's thread once per half segment and is
+    expected to hand over, through :meth:`accept`, whatever has aged out of
+    the full-quality window. It must not block on anything the tier's owner
+    holds while calling :meth:`stop`.
+
+    Thread safety: every public method may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        seconds: int,
+        segment_seconds: int,
+        collect: Callable[[], None],
+    ) -> None:
+        self._directory = directory
+        self._seconds = seconds
+        self._segment_seconds = segment_seconds
+        self._collect = collect
+        self._lock = threading.Lock()
+        self._next = 0
+        # Saves in progress. While any is, nothing is deleted; what would have
+        # been is queued in _doomed and removed when the last save lets go.
+        self._holds = 0
+        self._doomed: list[Path] = []
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def seconds(self) -> int:
+        return self._seconds
+
+    def start(self) -> None:
+        """Start transcoding, carrying on after anything already on disk."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            numbers = [
+                int(match.group(1))
+                for path in self._directory.iterdir()
+                if (match := _SEQUENCE.match(path.name)) is not None
+            ]
+            self._next = max(numbers, default=-1) + 1
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="sclip-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self, *, timeout: float = 5.0) -> None:
+        """Stop the transcoder, letting a transcode in flight finish first."""
+        self._stopping.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("The archive transcoder did not stop in %.0fs", timeout)
+
+    def accept(self, segment: Path) -> None:
+        """Take a finished segment out of the ring, to be archived.
+
+        The segment is renamed into the tier, so ``segment`` must be on the
+        same volume. Raises ``OSError`` if it cannot be moved - on Windows, a
+        file something still has open - in which case it stays where it was.
+        """
+        with self._lock:
+            target = self._directory / (_PENDING_NAME % self._next)
+            segment.rename(target)
+            self._next += 1
+            self._drop_overdue_locked()
+
+    def snapshot(self) -> tuple[list[Path], list[Path]]:
+        """The archived segments and those still waiting, each oldest first.
+
+        Together they run in recording order, archived first. Hold the tier
+        (see :meth:`held`) for as long as the files are being read.
+        """
+        with self._lock:
+            return self._archived_locked(), self._pending_locked()
+
+    @contextlib.contextmanager
+    def held(self) -> Iterator[None]:
+        """Keep every file in the tier on disk until the block ends."""
+        with self._lock:
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._holds -= 1
+                if self._holds == 0:
+                    self._trim_locked()
+
+    # --- internals -------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._segment_seconds / 2):
+            try:
+                self._collect()
+            except Exception:
+                logger.exception("Handing segments to the archive failed")
+            while not self._stopping.is_set() and self._transcode_oldest():
+                pass
+
+    def _transcode_oldest(self) -> bool:
+        """Archive the oldest waiting segment; False when there is none."""
+        with self._lock:
+            pending = self._pending_locked()
+        if not pending:
+            return False
+        source = pending[0]
+        match = _SEQUENCE.match(source.name)
+        assert match is not None  # _pending_locked only lists our own names
+        target = source.with_name(_ARCHIVED_NAME % int(match.group(1)))
+        partial = target.with_suffix(".part")
+        try:
+            result = run_ffmpeg(
+                build_archive_args(source, partial),
+                job=JobClass.BACKGROUND,
+                timeout=_TRANSCODE_TIMEOUT,
+            )
+            ok = result.returncode == 0 and partial.exists()
+            if not ok:
+                logger.warning(
+                    "Archiving %s failed (code %s): %s",
+                    source.name,
+                    result.returncode,
+                    result.stderr.strip()[-300:],
+                )
+        except (FFmpegNotFoundError, OSError, subprocess.TimeoutExpired) as exc:
+            logger.warning("Archiving %s failed: %s", source.name, exc)
+            ok = False
+
+        with self._lock:
+            if ok:
+                try:
+                    partial.replace(target)
+                except OSError as exc:
+                    logger.warning("Could not file the archived %s: %s", source.name, exc)
+                    ok = False
+            if not ok:
+                remove_quietly(partial)
+            # Archived or not, the full-quality copy has had its turn: keeping
+            # a segment that will not transcode would stall every one behind it.
+            self._doomed.append(source)
+            if self._holds == 0:
+                self._trim_locked()
+        return True
+
+    def _archived_locked(self) -> list[Path]:
+        return sorted(self._directory.glob("arc_*.ts"))
+
+    def _pending_locked(self) -> list[Path]:
+        doomed = set(self._doomed)
+        return [p for p in sorted(self._directory.glob("raw_*.ts")) if p not in doomed]
+
+    def _drop_overdue_locked(self) -> None:
+        """Drop the oldest waiting segments once the transcoder is too far behind."""
+        pending = self._pending_locked()
+        limit = max(1, math.ceil(_PENDING_LIMIT_SECONDS / self._segment_seconds))
+        overdue = pending[: max(0, len(pending) - limit)]
+        if overdue:
+            logger.warning("The archive is %d segment(s) behind; dropping the oldest", len(overdue))
+            self._doomed.extend(overdue)
+            if self._holds == 0:
+                self._trim_locked()
+
+    def _trim_locked(self) -> None:
+        """Delete what has been superseded, and archive past the tier's length."""
+        archived = self._archived_locked()
+        keep = math.ceil(self._seconds / self._segment_seconds)
+        self._doomed.extend(archived[: max(0, len(archived) - keep)])
+        for path in self._doomed:
+            remove_quietly(path)
+        # Windows will not delete a file something still has open; try again
+        # next time rather than let it come back as a pending segment.
+        self._doomed = [path for path in self._doomed if path.exists()]
+
+
+__all__ = [
+    "ARCHIVE_CRF",
+    "ARCHIVE_MAX_HEIGHT",
+    "ArchiveTier",
+    "build_archive_args",
+]
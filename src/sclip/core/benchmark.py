@@ -12,8 +12,17 @@ preset for 1440p60 measured 227 percent of a CPU core and dropped one frame in
 five, and nothing in the interface said so.
 
 Each candidate is timed encoding a synthetic clip at the user's real target
-resolution and frame rate. Nothing is captured from the screen and no file is
-written, so the measurement is quick, repeatable, and reveals nothing.
+resolution and frame rate. Nothing is captured from the screen, so the
+measurement is quick, repeatable, and reveals nothing.
+
+The clip matters. ``testsrc2`` alone is smooth and cheap, and an encoder's
+speed on it says little about its speed on a game, where most of the frame
+changes every frame. So trials draw on a small corpus of generated scenes -
+high-motion noise, a scrolling picture under a fixed HUD, a mostly static
+menu - see :data:`BENCHMARK_SCENES`, or on a real clip from the library (see
+:func:`clip_scene`). Each trial's output is written to a scratch file and
+scored against its source for PSNR and SSIM, and weighed for its bitrate, so a
+preset is judged on the picture it gives as well as its speed.
 
 A note on thresholds, because the obvious one is wrong. Sustaining real time is
 not enough. The measured figure covers the encode alone, while a live capture
@@ -22,22 +31,71 @@ to copy every frame out of GPU memory as well. Worse, the machine is
 simultaneously running the game worth recording. So the bar is set well above
 1.0, and higher for encoders that run on the CPU, where that copy competes for
 the very cores doing the encoding.
+
+That bar is an allowance for costs the trial never sees, and
+:func:`measure_pipeline` measures them instead. It runs the replay buffer's
+own command line on generated inputs, with the muxer and the disk writes
+included. With its result attached, a trial's bar is what the rest of the
+pipeline was measured to cost, plus a smaller margin for the game (see
+:attr:`EncoderTrial.required_headroom`).
+
+A CPU budget changes the question. With one set (see
+:func:`~sclip.core.ffmpeg.budget_cores`), the live encoder is held to a few
+of the machine's cores, and the trial is held to the same ones, so its verdict
+is about the cores the game leaves free rather than the whole machine.
+
+A search can take a minute on a machine without a hardware encoder, so it
+is watched and stoppable. :func:`find_best_configuration` hands each trial to
+an ``on_trial`` callback as it completes, as a :class:`BenchmarkProgress`
+with an estimate of the time left, and every measurement takes a ``cancel``
+event: setting it kills the FFmpeg running at the time and raises
+:class:`~sclip.core.ffmpeg.JobCancelledError` out of the search.
+
+Two measurements do write files. :func:`measure_frame_decimation` sizes the
+saving of a variable-frame-rate buffer, and :func:`compare_codecs` the saving
+of an HEVC or AV1 buffer over H.264. Both savings are in bytes on disk, so
+both encode to a scratch directory that is removed before they return.
 """
 
 from __future__ import annotations
 
+import contextlib
 import logging
+import math
+import random
+import re
 import subprocess
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, replace
+from pathlib import Path
 
-from sclip.contracts import encoder_by_codec
+from sclip.contracts import Monitor, encoder_by_codec, encoder_family
+from sclip.core.capabilities import ffmpeg_capabilities
 from sclip.core.ffmpeg import (
+    AudioConfig,
+    CapturePlan,
     FFmpegNotFoundError,
+    JobCancelledError,
+    JobClass,
+    ResourceUsage,
+    StderrPump,
+    VideoBackend,
+    budget_cores,
+    build_capture_io,
     build_quality_args,
+    count_video_frames,
+    decimate_filter,
     encoder_is_gpu_native,
+    encoder_runs_on_gpu,
+    encoder_thread_args,
     run_ffmpeg,
+    start_ffmpeg,
+    wait_for_exit,
 )
+from sclip.core.replay_buffer import SEGMENT_SECONDS, BufferSpec, build_segment_args
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +121,178 @@ _CPU_HEADROOM: float = 3.0
 # Guards against a wedged encoder holding up the whole recommendation.
 _TRIAL_TIMEOUT: float = 60.0
 
+# Footage a pipeline trial writes: three of the buffer's segments, enough for
+# the muxer to rotate twice and for the start-up to be a small share of it.
+_PIPELINE_SECONDS: float = 6.0
+
+# How much faster than real time the whole pipeline must run. A pipeline trial
+# already pays for the muxer, the disk, the audio and any software resize, so
+# these cover only what it cannot reproduce: the game, and for a CPU encoder
+# the copy of every frame out of GPU memory, which competes for its cores.
+_PIPELINE_GPU_MARGIN: float = 1.1
+_PIPELINE_CPU_MARGIN: float = 1.5
+
+# Desktop audio as the pump delivers it, for a pipeline trial. The PCM is
+# noise, which is the hardest thing to ask of AAC; the microphone stands in as
+# a tone, so the two still have to be mixed.
+_PIPELINE_AUDIO_RATE: int = 48000
+_PIPELINE_AUDIO_CHANNELS: int = 2
+_PIPELINE_MICROPHONE: tuple[str, ...] = (
+    "-f",
+    "lavfi",
+    "-i",
+    f"sine=frequency=440:sample_rate={_PIPELINE_AUDIO_RATE}",
+)
+
+# The decimation benchmark's synthetic "static" screen: a clip long enough to
+# span several segments' worth of stillness, whose picture changes this many
+# times a second. Once a second is roughly a menu with a blinking cursor.
+_DECIMATION_SECONDS: float = 6.0
+_STATIC_CONTENT_RATE: int = 1
+
+# How much SSIM a faster preset may give up against the slowest one that
+# keeps up, and still be preferred. SSIM runs from 0 to 1; a step this small
+# is about the least a viewer notices with the two side by side, so anything
+# within it is speed for free.
+_SSIM_TOLERANCE: float = 0.005
+
+# The summaries the ssim and psnr filters log when they finish.
+_SSIM_RE = re.compile(r"SSIM .*All:(\d+(?:\.\d+)?)")
+_PSNR_RE = re.compile(r"PSNR .*average:(\d+(?:\.\d+)?|inf)")
+
+# Seconds of moving synthetic video behind each codec's bitrate figure: long
+# enough that the first keyframe's cost is spread thin, short enough that
+# comparing three formats stays a matter of seconds on a GPU.
+_BITRATE_SECONDS: float = 4.0
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkScene:
+    """One clip an encoder is timed and scored on.
+
+    ``source`` is a lavfi graph, formatted with the trial's ``width``,
+    ``height`` and ``fps``. ``clip`` replaces it with a real recording,
+    looped and brought to the trial's size and rate on the way in; decoding
+    it is charged to the trial, but costs far less than the encode.
+    """
+
+    name: str
+    source: str = ""
+    clip: Path | None = None
+
+    def input_args(self, *, width: int, height: int, fps: int) -> list[str]:
+        """The FFmpeg input that plays this scene."""
+        if self.clip is not None:
+            return ["-stream_loop", "-1", "-i", str(self.clip)]
+        return ["-f", "lavfi", "-i", self.source.format(width=width, height=height, fps=fps)]
+
+    def filters(self, *, width: int, height: int, fps: int) -> list[str]:
+        """Filters that bring a clip to the trial's size and rate; none for a generated scene."""
+        if self.clip is None:
+            return []
+        return [f"scale={width}:{height}", f"fps={fps}"]
+
+
+# Fast motion with fine detail everywhere: the moving pattern under a layer of
+# per-frame noise, as foliage, particles and film grain look to an encoder.
+MOTION_SCENE = BenchmarkScene(
+    "motion", "testsrc2=size={width}x{height}:rate={fps},noise=alls=24:allf=t+u"
+)
+
+# A scrolling picture under a fixed HUD grid, as a map or a feed scrolls under
+# a game's interface; the encoder has to keep the sharp static lines sharp.
+HUD_SCENE = BenchmarkScene(
+    "hud",
+    "testsrc2=size={width}x{height}:rate={fps},scroll=vertical=0.01,"
+    "drawgrid=w=iw/6:h=ih/8:t=3:c=white@0.8",
+)
+
+# A menu: a picture that changes once a second, repeated up to the frame rate.
+STATIC_SCENE = BenchmarkScene(
+    "static", f"testsrc2=size={{width}}x{{height}}:rate={_STATIC_CONTENT_RATE},fps={{fps}}"
+)
+
+BENCHMARK_SCENES: tuple[BenchmarkScene, ...] = (MOTION_SCENE, HUD_SCENE, STATIC_SCENE)
+
+
+def clip_scene(path: Path) -> BenchmarkScene:
+    """A scene that plays a real clip, such as one from the library."""
+    return BenchmarkScene(path.stem, clip=path)
+
+
+@dataclass(frozen=True, slots=True)
+class PipelineTrial:
+    """What the whole capture pipeline managed, not just its encoder.
+
+    Measured by :func:`measure_pipeline`, which runs the capture's own
+    command line - filters, encoder, AAC, the segment muxer and its disk
+    writes - flat out on a generated picture, so ``speed`` is the margin the
+    whole pipeline has over real time.
+    """
+
+    encoder: str
+    preset: str
+    width: int
+    height: int
+    fps: int
+    available: bool
+    frames: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    frames_dropped: int = 0
+    bytes_written: int = 0
+    segments: int = 0
+
+    @property
+    def footage_seconds(self) -> float:
+        """Seconds of video the pipeline wrote."""
+        if self.fps <= 0:
+            return 0.0
+        return self.frames / self.fps
+
+    @property
+    def speed(self) -> float:
+        """Footage written per second taken. 1.0 is exactly real time."""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.footage_seconds / self.wall_seconds
+
+    @property
+    def cores_at_real_time(self) -> float:
+        """CPU cores the pipeline would keep busy capturing at real time."""
+        if self.footage_seconds <= 0:
+            return 0.0
+        return self.cpu_seconds / self.footage_seconds
+
+    @property
+    def disk_bps(self) -> float:
+        """Bytes a second the pipeline wrote to disk while running flat out."""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.bytes_written / self.wall_seconds
+
+    @property
+    def required_speed(self) -> float:
+        """The margin over real time this pipeline needs to be trusted live."""
+        return _PIPELINE_GPU_MARGIN if encoder_is_gpu_native(self.encoder) else _PIPELINE_CPU_MARGIN
+
+    @property
+    def sustains_capture(self) -> bool:
+        """Whether this pipeline can be trusted with a live capture."""
+        return self.available and not self.frames_dropped and self.speed >= self.required_speed
+
+    def describe(self) -> str:
+        """One line fit to show a user."""
+        if not self.available:
+            return f"the {self.encoder} pipeline did not run"
+        return (
+            f"{self.encoder} {self.preset} pipeline at {self.width}x{self.height}: "
+            f"{self.speed:.1f}x real time, {self.cores_at_real_time:.1f} cores at "
+            f"{self.fps} fps, peak {self.peak_rss_bytes / 1_048_576:.0f} MB, "
+            f"{self.disk_bps / 1_000_000:.1f} MB/s to disk, {self.frames_dropped} dropped"
+        )
+
 
 @dataclass(frozen=True, slots=True)
 class EncoderTrial:
@@ -75,6 +305,18 @@ class EncoderTrial:
     fps: int
     available: bool
     achieved_fps: float = 0.0
+    # Cores the trial was held to under a CPU budget; 0 for the whole machine.
+    cores: int = 0
+    # The scene it was measured on, and what the picture came out as; the
+    # scores are ``None`` when they could not be measured.
+    scene: str = ""
+    bitrate_bps: float = 0.0
+    psnr: float | None = None
+    ssim: float | None = None
+    # What the encode cost beyond FFmpeg's start-up, where the OS said.
+    usage: ResourceUsage | None = None
+    # The whole pipeline measured at the same target, where it was.
+    pipeline: PipelineTrial | None = None
 
     @property
     def headroom(self) -> float:
@@ -83,9 +325,35 @@ class EncoderTrial:
             return 0.0
         return self.achieved_fps / self.fps
 
+    @property
+    def cores_used(self) -> float:
+        """CPU cores the encode kept busy on average; 0.0 when not measured."""
+        return self.usage.cores if self.usage is not None else 0.0
+
+    @property
+    def fps_per_core(self) -> float | None:
+        """Frames encoded per busy core: how cheaply the speed was bought.
+
+        ``None`` when the CPU time was not measured. Two trials at the same
+        speed can differ tenfold here, and the one that used every core to
+        get there is the one a game will feel.
+        """
+        if self.cores_used <= 0:
+            return None
+        return self.achieved_fps / self.cores_used
+
     @property
     def required_headroom(self) -> float:
-        """The bar this encoder has to clear, which depends on where it runs."""
+        """The bar this encoder has to clear, which depends on where it runs.
+
+        With a pipeline trial attached the bar is measured rather than
+        assumed: what the rest of the pipeline cost is the ratio of the
+        encode's speed to the whole pipeline's, and the encode has to clear
+        that times the pipeline's own margin.
+        """
+        pipeline = self.pipeline
+        if pipeline is not None and pipeline.available and pipeline.speed > 0:
+            return pipeline.required_speed * self.headroom / pipeline.speed
         return _GPU_HEADROOM if encoder_is_gpu_native(self.encoder) else _CPU_HEADROOM
 
     @property
@@ -98,21 +366,124 @@ class EncoderTrial:
         if not self.available:
             return f"{self.encoder} is not available on this PC"
         verdict = "comfortable" if self.sustains_capture else "too slow"
+        on_cores = f" on {self.cores} core{'s' if self.cores != 1 else ''}" if self.cores else ""
+        picture = ""
+        if self.ssim is not None:
+            picture = f", SSIM {self.ssim:.3f} at {self.bitrate_bps / 1_000_000:.1f} Mb/s"
+        cost = ""
+        if self.usage is not None and self.cores_used > 0:
+            cost = (
+                f", busy on {self.cores_used:.1f} cores, "
+                f"peak {self.usage.peak_rss_bytes / 1_048_576:.0f} MB"
+            )
+        whole = ""
+        if self.pipeline is not None and self.pipeline.available:
+            whole = f"; whole pipeline {self.pipeline.speed:.1f}x real time"
         return (
             f"{self.encoder} {self.preset}: {self.achieved_fps:.0f} fps at "
-            f"{self.width}x{self.height} ({self.headroom:.1f}x real time, {verdict})"
+            f"{self.width}x{self.height}{on_cores} ({self.headroom:.1f}x real time, "
+            f"{verdict}){cost}{picture}{whole}"
         )
 
 
+@dataclass(frozen=True, slots=True)
+class BenchmarkProgress:
+    """How far a benchmark search has got, as of the trial it just finished.
+
+    ``planned`` is the most trials the search can still run to in all: it
+    shrinks as encoders turn out to be missing or settle early, so the time
+    left is an upper bound that tightens as the search goes on.
+    """
+
+    trial: EncoderTrial
+    completed: int
+    planned: int
+    elapsed_seconds: float
+
+    @property
+    def remaining(self) -> int:
+        """Trials that may still be run after this one."""
+        return max(0, self.planned - self.completed)
+
+    @property
+    def eta_seconds(self) -> float:
+        """Seconds left at the pace so far; 0.0 when nothing is left to run."""
+        if self.completed <= 0:
+            return 0.0
+        return self.elapsed_seconds / self.completed * self.remaining
+
+
+def _raise_if_cancelled(cancel: threading.Event | None) -> None:
+    if cancel is not None and cancel.is_set():
+        raise JobCancelledError("benchmark cancelled")
+
+
+def _scale_filters(
+    encoder: str, *, width: int, height: int, source: tuple[int, int] | None, scaler: str
+) -> list[str]:
+    """The software resize a live capture would pay for, as trial filters.
+
+    Only a CPU encoder is charged for it: a hardware encoder resizes on the GPU
+    (see :mod:`sclip.core.ffmpeg`), where the cost is negligible next to the
+    encode and nothing a lavfi source could reproduce anyway.
+    """
+    if source is None or source == (width, height) or encoder_runs_on_gpu(encoder):
+        return []
+    return [f"scale={width}:{height}:flags={scaler}", "format=yuv420p"]
+
+
+def _trial_input(
+    encoder: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    scene: BenchmarkScene,
+    source: tuple[int, int] | None,
+    scaler: str,
+) -> tuple[list[str], list[str]]:
+    """The input arguments and filter chain that feed one trial's encoder.
+
+    With ``source`` set, the scene is generated at that size and resized to
+    ``width`` by ``height`` on the way in, as a capture of a larger display
+    would be.
+    """
+    scale = _scale_filters(encoder, width=width, height=height, source=source, scaler=scaler)
+    generated_width, generated_height = source if scale and source else (width, height)
+    size = {"width": generated_width, "height": generated_height, "fps": fps}
+    return scene.input_args(**size), [*scene.filters(**size), *scale]
+
+
 def _time_encode(
-    encoder: str, preset: str, *, width: int, height: int, fps: int, quality: int, frames: int
-) -> float | None:
-    """Wall-clock seconds to encode ``frames`` synthetic frames, or ``None`` on failure."""
+    encoder: str,
+    preset: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int,
+    frames: int,
+    scene: BenchmarkScene = MOTION_SCENE,
+    source: tuple[int, int] | None = None,
+    scaler: str = "bilinear",
+    cores: frozenset[int] | None = None,
+    output: Path | None = None,
+    cancel: threading.Event | None = None,
+) -> ResourceUsage | None:
+    """What encoding ``frames`` frames of ``scene`` cost, or ``None`` on failure.
+
+    ``source`` and ``scaler`` describe a resize; see :func:`_trial_input`.
+    ``cores`` holds the encode to them, threads and all, as the capture
+    would be. ``output`` keeps the encode as MPEG-TS, for scoring; without
+    it the frames go to the null muxer.
+    """
+    inputs, filters = _trial_input(
+        encoder, width=width, height=height, fps=fps, scene=scene, source=source, scaler=scaler
+    )
     argv = [
-        "-f",
-        "lavfi",
-        "-i",
-        f"testsrc2=size={width}x{height}:rate={fps}",
+        "-y",
+        *inputs,
+        *(["-vf", ",".join(filters)] if filters else []),
         "-frames:v",
         str(frames),
         "-c:v",
@@ -121,13 +492,30 @@ def _time_encode(
         preset,
         *(["-tune", "hq"] if encoder.endswith("_nvenc") else []),
         *build_quality_args(encoder, quality),
-        "-f",
-        "null",
-        "-",
+        *(encoder_thread_args(encoder, len(cores)) if cores is not None else []),
+        "-pix_fmt",
+        "yuv420p",
+        *(["-f", "mpegts", str(output)] if output is not None else ["-f", "null", "-"]),
     ]
-    started = time.monotonic()
+    return _run_timed(argv, encoder=encoder, preset=preset, cores=cores, cancel=cancel)
+
+
+def _run_timed(
+    argv: list[str],
+    *,
+    encoder: str,
+    preset: str,
+    cores: frozenset[int] | None = None,
+    cancel: threading.Event | None = None,
+) -> ResourceUsage | None:
+    """Run one benchmark FFmpeg and return what it cost, wall clock and all, or ``None``.
+
+    A cancel is not a failure of the encoder, so it is left to propagate.
+    """
     try:
-        result = run_ffmpeg(argv, timeout=_TRIAL_TIMEOUT)
+        result = run_ffmpeg(
+            argv, job=JobClass.SAVE, cores=cores, timeout=_TRIAL_TIMEOUT, cancel=cancel
+        )
     except FFmpegNotFoundError:
         logger.warning("FFmpeg not found while benchmarking %s", encoder)
         return None
@@ -137,11 +525,16 @@ def _time_encode(
     except OSError as exc:
         logger.warning("Benchmark for %s %s could not run: %s", encoder, preset, exc)
         return None
-    elapsed = time.monotonic() - started
     if result.returncode != 0:
         logger.debug("Encoder %s %s is unavailable here", encoder, preset)
         return None
-    return elapsed
+    return result.usage
+
+
+def _not_built_in(encoder: str) -> bool:
+    """True when the FFmpeg in use is known to have been built without ``encoder``."""
+    capabilities = ffmpeg_capabilities()
+    return capabilities is not None and not capabilities.has_encoder(encoder)
 
 
 def benchmark_encoder(
@@ -153,11 +546,24 @@ def benchmark_encoder(
     fps: int,
     quality: int = 21,
     seconds: float = _TRIAL_SECONDS,
+    scene: BenchmarkScene = MOTION_SCENE,
+    source: tuple[int, int] | None = None,
+    scaler: str = "bilinear",
+    cpu_budget: int = 0,
+    cancel: threading.Event | None = None,
 ) -> EncoderTrial:
-    """Measure what ``encoder`` sustains at the given target.
+    """Measure what ``encoder`` sustains on ``scene`` at the given target.
 
-    Output goes to the null muxer, so this measures the encoder rather than the
-    disk, and leaves nothing behind.
+    Both encodes are written to a scratch directory, removed before this
+    returns, and the longer is then scored for PSNR and SSIM against the
+    scene it was made from (see :func:`_score_picture`) and weighed for its
+    bitrate. The file costs both runs alike, so the timing is unaffected.
+
+    ``width`` and ``height`` are the size actually encoded. When the capture
+    is resized down from a larger display, pass that display as ``source``: a
+    CPU encoder is then timed including the software resize it would really
+    pay for, so the verdict covers the whole of its work rather than only the
+    smaller encode.
 
     The same clip is encoded at two lengths and the rate is taken from the
     *difference* between them. Timing a single run would fold FFmpeg's start-up
@@ -166,32 +572,83 @@ def benchmark_encoder(
     an NVENC session is markedly more expensive than starting libx264. Charging
     a fixed cost against the encoder least able to spare it is exactly the wrong
     bias, and subtracting two runs cancels it without needing to know what it is.
+
+    ``cpu_budget`` is the capture's, as a percentage of the cores; a software
+    encoder is then timed on only the cores the capture would be given.
+
+    The CPU time and memory each run cost are taken from the OS as it is
+    reaped (see :func:`~sclip.core.ffmpeg.wait_for_exit`), and subtracted the
+    same way the time is, so ``usage`` is the encode's own.
+
+    Setting ``cancel`` kills whichever FFmpeg is running and raises
+    :class:`~sclip.core.ffmpeg.JobCancelledError`.
+
+    An encoder the FFmpeg build is known to lack is reported unavailable
+    without being run; see :mod:`sclip.core.capabilities`.
     """
+    cores = budget_cores(encoder, cpu_budget)
     unavailable = EncoderTrial(
-        encoder=encoder, preset=preset, width=width, height=height, fps=fps, available=False
+        encoder=encoder,
+        preset=preset,
+        width=width,
+        height=height,
+        fps=fps,
+        available=False,
+        scene=scene.name,
     )
+    if _not_built_in(encoder):
+        logger.debug("Encoder %s is not in this FFmpeg build", encoder)
+        return unavailable
     short_frames = max(1, round(fps * seconds))
     long_frames = short_frames * 2
+    with tempfile.TemporaryDirectory(prefix="sclip-bench-") as scratch:
+        output = Path(scratch) / "trial.ts"
+        runs: list[ResourceUsage] = []
+        for frames in (short_frames, long_frames):
+            run = _time_encode(
+                encoder,
+                preset,
+                width=width,
+                height=height,
+                fps=fps,
+                quality=quality,
+                frames=frames,
+                scene=scene,
+                source=source,
+                scaler=scaler,
+                cores=cores,
+                output=output,
+                cancel=cancel,
+            )
+            if run is None:
+                return unavailable
+            runs.append(run)
+        size = output.stat().st_size if output.exists() else 0
+        scores = None
+        if size:
+            scores = _score_picture(
+                output,
+                encoder,
+                width=width,
+                height=height,
+                fps=fps,
+                frames=long_frames,
+                scene=scene,
+                source=source,
+                scaler=scaler,
+                cancel=cancel,
+            )
+    short_run, long_run = runs
 
-    short_elapsed = _time_encode(
-        encoder, preset, width=width, height=height, fps=fps, quality=quality, frames=short_frames
-    )
-    if short_elapsed is None:
-        return unavailable
-    long_elapsed = _time_encode(
-        encoder, preset, width=width, height=height, fps=fps, quality=quality, frames=long_frames
-    )
-    if long_elapsed is None:
-        return unavailable
-
-    marginal = long_elapsed - short_elapsed
-    if marginal > 0:
-        achieved = short_frames / marginal
+    usage = long_run.beyond(short_run)
+    if usage.wall_seconds > 0:
+        achieved = short_frames / usage.wall_seconds
     else:
         # Scheduling noise swamped the difference, which only happens when the
         # encode is far quicker than the start-up it was meant to cancel. The
         # single-run figure is pessimistic but still safe to act on.
-        achieved = long_frames / long_elapsed if long_elapsed > 0 else 0.0
+        usage = long_run
+        achieved = long_frames / long_run.wall_seconds if long_run.wall_seconds > 0 else 0.0
 
     trial = EncoderTrial(
         encoder=encoder,
@@ -201,11 +658,594 @@ def benchmark_encoder(
         fps=fps,
         available=True,
         achieved_fps=achieved,
+        cores=len(cores) if cores is not None else 0,
+        scene=scene.name,
+        bitrate_bps=size * 8 * fps / long_frames,
+        psnr=scores[0] if scores is not None else None,
+        ssim=scores[1] if scores is not None else None,
+        usage=usage,
     )
-    logger.info("Benchmark: %s", trial.describe())
+    logger.info("Benchmark (%s): %s", scene.name, trial.describe())
     return trial
 
 
+def _score_picture(
+    encoded: Path,
+    encoder: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    frames: int,
+    scene: BenchmarkScene,
+    source: tuple[int, int] | None,
+    scaler: str,
+    cancel: threading.Event | None = None,
+) -> tuple[float, float] | None:
+    """PSNR and SSIM of ``encoded`` against the frames it was made from.
+
+    The reference is the scene played again through the same filters the
+    encoder was fed, so the scores measure the encode and nothing else. Both
+    sides are restarted at zero, since MPEG-TS starts its clock late. An
+    identical encode scores an infinite PSNR, which is kept as such. Returns
+    ``None`` if FFmpeg fails or does not report both scores.
+    """
+    inputs, filters = _trial_input(
+        encoder, width=width, height=height, fps=fps, scene=scene, source=source, scaler=scaler
+    )
+    reference = ",".join(
+        [*filters, "format=yuv420p", f"trim=end_frame={frames}", "setpts=PTS-STARTPTS"]
+    )
+    graph = (
+        "[0:v]setpts=PTS-STARTPTS,split[e0][e1];"
+        f"[1:v]{reference},split[r0][r1];"
+        "[e0][r0]ssim=shortest=1;[e1][r1]psnr=shortest=1"
+    )
+    argv = ["-i", str(encoded), *inputs, "-lavfi", graph, "-f", "null", "-"]
+    try:
+        result = run_ffmpeg(
+            argv, job=JobClass.SAVE, timeout=_TRIAL_TIMEOUT, loglevel="info", cancel=cancel
+        )
+    except (FFmpegNotFoundError, OSError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Could not score the %s trial: %s", encoder, exc)
+        return None
+    ssim = _SSIM_RE.search(result.stderr)
+    psnr = _PSNR_RE.search(result.stderr)
+    if result.returncode != 0 or ssim is None or psnr is None:
+        logger.debug("Scoring the %s trial failed: %s", encoder, result.stderr.strip()[-300:])
+        return None
+    return float(psnr.group(1)), float(ssim.group(1))
+
+
+def worst_trial(trials: Sequence[EncoderTrial]) -> EncoderTrial:
+    """One encoder and preset's trials on several scenes, as the worst of them.
+
+    A preset is only as fast as it is on the scene it finds hardest, and only
+    as good as the picture it makes of the scene it handles worst, so the
+    result is the slowest trial carrying the lowest scores, the highest
+    bitrate and the heaviest CPU use of any. An unavailable trial is the
+    worst of all.
+    """
+    if not trials:
+        raise ValueError("no trials to combine")
+    slowest = min(trials, key=lambda trial: (trial.available, trial.headroom))
+    psnrs = [trial.psnr for trial in trials if trial.psnr is not None]
+    ssims = [trial.ssim for trial in trials if trial.ssim is not None]
+    usages = [trial.usage for trial in trials if trial.usage is not None]
+    return replace(
+        slowest,
+        usage=max(usages, key=lambda usage: usage.cores, default=slowest.usage),
+        bitrate_bps=max(trial.bitrate_bps for trial in trials),
+        psnr=min(psnrs) if len(psnrs) == len(trials) else None,
+        ssim=min(ssims) if len(ssims) == len(trials) else None,
+    )
+
+
+def measure_pipeline(
+    encoder: str,
+    preset: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int = 21,
+    seconds: float = _PIPELINE_SECONDS,
+    scene: BenchmarkScene = MOTION_SCENE,
+    source: tuple[int, int] | None = None,
+    scaler: str = "bilinear",
+    cpu_budget: int = 0,
+    microphone: bool = True,
+    desktop_audio: bool = True,
+    variable_frame_rate: bool = False,
+    directory: Path | None = None,
+    cancel: threading.Event | None = None,
+) -> PipelineTrial:
+    """Run the capture's whole pipeline flat out and measure what it costs.
+
+    :func:`benchmark_encoder` times the encode alone, which is why its bar is
+    set so high: everything else a capture does is guessed at. This runs the
+    argv the replay buffer would - :func:`~sclip.core.ffmpeg.build_capture_io`
+    and :func:`~sclip.core.replay_buffer.build_segment_args` - with generated
+    stand-ins for what only a live desktop can provide. ``scene``, in BGRA,
+    takes the screen grab's place. Desktop audio is raw PCM read exactly as
+    the pump's pipe is, and the microphone is a tone. The muxer rotates real
+    segments in a scratch folder inside ``directory``, normally the buffer's,
+    so the disk being measured is the one the buffer writes to. A
+    ``directory`` that does not exist falls back to the system's temp folder.
+
+    Nothing paces the stand-ins, so the trial runs as fast as the slowest
+    stage allows and its speed is the pipeline's margin over real time.
+    Its CPU time, drops and disk throughput are measured along with it.
+
+    It cannot reproduce the copy of each frame out of GPU memory that
+    Desktop Duplication costs a CPU encoder, or a resize a hardware encoder
+    would do on the GPU, which here runs on the CPU. FFmpeg's start-up is
+    charged to the trial. All three make the figure pessimistic, which is
+    the safe side. ``scene`` must be a generated one. Setting ``cancel``
+    stops the trial as it does :func:`benchmark_encoder`.
+    """
+    cores = budget_cores(encoder, cpu_budget)
+    if directory is not None and not directory.is_dir():
+        directory = None
+    with tempfile.TemporaryDirectory(prefix="sclip-pipeline-", dir=directory) as scratch:
+        argv = _pipeline_argv(
+            encoder,
+            preset,
+            width=width,
+            height=height,
+            fps=fps,
+            quality=quality,
+            seconds=seconds,
+            scene=scene,
+            source=source,
+            scaler=scaler,
+            cores=cores,
+            microphone=microphone,
+            desktop_audio=desktop_audio,
+            variable_frame_rate=variable_frame_rate,
+            directory=Path(scratch),
+        )
+        measured = _run_pipeline(argv, encoder=encoder, preset=preset, cores=cores, cancel=cancel)
+        segments = sorted(Path(scratch).glob("seg_*.ts"))
+        frames = sum(count_video_frames(segment) for segment in segments)
+        if measured is None or frames == 0:
+            return PipelineTrial(encoder, preset, width, height, fps, available=False)
+        usage, dropped = measured
+        trial = PipelineTrial(
+            encoder,
+            preset,
+            width,
+            height,
+            fps,
+            available=True,
+            frames=frames,
+            wall_seconds=usage.wall_seconds,
+            cpu_seconds=usage.cpu_seconds,
+            peak_rss_bytes=usage.peak_rss_bytes,
+            frames_dropped=dropped,
+            bytes_written=sum(segment.stat().st_size for segment in segments),
+            segments=len(segments),
+        )
+    logger.info("Pipeline trial: %s", trial.describe())
+    return trial
+
+
+def _pipeline_argv(
+    encoder: str,
+    preset: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int,
+    seconds: float,
+    scene: BenchmarkScene,
+    source: tuple[int, int] | None,
+    scaler: str,
+    cores: frozenset[int] | None,
+    microphone: bool,
+    desktop_audio: bool,
+    variable_frame_rate: bool,
+    directory: Path,
+) -> list[str]:
+    """The replay buffer's command line, with its inputs swapped for stand-ins."""
+    if scene.clip is not None:
+        raise ValueError("a pipeline trial needs a generated scene")
+    captured_width, captured_height = source or (width, height)
+    desktop_pipe = ""
+    if desktop_audio:
+        desktop_pipe = str(directory / "desktop.pcm")
+        # A second over, so the sound never runs out before the picture does.
+        _write_desktop_pcm(Path(desktop_pipe), seconds + 1)
+    plan = CapturePlan(
+        monitor=Monitor("benchmark", 0, 0, captured_width, captured_height, is_primary=True),
+        monitor_index=0,
+        fps=fps,
+        encoder=encoder,
+        preset=preset,
+        crf=quality,
+        audio=AudioConfig(
+            microphone="tone" if microphone else "",
+            desktop_pipe=desktop_pipe,
+            desktop_rate=_PIPELINE_AUDIO_RATE,
+            desktop_channels=_PIPELINE_AUDIO_CHANNELS,
+        ),
+        output_size=(width, height)
+        if (captured_width, captured_height) != (width, height)
+        else None,
+        scaler=scaler,
+        variable_frame_rate=variable_frame_rate,
+        cores=cores,
+    )
+    picture = scene.source.format(width=captured_width, height=captured_height, fps=fps)
+    capture = build_capture_io(
+        plan,
+        backend=VideoBackend.GDIGRAB,
+        keyframe_seconds=SEGMENT_SECONDS,
+        force_keyframes=True,
+        video_input=["-f", "lavfi", "-i", f"{picture},format=bgra"],
+        microphone_input=_PIPELINE_MICROPHONE,
+    )
+    spec = BufferSpec(
+        capture_args=[*capture, "-t", f"{seconds:g}"],
+        directory=directory,
+        seconds=math.ceil(seconds),
+        encoder=encoder,
+        preset=preset,
+        crf=quality,
+        fps=fps,
+        variable_frame_rate=variable_frame_rate,
+        cores=cores,
+    )
+    return build_segment_args(spec)
+
+
+def _write_desktop_pcm(path: Path, seconds: float) -> None:
+    """Write ``seconds`` of noise in the desktop-audio pump's raw PCM format."""
+    second = random.Random(0).randbytes(_PIPELINE_AUDIO_RATE * _PIPELINE_AUDIO_CHANNELS * 2)
+    with path.open("wb") as handle:
+        for _ in range(math.ceil(seconds)):
+            handle.write(second)
+
+
+def _run_pipeline(
+    argv: list[str],
+    *,
+    encoder: str,
+    preset: str,
+    cores: frozenset[int] | None,
+    cancel: threading.Event | None = None,
+) -> tuple[ResourceUsage, int] | None:
+    """Run a pipeline trial to its end: what it cost, and the frames it dropped.
+
+    ``None`` if it could not start, failed or hung.
+    """
+    started = time.monotonic()
+    try:
+        process = start_ffmpeg(argv, job=JobClass.SAVE, cores=cores, pumped=True)
+    except (FFmpegNotFoundError, OSError) as exc:
+        logger.warning("The %s pipeline trial could not run: %s", encoder, exc)
+        return None
+    pump = StderrPump(process, name="pipeline-trial")
+    pump.start()
+    try:
+        usage = wait_for_exit(process, timeout=_TRIAL_TIMEOUT, cancel=cancel)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        logger.warning("The %s %s pipeline trial timed out", encoder, preset)
+        return None
+    finally:
+        if process.stdin is not None:
+            with contextlib.suppress(OSError):
+                process.stdin.close()
+    usage = replace(usage, wall_seconds=time.monotonic() - started)
+    pump.join(1.0)
+    if process.returncode != 0:
+        logger.debug(
+            "The %s %s pipeline trial failed: %s", encoder, preset, " | ".join(pump.tail(3))
+        )
+        return None
+    return usage, pump.counters.frames_dropped
+
+
+@dataclass(frozen=True, slots=True)
+class DecimationTrial:
+    """What dropping repeated frames saved on one stretch of mostly-static video.
+
+    The same synthetic clip is encoded twice, once at a constant rate and once
+    through the ``mpdecimate`` stage a variable-frame-rate buffer uses, so the
+    two sets of figures differ only in the frames that were skipped.
+    """
+
+    encoder: str
+    preset: str
+    width: int
+    height: int
+    fps: int
+    frames_total: int
+    frames_kept: int
+    cfr_seconds: float
+    vfr_seconds: float
+    cfr_bytes: int
+    vfr_bytes: int
+    # What each encode cost, where the OS said.
+    cfr_usage: ResourceUsage | None = None
+    vfr_usage: ResourceUsage | None = None
+
+    @property
+    def skipped_fraction(self) -> float:
+        """Share of the frames the decimation dropped, ``0.0..1.0``."""
+        if self.frames_total <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.frames_kept / self.frames_total)
+
+    @property
+    def time_saving(self) -> float:
+        """Fraction of the constant-rate encode time saved; negative if slower."""
+        if self.cfr_seconds <= 0:
+            return 0.0
+        return 1.0 - self.vfr_seconds / self.cfr_seconds
+
+    @property
+    def cpu_saving(self) -> float:
+        """Fraction of the constant-rate encode's CPU time saved; 0.0 when unmeasured.
+
+        The figure the decimation is really for: a skipped frame saves its
+        encode whether or not the encoder was the slowest stage.
+        """
+        if self.cfr_usage is None or self.vfr_usage is None or self.cfr_usage.cpu_seconds <= 0:
+            return 0.0
+        return 1.0 - self.vfr_usage.cpu_seconds / self.cfr_usage.cpu_seconds
+
+    @property
+    def bytes_saving(self) -> float:
+        """Fraction of the constant-rate output size saved; negative if larger."""
+        if self.cfr_bytes <= 0:
+            return 0.0
+        return 1.0 - self.vfr_bytes / self.cfr_bytes
+
+    def describe(self) -> str:
+        """One line fit to show a user."""
+        return (
+            f"{self.encoder} {self.preset} at {self.width}x{self.height}: skipped "
+            f"{self.skipped_fraction:.0%} of frames, {self.time_saving:.0%} less encode "
+            f"time, {self.bytes_saving:.0%} smaller"
+        )
+
+
+def measure_frame_decimation(
+    encoder: str,
+    preset: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int = 21,
+    seconds: float = _DECIMATION_SECONDS,
+) -> DecimationTrial | None:
+    """Encode a mostly-static clip with and without dropping repeated frames.
+
+    The source is ``testsrc2`` producing a new picture only
+    ``_STATIC_CONTENT_RATE`` times a second, stretched to ``fps`` with the
+    ``fps`` filter - the same repeated frames ddagrab's ``dup_frames`` emits
+    while a menu or loading screen sits still. Both runs write MPEG-TS to a
+    scratch directory, because the point is the bytes a buffer would keep, and
+    the frames are counted from the files rather than trusted from the filter.
+
+    Returns ``None`` if either encode fails.
+    """
+    source = f"testsrc2=size={width}x{height}:rate={_STATIC_CONTENT_RATE},fps={fps}"
+    codec = [
+        "-c:v",
+        encoder,
+        "-preset",
+        preset,
+        *(["-tune", "hq"] if encoder.endswith("_nvenc") else []),
+        *build_quality_args(encoder, quality),
+        "-pix_fmt",
+        "yuv420p",
+    ]
+    with tempfile.TemporaryDirectory(prefix="sclip-bench-") as scratch:
+        cfr_path = Path(scratch) / "cfr.ts"
+        vfr_path = Path(scratch) / "vfr.ts"
+        base = ["-y", "-f", "lavfi", "-i", source, "-t", f"{seconds:g}"]
+        cfr_usage = _run_timed(
+            [*base, *codec, "-fps_mode", "cfr", "-f", "mpegts", str(cfr_path)],
+            encoder=encoder,
+            preset=preset,
+        )
+        if cfr_usage is None:
+            return None
+        vfr_usage = _run_timed(
+            [
+                *base,
+                "-vf",
+                decimate_filter(fps),
+                *codec,
+                "-fps_mode",
+                "vfr",
+                "-f",
+                "mpegts",
+                str(vfr_path),
+            ],
+            encoder=encoder,
+            preset=preset,
+        )
+        if vfr_usage is None:
+            return None
+        try:
+            cfr_bytes = cfr_path.stat().st_size
+            vfr_bytes = vfr_path.stat().st_size
+        except OSError as exc:
+            logger.warning("Decimation benchmark output went missing: %s", exc)
+            return None
+        trial = DecimationTrial(
+            encoder=encoder,
+            preset=preset,
+            width=width,
+            height=height,
+            fps=fps,
+            frames_total=count_video_frames(cfr_path),
+            frames_kept=count_video_frames(vfr_path),
+            cfr_seconds=cfr_usage.wall_seconds,
+            vfr_seconds=vfr_usage.wall_seconds,
+            cfr_bytes=cfr_bytes,
+            vfr_bytes=vfr_bytes,
+            cfr_usage=cfr_usage,
+            vfr_usage=vfr_usage,
+        )
+    logger.info("Decimation benchmark: %s", trial.describe())
+    return trial
+
+
+@dataclass(frozen=True, slots=True)
+class BitrateTrial:
+    """The bytes one encoder spent on a stretch of moving video.
+
+    Measured at the user's quality setting, so trials of different codecs are
+    as near to equal quality as the slider can make them and their sizes can
+    be compared directly.
+    """
+
+    encoder: str
+    preset: str
+    width: int
+    height: int
+    fps: int
+    seconds: float
+    encode_seconds: float
+    bytes: int
+    # What the encode cost, where the OS said.
+    usage: ResourceUsage | None = None
+
+    @property
+    def family(self) -> str:
+        return encoder_family(self.encoder)
+
+    @property
+    def bitrate_bps(self) -> float:
+        """Average video bitrate, bits per second."""
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes * 8 / self.seconds
+
+    def saving_against(self, baseline: BitrateTrial) -> float:
+        """Fraction of ``baseline``'s size saved; negative if larger."""
+        if baseline.bytes <= 0:
+            return 0.0
+        return 1.0 - self.bytes / baseline.bytes
+
+    def describe(self) -> str:
+        """One line fit to show a user."""
+        return (
+            f"{self.encoder} {self.preset} at {self.width}x{self.height}: "
+            f"{self.bitrate_bps / 1_000_000:.1f} Mb/s, encoded in {self.encode_seconds:.1f}s"
+        )
+
+
+def measure_bitrate(
+    encoder: str,
+    preset: str,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int = 21,
+    seconds: float = _BITRATE_SECONDS,
+) -> BitrateTrial | None:
+    """Encode moving synthetic video with ``encoder`` and weigh the result.
+
+    Written as MPEG-TS, as the replay buffer writes it, so the figure includes
+    the container overhead a buffer really pays. Returns ``None`` if the
+    encoder fails.
+    """
+    with tempfile.TemporaryDirectory(prefix="sclip-bench-") as scratch:
+        output = Path(scratch) / "bitrate.ts"
+        usage = _run_timed(
+            [
+                "-y",
+                "-f",
+                "lavfi",
+                "-i",
+                f"testsrc2=size={width}x{height}:rate={fps}",
+                "-t",
+                f"{seconds:g}",
+                "-c:v",
+                encoder,
+                "-preset",
+                preset,
+                *(["-tune", "hq"] if encoder.endswith("_nvenc") else []),
+                *build_quality_args(encoder, quality),
+                "-pix_fmt",
+                "yuv420p",
+                "-f",
+                "mpegts",
+                str(output),
+            ],
+            encoder=encoder,
+            preset=preset,
+        )
+        if usage is None:
+            return None
+        try:
+            size = output.stat().st_size
+        except OSError as exc:
+            logger.warning("Bitrate benchmark output went missing: %s", exc)
+            return None
+    return BitrateTrial(
+        encoder=encoder,
+        preset=preset,
+        width=width,
+        height=height,
+        fps=fps,
+        seconds=seconds,
+        encode_seconds=usage.wall_seconds,
+        bytes=size,
+        usage=usage,
+    )
+
+
+def compare_codecs(
+    candidates: Sequence[tuple[str, str]],
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int = 21,
+) -> list[BitrateTrial]:
+    """Measure the bitrate of each ``(encoder, preset)`` on the same clip.
+
+    Encoders that fail are left out of the result rather than failing the
+    comparison: an AV1 encoder missing from this FFmpeg build says nothing
+    about HEVC. The saving of each against the first H.264 trial, where there
+    is one, is logged; callers wanting the figure use
+    :meth:`BitrateTrial.saving_against`.
+    """
+    trials = [
+        trial
+        for encoder, preset in candidates
+        if (
+            trial := measure_bitrate(
+                encoder, preset, width=width, height=height, fps=fps, quality=quality
+            )
+        )
+        is not None
+    ]
+    baseline = next((trial for trial in trials if trial.family == "h264"), None)
+    for trial in trials:
+        if baseline is not None and trial is not baseline:
+            logger.info(
+                "Bitrate benchmark: %s, %.0f%% smaller than %s",
+                trial.describe(),
+                trial.saving_against(baseline) * 100,
+                baseline.encoder,
+            )
+        else:
+            logger.info("Bitrate benchmark: %s", trial.describe())
+    return trials
+
+
 def _presets_to_try(encoder: str) -> list[str]:
     """Candidate presets for one encoder, best quality first.
 
@@ -219,13 +1259,57 @@ def _presets_to_try(encoder: str) -> list[str]:
         # p7 is slowest/best, p1 fastest. Measurement showed p7 buys nothing
         # over p5 on this pipeline, so p5 leads.
         preferred = ["p5", "p4", "p3", "p2", "p1"]
-    elif encoder == "libx264":
+    elif encoder in ("libx264", "libx265"):
         preferred = ["medium", "fast", "faster", "veryfast", "superfast", "ultrafast"]
+    elif encoder == "libsvtav1":
+        # Below 8 SVT-AV1 is an archival encoder; nothing slower keeps up live.
+        preferred = ["8", "9", "10", "11", "12", "13"]
     else:
         preferred = list(spec.presets)
     return [preset for preset in preferred if preset in spec.presets] or list(spec.presets)
 
 
+def _trial_on_scenes(
+    encoder: str,
+    preset: str,
+    scenes: Sequence[BenchmarkScene],
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int,
+    source: tuple[int, int] | None,
+    scaler: str,
+    cpu_budget: int,
+    cancel: threading.Event | None = None,
+) -> EncoderTrial:
+    """Measure one preset on each scene in turn, as the worst of them.
+
+    Stops at the first scene it cannot keep up with: the rest could only
+    confirm the verdict.
+    """
+    trials: list[EncoderTrial] = []
+    for scene in scenes:
+        _raise_if_cancelled(cancel)
+        trial = benchmark_encoder(
+            encoder,
+            preset,
+            width=width,
+            height=height,
+            fps=fps,
+            quality=quality,
+            scene=scene,
+            source=source,
+            scaler=scaler,
+            cpu_budget=cpu_budget,
+            cancel=cancel,
+        )
+        trials.append(trial)
+        if not trial.sustains_capture:
+            break
+    return worst_trial(trials)
+
+
 def find_best_configuration(
     candidates: list[str],
     *,
@@ -233,6 +1317,13 @@ def find_best_configuration(
     height: int,
     fps: int,
     quality: int = 21,
+    source: tuple[int, int] | None = None,
+    scaler: str = "bilinear",
+    cpu_budget: int = 0,
+    scenes: Sequence[BenchmarkScene] = (MOTION_SCENE,),
+    rank_by_efficiency: bool = False,
+    on_trial: Callable[[BenchmarkProgress], None] | None = None,
+    cancel: threading.Event | None = None,
 ) -> tuple[EncoderTrial | None, list[EncoderTrial]]:
     """Benchmark ``candidates`` and return the best sustainable one.
 
@@ -243,24 +1334,147 @@ def find_best_configuration(
     Encoders are tried in the order given, and the first that sustains capture
     wins: the list is a preference order, so a hardware encoder that is merely
     good enough is still preferable to a CPU encoder that benchmarks faster but
-    would spend the machine's cores doing it.
+    would spend the machine's cores doing it. ``cpu_budget`` holds every
+    software trial to the capture's share of the cores.
+
+    With ``rank_by_efficiency`` the order is only a tie-break: every encoder
+    is measured, and of those that sustain capture the one that encodes the
+    most frames per busy core wins (see :attr:`EncoderTrial.fps_per_core`).
+    That takes longer, and answers the question the preference order only
+    guesses at - which encoder leaves the game the most CPU on this machine.
+    A trial whose CPU time could not be measured ranks last.
+
+    Each preset is measured on every one of ``scenes`` and judged by the
+    worst (see :func:`worst_trial`). The first preset that keeps up sets a
+    quality floor a little below its own SSIM, and the walk then carries on
+    to faster presets for as long as they stay above it: a faster preset
+    leaves the game more room, and the floor says nobody will see what it
+    cost. Where the picture could not be scored, the first preset that keeps
+    up is taken, as it always was.
+
+    ``on_trial`` is called on the calling thread with each preset's trial as
+    it completes (see :class:`BenchmarkProgress`). Setting ``cancel`` stops
+    the search, killing the FFmpeg running at the time, and raises
+    :class:`~sclip.core.ffmpeg.JobCancelledError`; the trials already
+    reported are all there is.
     """
     attempts: list[EncoderTrial] = []
-    for encoder in candidates:
-        for preset in _presets_to_try(encoder):
-            trial = benchmark_encoder(
-                encoder, preset, width=width, height=height, fps=fps, quality=quality
+    winners: list[EncoderTrial] = []
+    started = time.monotonic()
+    planned = sum(len(_presets_to_try(encoder)) for encoder in candidates)
+
+    def report(trial: EncoderTrial) -> None:
+        if on_trial is not None:
+            on_trial(
+                BenchmarkProgress(
+                    trial,
+                    completed=len(attempts),
+                    planned=planned,
+                    elapsed_seconds=time.monotonic() - started,
+                )
             )
-            attempts.append(trial)
-            if not trial.available:
-                break  # the encoder itself is missing; other presets cannot help
+
+    for encoder in candidates:
+        tried_before = len(attempts)
+        chosen = _walk_presets(
+            encoder,
+            attempts,
+            report,
+            scenes=scenes,
+            width=width,
+            height=height,
+            fps=fps,
+            quality=quality,
+            source=source,
+            scaler=scaler,
+            cpu_budget=cpu_budget,
+            cancel=cancel,
+        )
+        # Presets the walk never reached no longer count towards the estimate.
+        planned -= len(_presets_to_try(encoder)) - (len(attempts) - tried_before)
+        if chosen is None:
+            continue
+        if not rank_by_efficiency:
+            return chosen, attempts
+        winners.append(chosen)
+    if not winners:
+        return None, attempts
+    # max() keeps the first of equals, so the preference order breaks ties.
+    best = max(winners, key=lambda trial: trial.fps_per_core or 0.0)
+    return best, attempts
+
+
+def _walk_presets(
+    encoder: str,
+    attempts: list[EncoderTrial],
+    report: Callable[[EncoderTrial], None],
+    *,
+    scenes: Sequence[BenchmarkScene],
+    width: int,
+    height: int,
+    fps: int,
+    quality: int,
+    source: tuple[int, int] | None,
+    scaler: str,
+    cpu_budget: int,
+    cancel: threading.Event | None,
+) -> EncoderTrial | None:
+    """Walk one encoder's presets as :func:`find_best_configuration` describes.
+
+    Every trial run is appended to ``attempts`` and then passed to
+    ``report``; the preset chosen, if any keeps up, is returned.
+    """
+    chosen: EncoderTrial | None = None
+    floor = 0.0
+    for preset in _presets_to_try(encoder):
+        trial = _trial_on_scenes(
+            encoder,
+            preset,
+            scenes,
+            width=width,
+            height=height,
+            fps=fps,
+            quality=quality,
+            source=source,
+            scaler=scaler,
+            cpu_budget=cpu_budget,
+            cancel=cancel,
+        )
+        attempts.append(trial)
+        report(trial)
+        if not trial.available:
+            break  # the encoder itself is missing; other presets cannot help
+        if chosen is None:
             if trial.sustains_capture:
-                return trial, attempts
-    return None, attempts
+                chosen = trial
+                if trial.ssim is None:
+                    break
+                floor = trial.ssim - _SSIM_TOLERANCE
+            continue
+        if trial.ssim is None or trial.ssim < floor:
+            break  # faster presets only lose more
+        if trial.sustains_capture:
+            chosen = trial
+    return chosen
 
 
 __all__ = [
+    "BENCHMARK_SCENES",
+    "HUD_SCENE",
+    "MOTION_SCENE",
+    "STATIC_SCENE",
+    "BenchmarkProgress",
+    "BenchmarkScene",
+    "BitrateTrial",
+    "DecimationTrial",
     "EncoderTrial",
+    "PipelineTrial",
     "benchmark_encoder",
+    "clip_scene",
+    "compare_codecs",
     "find_best_configuration",
+    "measure_bitrate",
+    "measure_frame_decimation",
+    "measure_pipeline",
+    "worst_trial",
 ]
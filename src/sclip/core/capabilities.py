@@ -0,0 +1,264 @@
+"""What the FFmpeg in use can do, worked out once per binary.
+
+Several parts of S-Clip need to know something about the FFmpeg they are about
+to run: whether it was built with an encoder, whether it has the ``ddagrab``
+source at all, which version it is. Finding out costs a process each time, and
+the encoder probes in :mod:`sclip.core.hardware` cost a short encode each, so
+every launch used to pay for questions whose answers had not changed.
+
+They depend only on the binary, so they are kept in a manifest under the
+config directory, keyed by the binary's path and checked against its size and
+modification time. Replacing FFmpeg - an update, a different build on PATH -
+changes one or the other, and the entry is then rebuilt. Until that happens a
+launch reads the manifest and starts nothing.
+
+The manifest also remembers how each encoder probe went. A probe answers for
+this binary on this machine's GPU, which can change while FFmpeg does not; that
+is acceptable because probes only choose the first-run encoder, and Re-detect,
+which is how a user asks again, times the encoders directly instead.
+
+Everything here is best-effort. An FFmpeg that cannot be found, will not run,
+or lists no encoders gives ``None``, meaning "unknown", and every caller then
+does what it did before there was a manifest: it simply tries.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+
+from sclip.core.ffmpeg import FFmpegNotFoundError, JobClass, find_ffmpeg, run_ffmpeg
+from sclip.paths import app_paths
+
+logger = logging.getLogger(__name__)
+
+
+# Bumped whenever the shape of an entry changes; an entry written under any
+# other schema is treated as missing and rebuilt.
+_SCHEMA: int = 1
+
+# Listing encoders and filters is instant. Past this the binary is not well.
+_QUERY_TIMEOUT: float = 10.0
+
+# One line of ``ffmpeg -encoders``: six flag columns, then the name, e.g.
+# " V....D libx264   libx264 H.264 / AVC ...". The legend above the list
+# ("V..... = Video") is skipped because "=" is not a name.
+_ENCODER_LINE = re.compile(r"^\s*[VAS][A-Z.]{5}\s+([\w.-]+)\s")
+
+# One line of ``ffmpeg -filters``: flags, the name, then its pads, e.g.
+# " ... ddagrab   |->V   Grab Windows Desktop images using Desktop Duplication".
+_FILTER_LINE = re.compile(r"^\s*[A-Z.]{2,3}\s+([\w.-]+)\s+\S*->\S*\s")
+
+# The binary's identity as far as the manifest is concerned.
+_Identity = tuple[int, int]
+
+# Answers already worked out by this process, including "unknown", so an
+# FFmpeg that will not describe itself is not asked again on every call.
+_lock = threading.Lock()
+_known: dict[Path, tuple[_Identity, FFmpegCapabilities | None]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class FFmpegCapabilities:
+    """What one FFmpeg binary was built with, and how its probes went.
+
+    ``size`` and ``mtime_ns`` identify the build this describes. ``probes``
+    maps an encoder to whether it passed a probe encode on this machine.
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+    version: str
+    encoders: frozenset[str]
+    filters: frozenset[str]
+    probes: Mapping[str, bool] = field(default_factory=dict)
+
+    @property
+    def identity(self) -> _Identity:
+        return self.size, self.mtime_ns
+
+    def has_encoder(self, codec: str) -> bool:
+        return codec in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+
+def ffmpeg_capabilities(binary: Path | None = None) -> FFmpegCapabilities | None:
+    """What ``binary``, or the FFmpeg S-Clip would run, can do; ``None`` if unknown.
+
+    Reads the manifest, or on a miss asks the binary and records the answer.
+    Callers on several threads at once ask it only once between them.
+    """
+    with _lock:
+        return _capabilities_locked(binary)
+
+
+def record_probe(codec: str, passed: bool, *, binary: Path | None = None) -> None:
+    """Remember whether ``codec`` passed a probe encode with this FFmpeg.
+
+    Only a definite answer belongs here: a probe that was cancelled or timed
+    out says nothing about the encoder and should not be recorded.
+    """
+    with _lock:
+        capabilities = _capabilities_locked(binary)
+        if capabilities is None or capabilities.probes.get(codec) is passed:
+            return
+        updated = replace(capabilities, probes={**capabilities.probes, codec: passed})
+        _known[updated.path] = (updated.identity, updated)
+        _write_entry(updated)
+
+
+# --- internals -----------------------------------------------------------
+
+
+def _capabilities_locked(binary: Path | None) -> FFmpegCapabilities | None:
+    try:
+        path = binary or find_ffmpeg()
+        stat = path.stat()
+    except (FFmpegNotFoundError, OSError) as exc:
+        logger.debug("No FFmpeg to describe: %s", exc)
+        return None
+    identity = (stat.st_size, stat.st_mtime_ns)
+    cached = _known.get(path)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+    found = _read_entry(path, identity)
+    if found is None:
+        found = _discover(path, identity)
+        if found is not None:
+            _write_entry(found)
+    _known[path] = (identity, found)
+    return found
+
+
+def _discover(path: Path, identity: _Identity) -> FFmpegCapabilities | None:
+    """Ask ``path`` for its version, encoders and filters."""
+    try:
+        version = _parse_version(_query(path, "-version"))
+        encoders = _parse_names(_query(path, "-encoders"), _ENCODER_LINE)
+        filters = _parse_names(_query(path, "-filters"), _FILTER_LINE)
+    except (FFmpegNotFoundError, OSError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Could not ask %s what it can do: %s", path, exc)
+        return None
+    if not encoders:
+        # Every build has at least a few. An empty list means the output was
+        # not what we expected, and recording it would rule every encoder out.
+        logger.warning("%s listed no encoders; not recording its capabilities", path)
+        return None
+    logger.info(
+        "FFmpeg %s at %s: %d encoders, %d filters",
+        version or "(unknown version)",
+        path,
+        len(encoders),
+        len(filters),
+    )
+    size, mtime_ns = identity
+    return FFmpegCapabilities(path, size, mtime_ns, version, encoders, filters)
+
+
+def _query(binary: Path, flag: str) -> str:
+    result = run_ffmpeg([flag], binary=binary, job=JobClass.SAVE, timeout=_QUERY_TIMEOUT)
+    return result.stdout or ""
+
+
+def _parse_version(stdout: str) -> str:
+    """Pull the version token out of ``ffmpeg -version`` output, or ``""``.
+
+    The first line reads "ffmpeg version <token> ..."; anything shaped
+    otherwise gives an empty string rather than a guess.
+    """
+    first_line = stdout.strip().splitlines()[0] if stdout.strip() else ""
+    tokens = first_line.split()
+    if len(tokens) >= 3 and tokens[0] == "ffmpeg" and tokens[1] == "version":
+        return tokens[2]
+    return ""
+
+
+def _parse_names(stdout: str, line: re.Pattern[str]) -> frozenset[str]:
+    return frozenset(
+        match.group(1) for text in stdout.splitlines() if (match := line.match(text)) is not None
+    )
+
+
+def _read_manifest() -> dict[str, Any]:
+    """The whole manifest, treating any problem with it as "empty"."""
+    try:
+        parsed = json.loads(app_paths().capabilities_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(parsed, dict) or parsed.get("schema") != _SCHEMA:
+        return {}
+    return parsed
+
+
+def _read_entry(path: Path, identity: _Identity) -> FFmpegCapabilities | None:
+    """The manifest's entry for ``path``, if it describes this very build."""
+    entry = _read_manifest().get("binaries", {}).get(str(path))
+    if not isinstance(entry, dict):
+        return None
+    try:
+        capabilities = FFmpegCapabilities(
+            path=path,
+            size=int(entry["size"]),
+            mtime_ns=int(entry["mtime_ns"]),
+            version=str(entry["version"]),
+            encoders=frozenset(map(str, entry["encoders"])),
+            filters=frozenset(map(str, entry["filters"])),
+            probes={str(codec): bool(passed) for codec, passed in entry["probes"].items()},
+        )
+    except (KeyError, TypeError, ValueError, AttributeError):
+        logger.debug("Ignoring a malformed capability entry for %s", path)
+        return None
+    if capabilities.identity != identity:
+        logger.info("FFmpeg at %s has changed; asking it again", path)
+        return None
+    return capabilities
+
+
+def _write_entry(capabilities: FFmpegCapabilities) -> None:
+    """Store ``capabilities`` in the manifest. Best-effort by design.
+
+    Written to a temporary file and renamed over the old one, so a crash
+    mid-write leaves the previous manifest rather than a torn one.
+    """
+    manifest = _read_manifest()
+    binaries = manifest.get("binaries")
+    if not isinstance(binaries, dict):
+        binaries = {}
+    binaries[str(capabilities.path)] = {
+        "size": capabilities.size,
+        "mtime_ns": capabilities.mtime_ns,
+        "version": capabilities.version,
+        "encoders": sorted(capabilities.encoders),
+        "filters": sorted(capabilities.filters),
+        "probes": dict(sorted(capabilities.probes.items())),
+    }
+    target = app_paths().capabilities_file
+    partial = target.with_suffix(".tmp")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial.write_text(
+            json.dumps({"schema": _SCHEMA, "binaries": binaries}, indent=1), encoding="utf-8"
+        )
+        os.replace(partial, target)
+    except OSError as exc:
+        # A read-only config directory costs only that the next launch asks
+        # FFmpeg again; it is no reason to interrupt anything.
+        logger.debug("Could not record FFmpeg's capabilities: %s", exc)
+
+
+__all__ = [
+    "FFmpegCapabilities",
+    "ffmpeg_capabilities",
+    "record_probe",
+]
@@ -8,17 +8,42 @@ delegates rolling replay capture to :class:`RollingBuffer`.
 Capture is attempted with the GPU ``ddagrab`` backend first. If Desktop
 Duplication will not start - an RDP session, say, or an unusual display
 driver - the engine quietly retries with the legacy ``gdigrab`` backend so
-the user still gets a recording, just a less smooth one.
+the user still gets a recording, just a less smooth one. An FFmpeg build
+known to lack ddagrab altogether (see :mod:`sclip.core.capabilities`) skips
+straight to gdigrab.
 
 Desktop audio is captured through :class:`DesktopAudioPump`, which streams the
 system sound into FFmpeg over a named pipe. The pump is started before each
 FFmpeg process so the pipe exists when FFmpeg opens it, and stopped once the
 capture ends.
+
+Every long-lived FFmpeg is watched by a
+:class:`~sclip.core.supervisor.ProcessSupervisor`. A replay buffer that dies
+mid-session is restarted, after a growing pause, with the footage it had
+already banked kept; only when restarts keep failing - or the reason is one a
+restart cannot fix, like a full disk - does the engine move to ``ERROR``. A
+manual recording that dies is reported at once, and the parts it had written
+are joined into an MP4 all the same (see :mod:`sclip.core.recording`); so are
+any a crash of S-Clip itself left behind, by :meth:`recover_recordings`.
+
+Starting a manual recording while the replay buffer rolls does not start a
+second capture. The buffer is promoted instead: its FFmpeg carries on, the
+segments it writes are kept rather than rotated away, and the recording
+opens with the window already buffered. Stopping joins them into one MP4 and
+leaves the buffer rolling.
+
+Each time the buffer is armed, :class:`~sclip.core.storage.BufferPlanner`
+decides which folder it lives in and how much of the configured window that
+folder can hold, and checks the drive can write as fast as the capture does.
+A window the disk cannot hold or keep up with is refused before FFmpeg starts,
+rather than found out mid-session as a full disk.
 """
 
 from __future__ import annotations
 
 import contextlib
+import dataclasses
+import functools
 import logging
 import subprocess
 import threading
@@ -33,18 +58,40 @@ from sclip.contracts import (
     Monitor,
     Settings,
     SettingsStore,
+    encoder_family,
 )
+from sclip.core.capabilities import ffmpeg_capabilities
 from sclip.core.desktop_audio import DesktopAudioPump, DesktopAudioStream
 from sclip.core.ffmpeg import (
     AudioConfig,
     CapturePlan,
+    JobClass,
     VideoBackend,
+    budget_cores,
     build_capture_io,
+    fit_output_size,
+    frames_can_be_decimated,
+    parse_resolution,
     read_stderr_tail,
     start_ffmpeg,
     stop_ffmpeg,
 )
-from sclip.core.replay_buffer import SEGMENT_SECONDS, BufferSpec, RollingBuffer
+from sclip.core.recording import (
+    RecordingSession,
+    find_unfinished_sessions,
+    finish_session,
+    open_session,
+)
+from sclip.core.region import resolve_capture_region
+from sclip.core.replay_buffer import (
+    SEGMENT_SECONDS,
+    BufferSpec,
+    RollingBuffer,
+    build_segment_args,
+    transcode_to_h264,
+)
+from sclip.core.storage import BufferPlan, BufferPlanner, CaptureProfile
+from sclip.core.supervisor import ExitReason, ProcessExit, ProcessSupervisor, default_supervisor
 from sclip.paths import app_paths
 
 logger = logging.getLogger(__name__)
@@ -64,12 +111,46 @@ _MANUAL_KEYFRAME_SECONDS = 2
 _BACKEND_ORDER: tuple[VideoBackend, ...] = (VideoBackend.DDAGRAB, VideoBackend.GDIGRAB)
 
 
+def _usable_backends() -> tuple[VideoBackend, ...]:
+    """The backends to try, less ddagrab when this FFmpeg was built without it.
+
+    Such a build fails ddagrab every time, and learning that by starting a
+    capture costs a process and a wait before gdigrab gets its turn. When the
+    build is unknown, both are tried as before.
+    """
+    capabilities = ffmpeg_capabilities()
+    if capabilities is None or capabilities.has_filter(VideoBackend.DDAGRAB.value):
+        return _BACKEND_ORDER
+    logger.debug("This FFmpeg has no ddagrab; capturing with gdigrab")
+    return tuple(backend for backend in _BACKEND_ORDER if backend is not VideoBackend.DDAGRAB)
+
+
 # How long ``shutdown()`` waits for an in-flight clip-save worker to finish
 # before giving up on it. A stitch normally completes in a few seconds; this
 # ceiling is generous enough to let a long buffer finish writing while still
 # bounding how long quitting the app can hang.
 _SAVE_JOIN_TIMEOUT = 30.0
 
+# Restarting a replay buffer that died mid-session. The pause doubles with
+# each consecutive failure, from one second up to fifteen: long enough for a
+# driver reset to finish, short enough that a one-off crash costs seconds of
+# footage. After _MAX_BUFFER_RESTARTS failures in a row the engine gives up
+# and reports the error. A buffer that ran for _STABLE_UPTIME before dying
+# is treated as a fresh failure, not the next in a run.
+_RESTART_BACKOFF_BASE = 1.0
+_RESTART_BACKOFF_MAX = 15.0
+_MAX_BUFFER_RESTARTS = 5
+_STABLE_UPTIME = 60.0
+
+# What to tell the user when a capture dies for good, by reason.
+_EXIT_MESSAGES: dict[ExitReason, str] = {
+    ExitReason.DISK_FULL: "the disk is full",
+    ExitReason.DEVICE_LOST: "the graphics device was lost",
+    ExitReason.INPUT_LOST: "an audio or video input stopped responding",
+    ExitReason.ENDED: "FFmpeg ended unexpectedly",
+    ExitReason.CRASHED: "FFmpeg crashed",
+}
+
 
 class FFmpegCaptureEngine:
     """Capture engine used by the desktop application."""
@@ -80,12 +161,15 @@ class FFmpegCaptureEngine:
         device_registry: DeviceRegistry,
         *,
         buffer_factory: Callable[[Path], RollingBuffer] = RollingBuffer,
+        supervisor: ProcessSupervisor | None = None,
     ) -> None:
         """Wire the engine to its settings store and device registry.
 
         ``buffer_factory`` builds the :class:`RollingBuffer` the engine owns;
         it defaults to the real class and exists so a test can substitute a
-        fake buffer whose stitch is instant and FFmpeg-free.
+        fake buffer whose stitch is instant and FFmpeg-free. ``supervisor``
+        watches the manual recording; the buffer is built with its own,
+        which by default is the same shared one.
         """
         self._settings_store = settings_store
         self._device_registry = device_registry
@@ -102,20 +186,47 @@ class FFmpegCaptureEngine:
         self._error_listeners: list[ErrorCallback] = []
 
         self._manual_process: subprocess.Popen[str] | None = None
-        self._manual_output: Path | None = None
+        # Where the recording in progress is writing its parts, either from a
+        # process of its own or - with ``_recording_from_buffer`` - from the
+        # replay buffer's; see start_manual_recording.
+        self._manual_session: RecordingSession | None = None
+        self._recording_from_buffer = False
 
         # The clip-save stitch runs on a daemon worker thread so it never
         # blocks the GUI. At most one save runs at a time; this handle lets
         # ``shutdown()`` join a save that is still in flight.
         self._save_thread: threading.Thread | None = None
 
+        self._supervisor = supervisor or default_supervisor()
+
+        # Restarting a buffer that died. ``_restart_cancel`` belongs to the
+        # restart currently pending, if any; stopping the buffer sets it so a
+        # sleeping restart wakes up and stands down. ``_restart_now`` cuts the
+        # backoff short instead: a device arriving is the likeliest fix for a
+        # buffer that lost its microphone, so it is tried at once.
+        self._restart_failures = 0
+        self._restart_cancel: threading.Event | None = None
+        self._restart_now: threading.Event | None = None
+
         self._buffer = buffer_factory(app_paths().replay_buffer_dir)
+        # Where the running buffer was placed and how long its window came
+        # out, and the capture profile its measured bitrate is filed under.
+        # A restart after a crash keeps the plan, and with it the footage.
+        self._planner = BufferPlanner(app_paths().replay_buffer_dir)
+        self._buffer_plan: BufferPlan | None = None
+        self._buffer_profile: CaptureProfile | None = None
+        # The settings the running buffer was armed with, so a change that
+        # only affects saving can leave it rolling.
+        self._buffer_settings: Settings | None = None
         self._buffer.set_error_handler(self._handle_error)
+        self._buffer.set_exit_handler(self._on_buffer_exit)
 
         # One pump, reused for every capture. It is started just before an
         # FFmpeg process and stopped once that process ends.
         self._pump = DesktopAudioPump()
 
+        device_registry.add_change_listener(self._on_devices_changed)
+
     # --- listener registration -----------------------------------------------
 
     def add_state_listener(self, listener: StateCallback) -> None:
@@ -146,11 +257,41 @@ class FFmpegCaptureEngine:
     # --- manual recording ----------------------------------------------------
 
     def start_manual_recording(self) -> None:
-        """Start a continuous MP4 recording using the current settings."""
+        """Start a continuous MP4 recording using the current settings.
+
+        From ``IDLE`` this starts an FFmpeg of its own. From ``BUFFERING`` it
+        promotes the replay buffer instead (see
+        :meth:`RollingBuffer.begin_recording`): the recording includes the
+        window already buffered, costs no second capture, and the buffer keeps
+        rolling once it is stopped.
+        """
         with self._lock:
-            if self.state is CaptureState.RECORDING and self._manual_process is not None:
+            if self.state is CaptureState.RECORDING and (
+                self._manual_process is not None or self._recording_from_buffer
+            ):
                 logger.debug("Manual recording already running; start is a no-op")
                 return
+            if self.state is CaptureState.BUFFERING:
+                settings = self._settings_store.load()
+                # The buffer's own spec says whether its segments drop frames:
+                # a capture that cannot decimate records them at a constant rate
+                # whatever the setting, and recovery need not re-encode those.
+                live = self._buffer.spec
+                session = open_session(
+                    app_paths().recordings_dir,
+                    self._clip_path("recording", settings),
+                    settings,
+                    variable_frame_rate=live is not None and live.variable_frame_rate,
+                )
+                try:
+                    self._buffer.begin_recording(session.directory)
+                except RuntimeError:
+                    session.discard()
+                    raise
+                self._manual_session = session
+                self._recording_from_buffer = True
+                self._set_state(CaptureState.RECORDING)
+                return
             if self.state is not CaptureState.IDLE:
                 raise RuntimeError(f"Cannot start manual recording while {self.state.value}")
 
@@ -160,15 +301,32 @@ class FFmpegCaptureEngine:
             self._set_state(CaptureState.RECORDING)
 
     def stop_manual_recording(self) -> Path | None:
-        """Stop the manual recording and return the written MP4 path."""
+        """Stop the manual recording and return the written MP4 path.
+
+        A recording promoted from the replay buffer is joined from its
+        segments, which blocks for up to one segment's length while the
+        segment being written is finished, then returns to ``BUFFERING``.
+        """
+        with self._lock:
+            session = self._manual_session
+            from_buffer = self._recording_from_buffer
+            if from_buffer:
+                self._recording_from_buffer = False
+                self._manual_session = None
+                if self.state is CaptureState.RECORDING:
+                    self._set_state(CaptureState.SAVING)
+        if from_buffer and session is not None:
+            return self._finish_buffer_recording(session)
+
         with self._lock:
             process = self._manual_process
-            destination = self._manual_output
+            session = self._manual_session
             if process is None:
                 return None
 
             self._manual_process = None
-            self._manual_output = None
+            self._manual_session = None
+            self._supervisor.unwatch(process)
             self._set_state(CaptureState.SAVING)
 
         try:
@@ -177,14 +335,66 @@ class FFmpegCaptureEngine:
             # FFmpeg has let go of the audio pipe; the pump can stop now.
             self._stop_desktop_pump()
 
-        if destination is not None and destination.exists() and destination.stat().st_size > 0:
-            self._emit_clip_saved(destination)
+        # ``q`` made the segment muxer close its last part; joining them is a
+        # stream copy.
+        saved = (
+            finish_session(
+                session,
+                microphone_level=self._microphone_level(),
+            )
+            if session is not None
+            else None
+        )
+        if saved is not None:
+            self._emit_clip_saved(saved)
             self._set_state(CaptureState.IDLE)
-            return destination
+            return saved
 
         self._handle_error("Manual recording stopped, but no playable file was written.")
         return None
 
+    def recover_recordings(self) -> list[Path]:
+        """Join any recording a crash left unfinished, and announce each as a clip.
+
+        Blocks for as long as the joins take, so it belongs on a worker
+        thread. A recording in progress is never mistaken for a leftover: the
+        sessions are listed under the engine lock, with the live one excluded.
+        """
+        with self._lock:
+            active = [self._manual_session.directory] if self._manual_session is not None else []
+            sessions = find_unfinished_sessions(app_paths().recordings_dir, exclude=active)
+        recovered: list[Path] = []
+        microphone_level = self._microphone_level() if sessions else 1.0
+        for session in sessions:
+            logger.info("Recovering an unfinished recording: %s", session.destination.name)
+            saved = finish_session(session, microphone_level=microphone_level)
+            if saved is not None:
+                recovered.append(saved)
+                self._emit_clip_saved(saved)
+        return recovered
+
+    def _finish_buffer_recording(self, session: RecordingSession) -> Path | None:
+        """Join a recording promoted from the buffer; see :meth:`stop_manual_recording`."""
+        saved: Path | None = None
+        try:
+            spec = self._buffer.end_recording()
+            saved = finish_session(
+                session,
+                spec,
+                microphone_level=self._microphone_level(),
+            )
+        except Exception:
+            logger.exception("Finishing the recording from the replay buffer failed")
+        with self._lock:
+            if self.state is CaptureState.SAVING:
+                rolling = self._buffer.is_running or self._restart_cancel is not None
+                self._set_state(CaptureState.BUFFERING if rolling else CaptureState.IDLE)
+        if saved is None:
+            self._handle_error("The recording could not be saved from the replay buffer.")
+            return None
+        self._emit_clip_saved(saved)
+        return saved
+
     # --- replay buffer -------------------------------------------------------
 
     def start_replay_buffer(self) -> None:
@@ -196,18 +406,26 @@ class FFmpegCaptureEngine:
                 raise RuntimeError(f"Cannot start replay buffer while {self.state.value}")
 
             settings = self._settings_store.load()
+            self._restart_failures = 0
             self._start_buffer_with_fallback(settings)
             self._set_state(CaptureState.BUFFERING)
 
     def stop_replay_buffer(self) -> None:
-        """Stop the rolling replay buffer."""
+        """Stop the rolling replay buffer.
+
+        A recording promoted from the buffer is saved first, so stopping the
+        buffer never throws away a recording in progress.
+        """
+        if self._recording_from_buffer:
+            self.stop_manual_recording()
         with self._lock:
+            self._cancel_buffer_restart()
             self._buffer.stop()
             self._stop_desktop_pump()
             if self.state is CaptureState.BUFFERING:
                 self._set_state(CaptureState.IDLE)
 
-    def save_replay_clip(self) -> None:
+    def save_replay_clip(self, seconds: int | None = None) -> None:
         """Save the current rolling-buffer window as an MP4, off the GUI thread.
 
         The stitch is a full FFmpeg re-encode that can take seconds (minutes
@@ -220,6 +438,14 @@ class FFmpegCaptureEngine:
         is in the ``SAVING`` state and a second worker would race the first
         for the same segments. The completed clip is announced through the
         registered clip listeners; a failed stitch through the error listeners.
+
+        With :attr:`Settings.h264_export` on and an HEVC or AV1 buffer, the
+        saved clip is followed by an H.264 copy, transcoded on a thread of its
+        own and announced as a second clip when it lands. The save itself - and
+        the return to ``BUFFERING`` - does not wait for it.
+
+        ``seconds`` saves just the newest part of the window, for the clip
+        hotkeys in :attr:`Settings.clip_bindings`; ``None`` saves all of it.
         """
         with self._lock:
             if self.state is not CaptureState.BUFFERING:
@@ -228,17 +454,31 @@ class FFmpegCaptureEngine:
                 return
             settings = self._settings_store.load()
             destination = self._clip_path("clip", settings)
+            microphone_level = settings.microphone_level / 100
+            # The buffer may be running on other settings than the saved ones
+            # (a pending change, a fallback); its own spec is what it recorded.
+            live = self._buffer.spec
+            encoder = live.encoder if live is not None else settings.encoder
+            crf = live.crf if live is not None else int(settings.crf)
+            export_crf = crf if settings.h264_export and encoder_family(encoder) != "h264" else None
             self._set_state(CaptureState.SAVING)
             thread = threading.Thread(
                 target=self._run_save_clip,
-                args=(destination,),
+                args=(destination, export_crf, settings.fragmented_mp4, seconds, microphone_level),
                 name="sclip-clip-save",
                 daemon=True,
             )
             self._save_thread = thread
             thread.start()
 
-    def _run_save_clip(self, destination: Path) -> None:
+    def _run_save_clip(
+        self,
+        destination: Path,
+        export_crf: int | None = None,
+        fragmented: bool = False,
+        seconds: int | None = None,
+        microphone_level: float = 1.0,
+    ) -> None:
         """Worker-thread body for :meth:`save_replay_clip`.
 
         Runs the blocking stitch, then restores the engine state under the
@@ -260,7 +500,12 @@ class FFmpegCaptureEngine:
         saved: Path | None = None
         try:
             try:
-                saved = self._buffer.save_clip(destination)
+                saved = self._buffer.save_clip(
+                    destination,
+                    fragmented=fragmented,
+                    seconds=seconds,
+                    microphone_level=microphone_level,
+                )
             finally:
                 with self._lock:
                     # Leave ERROR alone - the buffer's own error handler has
@@ -268,7 +513,8 @@ class FFmpegCaptureEngine:
                     # with a specific message.
                     if self.state is CaptureState.ERROR:
                         pass
-                    elif self._buffer.is_running:
+                    elif self._buffer.is_running or self._restart_cancel is not None:
+                        # A buffer mid-restart is still the user's buffer.
                         self._set_state(CaptureState.BUFFERING)
                     elif self.state is CaptureState.SAVING:
                         self._set_state(CaptureState.IDLE)
@@ -279,6 +525,13 @@ class FFmpegCaptureEngine:
 
         if saved is not None:
             self._emit_clip_saved(saved)
+            if export_crf is not None:
+                threading.Thread(
+                    target=self._run_h264_export,
+                    args=(saved, export_crf),
+                    name="sclip-h264-export",
+                    daemon=True,
+                ).start()
         elif self.state is not CaptureState.ERROR:
             # ``save_clip`` returned ``None`` without the buffer reporting an
             # error - most likely the buffer had no segments to stitch yet.
@@ -286,6 +539,24 @@ class FFmpegCaptureEngine:
             # duplicating an error the buffer already announced.
             self._handle_error("Could not save the replay clip.")
 
+    def _run_h264_export(self, saved: Path, crf: int) -> None:
+        """Worker-thread body for the H.264 copy of a saved clip.
+
+        A failed copy is logged rather than raised to the error listeners: the
+        clip the user asked for exists, and an error toast would suggest that
+        it does not.
+        """
+        copy = saved.with_name(f"{saved.stem}_h264.mp4")
+        try:
+            exported = transcode_to_h264(saved, copy, crf=crf)
+        except Exception:
+            logger.exception("H.264 export worker crashed")
+            return
+        if exported:
+            self._emit_clip_saved(copy)
+        else:
+            logger.warning("No H.264 copy of %s was written", saved.name)
+
     def telemetry(self) -> BufferTelemetry | None:
         """Report the live replay window, or ``None`` when nothing is rolling.
 
@@ -297,16 +568,41 @@ class FFmpegCaptureEngine:
         """
         if self.state not in (CaptureState.BUFFERING, CaptureState.SAVING):
             return None
-        return self._buffer.telemetry()
+        telemetry = self._buffer.telemetry()
+        if telemetry is not None:
+            drift = self._pump.drift_ppm
+            if drift is not None:
+                telemetry = dataclasses.replace(telemetry, audio_drift_ppm=drift)
+        plan, profile = self._buffer_plan, self._buffer_profile
+        if telemetry is None or plan is None or profile is None:
+            return telemetry
+        # Every reading doubles as a bitrate measurement for the next arm.
+        self._planner.observe(profile, telemetry)
+        if plan.warning:
+            telemetry = dataclasses.replace(telemetry, storage_note=plan.warning)
+        return telemetry
 
     def reload_settings(self) -> None:
-        """Restart the replay buffer if settings changed while it was running."""
+        """Restart the replay buffer if settings changed while it was running.
+
+        A new microphone level alone is not a reason to: it is applied when
+        split audio tracks are mixed at save time, so keeping the buffer
+        keeps the footage already in it, ready to be saved at the new level.
+        """
         with self._lock:
             if self.state is not CaptureState.BUFFERING:
                 return
+            settings = self._settings_store.load()
+            armed = self._buffer_settings
+            if armed is not None and armed == dataclasses.replace(
+                settings, microphone_level=armed.microphone_level
+            ):
+                logger.info("Only the save-time mix changed; the replay buffer keeps rolling")
+                self._buffer_settings = settings
+                return
+            self._cancel_buffer_restart()
             self._buffer.stop()
             self._stop_desktop_pump()
-            settings = self._settings_store.load()
             self._start_buffer_with_fallback(settings)
             self._set_state(CaptureState.BUFFERING)
 
@@ -323,6 +619,8 @@ class FFmpegCaptureEngine:
         except Exception:
             logger.exception("Manual recording shutdown failed")
         self._join_save_thread()
+        with self._lock:
+            self._cancel_buffer_restart()
         try:
             self._buffer.stop()
         except Exception:
@@ -389,6 +687,16 @@ class FFmpegCaptureEngine:
             preset=settings.preset,
             crf=int(settings.crf),
             audio=self._resolve_audio(settings, desktop),
+            scaler=settings.scaler,
+            # Only the buffer drops repeats: its save step restores a constant
+            # rate, while a manual recording is written straight to its MP4.
+            variable_frame_rate=for_buffer and settings.variable_frame_rate,
+            region=resolve_capture_region(settings, monitor),
+            cores=budget_cores(settings.encoder, settings.cpu_budget_percent),
+        )
+        # The output size is scaled from what is grabbed, which the plan knows.
+        plan = dataclasses.replace(
+            plan, output_size=self._resolve_output_size(settings, plan.capture_size)
         )
         keyframe_seconds = SEGMENT_SECONDS if for_buffer else _MANUAL_KEYFRAME_SECONDS
         return build_capture_io(
@@ -404,16 +712,25 @@ class FFmpegCaptureEngine:
         Must be called with the engine lock held. The desktop-audio pump is
         (re)started for each attempt so a fresh pipe is in place; a failed
         attempt tears its pump down before the next one begins.
+
+        The process writes numbered segments into a recording session rather
+        than ``destination`` itself; :meth:`stop_manual_recording` joins them.
         """
+        session = open_session(app_paths().recordings_dir, destination, settings)
         last_error: RuntimeError | None = None
-        for backend in _BACKEND_ORDER:
+        backends = _usable_backends()
+        for backend in backends:
             desktop = self._start_desktop_pump(settings)
-            io_args = self._build_capture_io(
-                settings, backend=backend, for_buffer=False, desktop=desktop
+            spec = session.spec(
+                self._build_capture_io(settings, backend=backend, for_buffer=False, desktop=desktop)
             )
-            args = [*io_args, "-movflags", "+faststart", str(destination)]
 
-            process = start_ffmpeg(args)
+            process = start_ffmpeg(
+                build_segment_args(spec),
+                job=JobClass.CAPTURE,
+                cores=budget_cores(settings.encoder, settings.cpu_budget_percent),
+                pumped=True,
+            )
             try:
                 self._check_started(process, f"Manual recording ({backend.value})")
             except RuntimeError as exc:
@@ -422,8 +739,9 @@ class FFmpegCaptureEngine:
                     with contextlib.suppress(OSError):
                         process.kill()
                 self._stop_desktop_pump()
+                session.discard_parts()
                 last_error = exc
-                if backend is not _BACKEND_ORDER[-1]:
+                if backend is not backends[-1]:
                     logger.warning(
                         "%s capture failed to start; trying the next backend", backend.value
                     )
@@ -431,10 +749,14 @@ class FFmpegCaptureEngine:
                 break
 
             self._manual_process = process
-            self._manual_output = destination
+            self._manual_session = session
+            self._supervisor.watch(
+                process, "Manual recording", functools.partial(self._on_manual_exit, process)
+            )
             logger.info("Manual recording started with %s backend", backend.value)
             return
 
+        session.discard()
         message = str(last_error) if last_error else "Manual recording failed to start."
         self._handle_error(message)
         raise RuntimeError(message)
@@ -444,36 +766,208 @@ class FFmpegCaptureEngine:
 
         Must be called with the engine lock held.
         """
+        try:
+            self._try_start_buffer(settings)
+        except RuntimeError as exc:
+            self._handle_error(str(exc))
+            raise
+
+    def _try_start_buffer(self, settings: Settings, *, resume: bool = False) -> None:
+        """Start the buffer on the first backend that works, or raise ``RuntimeError``.
+
+        Must be called with the engine lock held. ``resume`` keeps the
+        segments already recorded; see :meth:`RollingBuffer.start`. It also
+        keeps the last placement, where a fresh start plans one anew and
+        raises :class:`~sclip.core.storage.BufferStorageError` - a
+        ``RuntimeError`` - when no folder will do.
+        """
+        plan = self._buffer_plan if resume else None
+        if plan is None:
+            profile = self._capture_profile(settings)
+            plan = self._planner.plan(settings, profile)
+            self._buffer_plan, self._buffer_profile = plan, profile
+
         last_error: RuntimeError | None = None
-        for backend in _BACKEND_ORDER:
+        backends = _usable_backends()
+        for backend in backends:
             desktop = self._start_desktop_pump(settings)
             spec = BufferSpec(
                 capture_args=self._build_capture_io(
                     settings, backend=backend, for_buffer=True, desktop=desktop
                 ),
-                directory=app_paths().replay_buffer_dir,
-                seconds=int(settings.replay_seconds),
+                directory=plan.directory,
+                seconds=plan.seconds,
+                archive_seconds=plan.archive_seconds,
                 encoder=settings.encoder,
                 preset=settings.preset,
                 crf=int(settings.crf),
+                fps=int(settings.fps),
+                variable_frame_rate=settings.variable_frame_rate
+                and frames_can_be_decimated(settings.encoder, backend),
+                cores=budget_cores(settings.encoder, settings.cpu_budget_percent),
+                separate_audio=settings.capture_audio and settings.separate_audio_tracks,
             )
             try:
-                self._buffer.start(spec)
+                self._buffer.start(spec, resume=resume)
             except RuntimeError as exc:
                 self._stop_desktop_pump()
                 last_error = exc
-                if backend is not _BACKEND_ORDER[-1]:
+                if backend is not backends[-1]:
                     logger.warning(
                         "Replay buffer %s start failed; trying the next backend", backend.value
                     )
                     continue
                 break
             logger.info("Replay buffer started with %s backend", backend.value)
+            self._buffer_settings = settings
             return
 
-        message = str(last_error) if last_error else "Replay buffer failed to start."
+        raise RuntimeError(str(last_error) if last_error else "Replay buffer failed to start.")
+
+    # --- supervision ---------------------------------------------------------
+
+    def _on_buffer_exit(self, info: ProcessExit) -> None:
+        """The replay buffer's FFmpeg died mid-session: restart it, or give up.
+
+        Runs on the supervisor thread, so the restart itself is handed to a
+        thread of its own rather than sleeping through the backoff here.
+        """
+        with self._lock:
+            if not self._buffer_in_use():
+                return
+            if info.uptime_seconds >= _STABLE_UPTIME:
+                self._restart_failures = 0
+            self._restart_failures += 1
+            give_up = (
+                not info.reason.is_recoverable or self._restart_failures > _MAX_BUFFER_RESTARTS
+            )
+            if not give_up:
+                self._schedule_buffer_restart()
+                return
+            self._cancel_buffer_restart()
+            self._stop_desktop_pump()
+        self._give_up_on_buffer(f"The replay buffer stopped: {_EXIT_MESSAGES[info.reason]}.")
+
+    def _schedule_buffer_restart(self) -> None:
+        """Start a restart after the backoff for the current failure count.
+
+        Must be called with the engine lock held.
+        """
+        delay = min(_RESTART_BACKOFF_BASE * 2 ** (self._restart_failures - 1), _RESTART_BACKOFF_MAX)
+        cancel = threading.Event()
+        wake = threading.Event()
+        self._restart_cancel = cancel
+        self._restart_now = wake
+        logger.warning(
+            "Restarting the replay buffer in %.0fs (attempt %d of %d)",
+            delay,
+            self._restart_failures,
+            _MAX_BUFFER_RESTARTS,
+        )
+        threading.Thread(
+            target=self._run_buffer_restart,
+            args=(delay, cancel, wake),
+            name="sclip-buffer-restart",
+            daemon=True,
+        ).start()
+
+    def _run_buffer_restart(
+        self, delay: float, cancel: threading.Event, wake: threading.Event
+    ) -> None:
+        """Worker-thread body for :meth:`_schedule_buffer_restart`."""
+        wake.wait(delay)
+        with self._lock:
+            if cancel.is_set() or self._restart_cancel is not cancel:
+                return
+            self._restart_cancel = None
+            self._restart_now = None
+            if not self._buffer_in_use():
+                return
+            # The audio pipe died with FFmpeg; a fresh process needs a fresh one.
+            self._stop_desktop_pump()
+            try:
+                self._try_start_buffer(self._settings_store.load(), resume=True)
+            except RuntimeError as exc:
+                self._restart_failures += 1
+                if self._restart_failures <= _MAX_BUFFER_RESTARTS:
+                    self._schedule_buffer_restart()
+                    return
+                message = f"The replay buffer could not be restarted: {exc}"
+            else:
+                logger.info("Replay buffer restarted")
+                return
+        self._give_up_on_buffer(message)
+
+    def _buffer_in_use(self) -> bool:
+        """Whether the buffer dying matters. Must be called with the engine lock held."""
+        return self.state in (CaptureState.BUFFERING, CaptureState.SAVING) or (
+            self.state is CaptureState.RECORDING and self._recording_from_buffer
+        )
+
+    def _give_up_on_buffer(self, message: str) -> None:
+        """Report a buffer that will not come back, saving any recording it held.
+
+        The segments a promoted recording had banked are still on disk, so
+        they are written out on a thread of their own rather than lost with
+        the buffer.
+        """
         self._handle_error(message)
-        raise RuntimeError(message)
+        if self._recording_from_buffer:
+            threading.Thread(
+                target=self.stop_manual_recording, name="sclip-recording-save", daemon=True
+            ).start()
+
+    def _cancel_buffer_restart(self) -> None:
+        """Stand down a pending restart. Must be called with the engine lock held."""
+        if self._restart_cancel is not None:
+            self._restart_cancel.set()
+            self._restart_cancel = None
+        if self._restart_now is not None:
+            self._restart_now.set()
+            self._restart_now = None
+
+    def _on_devices_changed(self) -> None:
+        """A device came or went: try a pending buffer restart straight away."""
+        with self._lock:
+            if self._restart_now is not None:
+                logger.info("Devices changed; restarting the replay buffer now")
+                self._restart_now.set()
+
+    def _on_manual_exit(self, process: subprocess.Popen[str], info: ProcessExit) -> None:
+        """The manual recording's FFmpeg died before it was stopped."""
+        with self._lock:
+            if self._manual_process is not process:
+                return
+            self._manual_process = None
+            session = self._manual_session
+            self._manual_session = None
+        self._stop_desktop_pump()
+        self._handle_error(f"The recording stopped: {_EXIT_MESSAGES[info.reason]}.")
+        if session is not None:
+            # Every part but the one being written is whole; keep them.
+            threading.Thread(
+                target=self._salvage_session,
+                args=(session,),
+                name="sclip-recording-save",
+                daemon=True,
+            ).start()
+
+    def _microphone_level(self) -> float:
+        """The microphone's share of a save-time mix, as a gain; read per save."""
+        return self._settings_store.load().microphone_level / 100
+
+    def _salvage_session(self, session: RecordingSession) -> None:
+        """Worker-thread body: join what a dead recording had written."""
+        try:
+            saved = finish_session(
+                session,
+                microphone_level=self._microphone_level(),
+            )
+        except Exception:
+            logger.exception("Saving the interrupted recording failed")
+            return
+        if saved is not None:
+            self._emit_clip_saved(saved)
 
     def _resolve_monitor(self, settings: Settings) -> tuple[Monitor, int]:
         """Find the monitor the user picked and its zero-based output index.
@@ -514,6 +1008,48 @@ class FFmpegCaptureEngine:
         )
         return fallback, 0
 
+    @staticmethod
+    def _resolve_output_size(
+        settings: Settings, captured: tuple[int, int]
+    ) -> tuple[int, int] | None:
+        """The encoded frame size ``settings.resolution`` asks for on a capture.
+
+        ``captured`` is the size grabbed: the whole monitor, or the region
+        cropped from it. ``None`` means encode at that size. That is the answer
+        both when the resolution matches the display - the common case, since
+        the recommendation writes the native size - and when it is larger, as
+        :func:`fit_output_size` never upscales. An unparseable value (the
+        settings store normally prevents one) is treated the same way rather
+        than failing the capture.
+        """
+        try:
+            target = parse_resolution(settings.resolution)
+        except ValueError:
+            logger.warning("Ignoring unusable resolution %r", settings.resolution)
+            return None
+        return fit_output_size(captured, target)
+
+    @staticmethod
+    def _capture_profile(settings: Settings) -> CaptureProfile:
+        """What the buffer's bitrate depends on, for sizing it to the disk.
+
+        The frame size is the configured resolution: the capture is never
+        scaled up to it, so it is the largest the encoded frame can be, and a
+        buffer sized from it errs on the side of room to spare.
+        """
+        try:
+            width, height = parse_resolution(settings.resolution)
+        except ValueError:
+            width, height = 1920, 1080
+        return CaptureProfile(
+            width=width,
+            height=height,
+            fps=int(settings.fps),
+            encoder=settings.encoder,
+            crf=int(settings.crf),
+            audio=settings.capture_audio,
+        )
+
     def _resolve_audio(
         self,
         settings: Settings,
@@ -536,6 +1072,7 @@ class FFmpegCaptureEngine:
             desktop_pipe=desktop.pipe_name,
             desktop_rate=desktop.sample_rate,
             desktop_channels=desktop.channels,
+            separate_tracks=settings.separate_audio_tracks,
         )
 
     def _clip_path(self, prefix: str, settings: Settings) -> Path:
@@ -545,7 +1082,7 @@ class FFmpegCaptureEngine:
         target has been removed, a USB drive unplugged, permissions changed),
         we fall back to the platform default rather than letting a capture
         fail outright. The settings layer already validates the *shape* of the
-        value (see :func:`_coerce_output_dir`); this is the runtime safety net.
+        value (see :func:`_coerce_directory`); this is the runtime safety net.
         """
         default_dir = app_paths().clips_dir
         configured = settings.output_dir.strip() if settings.output_dir else ""
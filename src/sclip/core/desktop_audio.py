@@ -9,7 +9,10 @@ no "Stereo Mix" and no virtual cable.
 This module does the same. :class:`DesktopAudioPump` opens the default
 playback device in loopback mode, then streams the raw PCM into a Windows
 named pipe. The capture engine points an extra FFmpeg input at that pipe and
-mixes it with the microphone, so a saved clip carries the game audio.
+mixes it with the microphone, so a saved clip carries the game audio. On the
+way, :mod:`sclip.core.pcm` folds a surround or high-rate device down to the
+stereo 48 kHz the clip is encoded at, when NumPy is there to do it, and
+corrects for the device clock drifting against the wall clock.
 
 The whole feature degrades gracefully: if the optional ``PyAudioWPatch``
 dependency is missing, or no loopback device can be opened, :meth:`start`
@@ -27,6 +30,8 @@ from ctypes import wintypes
 from dataclasses import dataclass
 from typing import Any
 
+from sclip.core.pcm import PIPE_CHANNELS, PIPE_RATE, PcmConverter, make_converter
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +43,57 @@ _READ_FRAMES: int = 1024
 # occasional moment when FFmpeg is busy and not draining the pipe.
 _PIPE_BUFFER_BYTES: int = 256 * 1024
 
+# How long PCM may wait in the pump before it is written. Gathering this much
+# into a single WriteFile makes 25 calls a second rather than one per WASAPI
+# read, and 40 ms is nothing against FFmpeg's own input queue.
+_WRITE_LATENCY: float = 0.04
+
+# The shortest idle wait. Anything shorter is a busy loop by another name.
+_MIN_WAIT: float = 0.001
+
+# A pause in delivery longer than this means the endpoint went quiet, which
+# ends a stretch of flowing audio the drift is measured over. WASAPI hands
+# over a period every 10 ms or so while anything is playing.
+_DRIFT_GAP: float = 0.25
+
+# Flowing audio to measure before the drift figure is trusted. A stretch is
+# only timed to within a device period at either end, so it takes this long
+# for that to shrink to a few parts per million.
+_DRIFT_SETTLE: float = 30.0
+
+# How often the correction follows the measurement, in seconds.
+_DRIFT_UPDATE: float = 1.0
+
+# The most the correction will make up for. Real crystals are within a
+# couple of hundred ppm; a figure past this is a stalled or misreported
+# device, and correcting all of it would be audible as a pitch change.
+_MAX_DRIFT_PPM: float = 1000.0
+
+
+@dataclass(frozen=True, slots=True)
+class PumpStats:
+    """How one run of the pump went, as logged when it stops.
+
+    ``worst_jitter`` is the largest amount by which the gap between two pipe
+    writes missed :data:`_WRITE_LATENCY`, in seconds. ``drift_ppm`` is how
+    much faster than nominal the device clock ran against the monotonic
+    clock, or ``None`` if too little audio flowed to tell.
+    """
+
+    audio_seconds: float
+    cpu_seconds: float
+    writes: int
+    worst_jitter: float
+    drift_ppm: float | None = None
+
+    @property
+    def cpu_per_audio_second(self) -> float:
+        return self.cpu_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    @property
+    def writes_per_second(self) -> float:
+        return self.writes / self.audio_seconds if self.audio_seconds else 0.0
+
 
 @dataclass(frozen=True, slots=True)
 class DesktopAudioStream:
@@ -121,12 +177,19 @@ class _OutboundPipe:
         if client not in (0, _INVALID_HANDLE_VALUE):
             self._k32.CloseHandle(client)
 
-    def write(self, data: bytes) -> bool:
-        """Write a PCM chunk. Returns False once the reader has gone away."""
+    def write(self, data: bytes | memoryview) -> bool:
+        """Write a PCM chunk. Returns False once the reader has gone away.
+
+        A memoryview over a writable buffer is passed to Windows in place, so
+        the pump's staging buffer is never copied on its way out.
+        """
         if self._handle is None:
             return False
+        buffer: Any = data
+        if isinstance(data, memoryview):
+            buffer = ctypes.byref(ctypes.c_char.from_buffer(data))
         written = wintypes.DWORD(0)
-        ok = self._k32.WriteFile(self._handle, data, len(data), ctypes.byref(written), None)
+        ok = self._k32.WriteFile(self._handle, buffer, len(data), ctypes.byref(written), None)
         return bool(ok)
 
     def close(self) -> None:
@@ -136,6 +199,136 @@ class _OutboundPipe:
             self._handle = None
 
 
+class _PipeBatcher:
+    """Gathers PCM in one preallocated buffer and writes it out in batches.
+
+    Nothing here allocates per chunk: captured audio and silence are both
+    copied into the same buffer, silence from a block of zeroes made once,
+    and each batch goes to the pipe as a view of that buffer. It also keeps
+    the figures :class:`PumpStats` reports.
+    """
+
+    def __init__(self, pipe: Any, bytes_per_frame: int, sample_rate: int) -> None:
+        self._pipe = pipe
+        self._frame = bytes_per_frame
+        self._batch = max(1, int(sample_rate * _WRITE_LATENCY)) * bytes_per_frame
+        # Room for a whole batch plus one read, so a read never has to wait
+        # for a flush to fit.
+        self._buffer = bytearray(self._batch + _READ_FRAMES * bytes_per_frame)
+        self._view = memoryview(self._buffer)
+        self._silence = memoryview(bytes(_READ_FRAMES * bytes_per_frame))
+        self._staged = 0
+        self._staged_at = 0.0
+        self._last_write: float | None = None
+        self.frames = 0
+        self.writes = 0
+        self.worst_jitter = 0.0
+
+    def add(self, chunk: bytes | memoryview) -> bool:
+        """Queue captured PCM. Returns False once the reader has gone away."""
+        size = len(chunk)
+        if self._staged + size > len(self._buffer) and not self.flush():
+            return False
+        self.frames += size // self._frame
+        if size > len(self._buffer):
+            return self._write(chunk)
+        self._stage(chunk, size)
+        return self._staged < self._batch or self.flush()
+
+    def add_silence(self, frames: int) -> bool:
+        """Queue ``frames`` of silence, flushing whole batches as they fill."""
+        self.frames += frames
+        remaining = frames * self._frame
+        while remaining:
+            size = min(remaining, len(self._silence), len(self._buffer) - self._staged)
+            self._stage(self._silence[:size], size)
+            remaining -= size
+            if self._staged >= self._batch and not self.flush():
+                return False
+        return True
+
+    def due_in(self, now: float) -> float:
+        """Seconds until the staged PCM has waited its latency; inf if none is staged."""
+        if not self._staged:
+            return float("inf")
+        return self._staged_at + _WRITE_LATENCY - now
+
+    def flush(self, *, measure: bool = True) -> bool:
+        """Write whatever is staged."""
+        if not self._staged:
+            return True
+        size, self._staged = self._staged, 0
+        return self._write(self._view[:size], measure=measure)
+
+    def _stage(self, data: bytes | memoryview, size: int) -> None:
+        if not self._staged:
+            self._staged_at = time.monotonic()
+        self._view[self._staged : self._staged + size] = data
+        self._staged += size
+
+    def _write(self, data: bytes | memoryview, *, measure: bool = True) -> bool:
+        if not self._pipe.write(data):
+            return False
+        self.writes += 1
+        now = time.monotonic()
+        if measure and self._last_write is not None:
+            jitter = abs(now - self._last_write - _WRITE_LATENCY)
+            self.worst_jitter = max(self.worst_jitter, jitter)
+        self._last_write = now
+        return True
+
+
+class _DriftMeter:
+    """Measures how far the device clock runs from the monotonic one.
+
+    Only stretches of flowing audio say anything about the device clock -
+    a silent loopback endpoint delivers nothing - so each stretch is timed
+    from its first read to its last, and the frames read in between are
+    set against that. Totals carry across stretches, so the figure sharpens
+    the longer the session runs. A stretch starts at the first read that
+    leaves nothing waiting behind it, since a backlog was produced before
+    that read's timestamp.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        self._rate = sample_rate
+        self._frames = 0
+        self._seconds = 0.0
+        self._span_frames = 0
+        self._span_started: float | None = None
+        self._last = 0.0
+
+    def observe(self, frames: int, backlog: int, now: float) -> None:
+        """Record a read of ``frames`` at ``now`` that left ``backlog`` waiting."""
+        if self._span_started is not None and now - self._last > _DRIFT_GAP:
+            self._frames += self._span_frames
+            self._seconds += self._last - self._span_started
+            self._span_started = None
+        if self._span_started is None:
+            if backlog <= 0:
+                self._span_started = self._last = now
+                self._span_frames = 0
+            return
+        self._span_frames += frames
+        self._last = now
+
+    @property
+    def seconds(self) -> float:
+        """Flowing audio measured so far, in wall-clock seconds."""
+        if self._span_started is None:
+            return self._seconds
+        return self._seconds + self._last - self._span_started
+
+    @property
+    def ppm(self) -> float | None:
+        """Device rate over nominal, in parts per million; ``None`` until settled."""
+        seconds = self.seconds
+        if seconds < _DRIFT_SETTLE:
+            return None
+        frames = self._frames + (self._span_frames if self._span_started is not None else 0)
+        return (frames / (seconds * self._rate) - 1) * 1e6
+
+
 class DesktopAudioPump:
     """Captures the default playback device and streams it to a named pipe."""
 
@@ -147,6 +340,7 @@ class DesktopAudioPump:
         self._connected = threading.Event()
         # Set once we know whether the optional dependency is importable.
         self._available: bool | None = None
+        self._drift: _DriftMeter | None = None
 
     @property
     def is_available(self) -> bool:
@@ -155,6 +349,12 @@ class DesktopAudioPump:
             self._available = self._probe_availability()
         return self._available
 
+    @property
+    def drift_ppm(self) -> float | None:
+        """The running capture's device clock drift, in ppm; ``None`` if not yet known."""
+        drift = self._drift
+        return drift.ppm if drift is not None else None
+
     @staticmethod
     def _probe_availability() -> bool:
         """Check the optional dependency imports and a loopback device exists."""
@@ -199,8 +399,14 @@ class DesktopAudioPump:
             if device is None:
                 return None
 
-            sample_rate = int(device["defaultSampleRate"])
-            channels = int(device["maxInputChannels"])
+            device_rate = int(device["defaultSampleRate"])
+            device_channels = int(device["maxInputChannels"])
+            # What the pipe carries: stereo 48 kHz when the pump converts,
+            # otherwise exactly what the device delivers.
+            convert = make_converter(device_channels, device_rate)
+            sample_rate, channels = (
+                (PIPE_RATE, PIPE_CHANNELS) if convert else (device_rate, device_channels)
+            )
             pipe_name = rf"\\.\pipe\sclip-desktop-audio-{os.getpid()}"
 
             pipe = _OutboundPipe(pipe_name)
@@ -215,15 +421,17 @@ class DesktopAudioPump:
             self._connected.clear()
             self._thread = threading.Thread(
                 target=self._run,
-                args=(int(device["index"]), sample_rate, channels),
+                args=(int(device["index"]), device_rate, device_channels, convert),
                 name="sclip-desktop-audio",
                 daemon=True,
             )
             self._thread.start()
 
             logger.info(
-                "Desktop audio pump started: %s @ %d Hz, %d ch",
+                "Desktop audio pump started: %s @ %d Hz, %d ch, piped as %d Hz, %d ch",
                 device["name"],
+                device_rate,
+                device_channels,
                 sample_rate,
                 channels,
             )
@@ -248,6 +456,7 @@ class DesktopAudioPump:
                 self._pipe.close()
             self._pipe = None
             self._thread = None
+            self._drift = None
         logger.info("Desktop audio pump stopped")
 
     # -- worker -------------------------------------------------------------
@@ -294,9 +503,13 @@ class DesktopAudioPump:
         pipe: _OutboundPipe,
         sample_rate: int,
         channels: int,
-    ) -> None:
+        convert: PcmConverter | None = None,
+    ) -> PumpStats:
         """Forward loopback PCM to the pipe until asked to stop.
 
+        ``sample_rate`` and ``channels`` describe what goes into the pipe;
+        ``convert``, when given, turns each read from the device into that.
+
         Two failure modes shape this loop, and they pull in opposite
         directions.
 
@@ -319,10 +532,27 @@ class DesktopAudioPump:
         wall time. When sound is playing the correction is zero and nothing is
         injected; when the endpoint goes quiet the deficit grows and is filled
         exactly. The result is self-correcting and needs no accurate timer.
+
+        Around that, the loop is built not to cost the game anything. What it
+        writes is gathered into one preallocated buffer and sent every
+        :data:`_WRITE_LATENCY` rather than per read, silence included, and
+        when there is nothing to do it sleeps until there will be - the next
+        batch due, or the next pad owed - instead of polling.
+
+        Trusting the device clock has one cost over a long session: it is
+        never exactly its nominal rate, so hours into a buffer the audio has
+        slid against the video FFmpeg stamps by the wall clock. Each read is
+        therefore also timed against the monotonic clock, and once that has
+        settled the converter resamples by the measured drift, so the device
+        still sets the pace and the pipe still keeps wall time.
         """
         bytes_per_frame = channels * 2  # 16-bit samples
+        batcher = _PipeBatcher(pipe, bytes_per_frame, sample_rate)
+        drift = _DriftMeter(convert.sample_rate if convert else sample_rate)
+        self._drift = drift
         started = time.monotonic()
-        written_frames = 0
+        cpu_started = time.thread_time()
+        next_correction = started + _DRIFT_UPDATE
 
         # Only bother padding once the shortfall is worth a write, and never
         # emit a huge block at once, so a long silence stays smooth.
@@ -335,35 +565,57 @@ class DesktopAudioPump:
             except Exception:  # not every backend implements it
                 available = _READ_FRAMES
 
+            now = time.monotonic()
+            deficit = int((now - started) * sample_rate) - batcher.frames
             if available > 0:
                 # Returns straight away: we only ask for what is already there,
                 # so the device paces us without a sleep.
-                chunk = stream.read(min(available, _READ_FRAMES), exception_on_overflow=False)
-                if not pipe.write(chunk):
-                    if not self._stop_event.is_set():
-                        logger.debug("Desktop-audio reader closed the pipe")
-                    return
-                written_frames += len(chunk) // bytes_per_frame
-                continue
-
-            expected = int((time.monotonic() - started) * sample_rate)
-            deficit = expected - written_frames
-            if deficit >= min_pad:
-                pad = min(deficit, max_pad)
-                if not pipe.write(bytes(pad * bytes_per_frame)):
-                    if not self._stop_event.is_set():
-                        logger.debug("Desktop-audio reader closed the pipe")
-                    return
-                written_frames += pad
+                frames = min(available, _READ_FRAMES)
+                chunk = stream.read(frames, exception_on_overflow=False)
+                drift.observe(frames, available - frames, now)
+                if convert is not None and now >= next_correction:
+                    next_correction = now + _DRIFT_UPDATE
+                    ppm = drift.ppm
+                    if ppm is not None:
+                        convert.correct(max(-_MAX_DRIFT_PPM, min(_MAX_DRIFT_PPM, ppm)))
+                alive = batcher.add(convert(chunk) if convert else chunk)
+            elif deficit >= min_pad:
+                alive = batcher.add_silence(min(deficit, max_pad))
+            elif batcher.due_in(now) <= 0:
+                alive = batcher.flush()
+            else:
+                # Nothing ready and nothing owed yet: sleep until a pad or the
+                # staged batch falls due. A coarse Windows timer oversleeping
+                # this only grows the deficit, which the next pass makes up.
+                owed_in = (min_pad - deficit) / sample_rate
+                self._stop_event.wait(max(_MIN_WAIT, min(owed_in, batcher.due_in(now))))
                 continue
+            if not alive:
+                if not self._stop_event.is_set():
+                    logger.debug("Desktop-audio reader closed the pipe")
+                break
+        else:
+            batcher.flush(measure=False)
+
+        return PumpStats(
+            audio_seconds=batcher.frames / sample_rate,
+            cpu_seconds=time.thread_time() - cpu_started,
+            writes=batcher.writes,
+            worst_jitter=batcher.worst_jitter,
+            drift_ppm=drift.ppm,
+        )
 
-            # Nothing ready and nothing owed: idle briefly. The wait is short
-            # enough that the coarse Windows timer cannot make us fall behind,
-            # because the deficit above corrects for it either way.
-            self._stop_event.wait(0.002)
+    def _run(
+        self,
+        device_index: int,
+        sample_rate: int,
+        channels: int,
+        convert: PcmConverter | None,
+    ) -> None:
+        """Worker thread: read loopback PCM and forward it to the pipe.
 
-    def _run(self, device_index: int, sample_rate: int, channels: int) -> None:
-        """Worker thread: read loopback PCM and forward it to the pipe."""
+        ``sample_rate`` and ``channels`` are the device's own.
+        """
         try:
             import pyaudiowpatch as pyaudio
         except ImportError:
@@ -395,7 +647,19 @@ class DesktopAudioPump:
                 input=True,
                 input_device_index=device_index,
             )
-            self._pump_until_stopped(stream, pipe, sample_rate, channels)
+            if convert is not None:
+                stats = self._pump_until_stopped(stream, pipe, PIPE_RATE, PIPE_CHANNELS, convert)
+            else:
+                stats = self._pump_until_stopped(stream, pipe, sample_rate, channels)
+            logger.info(
+                "Desktop audio pump ran %.0fs: %.1f ms CPU per second of audio, "
+                "%.0f writes per second, worst jitter %.1f ms, clock drift %s",
+                stats.audio_seconds,
+                stats.cpu_per_audio_second * 1000,
+                stats.writes_per_second,
+                stats.worst_jitter * 1000,
+                "unmeasured" if stats.drift_ppm is None else f"{stats.drift_ppm:+.1f} ppm",
+            )
 
         except Exception:
             logger.exception("Desktop audio capture loop failed")
@@ -410,4 +674,4 @@ class DesktopAudioPump:
                 audio.terminate()
 
 
-__all__ = ["DesktopAudioPump", "DesktopAudioStream"]
+__all__ = ["DesktopAudioPump", "DesktopAudioStream", "PumpStats"]
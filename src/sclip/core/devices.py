@@ -2,18 +2,29 @@
 
 Listing devices is surprisingly slow on Windows - every call to FFmpeg's dshow
 probe spins up the binary, queries the COM subsystem and waits for it to time
-out trying to open ``dummy`` as an input. We cache the results until a caller
-explicitly invokes :meth:`SystemDeviceRegistry.refresh`.
+out trying to open ``dummy`` as an input. We cache the results, and the audio
+list is also kept on disk, so a launch shows the devices the last one found
+straight away and checks them again in the background.
+
+That check, and the one :meth:`SystemDeviceRegistry.refresh` starts when the
+OS reports a device arriving or leaving, only tell anyone when the answer
+actually differs. A burst of hot-plug messages - Windows sends several for a
+single USB headset - therefore costs at most two probes and, if nothing
+changed, not a single repaint.
 """
 
 from __future__ import annotations
 
+import json
 import logging
+import os
 import re
 import shutil
 import subprocess
 import sys
 import threading
+from collections.abc import Callable
+from pathlib import Path
 from typing import Final
 
 from sclip.contracts import AudioDevice, Monitor
@@ -42,6 +53,10 @@ _DEVICE_LINE_RE: Final = re.compile(
 # loosely so we don't accidentally pick up the next device entry.
 _ALT_NAME_RE: Final = re.compile(r'^\[dshow @ [^\]]+\]\s+Alternative name\s+"(?P<alt>[^"]+)"')
 
+# Bumped whenever the shape of the device file changes; a file written under
+# any other schema is ignored and the devices are enumerated afresh.
+_CACHE_SCHEMA: Final = 1
+
 # Try the new ffmpeg helper; fall back to a system lookup if the module is not
 # yet in the tree (another agent is writing it in parallel). The import is
 # guarded so this file at least parses and imports cleanly during development.
@@ -62,14 +77,28 @@ except ImportError:  # pragma: no cover - only triggered before the sibling land
 
 
 class SystemDeviceRegistry:
-    """Implementation of :class:`DeviceRegistry` backed by ``screeninfo`` + dshow."""
+    """Implementation of :class:`DeviceRegistry` backed by ``screeninfo`` + dshow.
+
+    ``cache_file`` is where the audio list is remembered between launches;
+    without one the registry forgets it on exit and the first call after a
+    launch waits for the probe, as it always used to. Monitors are never
+    remembered: ``screeninfo`` answers at once, and a stale list could point
+    capture at a display that is no longer there.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, cache_file: Path | None = None) -> None:
         # Caches are populated lazily on first access. The lock guards against
         # two GUI threads each refreshing the list at the same time on startup.
         self._monitors_cache: list[Monitor] | None = None
         self._audio_cache: list[AudioDevice] | None = None
+        self._cache_file = cache_file
         self._lock = threading.Lock()
+        self._change_listeners: list[Callable[[], None]] = []
+        # At most one background audio scan runs. A request arriving while it
+        # does sets ``_rescan_again`` so the scan runs once more when it ends,
+        # and the last device to settle is not missed.
+        self._scanning = False
+        self._rescan_again = False
 
     # ----------------------------------------------------------------- public
 
@@ -81,18 +110,92 @@ class SystemDeviceRegistry:
             return list(self._monitors_cache)
 
     def audio_devices(self) -> list[AudioDevice]:
-        """Return audio endpoints exposed by FFmpeg's dshow demuxer."""
+        """Return audio endpoints exposed by FFmpeg's dshow demuxer.
+
+        The first call of a launch answers from the device file when there is
+        one and starts a scan to confirm it; only with no file does it wait
+        for FFmpeg.
+        """
         with self._lock:
             if self._audio_cache is None:
-                self._audio_cache = _enumerate_audio_devices()
+                remembered = _load_audio_devices(self._cache_file)
+                if remembered is not None:
+                    self._audio_cache = remembered
+                    self._start_scan_locked()
+                else:
+                    found = _enumerate_audio_devices()
+                    self._audio_cache = found or []
+                    if found is not None:
+                        _save_audio_devices(self._cache_file, found)
             return list(self._audio_cache)
 
     def refresh(self) -> None:
-        """Invalidate the caches so the next call rediscovers everything."""
+        """Look for devices again, and tell the listeners if any came or went.
+
+        Monitors are re-read here and now; audio devices are probed in the
+        background, so this returns at once and is safe to call on the GUI
+        thread whenever the OS mentions hardware.
+        """
+        monitors = _enumerate_monitors()
         with self._lock:
-            self._monitors_cache = None
-            self._audio_cache = None
-        logger.debug("Device caches cleared")
+            changed = self._monitors_cache is not None and monitors != self._monitors_cache
+            self._monitors_cache = monitors
+            self._start_scan_locked()
+        if changed:
+            logger.info("Monitors changed: %s", ", ".join(m.name for m in monitors) or "none")
+            self._notify_changed()
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback fired when the monitors or audio devices change.
+
+        It receives nothing; the listener asks for whichever list it shows.
+        It runs on the thread that noticed the change, usually the scan's, so
+        a Qt-based listener must marshal back onto the GUI thread itself.
+        """
+        self._change_listeners.append(listener)
+
+    # -------------------------------------------------------------- internals
+
+    def _start_scan_locked(self) -> None:
+        """Probe the audio devices on a thread. Must be called with the lock held."""
+        if self._scanning:
+            self._rescan_again = True
+            return
+        self._scanning = True
+        threading.Thread(target=self._scan, name="sclip-device-scan", daemon=True).start()
+
+    def _scan(self) -> None:
+        """Worker-thread body for :meth:`_start_scan_locked`."""
+        while True:
+            found = _enumerate_audio_devices()
+            learned = changed = False
+            with self._lock:
+                # A probe that could not run says nothing about the devices,
+                # so it leaves the list - and the file - as they were.
+                if found is not None and found != self._audio_cache:
+                    # Anything new is worth the file, even with no list before
+                    # it - a scan from refresh() can beat the first lookup -
+                    # but only a list that replaced another is a change.
+                    learned = True
+                    changed = self._audio_cache is not None
+                    self._audio_cache = found
+                again = self._rescan_again
+                self._rescan_again = False
+                self._scanning = again
+            if found is not None and learned:
+                _save_audio_devices(self._cache_file, found)
+            if found is not None and changed:
+                logger.info("Audio devices changed: %d found", len(found))
+                self._notify_changed()
+            if not again:
+                return
+
+    def _notify_changed(self) -> None:
+        for listener in list(self._change_listeners):
+            try:
+                listener()
+            except Exception:
+                logger.exception("Device change listener raised")
 
 
 # ====================================================================== monitors
@@ -130,12 +233,16 @@ def _enumerate_monitors() -> list[Monitor]:
 # ================================================================= audio devices
 
 
-def _enumerate_audio_devices() -> list[AudioDevice]:
-    """Run FFmpeg's dshow probe and parse the stderr block it spits out."""
+def _enumerate_audio_devices() -> list[AudioDevice] | None:
+    """Run FFmpeg's dshow probe and parse the stderr block it spits out.
+
+    ``None`` means the probe could not be run at all, as opposed to running
+    and finding nothing, so a failed probe cannot overwrite a good list.
+    """
     ffmpeg_path = _resolve_ffmpeg()
     if not ffmpeg_path:
         logger.warning("FFmpeg not available; cannot enumerate audio devices")
-        return []
+        return None
 
     cmd = [
         ffmpeg_path,
@@ -161,13 +268,13 @@ def _enumerate_audio_devices() -> list[AudioDevice]:
         )
     except FileNotFoundError:
         logger.warning("FFmpeg binary at %s went missing between probes", ffmpeg_path)
-        return []
+        return None
     except subprocess.TimeoutExpired:
         logger.warning("Audio device probe timed out after %.1fs", _FFMPEG_TIMEOUT_SECONDS)
-        return []
+        return None
     except OSError as exc:
         logger.warning("Could not run FFmpeg for device probe: %s", exc)
-        return []
+        return None
 
     return _parse_dshow_devices(result.stderr or "")
 
@@ -224,6 +331,44 @@ def _parse_dshow_devices(stderr: str) -> list[AudioDevice]:
     return devices
 
 
+# ================================================================== device file
+
+
+def _load_audio_devices(cache_file: Path | None) -> list[AudioDevice] | None:
+    """The audio devices the last launch found, or ``None`` if there is no usable file."""
+    if cache_file is None:
+        return None
+    try:
+        parsed = json.loads(cache_file.read_text(encoding="utf-8"))
+        if parsed.get("schema") != _CACHE_SCHEMA:
+            return None
+        return [AudioDevice(name=str(d["name"]), kind=str(d["kind"])) for d in parsed["audio"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _save_audio_devices(cache_file: Path | None, devices: list[AudioDevice]) -> None:
+    """Remember ``devices`` for the next launch. Best-effort by design.
+
+    Written to a temporary file and renamed over the old one, so a crash
+    mid-write leaves the previous list rather than a torn one.
+    """
+    if cache_file is None:
+        return
+    payload = {
+        "schema": _CACHE_SCHEMA,
+        "audio": [{"name": device.name, "kind": device.kind} for device in devices],
+    }
+    partial = cache_file.with_suffix(".tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        partial.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        os.replace(partial, cache_file)
+    except OSError as exc:
+        # The next launch simply waits for the probe, as it would have anyway.
+        logger.debug("Could not remember the audio devices: %s", exc)
+
+
 # ===================================================================== platform
 
 
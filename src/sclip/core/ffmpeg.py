@@ -13,22 +13,68 @@ Desktop Duplication API. It runs on the GPU, hands frames back at the true
 refresh rate, and (with ``dup_frames``) emits perfectly constant-rate video.
 ``gdigrab`` is kept only as a fallback for the rare machine where Desktop
 Duplication is unavailable, such as an RDP session.
+
+The capture can also be resized on its way to the encoder, so a 4K desktop can
+be recorded at 1080p. Where the frames are already on the GPU for a hardware
+encoder the resize happens there too; a CPU encoder gets a software resize,
+fused with its colour conversion into a single pass.
+
+A capture can also be cropped to part of the monitor - a region, or a window
+found by title (see :mod:`sclip.core.region`). The crop is handed to the grab
+itself as an offset and a size, so the pixels outside it never leave the
+desktop: nothing downstream, not even the copy out of GPU memory, pays for
+them.
+
+The replay buffer can optionally run at a variable frame rate. ``dup_frames``
+keeps ddagrab's output constant even while nothing on screen moves, which
+means encoding and writing a full frame rate of identical pictures through
+every menu and loading screen. With the option on, ``mpdecimate`` drops those
+repeats before they reach the encoder, and the save step lays the constant
+rate back down when a clip is written.
+
+A long-lived FFmpeg's stderr is read continuously by a :class:`StderrPump`,
+which keeps the last few hundred lines and counts the warnings worth knowing
+about - dropped frames, timestamp trouble, audio buffer overruns. Because the
+pipe can never fill, a capture whose stderr is pumped is started with warnings
+and progress statistics switched on, where everything else stays at ``error``.
+
+Every FFmpeg is started for a :class:`JobClass`, which sets its CPU and I/O
+priority: the capture above the game's own, saves level with it, and work
+nobody is waiting on - thumbnails, probes, transcodes - only when the machine
+is otherwise idle. Windows takes a priority class at creation; elsewhere the
+child sets its own niceness, and on Linux its I/O class, before it execs.
+
+A software encoder can be held to a CPU budget, so that it leaves cores to the
+game rather than spreading over all of them; see :func:`budget_cores`. The
+budget sets the encoder's thread count and the process's affinity together -
+threads alone still let the scheduler put them on any core, and affinity
+alone leaves x264 running one thread per core it cannot use.
 """
 
 from __future__ import annotations
 
+import contextlib
+import ctypes
+import json
 import logging
+import os
+import platform
+import re
 import shutil
 import subprocess
 import sys
-from collections.abc import Iterable, Sequence
-from dataclasses import dataclass
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, replace
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, NoReturn
 
-from sclip.contracts import Monitor, encoder_by_codec
+from sclip.contracts import Monitor, encoder_by_codec, encoder_family
 from sclip.core.process_guard import guard_child
+from sclip.core.region import CaptureRegion
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +83,40 @@ logger = logging.getLogger(__name__)
 # other platforms can still import this module without tripping over it.
 _CREATE_NO_WINDOW: int = getattr(subprocess, "CREATE_NO_WINDOW", 0)
 
+# Niceness a POSIX child is given once started, per job class; see JobClass. The
+# capture's negative value needs privileges most users lack, and is quietly
+# skipped without them.
+_CAPTURE_NICENESS: int = -5
+_BACKGROUND_NICENESS: int = 19
+
+# Linux's ioprio_set, which Python does not wrap: the syscall number for each
+# architecture S-Clip might be developed on, and the idle I/O class, which
+# only gets the disk when nothing else wants it. Elsewhere a niceness of 19
+# still puts the child in the lowest best-effort I/O level.
+_IOPRIO_SET_SYSCALLS: dict[str, int] = {"x86_64": 251, "aarch64": 30, "i686": 289, "armv7l": 314}
+_IOPRIO_WHO_PROCESS: int = 1
+_IOPRIO_CLASS_IDLE: int = 3
+_IOPRIO_CLASS_SHIFT: int = 13
+
+# Windows affinity masks are one machine word, covering one processor group;
+# a budget on a bigger machine is taken from the first group's cores.
+_WINDOWS_AFFINITY_BITS: int = 64
+
+# Access rights asked of OpenProcess: enough to set a process's affinity and
+# to read its times and memory, and nothing more.
+_PROCESS_SET_INFORMATION: int = 0x0200
+_PROCESS_QUERY_LIMITED_INFORMATION: int = 0x1000
+
+# The longest wait_for_exit sleeps between looks for the child's exit, as
+# subprocess's own wait caps it. It starts far shorter and backs off, so a
+# short job is not charged a whole poll and a long one wakes S-Clip twenty
+# times a second rather than hundreds. A cancel cuts the sleep short.
+_REAP_POLL_MAX: float = 0.05
+
+# How often a Windows wait looks at its cancel event. POSIX sleeps on the
+# event itself between its looks at the child.
+_CANCEL_POLL: float = 0.1
+
 # A generous audio queue keeps dshow from dropping samples when the video
 # encoder briefly runs ahead of the audio thread.
 _AUDIO_THREAD_QUEUE: str = "1024"
@@ -48,6 +128,10 @@ _AUDIO_THREAD_QUEUE: str = "1024"
 # capture - one source of truth keeps the two paths in lockstep.
 AUDIO_BITRATE: str = "192k"
 
+# Top of the CRF scale for x264 (and the slider) and for SVT-AV1.
+_X264_CRF_MAX: int = 51
+_SVT_AV1_CRF_MAX: int = 63
+
 # Consecutive B-frames between reference frames. Three is the usual sweet spot:
 # most of the compression benefit, and still supported by every NVENC generation
 # the application targets. Safe alongside the segment muxer because every
@@ -60,10 +144,74 @@ _B_FRAMES: int = 3
 _FAST_PROBE: tuple[str, ...] = ("-analyzeduration", "0", "-probesize", "32")
 
 
+# The log level for a process whose stderr nobody reads until it exits. Safe
+# only because a healthy process says nothing at this level; see
+# _argv_with_binary.
+_QUIET_LOGLEVEL: str = "error"
+
+# The log level for a process whose stderr is pumped. ``level+`` tags every
+# line with its severity, which is what lets the pump count warnings without
+# guessing from the wording.
+_PUMPED_LOGLEVEL: str = "level+warning"
+
+# Lines of stderr a pump keeps. Enough to hold an error and the context FFmpeg
+# prints before it, without letting a chatty process grow without bound.
+_STDERR_RING_LINES: int = 200
+
+# Bytes copied per write when streaming files into FFmpeg's stdin. Large
+# enough that a multi-gigabyte recording is a few thousand writes, small
+# enough that the copy never holds more than this in memory.
+_STREAM_CHUNK: int = 1 << 20
+
+# The progress line ``-stats`` writes; its drop= and dup= fields are running
+# totals for the whole process.
+_PROGRESS_FIELDS = re.compile(r"\b(drop|dup)=\s*(\d+)")
+
+# Lower-cased substrings that identify each class of warning the pump counts.
+_TIMESTAMP_MARKERS: tuple[str, ...] = (
+    "past duration",  # "Past duration 0.999 too large"
+    "non-monotonic dts",
+    "non monotonically increasing dts",
+    "queue input is backward in time",
+)
+_OVERRUN_MARKERS: tuple[str, ...] = (
+    "real-time buffer",  # dshow: "real-time buffer [...] too full or near too full"
+    "thread message queue blocking",
+    "buffer overrun",
+)
+
+
 class FFmpegNotFoundError(RuntimeError):
     """Raised when no FFmpeg binary can be located on this machine."""
 
 
+class JobCancelledError(RuntimeError):
+    """Raised when a job is cancelled through its ``cancel`` event.
+
+    Any FFmpeg the job had running has been killed and reaped by the time
+    this is raised.
+    """
+
+
+class JobClass(Enum):
+    """What an FFmpeg job is for, which decides how much it may take from the game.
+
+    ``CAPTURE`` is the live capture - the replay buffer's muxer or a manual
+    recording - and runs above normal priority: a frame it misses is gone,
+    where every other job can be late without losing anything. ``SAVE`` is
+    work the user is waiting on - a clip stitch, a recording join, a benchmark
+    trial, whose timings would mean nothing at any other priority - and runs
+    at normal. ``BACKGROUND`` is work nobody is waiting on - library
+    thumbnails and duration probes, the archive's transcodes, the H.264
+    export copy - and runs at idle priority, with idle I/O where the platform
+    lets a child have it.
+    """
+
+    CAPTURE = "capture"
+    SAVE = "save"
+    BACKGROUND = "background"
+
+
 class VideoBackend(str, Enum):
     """Which screen-capture path FFmpeg should use.
 
@@ -88,13 +236,16 @@ class AudioConfig:
     describe the PCM on it.
 
     An empty ``microphone`` means no microphone; an empty ``desktop_pipe``
-    means no desktop audio.
+    means no desktop audio. ``separate_tracks`` writes the two as tracks of
+    their own, microphone first, to be mixed when the footage is saved;
+    see :attr:`split`.
     """
 
     microphone: str = ""  # dshow microphone device; "" means disabled
     desktop_pipe: str = ""  # named pipe carrying desktop PCM; "" means disabled
     desktop_rate: int = 48000
     desktop_channels: int = 2
+    separate_tracks: bool = False
 
     @property
     def has_microphone(self) -> bool:
@@ -108,6 +259,11 @@ class AudioConfig:
     def any_audio(self) -> bool:
         return self.has_microphone or self.has_desktop
 
+    @property
+    def split(self) -> bool:
+        """True when the capture writes two audio tracks rather than one mix."""
+        return self.separate_tracks and self.has_microphone and self.has_desktop
+
 
 @dataclass(frozen=True, slots=True)
 class CapturePlan:
@@ -116,6 +272,15 @@ class CapturePlan:
     Built by the capture engine from the live settings and a resolved
     :class:`~sclip.contracts.Monitor`. Kept immutable so a half-built plan can
     never leak into a running capture.
+
+    ``output_size`` is the encoded frame size when it differs from the
+    monitor's; ``None`` encodes at native size with no resize stage at all.
+    ``scaler`` names the swscale algorithm used when that resize runs on the
+    CPU. ``variable_frame_rate`` asks for repeated frames to be dropped before
+    the encoder; see :func:`frames_can_be_decimated` for when that is honoured.
+    ``region`` crops the capture to part of the monitor, in the monitor's own
+    coordinates; when set, ``output_size`` is relative to the region's size.
+    ``cores`` holds a software encoder to a CPU budget; see :func:`budget_cores`.
     """
 
     monitor: Monitor
@@ -125,6 +290,18 @@ class CapturePlan:
     preset: str
     crf: int
     audio: AudioConfig
+    output_size: tuple[int, int] | None = None
+    scaler: str = "bilinear"
+    variable_frame_rate: bool = False
+    region: CaptureRegion | None = None
+    cores: frozenset[int] | None = None
+
+    @property
+    def capture_size(self) -> tuple[int, int]:
+        """The size of what is grabbed, before any resize."""
+        if self.region is not None:
+            return self.region.size
+        return self.monitor.width, self.monitor.height
 
 
 def _bundled_ffmpeg_candidates(root: Path, binary_name: str) -> list[Path]:
@@ -150,6 +327,12 @@ def _bundled_ffmpeg_candidates(root: Path, binary_name: str) -> list[Path]:
     return candidates
 
 
+# The binary find_ffmpeg settled on, under the key "ffmpeg". Every FFmpeg
+# S-Clip starts asks for it, and the walk behind the answer globs two folder
+# trees, so it is kept for as long as the file it names is still there.
+_FOUND: dict[str, Path] = {}
+
+
 def find_ffmpeg() -> Path:
     """Locate the FFmpeg binary, preferring a copy shipped alongside the app.
 
@@ -157,7 +340,21 @@ def find_ffmpeg() -> Path:
     uses the version it shipped with, rather than silently picking up whatever
     else the machine happens to have. A clear exception here beats a confusing
     failure deep inside a later Popen call.
+
+    The answer is remembered for the rest of the process; a remembered binary
+    that has since disappeared - FFmpeg updated under a running S-Clip - sends
+    the next call back to searching.
     """
+    found = _FOUND.get("ffmpeg")
+    if found is not None and found.is_file():
+        return found
+    found = _search_for_ffmpeg()
+    _FOUND["ffmpeg"] = found
+    return found
+
+
+def _search_for_ffmpeg() -> Path:
+    """Walk the bundled locations, then PATH; see :func:`find_ffmpeg`."""
     binary_name = "ffmpeg.exe" if sys.platform == "win32" else "ffmpeg"
 
     # paths.app_paths() is imported lazily so a missing platformdirs install
@@ -199,62 +396,572 @@ def ffprobe_path() -> Path:
     raise FFmpegNotFoundError("ffprobe binary was not found next to ffmpeg.")
 
 
-def popen_kwargs() -> dict[str, Any]:
-    """Subprocess kwargs that suppress the console window on Windows.
+def popen_kwargs(*, job: JobClass) -> dict[str, Any]:
+    """Subprocess kwargs that start a ``job`` with no console window.
 
     Used by every FFmpeg invocation, including the brief device-list probe -
     flashing a black console for a 200 ms call is just as ugly as flashing
     one for a long-running recording.
+
+    On Windows the priority is a creation flag too. Elsewhere nothing is
+    passed: taking a priority at creation would mean running Python between
+    fork and exec, which is not safe while other threads hold locks. Hand
+    the started process to :func:`apply_job_priority` instead, which sets
+    the priority, and any affinity, from this side on every platform.
     """
     if sys.platform != "win32":
         return {}
     startupinfo = subprocess.STARTUPINFO()
     startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
     startupinfo.wShowWindow = subprocess.SW_HIDE
-    return {"startupinfo": startupinfo, "creationflags": _CREATE_NO_WINDOW}
+    priority = {
+        JobClass.CAPTURE: subprocess.ABOVE_NORMAL_PRIORITY_CLASS,
+        JobClass.SAVE: subprocess.NORMAL_PRIORITY_CLASS,
+        JobClass.BACKGROUND: subprocess.IDLE_PRIORITY_CLASS,
+    }[job]
+    return {"startupinfo": startupinfo, "creationflags": _CREATE_NO_WINDOW | priority}
+
+
+def apply_job_priority(
+    process: subprocess.Popen[Any], job: JobClass, cores: frozenset[int] | None = None
+) -> None:
+    """Give a just-started ``process`` the priority of ``job``, and hold it to ``cores``.
+
+    On Windows the priority was set at creation by :func:`popen_kwargs`, so
+    only the affinity is left to do. Elsewhere the niceness, Linux's idle I/O
+    class for a background job, and the affinity are all set here, from the
+    parent. Linux keeps them per thread, so they are applied to each thread
+    the child has so far; any it starts later inherit them. The child may
+    run for a moment at S-Clip's own priority first, which costs nothing
+    that matters. Failures are swallowed: a child at the wrong priority is
+    a slower job, not a broken one.
+    """
+    if sys.platform == "win32":
+        _pin_windows_process(process, cores)
+        return
+    niceness = {JobClass.CAPTURE: _CAPTURE_NICENESS, JobClass.BACKGROUND: _BACKGROUND_NICENESS}
+    ioprio_set = _linux_ioprio_set() if job is JobClass.BACKGROUND else None
+    set_affinity = getattr(os, "sched_setaffinity", None) if cores is not None else None
+    if job not in niceness and set_affinity is None:
+        return
+    for thread in _threads_of(process.pid):
+        if job in niceness:
+            with contextlib.suppress(OSError):
+                os.setpriority(os.PRIO_PROCESS, thread, niceness[job])
+        if ioprio_set is not None:
+            ioprio_set(thread)
+        if set_affinity is not None:
+            with contextlib.suppress(OSError):
+                set_affinity(thread, cores)
+
+
+def _threads_of(pid: int) -> list[int]:
+    """The ids of ``pid``'s threads where /proc lists them, else just ``pid``."""
+    try:
+        return [int(entry.name) for entry in Path(f"/proc/{pid}/task").iterdir()]
+    except (OSError, ValueError):
+        return [pid]
+
+
+def _linux_ioprio_set() -> Callable[[int], None] | None:
+    """A call that moves a thread into the idle I/O class, where Linux has one."""
+    number = _IOPRIO_SET_SYSCALLS.get(platform.machine())
+    if not sys.platform.startswith("linux") or number is None:
+        return None
+    try:
+        syscall = ctypes.CDLL(None, use_errno=True).syscall
+    except (OSError, AttributeError):
+        return None
+    value = _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT
+
+    def set_idle(thread: int) -> None:
+        syscall(number, _IOPRIO_WHO_PROCESS, thread, value)
+
+    return set_idle
+
+
+def run_at_priority(
+    argv: Sequence[str], *, job: JobClass, timeout: float
+) -> subprocess.CompletedProcess[str]:
+    """Run a complete command line as ``job``, as :func:`subprocess.run` would, without a check.
+
+    For helper commands that name their own binary - ffprobe, a thumbnail
+    grab. Output is captured as text. A timeout kills the process and
+    raises :class:`subprocess.TimeoutExpired`, as ``run`` does.
+    """
+    with subprocess.Popen(
+        list(argv),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        **popen_kwargs(job=job),
+    ) as process:
+        apply_job_priority(process, job)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+    return subprocess.CompletedProcess(list(argv), process.returncode, stdout, stderr)
+
+
+def budget_cores(encoder: str, percent: int) -> frozenset[int] | None:
+    """The logical cores ``encoder`` may use under a CPU budget of ``percent``.
+
+    ``None`` means no limit: a budget of 0, one that covers every core this
+    process may use, or a hardware encoder, whose encode does not run on
+    the CPU at all. A budget always leaves the encoder one core.
+
+    The cores are the highest-numbered ones. Core 0 takes most of the
+    system's interrupts, and a game's main thread tends to start low, so
+    the top of the machine is where an encoder gets in the way least.
+    """
+    if percent <= 0 or encoder_runs_on_gpu(encoder):
+        return None
+    if hasattr(os, "sched_getaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+    else:
+        available = list(range(min(os.cpu_count() or 1, _WINDOWS_AFFINITY_BITS)))
+    count = max(1, len(available) * percent // 100)
+    if count >= len(available):
+        return None
+    return frozenset(available[-count:])
+
+
+def encoder_thread_args(encoder: str, threads: int) -> list[str]:
+    """Encoder flags that keep a software ``encoder`` to ``threads`` worker threads.
+
+    Each library takes its thread count in its own way: libx264 through the
+    generic ``-threads``, which FFmpeg forwards to x264; libx265 only through
+    the size of its thread pool; SVT-AV1 through its logical-processor
+    count. Hardware encoders get nothing - they have no threads to limit.
+    """
+    if encoder_runs_on_gpu(encoder):
+        return []
+    if encoder == "libx265":
+        return ["-x265-params", f"pools={threads}"]
+    if encoder == "libsvtav1":
+        return ["-svtav1-params", f"lp={threads}"]
+    return ["-threads", str(threads)]
+
+
+def _pin_windows_process(process: subprocess.Popen[Any], cores: frozenset[int] | None) -> None:
+    """Hold a just-started Windows ``process`` to ``cores``; see :func:`apply_job_priority`.
+
+    Windows applies an affinity to every thread a process has, so the few
+    milliseconds between start and pin cost nothing. A failure is logged and
+    the process left as it is: running unpinned is a worse capture, not a
+    broken one.
+    """
+    if sys.platform != "win32":
+        return
+    if cores is None:
+        return
+    mask = sum(1 << core for core in cores if core < _WINDOWS_AFFINITY_BITS)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.SetProcessAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+    access = _PROCESS_SET_INFORMATION | _PROCESS_QUERY_LIMITED_INFORMATION
+    try:
+        with _windows_process_handle(process.pid, access) as handle:
+            if kernel32.SetProcessAffinityMask(handle, mask):
+                return
+            raise ctypes.WinError(ctypes.get_last_error())
+    except OSError as exc:
+        logger.warning("Could not hold FFmpeg to %d core(s): %s", len(cores), exc)
+
+
+@contextlib.contextmanager
+def _windows_process_handle(pid: int, access: int) -> Iterator[int]:
+    """A handle to Windows process ``pid`` with ``access`` rights, closed on the way out.
+
+    Opened by pid rather than borrowed from the ``Popen``, whose handle is
+    private to CPython. Raises :class:`OSError` if it cannot be opened.
+    """
+    if sys.platform != "win32":
+        raise OSError("process handles are a Windows feature")
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    handle = kernel32.OpenProcess(access, False, pid)
+    if not handle:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        yield handle
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _argv_with_binary(
+    binary: Path, args: Sequence[str], *, loglevel: str = _QUIET_LOGLEVEL, stats: bool = False
+) -> list[str]:
+    """Prepend the binary path and the logging flags to a flag list.
+
+    ``-loglevel error`` is not only tidy, it is load-bearing for a process
+    whose stderr is piped and only read once it exits: a chattier level would
+    fill the pipe buffer and wedge FFmpeg. At ``error`` a healthy capture
+    stays silent. A process whose stderr is drained by a :class:`StderrPump`
+    has no such limit and can afford ``loglevel`` warnings and ``stats``.
+    """
+    return [
+        str(binary),
+        "-hide_banner",
+        "-loglevel",
+        loglevel,
+        *(["-stats"] if stats else ["-nostats"]),
+        *args,
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceUsage:
+    """What one finished FFmpeg cost the machine.
+
+    CPU time is split as the OS keeps it, user and system, summed over every
+    thread; ``peak_rss_bytes`` is the most memory the process held at once.
+    Figures the platform would not give are zero. ``wall_seconds`` is filled
+    in by whoever timed the run - :func:`run_ffmpeg` does.
+    """
+
+    user_seconds: float = 0.0
+    system_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    wall_seconds: float = 0.0
 
+    @property
+    def cpu_seconds(self) -> float:
+        return self.user_seconds + self.system_seconds
+
+    @property
+    def cores(self) -> float:
+        """Cores kept busy on average while it ran; 0.0 when that is unknown."""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.cpu_seconds / self.wall_seconds
+
+    def beyond(self, baseline: ResourceUsage) -> ResourceUsage:
+        """What this run cost over ``baseline``, a shorter run of the same job.
+
+        The difference cancels the start-up both runs paid. Memory is not
+        additive, so the peak is this run's own.
+        """
+        return ResourceUsage(
+            user_seconds=max(0.0, self.user_seconds - baseline.user_seconds),
+            system_seconds=max(0.0, self.system_seconds - baseline.system_seconds),
+            peak_rss_bytes=self.peak_rss_bytes,
+            wall_seconds=max(0.0, self.wall_seconds - baseline.wall_seconds),
+        )
+
+
+class FFmpegResult(subprocess.CompletedProcess[str]):
+    """A :class:`subprocess.CompletedProcess` that also carries what the run cost."""
+
+    def __init__(
+        self,
+        args: Sequence[str],
+        returncode: int,
+        stdout: str = "",
+        stderr: str = "",
+        *,
+        usage: ResourceUsage | None = None,
+    ) -> None:
+        super().__init__(args, returncode, stdout, stderr)
+        self.usage = usage or ResourceUsage()
+
+
+def wait_for_exit(
+    process: subprocess.Popen[str],
+    *,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+) -> ResourceUsage:
+    """Wait for ``process`` to exit, as ``wait`` would, and return what it cost.
+
+    ``wait`` reaps the child and throws its accounting away with it, and
+    afterwards nobody can ask. On POSIX the child is reaped with ``wait4``
+    instead, which hands back that child's own figures, and the exit code is
+    recorded on ``process`` exactly as ``wait`` would have. On Windows the
+    process handle stays valid after exit, so its times and peak working set
+    are read from it. Raises :class:`subprocess.TimeoutExpired` as ``wait``
+    does, with the process left running.
+
+    Setting ``cancel`` while this waits kills the process, reaps it and
+    raises :class:`JobCancelledError`.
+    """
+    if sys.platform == "win32":
+        _wait_windows(process, timeout=timeout, cancel=cancel)
+        return _windows_usage(process)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = 0.0005
+    while True:
+        if cancel is not None and cancel.is_set():
+            _kill_cancelled(process)
+        try:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        except ChildProcessError:
+            # Reaped already, by a poll() from another thread; the exit code
+            # survives on the Popen, the accounting does not.
+            process.wait()
+            return ResourceUsage()
+        if pid:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+            scale = 1 if sys.platform == "darwin" else 1024
+            return ResourceUsage(
+                user_seconds=usage.ru_utime,
+                system_seconds=usage.ru_stime,
+                peak_rss_bytes=usage.ru_maxrss * scale,
+            )
+        step = delay
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(process.args, timeout or 0.0)
+            step = min(step, remaining)
+        if cancel is not None:
+            cancel.wait(step)
+        else:
+            time.sleep(step)
+        delay = min(delay * 2, _REAP_POLL_MAX)
+
+
+def _wait_windows(
+    process: subprocess.Popen[str], *, timeout: float | None, cancel: threading.Event | None
+) -> None:
+    """``process.wait``, looking at ``cancel`` every :data:`_CANCEL_POLL` seconds."""
+    if cancel is None:
+        process.wait(timeout=timeout)
+        return
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        if cancel.is_set():
+            _kill_cancelled(process)
+        step = _CANCEL_POLL
+        if deadline is not None:
+            step = min(step, max(0.0, deadline - time.monotonic()))
+        try:
+            process.wait(timeout=step)
+            return
+        except subprocess.TimeoutExpired:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(process.args, timeout or 0.0) from None
+
+
+def _kill_cancelled(process: subprocess.Popen[str]) -> NoReturn:
+    """Kill and reap a cancelled job's FFmpeg, then say so."""
+    with contextlib.suppress(OSError):
+        process.kill()
+    process.wait()
+    raise JobCancelledError("cancelled")
+
+
+def _windows_usage(process: subprocess.Popen[str]) -> ResourceUsage:
+    """CPU times and peak working set of an exited Windows process; see :func:`wait_for_exit`."""
+    if sys.platform != "win32":
+        return ResourceUsage()
+    from ctypes import wintypes
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
 
-def _argv_with_binary(binary: Path, args: Sequence[str]) -> list[str]:
-    """Prepend the binary path and the standard quiet flags to a flag list.
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE, *[ctypes.c_void_p] * 4]
+    kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+    times = [wintypes.FILETIME() for _ in range(4)]
+    memory = _MemoryCounters(cb=ctypes.sizeof(_MemoryCounters))
+    try:
+        # Popen still holds its own handle, so an exited process can be opened.
+        with _windows_process_handle(process.pid, _PROCESS_QUERY_LIMITED_INFORMATION) as handle:
+            if not kernel32.GetProcessTimes(handle, *(ctypes.byref(part) for part in times)):
+                raise ctypes.WinError(ctypes.get_last_error())
+            if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(memory), memory.cb):
+                memory.PeakWorkingSetSize = 0
+    except OSError as exc:
+        logger.debug("Could not read what FFmpeg cost: %s", exc)
+        return ResourceUsage()
+    _created, _exited, kernel, user = times
+    # FILETIME counts hundreds of nanoseconds.
+    return ResourceUsage(
+        user_seconds=(user.dwHighDateTime << 32 | user.dwLowDateTime) / 1e7,
+        system_seconds=(kernel.dwHighDateTime << 32 | kernel.dwLowDateTime) / 1e7,
+        peak_rss_bytes=int(memory.PeakWorkingSetSize),
+    )
 
-    ``-loglevel error`` is not only tidy, it is load-bearing: a long capture
-    runs with its stderr piped, and a chattier log level would fill the pipe
-    buffer and wedge FFmpeg. At ``error`` a healthy capture stays silent.
+
+def _communicate(
+    process: subprocess.Popen[str], *, timeout: float, cancel: threading.Event | None = None
+) -> tuple[str, str, ResourceUsage]:
+    """Read a process's output to the end and reap it, keeping what it cost.
+
+    ``communicate`` would reap the child itself (see :func:`wait_for_exit`),
+    so the pipes are drained on threads instead while the caller's thread
+    waits. On a timeout the process is killed and reaped before the
+    :class:`subprocess.TimeoutExpired` is raised; a cancel kills it too.
     """
-    return [str(binary), "-hide_banner", "-loglevel", "error", *args]
+    output: dict[str, str] = {}
+
+    def drain(name: str, stream: IO[str] | None) -> None:
+        # ValueError covers a pipe closed under the reader after a timeout.
+        with contextlib.suppress(OSError, ValueError):
+            if stream is not None:
+                output[name] = stream.read()
+
+    readers = [
+        threading.Thread(
+            target=drain, args=(name, stream), name=f"sclip-ffmpeg-{name}", daemon=True
+        )
+        for name, stream in (("stdout", process.stdout), ("stderr", process.stderr))
+    ]
+    for reader in readers:
+        reader.start()
+    try:
+        usage = wait_for_exit(process, timeout=timeout, cancel=cancel)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        wait_for_exit(process)
+        raise
+    for reader in readers:
+        reader.join()
+    return output.get("stdout", ""), output.get("stderr", ""), usage
 
 
 def run_ffmpeg(
     args: Sequence[str],
     *,
     binary: Path | None = None,
+    job: JobClass,
+    cores: frozenset[int] | None = None,
     timeout: float = 30.0,
     check: bool = False,
-) -> subprocess.CompletedProcess[str]:
+    loglevel: str = _QUIET_LOGLEVEL,
+    cancel: threading.Event | None = None,
+) -> FFmpegResult:
     """Run FFmpeg synchronously, capturing stdout and stderr as text.
 
     Suited to short-lived helpers such as the concat job. Long-running
-    captures should use :func:`start_ffmpeg` instead.
+    captures should use :func:`start_ffmpeg` instead. ``job`` sets the
+    process's priority; see :class:`JobClass`. ``cores`` holds it to those
+    cores, as for a capture under a CPU budget. ``loglevel`` is for a job
+    whose answer FFmpeg only logs, such as a quality metric's summary.
+    Setting ``cancel`` kills the process and raises :class:`JobCancelledError`.
+
+    Behaves as :func:`subprocess.run` does, timeout and ``check`` included;
+    it is spelled out so the child can take its priority once started, and so
+    the result can carry the run's :class:`ResourceUsage`.
     """
     ff = binary or find_ffmpeg()
-    cmdline = _argv_with_binary(ff, args)
+    cmdline = _argv_with_binary(ff, args, loglevel=loglevel)
     logger.debug("Running FFmpeg synchronously: %s", " ".join(cmdline))
-    return subprocess.run(
+    started = time.monotonic()
+    with subprocess.Popen(
         cmdline,
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
         encoding="utf-8",
         errors="replace",
-        timeout=timeout,
-        check=check,
-        **popen_kwargs(),
+        **popen_kwargs(job=job),
+    ) as process:
+        apply_job_priority(process, job, cores)
+        stdout, stderr, usage = _communicate(process, timeout=timeout, cancel=cancel)
+        usage = replace(usage, wall_seconds=time.monotonic() - started)
+    result = FFmpegResult(cmdline, process.returncode, stdout, stderr, usage=usage)
+    if check:
+        result.check_returncode()
+    return result
+
+
+def stream_into_ffmpeg(
+    args: Sequence[str],
+    sources: Sequence[Path],
+    *,
+    job: JobClass,
+    binary: Path | None = None,
+    timeout: float = 120.0,
+) -> subprocess.CompletedProcess[str]:
+    """Run FFmpeg reading ``sources``, back to back, from its stdin.
+
+    For inputs that are valid concatenated byte for byte - MPEG-TS segments -
+    this is a join that never writes the concatenation to disk: the files are
+    copied into the pipe a chunk at a time while FFmpeg remuxes them, so the
+    only bytes written are the output's. ``args`` should name ``pipe:0`` as
+    the input.
+
+    A source that cannot be read raises :class:`OSError` after the process
+    has been killed. FFmpeg closing its end early is not an error here; its
+    exit code and stderr say why. Raises :class:`subprocess.TimeoutExpired`
+    if the whole job outlives ``timeout``.
+    """
+    ff = binary or find_ffmpeg()
+    cmdline = _argv_with_binary(ff, args)
+    logger.debug("Streaming %d file(s) into FFmpeg: %s", len(sources), " ".join(cmdline))
+    deadline = time.monotonic() + timeout
+    process = subprocess.Popen(
+        cmdline,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        **popen_kwargs(job=job),
     )
+    apply_job_priority(process, job)
+    guard_child(process)
+    stderr = process.stderr
+    assert process.stdin is not None and stderr is not None
+    # stderr is drained concurrently: at the quiet log level it is tiny, but
+    # an unread pipe that did fill would deadlock against the writes below.
+    captured: list[bytes] = []
+    reader = threading.Thread(
+        target=lambda: captured.append(stderr.read()), name="sclip-stderr-stream", daemon=True
+    )
+    reader.start()
+    try:
+        for source in sources:
+            with source.open("rb") as handle:
+                shutil.copyfileobj(handle, process.stdin, _STREAM_CHUNK)
+    except BrokenPipeError:
+        pass  # FFmpeg stopped reading; its exit code carries the reason
+    except OSError:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        with contextlib.suppress(OSError):
+            process.stdin.close()
+
+    try:
+        returncode = process.wait(timeout=max(0.0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    reader.join(timeout=1.0)
+    text = b"".join(captured).decode("utf-8", errors="replace")
+    return subprocess.CompletedProcess(cmdline, returncode, None, text)
 
 
 def start_ffmpeg(
     args: Sequence[str],
     *,
+    job: JobClass,
+    cores: frozenset[int] | None = None,
     binary: Path | None = None,
+    pumped: bool = False,
 ) -> subprocess.Popen[str]:
     """Start a long-lived FFmpeg process and return the ``Popen`` handle.
 
@@ -270,9 +977,17 @@ def start_ffmpeg(
     own graceful-stop protocol (``q`` → terminate → kill) does not benefit
     from automatic termination on scope exit, and forcing that model causes
     subtle bugs when the process is stored across scope boundaries.
+
+    ``pumped`` promises that the caller will hand stderr to a
+    :class:`StderrPump` once any startup check is done, and turns on the
+    warnings and progress statistics the pump parses. ``cores`` holds the
+    process to a CPU budget; see :func:`budget_cores`.
     """
     ff = binary or find_ffmpeg()
-    cmdline = _argv_with_binary(ff, args)
+    if pumped:
+        cmdline = _argv_with_binary(ff, args, loglevel=_PUMPED_LOGLEVEL, stats=True)
+    else:
+        cmdline = _argv_with_binary(ff, args)
     logger.debug("Starting FFmpeg: %s", " ".join(cmdline))
     process = subprocess.Popen(
         cmdline,
@@ -283,8 +998,9 @@ def start_ffmpeg(
         encoding="utf-8",
         errors="replace",
         bufsize=0,  # unbuffered: 'q' should reach FFmpeg the moment we send it
-        **popen_kwargs(),
+        **popen_kwargs(job=job),
     )
+    apply_job_priority(process, job, cores)
     # The stop path below is careful, but it only runs if S-Clip lives long
     # enough to run it. Enrol the child so the kernel kills it if we are killed
     # outright; see sclip.core.process_guard for why that matters more than it
@@ -330,6 +1046,116 @@ def stop_ffmpeg(process: subprocess.Popen[str], *, timeout: float = 8.0) -> int:
         return -1
 
 
+@dataclass(frozen=True, slots=True)
+class StderrCounters:
+    """What a :class:`StderrPump` has counted so far in one process's stderr.
+
+    ``frames_dropped`` and ``frames_duplicated`` come from the ``-stats``
+    progress line, where FFmpeg keeps them as running totals: a dropped frame
+    is one the capture could not get to the encoder in time, a duplicated one
+    a repeat inserted to hold a constant rate.
+    """
+
+    lines: int = 0
+    warnings: int = 0
+    errors: int = 0
+    frames_dropped: int = 0
+    frames_duplicated: int = 0
+    timestamp_warnings: int = 0
+    buffer_overruns: int = 0
+
+    @property
+    def is_clean(self) -> bool:
+        """Nothing worth mentioning happened."""
+        return not (
+            self.errors or self.frames_dropped or self.timestamp_warnings or self.buffer_overruns
+        )
+
+
+class StderrPump:
+    """Drain one FFmpeg's stderr continuously, keeping a tail and counters.
+
+    A reader thread per process, because Windows pipes cannot be multiplexed
+    with ``select`` and the thread spends its life blocked in ``read``, which
+    costs nothing. Progress lines are parsed but not kept: at two a second
+    they would push everything else out of the ring within minutes.
+
+    :func:`read_stderr_tail` must not be used on a process once its stderr
+    belongs to a pump.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen[str],
+        *,
+        name: str = "ffmpeg",
+        max_lines: int = _STDERR_RING_LINES,
+    ) -> None:
+        self._process = process
+        self._lock = threading.Lock()
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._counters = StderrCounters()
+        self._thread = threading.Thread(
+            target=self._drain, name=f"sclip-stderr-{name}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the pump to reach end-of-file, for up to ``timeout``."""
+        self._thread.join(timeout)
+
+    @property
+    def counters(self) -> StderrCounters:
+        with self._lock:
+            return self._counters
+
+    def tail(self, lines: int = 12) -> list[str]:
+        """The last ``lines`` lines kept, oldest first."""
+        with self._lock:
+            return list(self._lines)[-lines:]
+
+    def feed(self, line: str) -> None:
+        """Account for one line of stderr. Public so the parsing can be tested."""
+        stripped = line.strip()
+        if not stripped:
+            return
+        progress = dict(_PROGRESS_FIELDS.findall(stripped))
+        with self._lock:
+            counters = self._counters
+            if progress and stripped.startswith("frame="):
+                self._counters = replace(
+                    counters,
+                    frames_dropped=int(progress.get("drop", counters.frames_dropped)),
+                    frames_duplicated=int(progress.get("dup", counters.frames_duplicated)),
+                )
+                return
+            lowered = stripped.lower()
+            self._lines.append(stripped)
+            self._counters = replace(
+                counters,
+                lines=counters.lines + 1,
+                warnings=counters.warnings + ("[warning]" in lowered),
+                errors=counters.errors + ("[error]" in lowered or "[fatal]" in lowered),
+                timestamp_warnings=counters.timestamp_warnings
+                + any(marker in lowered for marker in _TIMESTAMP_MARKERS),
+                buffer_overruns=counters.buffer_overruns
+                + any(marker in lowered for marker in _OVERRUN_MARKERS),
+            )
+
+    def _drain(self) -> None:
+        stream = self._process.stderr
+        if stream is None:
+            return
+        # Text mode reads with universal newlines, so the carriage-return-
+        # terminated progress line arrives as a line of its own. ValueError
+        # covers a pipe closed by the owner mid-read.
+        with contextlib.suppress(OSError, ValueError):
+            for line in stream:
+                self.feed(line)
+
+
 def read_stderr_tail(process: subprocess.Popen[str], max_chars: int = 2000) -> str:
     """Drain whatever FFmpeg left on stderr without blocking forever.
 
@@ -368,6 +1194,82 @@ def parse_resolution(value: str) -> tuple[int, int]:
     return width, height
 
 
+def fit_output_size(source: tuple[int, int], target: tuple[int, int]) -> tuple[int, int] | None:
+    """Fit the capture into the requested resolution, or ``None`` to skip resizing.
+
+    The result keeps the source's aspect ratio inside the ``target`` box, so a
+    16:10 display asked for 1920x1080 comes out at 1728x1080 rather than
+    squashed. Both sides are rounded down to even numbers, which every encoder
+    in :data:`~sclip.contracts.ENCODERS` needs for 4:2:0 video.
+
+    Only downscaling is offered. Asking for more pixels than the display has
+    would spend bitrate inventing detail, so a target at or above the native
+    size means "capture as-is" and no resize stage is built.
+    """
+    source_width, source_height = source
+    target_width, target_height = target
+    if source_width <= 0 or source_height <= 0:
+        return None
+    factor = min(target_width / source_width, target_height / source_height)
+    if factor >= 1.0:
+        return None
+    width = max(2, int(source_width * factor) // 2 * 2)
+    height = max(2, int(source_height * factor) // 2 * 2)
+    if (width, height) == (source_width, source_height):
+        return None
+    return width, height
+
+
+@dataclass(frozen=True, slots=True)
+class MediaLayout:
+    """The shape of a media file's first video stream, and how many audio tracks it has."""
+
+    width: int
+    height: int
+    audio_tracks: int
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_tracks > 0
+
+
+def probe_media_layout(path: Path, *, job: JobClass, timeout: float = 10.0) -> MediaLayout | None:
+    """Ask ffprobe for ``path``'s frame size and audio; ``None`` if it cannot say.
+
+    A failure is logged and returned as ``None`` rather than raised: every
+    caller has a plainer way to carry on without the answer.
+    """
+    try:
+        argv = [
+            str(ffprobe_path()),
+            "-v",
+            "error",
+            "-show_entries",
+            "stream=codec_type,width,height",
+            "-of",
+            "json",
+            str(path),
+        ]
+        result = run_at_priority(argv, job=job, timeout=timeout)
+    except (FFmpegNotFoundError, OSError, subprocess.TimeoutExpired) as exc:
+        logger.warning("Could not probe %s: %s", path.name, exc)
+        return None
+    if result.returncode != 0:
+        logger.warning("ffprobe failed on %s: %s", path.name, result.stderr.strip()[-300:])
+        return None
+    try:
+        streams = json.loads(result.stdout).get("streams", [])
+        video = next(s for s in streams if s.get("codec_type") == "video")
+        return MediaLayout(
+            width=int(video["width"]),
+            height=int(video["height"]),
+            audio_tracks=sum(1 for s in streams if s.get("codec_type") == "audio"),
+        )
+    except (ValueError, KeyError, TypeError, AttributeError, StopIteration):
+        logger.warning("ffprobe gave no usable video stream for %s", path.name)
+        return None
+
+
 def iter_argv_flat(parts: Iterable[Iterable[str] | str]) -> list[str]:
     """Flatten a sequence of argument chunks into a single argv list.
 
@@ -412,6 +1314,52 @@ def expected_segment_paths(directory: Path) -> list[Path]:
     return [path for _mtime, path in dated]
 
 
+# MPEG-TS framing, for counting pictures without spawning ffprobe: fixed-size
+# packets behind a sync byte, and a PES start code whose stream id falls in
+# the video range.
+_TS_PACKET_SIZE: int = 188
+_TS_SYNC_BYTE: int = 0x47
+_PES_START_CODE: bytes = b"\x00\x00\x01"
+_PES_VIDEO_STREAM_IDS: range = range(0xE0, 0xF0)
+
+
+def count_video_frames(path: Path) -> int:
+    """Count the video pictures in an MPEG-TS file by reading its packets.
+
+    FFmpeg's muxer starts a new PES packet for every video frame, so counting
+    the packets that open a video PES counts the frames. That is a plain scan
+    of the bytes - quick enough to run over a finished segment from the
+    telemetry poll, where starting ffprobe once a segment would not be.
+
+    Returns ``0`` for a file that cannot be read; a packet that has lost its
+    sync byte is skipped rather than trusted.
+    """
+    try:
+        data = memoryview(path.read_bytes())
+    except OSError as exc:
+        logger.debug("Could not read %s to count frames: %s", path, exc)
+        return 0
+    frames = 0
+    for offset in range(0, len(data) - _TS_PACKET_SIZE + 1, _TS_PACKET_SIZE):
+        packet = data[offset : offset + _TS_PACKET_SIZE]
+        if packet[0] != _TS_SYNC_BYTE or not packet[1] & 0x40:
+            continue  # out of sync, or a continuation rather than a packet start
+        adaptation = (packet[3] >> 4) & 0b11
+        if not adaptation & 0b01:
+            continue  # adaptation field only, no payload
+        payload = 4
+        if adaptation & 0b10:
+            payload += 1 + packet[4]
+        if payload + 4 > _TS_PACKET_SIZE:
+            continue
+        if (
+            packet[payload : payload + 3] == _PES_START_CODE
+            and packet[payload + 3] in _PES_VIDEO_STREAM_IDS
+        ):
+            frames += 1
+    return frames
+
+
 def remove_quietly(path: Path) -> None:
     """Delete a file if it exists, swallowing benign errors.
 
@@ -432,14 +1380,18 @@ def build_quality_args(codec: str, crf: int) -> list[str]:
     ``-crf``; NVENC ignores CRF entirely and wants ``-cq``; AMF takes a
     constant QP; Intel QSV uses ``-global_quality``. Picking the right knob
     keeps the slider behaving consistently from the user's point of view.
+
+    SVT-AV1's CRF runs from 0 to 63 rather than 0 to 51, so the slider is
+    stretched onto that range; a value passed through unscaled would land
+    every setting at a visibly higher quality - and bitrate - than asked for.
     """
     spec = encoder_by_codec(codec)
     if spec is None:
         logger.warning("Unknown encoder %r; assuming libx264-style CRF", codec)
         return ["-crf", str(crf)]
 
-    if codec == "libx264":
-        return ["-crf", str(crf)]
+    if codec == "libsvtav1":
+        return ["-crf", str(round(crf * _SVT_AV1_CRF_MAX / _X264_CRF_MAX))]
     if codec.endswith("_nvenc"):
         # VBR with a quality target and no bitrate cap: NVENC then chases the
         # requested quality rather than a fixed bitrate.
@@ -480,9 +1432,37 @@ def build_quality_args(codec: str, crf: int) -> list[str]:
         return ["-rc", "cqp", "-qp_i", str(crf), "-qp_p", str(crf), "-qp_b", str(crf)]
     if codec.endswith("_qsv"):
         return ["-global_quality", str(crf)]
+    # libx264 and libx265 share the scale the slider was designed around.
     return ["-crf", str(crf)]
 
 
+def mp4_tag_args(encoder: str) -> list[str]:
+    """Sample-entry tag for writing ``encoder``'s stream into an MP4.
+
+    FFmpeg tags HEVC as ``hev1`` by default, which QuickTime, iOS and a good
+    many web players refuse to open. ``hvc1`` carries the same bitstream with
+    the parameter sets in the header, and plays everywhere HEVC plays at all.
+    H.264 and AV1 have only one tag, so they need nothing.
+    """
+    return ["-tag:v", "hvc1"] if encoder_family(encoder) == "hevc" else []
+
+
+def mp4_layout_args(*, fragmented: bool) -> list[str]:
+    """``-movflags`` for a saved MP4: a front-loaded index, or fragments.
+
+    Either way the file is seekable from the first byte and can be uploaded
+    as it is. ``+faststart`` gets there by writing the file, then rewriting
+    all of it to move the index - the moov atom - from the end to the front,
+    so every byte of the clip is written twice. A fragmented MP4 puts an
+    empty index up front and a small one before each keyframe's run of
+    samples, so it is written once, in order. The cost is compatibility
+    with a few older editors, which is why it is a setting.
+    """
+    if fragmented:
+        return ["-movflags", "frag_keyframe+empty_moov+default_base_moof"]
+    return ["-movflags", "+faststart"]
+
+
 def encoder_is_gpu_native(encoder: str) -> bool:
     """True when the encoder can consume ddagrab's GPU frames without a copy.
 
@@ -525,13 +1505,17 @@ def build_encoder_args(
         args += ["-tune", "hq"]
 
     args += build_quality_args(plan.encoder, plan.crf)
+    if plan.cores is not None:
+        args += encoder_thread_args(plan.encoder, len(plan.cores))
     args += [
         "-g",
         str(gop),
         "-bf",
         str(_B_FRAMES),
         "-fps_mode",
-        "cfr",  # force constant frame rate on the output as well as the input
+        # Constant rate on the output as well as the input, unless repeated
+        # frames are being dropped on purpose; then the gaps must survive.
+        "vfr" if plan.variable_frame_rate and not frames_on_gpu else "cfr",
     ]
     if force_keyframes:
         # Place a keyframe exactly on every segment boundary. Combined with
@@ -546,31 +1530,121 @@ def build_encoder_args(
     return args
 
 
+def encoder_runs_on_gpu(encoder: str) -> bool:
+    """True for any hardware encoder, whether or not it reads ddagrab's surfaces."""
+    spec = encoder_by_codec(encoder)
+    return spec is not None and spec.needs_gpu
+
+
+def _software_scale_filter(plan: CapturePlan) -> str:
+    """The swscale resize for a CPU encoder, or ``""`` when none is needed.
+
+    The trailing ``format`` matters more than it looks. A CPU encoder needs
+    ``yuv420p`` anyway, and naming it here lets one ``scale`` instance do the
+    resize and the colour conversion together; left to ``-pix_fmt`` alone,
+    FFmpeg would resize in BGRA and then run a second full-frame conversion.
+    """
+    if plan.output_size is None:
+        return ""
+    width, height = plan.output_size
+    return f"scale={width}:{height}:flags={plan.scaler},format=yuv420p"
+
+
+def frames_can_be_decimated(encoder: str, backend: VideoBackend) -> bool:
+    """Whether a capture with this encoder and backend can drop repeated frames.
+
+    ``mpdecimate`` compares pictures in system memory, so it is out of reach
+    only where the frames never arrive there: ddagrab feeding NVENC straight
+    from the GPU surface. Downloading every frame just to find the ones worth
+    skipping would cost more than encoding them, so that pairing stays at a
+    constant rate.
+    """
+    return not (backend is VideoBackend.DDAGRAB and encoder_is_gpu_native(encoder))
+
+
+def decimate_filter(fps: int) -> str:
+    """The ``mpdecimate`` stage that drops repeated frames.
+
+    ``max`` caps the run of consecutive drops just short of one second's worth,
+    so a completely still screen still yields a frame a second. Without that
+    heartbeat the encoder would go silent, no keyframe would arrive to cut on,
+    and the segment muxer would stop rotating until something moved.
+    """
+    return f"mpdecimate=max={max(1, fps - 1)}"
+
+
+def _system_memory_filters(plan: CapturePlan, *, resized_on_gpu: bool) -> list[str]:
+    """The filters a frame in system memory passes through before the encoder."""
+    filters: list[str] = []
+    if plan.output_size is not None and not resized_on_gpu:
+        filters.append(_software_scale_filter(plan))
+    if plan.variable_frame_rate:
+        if not filters:
+            # mpdecimate only understands planar formats, and BGRA is not one.
+            # The software resize already ends in yuv420p; otherwise convert
+            # here, which the encoder would have asked for anyway.
+            filters.append("format=yuv420p")
+        filters.append(decimate_filter(plan.fps))
+    return filters
+
+
 def _ddagrab_video_chain(plan: CapturePlan, *, label: str) -> str:
     """Build the ddagrab filter chain that produces the video stream.
 
     ``dup_frames`` is left at its default of on, so ddagrab repeats the last
     frame whenever the desktop has not changed. That is what guarantees a
-    genuinely constant frame rate even while the screen is static.
+    genuinely constant frame rate even while the screen is static. A plan
+    asking for a variable rate strips those repeats out again after the
+    download, which is cheaper than teaching the source two behaviours.
 
     A CPU encoder cannot read the Direct3D surfaces ddagrab emits, so for
     those we append ``hwdownload`` to copy each frame into system memory.
+
+    When the plan asks for a smaller output, a hardware encoder has the frame
+    resized by ``scale_d3d11`` while it is still a GPU surface - before the
+    ``hwdownload`` that AMF and Quick Sync need, so the copy over the bus
+    shrinks with it. libx264 is resized in software after the download
+    instead: it is the universal fallback, and must keep working on an FFmpeg
+    build too old to carry the Direct3D scaler.
     """
     chain = f"ddagrab=output_idx={plan.monitor_index}:framerate={plan.fps}:draw_mouse=1"
+    if plan.region is not None:
+        # Desktop Duplication copies only this rectangle out of the desktop
+        # surface, so the crop costs nothing and saves every stage after it.
+        region = plan.region
+        chain += (
+            f":offset_x={region.x}:offset_y={region.y}:video_size={region.width}x{region.height}"
+        )
+    resize_on_gpu = encoder_runs_on_gpu(plan.encoder)
+    if plan.output_size is not None and resize_on_gpu:
+        width, height = plan.output_size
+        chain += f",scale_d3d11=width={width}:height={height}"
     if not encoder_is_gpu_native(plan.encoder):
         chain += ",hwdownload,format=bgra"
+        for stage in _system_memory_filters(plan, resized_on_gpu=resize_on_gpu):
+            chain += f",{stage}"
     return f"{chain}[{label}]"
 
 
-def _amix_chain(audio_indices: Sequence[int], *, label: str) -> str:
-    """Mix two audio inputs into a single track.
+def _gdigrab_video_chain(plan: CapturePlan, *, label: str) -> str:
+    """Resize or decimate gdigrab's frames, which always arrive in system memory."""
+    stages = ",".join(_system_memory_filters(plan, resized_on_gpu=False))
+    return f"[0:v]{stages}[{label}]"
+
+
+def mix_audio_filter(streams: Sequence[str], *, label: str, weights: Sequence[float] = ()) -> str:
+    """A filter graph chain that mixes ``streams`` into the one track ``[label]``.
 
     Most editors and players handle a single audio track far more gracefully
     than parallel ones, so when the user captures both a microphone and the
-    system output we fold them together with ``amix``.
+    system output we fold them together with ``amix`` - live, in the capture,
+    or at save time for footage that kept them apart. ``streams`` are stream
+    specifiers such as ``1:a`` or ``0:a:1``. ``weights`` scales each one;
+    empty leaves every stream at its captured level.
     """
-    inputs = "".join(f"[{index}:a]" for index in audio_indices)
-    count = len(audio_indices)
+    inputs = "".join(f"[{stream}]" for stream in streams)
+    count = len(streams)
+    weight_option = ":weights=" + " ".join(f"{weight:g}" for weight in weights) if weights else ""
     # normalize=0 is the important part. By default amix divides every input by
     # the number of inputs, so capturing a microphone alongside game audio
     # halved both: a clip recorded with a mic was quieter than the same clip
@@ -581,8 +1655,8 @@ def _amix_chain(audio_indices: Sequence[int], *, label: str) -> str:
     # scale, so a limiter follows. It only acts on peaks that would otherwise
     # clip, leaving normal levels untouched.
     return (
-        f"{inputs}amix=inputs={count}:duration=longest:dropout_transition=0:normalize=0,"
-        f"alimiter=limit=0.97:attack=5:release=50[{label}]"
+        f"{inputs}amix=inputs={count}:duration=longest:dropout_transition=0:normalize=0"
+        f"{weight_option},alimiter=limit=0.97:attack=5:release=50[{label}]"
     )
 
 
@@ -591,20 +1665,22 @@ def _gdigrab_input(plan: CapturePlan) -> list[str]:
 
     Only reached when Desktop Duplication is unavailable. ``-framerate`` is an
     input option here because gdigrab needs the rate before it starts
-    grabbing.
+    grabbing. gdigrab works in desktop coordinates, so a region's offset is
+    added to the monitor's.
     """
     monitor = plan.monitor
+    region = plan.region or CaptureRegion(x=0, y=0, width=monitor.width, height=monitor.height)
     return [
         "-f",
         "gdigrab",
         "-framerate",
         str(plan.fps),
         "-offset_x",
-        str(monitor.x),
+        str(monitor.x + region.x),
         "-offset_y",
-        str(monitor.y),
+        str(monitor.y + region.y),
         "-video_size",
-        f"{monitor.width}x{monitor.height}",
+        f"{region.width}x{region.height}",
         "-draw_mouse",
         "1",
         "-i",
@@ -612,13 +1688,34 @@ def _gdigrab_input(plan: CapturePlan) -> list[str]:
     ]
 
 
-def _build_audio_inputs(audio: AudioConfig, first_index: int) -> tuple[list[str], list[int]]:
-    """Build audio ``-i`` blocks, returning argv and a list of stream indices."""
+def _video_input(
+    plan: CapturePlan, backend: VideoBackend, stand_in: Sequence[str] | None
+) -> list[str]:
+    """The video ``-i`` block: gdigrab's, its stand-in's, or none for ddagrab."""
+    if backend is not VideoBackend.GDIGRAB:
+        if stand_in is not None:
+            raise ValueError("a stand-in video input takes gdigrab's place")
+        return []
+    return list(stand_in) if stand_in is not None else _gdigrab_input(plan)
+
+
+def _build_audio_inputs(
+    audio: AudioConfig, first_index: int, *, microphone_input: Sequence[str] | None = None
+) -> tuple[list[str], list[int]]:
+    """Build audio ``-i`` blocks, returning argv and a list of stream indices.
+
+    ``microphone_input`` replaces the DirectShow block when there is a
+    microphone; see :func:`build_capture_io`.
+    """
     argv: list[str] = []
     indices: list[int] = []
     next_index = first_index
 
-    if audio.has_microphone:
+    if audio.has_microphone and microphone_input is not None:
+        argv += microphone_input
+        indices.append(next_index)
+        next_index += 1
+    elif audio.has_microphone:
         argv += [
             "-f",
             "dshow",
@@ -665,6 +1762,8 @@ def build_capture_io(
     backend: VideoBackend,
     keyframe_seconds: int,
     force_keyframes: bool,
+    video_input: Sequence[str] | None = None,
+    microphone_input: Sequence[str] | None = None,
 ) -> list[str]:
     """Build the FFmpeg command line from the global flags up to the codecs.
 
@@ -676,44 +1775,61 @@ def build_capture_io(
     The input layout differs by backend. ddagrab is a source *filter* with no
     ``-i`` of its own, so audio inputs take index 0 upward. gdigrab is a real
     input at index 0, pushing audio to index 1 upward.
-    """
-    argv: list[str] = ["-y"]
 
+    ``video_input`` and ``microphone_input`` stand in for the screen grab and
+    the DirectShow microphone with inputs of the caller's own - generated
+    ones, for a pipeline trial (see :func:`~sclip.core.benchmark.measure_pipeline`).
+    The video stand-in takes gdigrab's place at index 0, with frames in
+    system memory, so it needs the gdigrab backend. Everything after the
+    inputs is the capture's own.
+    """
     # --- inputs ----------------------------------------------------------
-    if backend is VideoBackend.GDIGRAB:
-        argv += _gdigrab_input(plan)
-        first_audio_index = 1
-    else:
-        first_audio_index = 0
+    video_argv = _video_input(plan, backend, video_input)
+    argv: list[str] = ["-y", *video_argv]
+    # ddagrab has no input of its own, so audio then starts at index 0.
+    first_audio_index = 1 if video_argv else 0
 
     # Audio inputs are added in a fixed order - microphone, then desktop - so
     # the indices the filter graph and the maps reference stay predictable.
-    audio_argv, audio_indices = _build_audio_inputs(plan.audio, first_audio_index)
+    audio_argv, audio_indices = _build_audio_inputs(
+        plan.audio, first_audio_index, microphone_input=microphone_input
+    )
     argv += audio_argv
 
     # --- filter graph ----------------------------------------------------
     graph_parts: list[str] = []
+    video_label: str | None = None
     if backend is VideoBackend.DDAGRAB:
-        graph_parts.append(_ddagrab_video_chain(plan, label="v"))
-
+        video_label = "v"
+        graph_parts.append(_ddagrab_video_chain(plan, label=video_label))
+    elif plan.output_size is not None or plan.variable_frame_rate:
+        video_label = "v"
+        graph_parts.append(_gdigrab_video_chain(plan, label=video_label))
+
+    # Two sources are mixed live unless they are to be kept as tracks of
+    # their own, which moves the mix - and its synchronisation point between
+    # the two inputs - out of the capture and into the save.
     mixed_audio_label: str | None = None
-    if len(audio_indices) >= 2:
+    if len(audio_indices) >= 2 and not plan.audio.split:
         mixed_audio_label = "a"
-        graph_parts.append(_amix_chain(audio_indices, label=mixed_audio_label))
+        graph_parts.append(
+            mix_audio_filter([f"{index}:a" for index in audio_indices], label=mixed_audio_label)
+        )
 
     if graph_parts:
         argv += ["-filter_complex", ";".join(graph_parts)]
 
     # --- stream mapping --------------------------------------------------
-    if backend is VideoBackend.DDAGRAB:
-        argv += ["-map", "[v]"]
+    if video_label is not None:
+        argv += ["-map", f"[{video_label}]"]
     else:
         argv += ["-map", "0:v"]
 
     if mixed_audio_label is not None:
         argv += ["-map", f"[{mixed_audio_label}]"]
-    elif len(audio_indices) == 1:
-        argv += ["-map", f"{audio_indices[0]}:a"]
+    else:
+        for index in audio_indices:
+            argv += ["-map", f"{index}:a"]
 
     # --- codecs ----------------------------------------------------------
     frames_on_gpu = backend is VideoBackend.DDAGRAB and encoder_is_gpu_native(plan.encoder)
@@ -736,21 +1852,43 @@ __all__ = [
     "AudioConfig",
     "CapturePlan",
     "FFmpegNotFoundError",
+    "FFmpegResult",
+    "JobCancelledError",
+    "JobClass",
+    "MediaLayout",
+    "ResourceUsage",
+    "StderrCounters",
+    "StderrPump",
     "VideoBackend",
+    "apply_job_priority",
+    "budget_cores",
     "build_capture_io",
     "build_encoder_args",
     "build_quality_args",
+    "count_video_frames",
+    "decimate_filter",
     "encoder_is_gpu_native",
+    "encoder_runs_on_gpu",
+    "encoder_thread_args",
     "expected_segment_paths",
     "ffprobe_path",
     "find_ffmpeg",
+    "fit_output_size",
+    "frames_can_be_decimated",
     "get_ffmpeg_path",
     "iter_argv_flat",
+    "mix_audio_filter",
+    "mp4_layout_args",
+    "mp4_tag_args",
     "parse_resolution",
     "popen_kwargs",
+    "probe_media_layout",
     "read_stderr_tail",
     "remove_quietly",
+    "run_at_priority",
     "run_ffmpeg",
     "start_ffmpeg",
     "stop_ffmpeg",
+    "stream_into_ffmpeg",
+    "wait_for_exit",
 ]
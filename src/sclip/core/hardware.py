@@ -19,17 +19,57 @@ it is pointed at*, which is a better answer and takes seconds rather than
 milliseconds. So the probe is the default and the benchmark is what the
 Re-detect action runs, where the user has asked for the measurement and can be
 shown it happening.
+
+The probes of one family run side by side rather than in turn. Each is a
+separate FFmpeg that spends most of its short life starting up or waiting on a
+driver, so running them together costs barely more than the slowest alone -
+and a wedged driver, which used to hold the whole walk for its own timeout
+before the next encoder was even tried, now only eats into one deadline
+shared by all of them. The best encoder that passes is taken the moment every
+encoder ranked above it has answered, and whatever is still running is
+killed. Better still, most launches probe nothing: an encoder the FFmpeg build
+does not include fails without being tried, and one already probed with this
+binary answers from the manifest in :mod:`sclip.core.capabilities`.
 """
 
 from __future__ import annotations
 
+import concurrent.futures
 import logging
 import subprocess
-from dataclasses import dataclass
-
-from sclip.contracts import DeviceRegistry, Settings, encoder_by_codec, encoder_label
-from sclip.core.benchmark import EncoderTrial, benchmark_encoder, find_best_configuration
-from sclip.core.ffmpeg import FFmpegNotFoundError, parse_resolution, run_ffmpeg
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from sclip.contracts import (
+    DeviceRegistry,
+    Settings,
+    encoder_by_codec,
+    encoder_family,
+    encoder_label,
+)
+from sclip.core.benchmark import (
+    BENCHMARK_SCENES,
+    BenchmarkProgress,
+    EncoderTrial,
+    benchmark_encoder,
+    clip_scene,
+    find_best_configuration,
+    measure_pipeline,
+    worst_trial,
+)
+from sclip.core.capabilities import ffmpeg_capabilities, record_probe
+from sclip.core.ffmpeg import (
+    FFmpegNotFoundError,
+    JobCancelledError,
+    JobClass,
+    fit_output_size,
+    parse_resolution,
+    run_ffmpeg,
+)
+from sclip.core.region import CaptureRegion, fit_region, parse_region
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +79,17 @@ logger = logging.getLogger(__name__)
 # libx264 is the universal software fallback and always succeeds.
 _ENCODER_PRIORITY: tuple[str, ...] = ("h264_nvenc", "h264_amf", "h264_qsv", "libx264")
 
+# The same ladder for each codec family, so a user who has chosen HEVC or AV1
+# is re-tuned within that family rather than quietly moved back to H.264.
+# Each ends in its software encoder; libsvtav1 is quick enough to capture
+# with at its faster presets, libx265 only just, which is why the benchmark
+# rather than this order has the last word.
+_ENCODER_PRIORITY_BY_FAMILY: dict[str, tuple[str, ...]] = {
+    "h264": _ENCODER_PRIORITY,
+    "hevc": ("hevc_nvenc", "hevc_amf", "hevc_qsv", "libx265"),
+    "av1": ("av1_nvenc", "libsvtav1"),
+}
+
 # ``encoder_label`` and ``_ENCODER_LABELS`` now live in ``sclip.contracts`` so
 # that the UI can import them without touching a core implementation module.
 # The import above re-exports ``encoder_label`` for any callers that reach it
@@ -50,9 +101,17 @@ _ENCODER_PRIORITY: tuple[str, ...] = ("h264_nvenc", "h264_amf", "h264_qsv", "lib
 _RECOMMENDED_PRESET: dict[str, str] = {
     "h264_nvenc": "p5",
     "hevc_nvenc": "p5",
+    "av1_nvenc": "p5",
     "h264_amf": "balanced",
+    "hevc_amf": "balanced",
     "h264_qsv": "medium",
+    "hevc_qsv": "medium",
     "libx264": "veryfast",
+    # x265 costs several times x264 at the same preset name, so it starts
+    # two rungs faster to stay inside the same CPU budget.
+    "libx265": "superfast",
+    # SVT-AV1 numbers its presets, faster upwards; 10 is its realtime range.
+    "libsvtav1": "10",
 }
 
 # A constant-quality target that looks clean without producing needlessly
@@ -65,13 +124,31 @@ _RECOMMENDED_CRF: int = 21
 # the Advanced settings for anyone who wants them.
 _RECOMMENDED_FPS: int = 60
 
+# Smaller capture sizes to fall back to, largest first, when the benchmark
+# finds nothing that sustains the display's native resolution. Each is a box
+# the display is fitted into, so the aspect ratio survives. Encoding a 4K
+# desktop at 1080p is a quarter of the pixels, which turns many a "too slow"
+# into a comfortable capture rather than a stuttering one.
+_FALLBACK_RESOLUTIONS: tuple[tuple[int, int], ...] = ((1920, 1080), (1280, 720))
+
+# How long a family's probes may take, all together. They run at once, so this
+# is what a single probe used to be allowed; an encoder that has not answered
+# by then counts as a failure, the same as one that errored.
+_PROBE_DEADLINE: float = 20.0
 
-def _probe_encoder(codec: str) -> bool:
+
+def _probe_encoder(
+    codec: str, *, timeout: float = _PROBE_DEADLINE, cancel: threading.Event | None = None
+) -> bool:
     """Return ``True`` if FFmpeg can actually encode with ``codec`` here.
 
     Encodes a fraction of a second of a synthetic black clip to the null
     muxer. A hardware encoder with no matching GPU fails immediately, so this
-    is a quick and trustworthy capability test.
+    is a quick and trustworthy capability test. Setting ``cancel`` kills the
+    encode, and a probe stopped that way has not passed.
+
+    A probe that ran to an answer is recorded against the binary, so the next
+    launch need not run it again; see :func:`_first_passing`.
     """
     try:
         result = run_ffmpeg(
@@ -86,8 +163,13 @@ def _probe_encoder(codec: str) -> bool:
                 "null",
                 "-",
             ],
-            timeout=20.0,
+            job=JobClass.SAVE,
+            timeout=timeout,
+            cancel=cancel,
         )
+    except JobCancelledError:
+        logger.debug("Encoder probe for %s stopped; a better encoder already passed", codec)
+        return False
     except FFmpegNotFoundError:
         logger.warning("FFmpeg not found while probing encoder %s", codec)
         return False
@@ -97,26 +179,99 @@ def _probe_encoder(codec: str) -> bool:
     except OSError as exc:
         logger.warning("Encoder probe for %s could not run: %s", codec, exc)
         return False
-    return result.returncode == 0
+    passed = result.returncode == 0
+    record_probe(codec, passed)
+    return passed
+
+
+def _encoder_priority(family: str) -> tuple[str, ...]:
+    return _ENCODER_PRIORITY_BY_FAMILY.get(family, _ENCODER_PRIORITY)
 
 
-def detect_best_encoder() -> str:
-    """Pick the best encoder this machine can actually use.
+def detect_best_encoder(family: str = "h264") -> str:
+    """Pick the best encoder of ``family`` this machine can actually use.
 
-    Walks the priority list and returns the first codec that survives a probe
-    encode. libx264 is last and always works, so a sensible value is always
-    returned.
+    Probes every encoder of the family at once and returns the first, in
+    priority order, that survives its probe encode; see the module docstring.
+    When none does - an FFmpeg built without libsvtav1, say - the answer is
+    libx264, which is always there, rather than nothing.
     """
-    for codec in _ENCODER_PRIORITY:
-        if _probe_encoder(codec):
-            logger.info("Recommended encoder: %s", codec)
-            return codec
+    codec = _first_passing(_encoder_priority(family))
+    if codec is not None:
+        logger.info("Recommended encoder: %s", codec)
+        return codec
+    if family != "h264":
+        logger.warning("No %s encoder passed the probe; falling back to H.264", family)
+        return detect_best_encoder()
     # _ENCODER_PRIORITY ends in libx264, so reaching here means even the
     # software encoder failed - most likely FFmpeg itself is missing.
     logger.warning("No encoder passed the probe; defaulting to libx264")
     return "libx264"
 
 
+def _first_passing(codecs: tuple[str, ...]) -> str | None:
+    """The highest-ranked of ``codecs`` whose probe passes, probing all at once.
+
+    What the FFmpeg manifest already knows is not asked again: an encoder the
+    build lacks has failed, and one probed before with this binary has the
+    answer it had then. Only the rest are probed.
+
+    Results are read in priority order, so a quick failure from a lower rank
+    never pre-empts a slower answer from a higher one. As soon as the answer
+    is known the remaining probes are cancelled, which kills their FFmpegs;
+    the pool is not waited on, since a killed probe has nothing left to say.
+    """
+    known = _known_probe_results(codecs)
+    # Nothing ranked below an encoder already known to pass can win.
+    passing = [index for index, codec in enumerate(codecs) if known.get(codec)]
+    if passing:
+        codecs = codecs[: passing[0] + 1]
+    unknown = [codec for codec in codecs if codec not in known]
+    if not unknown:
+        return next((codec for codec in codecs if known[codec]), None)
+
+    cancel = threading.Event()
+    pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(unknown), thread_name_prefix="sclip-probe"
+    )
+    try:
+        futures = {
+            codec: pool.submit(_probe_encoder, codec, timeout=_PROBE_DEADLINE, cancel=cancel)
+            for codec in unknown
+        }
+        deadline = time.monotonic() + _PROBE_DEADLINE
+        for codec in codecs:
+            if codec in known:
+                if known[codec]:
+                    return codec
+                continue
+            try:
+                passed = futures[codec].result(timeout=max(0.0, deadline - time.monotonic()))
+            except concurrent.futures.TimeoutError:
+                logger.warning("Encoder probe for %s missed the deadline", codec)
+                continue
+            if passed:
+                return codec
+        return None
+    finally:
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _known_probe_results(codecs: tuple[str, ...]) -> dict[str, bool]:
+    """What the FFmpeg manifest can say about ``codecs`` without a probe."""
+    capabilities = ffmpeg_capabilities()
+    if capabilities is None:
+        return {}
+    known: dict[str, bool] = {}
+    for codec in codecs:
+        if not capabilities.has_encoder(codec):
+            known[codec] = False
+        elif codec in capabilities.probes:
+            known[codec] = capabilities.probes[codec]
+    return known
+
+
 def _recommended_preset(encoder: str) -> str:
     """Return a sensible preset for ``encoder``, validated against its spec."""
     preset = _RECOMMENDED_PRESET.get(encoder, "veryfast")
@@ -130,7 +285,17 @@ def _recommended_preset(encoder: str) -> str:
 
 
 def measure_encoder_choice(
-    *, width: int, height: int, fps: int, quality: int = _RECOMMENDED_CRF
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    quality: int = _RECOMMENDED_CRF,
+    source: tuple[int, int] | None = None,
+    scaler: str = "bilinear",
+    family: str = "h264",
+    cpu_budget: int = 0,
+    on_trial: Callable[[BenchmarkProgress], None] | None = None,
+    cancel: threading.Event | None = None,
 ) -> tuple[str, str, list[EncoderTrial]]:
     """Choose an encoder and preset by measuring them at a real target.
 
@@ -139,9 +304,26 @@ def measure_encoder_choice(
     which is the honest outcome on a machine that genuinely cannot sustain the
     requested display: something still has to be recommended, and the fastest
     preset of the best available encoder is the closest thing to a right answer.
+
+    ``source`` and ``scaler`` describe a resize from a larger display, as for
+    :func:`~sclip.core.benchmark.benchmark_encoder`. Only encoders of
+    ``family`` are measured, and software ones on ``cpu_budget`` percent of
+    the cores. Every preset is measured on the whole benchmark corpus.
+    ``on_trial`` and ``cancel`` are handed to the search; see
+    :func:`~sclip.core.benchmark.find_best_configuration`.
     """
     best, attempts = find_best_configuration(
-        list(_ENCODER_PRIORITY), width=width, height=height, fps=fps, quality=quality
+        list(_encoder_priority(family)),
+        width=width,
+        height=height,
+        fps=fps,
+        quality=quality,
+        source=source,
+        scaler=scaler,
+        cpu_budget=cpu_budget,
+        scenes=BENCHMARK_SCENES,
+        on_trial=on_trial,
+        cancel=cancel,
     )
     if best is not None:
         return best.encoder, best.preset, attempts
@@ -152,7 +334,7 @@ def measure_encoder_choice(
         height,
         fps,
     )
-    encoder = detect_best_encoder()
+    encoder = detect_best_encoder(family)
     # The measured ladder was exhausted, so ask for speed over quality rather
     # than repeating a preset already shown to be too slow.
     fastest = next(
@@ -162,23 +344,91 @@ def measure_encoder_choice(
     return encoder, fastest, attempts
 
 
-def assess_settings(settings: Settings) -> EncoderTrial:
+def assess_settings(
+    settings: Settings,
+    *,
+    source: tuple[int, int] | None = None,
+    clip: Path | None = None,
+    on_trial: Callable[[BenchmarkProgress], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> EncoderTrial:
     """Measure whether ``settings`` can actually be captured on this machine.
 
     This is the check that was missing. Advanced mode will happily accept an
     encoder and preset that cannot keep up with the chosen display, and the
     symptom is not an error: it is a clip that stutters, because dropped frames
     are silently replaced by repeats of the frame before.
+
+    ``source`` is the size being captured, when known: the display, or the
+    region cropped from it (see :func:`~sclip.core.region.resolve_capture_region`).
+    The trial is then run at the size the engine would really encode - that
+    capture fitted into ``settings.resolution`` - and charged for the resize.
+
+    The trial runs on each scene of the benchmark corpus and reports the
+    worst, or on ``clip`` alone - a real recording, such as one from the
+    library - when one is given.
+
+    An encoder that runs is then put through a pipeline trial as well (see
+    :func:`~sclip.core.benchmark.measure_pipeline`), with the settings' own
+    audio and on the buffer's own drive, so the verdict rests on what the
+    whole capture was measured to cost rather than on a fixed allowance
+    for it. Should that trial fail, the allowance stands.
+
+    ``on_trial`` is called with each scene's trial as it completes, and
+    setting ``cancel`` stops the check by raising
+    :class:`~sclip.core.ffmpeg.JobCancelledError`.
     """
     width, height = parse_resolution(settings.resolution)
-    return benchmark_encoder(
+    if source is not None:
+        width, height = fit_output_size(source, (width, height)) or source
+    scenes = (clip_scene(clip),) if clip is not None else BENCHMARK_SCENES
+    started = time.monotonic()
+    trials: list[EncoderTrial] = []
+    for scene in scenes:
+        trials.append(
+            benchmark_encoder(
+                settings.encoder,
+                settings.preset,
+                width=width,
+                height=height,
+                fps=settings.fps,
+                quality=settings.crf,
+                scene=scene,
+                source=source,
+                scaler=settings.scaler,
+                cpu_budget=settings.cpu_budget_percent,
+                cancel=cancel,
+            )
+        )
+        if on_trial is not None:
+            on_trial(
+                BenchmarkProgress(
+                    trials[-1],
+                    completed=len(trials),
+                    planned=len(scenes),
+                    elapsed_seconds=time.monotonic() - started,
+                )
+            )
+    trial = worst_trial(trials)
+    if not trial.available:
+        return trial
+    pipeline = measure_pipeline(
         settings.encoder,
         settings.preset,
         width=width,
         height=height,
         fps=settings.fps,
         quality=settings.crf,
+        source=source,
+        scaler=settings.scaler,
+        cpu_budget=settings.cpu_budget_percent,
+        microphone=settings.capture_audio and bool(settings.audio_input.strip()),
+        desktop_audio=settings.capture_audio and settings.capture_desktop_audio,
+        variable_frame_rate=settings.variable_frame_rate,
+        directory=Path(settings.buffer_dir) if settings.buffer_dir else None,
+        cancel=cancel,
     )
+    return replace(trial, pipeline=pipeline) if pipeline.available else trial
 
 
 @dataclass(frozen=True, slots=True)
@@ -197,9 +447,21 @@ class Recommendation:
     trial: EncoderTrial | None
 
 
-def recommend_measured(base: Settings, registry: DeviceRegistry) -> Recommendation:
-    """Benchmark the machine and recommend what it can actually sustain."""
-    return _build_recommendation(base, registry, benchmark=True)
+def recommend_measured(
+    base: Settings,
+    registry: DeviceRegistry,
+    *,
+    on_trial: Callable[[BenchmarkProgress], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> Recommendation:
+    """Benchmark the machine and recommend what it can actually sustain.
+
+    ``on_trial`` hears of each trial as it completes, and ``cancel`` stops
+    the benchmark; see :func:`~sclip.core.benchmark.find_best_configuration`.
+    Each display size tried is a search of its own, so the progress starts
+    over when the native size proves too much.
+    """
+    return _build_recommendation(base, registry, benchmark=True, on_trial=on_trial, cancel=cancel)
 
 
 def recommend_settings(
@@ -224,22 +486,50 @@ def recommend_settings(
 
 
 def _build_recommendation(
-    base: Settings, registry: DeviceRegistry, *, benchmark: bool
+    base: Settings,
+    registry: DeviceRegistry,
+    *,
+    benchmark: bool,
+    on_trial: Callable[[BenchmarkProgress], None] | None = None,
+    cancel: threading.Event | None = None,
 ) -> Recommendation:
     """Do the work behind both public recommendation entry points."""
     monitor_name, resolution = _recommend_display(base, registry)
     trial: EncoderTrial | None = None
+    # The codec is a choice about file size and playback, not about this
+    # machine, so tuning keeps it and picks the best encoder that speaks it.
+    family = encoder_family(base.encoder)
 
     if benchmark:
         width, height = parse_resolution(resolution)
+        # A cropped capture encodes only the crop, so that is what to measure.
+        # The window, if any, is not looked up: it may not be open yet.
+        region = _configured_region(base, (width, height))
+        if region is not None:
+            width, height = region.size
         encoder, preset, attempts = measure_encoder_choice(
-            width=width, height=height, fps=_RECOMMENDED_FPS
-        )
-        trial = next(
-            (t for t in reversed(attempts) if t.encoder == encoder and t.preset == preset), None
+            width=width,
+            height=height,
+            fps=_RECOMMENDED_FPS,
+            family=family,
+            cpu_budget=base.cpu_budget_percent,
+            on_trial=on_trial,
+            cancel=cancel,
         )
+        trial = _chosen_trial(attempts, encoder, preset)
+        if attempts and (trial is None or not trial.sustains_capture):
+            downscaled = _recommend_downscale(
+                (width, height),
+                base.scaler,
+                family,
+                cpu_budget=base.cpu_budget_percent,
+                on_trial=on_trial,
+                cancel=cancel,
+            )
+            if downscaled is not None:
+                encoder, preset, trial, resolution = downscaled
     else:
-        encoder = detect_best_encoder()
+        encoder = detect_best_encoder(family)
         preset = _recommended_preset(encoder)
 
     microphone = _recommend_microphone(registry)
@@ -255,12 +545,25 @@ def _build_recommendation(
         # Desktop audio is captured through the WASAPI loopback pump, which
         # works on any modern Windows machine, so it is on by default.
         capture_desktop_audio=True,
+        separate_audio_tracks=base.separate_audio_tracks,
+        microphone_level=base.microphone_level,
         replay_buffer=base.replay_buffer,
         replay_seconds=base.replay_seconds,
+        archive_minutes=base.archive_minutes,
         monitor=monitor_name,
         clip_hotkey=base.clip_hotkey,
         record_hotkey=base.record_hotkey,
+        clip_bindings=base.clip_bindings,
         output_dir=base.output_dir,
+        buffer_dir=base.buffer_dir,
+        buffer_budget_mb=base.buffer_budget_mb,
+        scaler=base.scaler,
+        cpu_budget_percent=base.cpu_budget_percent,
+        variable_frame_rate=base.variable_frame_rate,
+        h264_export=base.h264_export,
+        fragmented_mp4=base.fragmented_mp4,
+        capture_region=base.capture_region,
+        capture_window=base.capture_window,
         auto_configure=True,
     )
     logger.info(
@@ -274,6 +577,62 @@ def _build_recommendation(
     return Recommendation(settings=recommended, trial=trial)
 
 
+def _configured_region(base: Settings, native: tuple[int, int]) -> CaptureRegion | None:
+    """The fixed capture region in ``base``, fitted to a display of ``native`` size."""
+    if not base.capture_region:
+        return None
+    try:
+        return fit_region(parse_region(base.capture_region), native)
+    except ValueError:
+        return None
+
+
+def _chosen_trial(attempts: list[EncoderTrial], encoder: str, preset: str) -> EncoderTrial | None:
+    """The trial behind a chosen encoder and preset, if one was measured."""
+    return next(
+        (t for t in reversed(attempts) if t.encoder == encoder and t.preset == preset), None
+    )
+
+
+def _recommend_downscale(
+    native: tuple[int, int],
+    scaler: str,
+    family: str = "h264",
+    *,
+    cpu_budget: int = 0,
+    on_trial: Callable[[BenchmarkProgress], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[str, str, EncoderTrial, str] | None:
+    """Find a smaller capture size this machine can sustain, if there is one.
+
+    Only reached once the native size has been measured and found too much.
+    Each fallback is benchmarked as the capture would run it - generated at
+    the display's size and resized down - and the first that keeps up wins.
+    Returns the encoder, preset and trial alongside the resolution setting.
+    """
+    for box in _FALLBACK_RESOLUTIONS:
+        scaled = fit_output_size(native, box)
+        if scaled is None:
+            continue
+        width, height = scaled
+        encoder, preset, attempts = measure_encoder_choice(
+            width=width,
+            height=height,
+            fps=_RECOMMENDED_FPS,
+            source=native,
+            scaler=scaler,
+            family=family,
+            cpu_budget=cpu_budget,
+            on_trial=on_trial,
+            cancel=cancel,
+        )
+        trial = _chosen_trial(attempts, encoder, preset)
+        if trial is not None and trial.sustains_capture:
+            logger.info("Native resolution is too much here; recommending %dx%d", width, height)
+            return encoder, preset, trial, f"{width}x{height}"
+    return None
+
+
 def _recommend_display(base: Settings, registry: DeviceRegistry) -> tuple[str, str]:
     """Choose the monitor to capture and its native resolution."""
     try:
@@ -0,0 +1,204 @@
+"""Turn whatever the loopback device delivers into stereo at 48 kHz.
+
+A WASAPI loopback endpoint captures in the device's own mix format, which is
+whatever the user's speakers or headset are set to: 44.1 or 48 kHz on most
+machines, 96 or 192 kHz on some, and six or eight channels on a surround
+headset. Every clip ends up as stereo AAC at 48 kHz all the same, so passing
+the device format through means a 7.1 endpoint pushes four times the PCM it
+needs through the named pipe, and FFmpeg's resampler spends a share of the
+capture's CPU folding it back down, frame after frame.
+
+:class:`PcmConverter` does that in the pump instead, on a whole read at a
+time with NumPy. The downmix is a channel matrix in the proportions FFmpeg's
+own ``-ac 2`` uses - centre and surrounds at -3 dB, the LFE left out - scaled
+so a full-scale signal on every channel cannot clip. The rate change is
+linear interpolation, carried across reads so there is no seam between them,
+behind a box filter when the device runs faster than 48 kHz, so content above
+the new Nyquist limit is damped rather than folded back. That is a cheaper
+filter than FFmpeg's, and the right trade for clip audio that is about to be
+encoded at 160 kbit/s; ``scripts/benchmark_audio_convert.py`` compares the
+two on the same PCM.
+
+The same resampler corrects for clock drift. A device's crystal is never
+exactly its nominal rate, and over a long buffering session the audio it
+delivers slowly parts company with the wall clock FFmpeg stamps video by.
+The pump measures that and hands it to :meth:`PcmConverter.correct`, which
+nudges the rate change by the same few parts per million. A device already
+in the pipe format is passed through untouched until there is drift to
+correct.
+
+NumPy is optional. Without it :func:`make_converter` returns ``None`` and
+the pump streams the device's format as it always did, for FFmpeg to convert.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+# What goes into the pipe whenever the pump converts. 48 kHz is what the AAC
+# track is encoded at, so FFmpeg has nothing left to resample.
+PIPE_RATE: int = 48000
+PIPE_CHANNELS: int = 2
+
+# -3 dB, the level ITU-R BS.775 and FFmpeg fold centre and surrounds in at.
+_MINUS_3DB: float = math.sqrt(0.5)
+
+# Where each channel of a WAVEFORMATEXTENSIBLE layout goes, in the order
+# Windows delivers them: the weight it adds to the left and to the right
+# output. Layouts Windows does not use for loopback fall back to splitting
+# channels alternately between the two sides.
+_LAYOUTS: dict[int, tuple[tuple[float, float], ...]] = {
+    # Mono: the one channel on both sides.
+    1: ((1.0, 1.0),),
+    # Quad: FL FR BL BR.
+    4: ((1.0, 0.0), (0.0, 1.0), (_MINUS_3DB, 0.0), (0.0, _MINUS_3DB)),
+    # 5.1: FL FR FC LFE BL BR.
+    6: (
+        (1.0, 0.0),
+        (0.0, 1.0),
+        (_MINUS_3DB, _MINUS_3DB),
+        (0.0, 0.0),
+        (_MINUS_3DB, 0.0),
+        (0.0, _MINUS_3DB),
+    ),
+    # 7.1: FL FR FC LFE BL BR SL SR.
+    8: (
+        (1.0, 0.0),
+        (0.0, 1.0),
+        (_MINUS_3DB, _MINUS_3DB),
+        (0.0, 0.0),
+        (_MINUS_3DB, 0.0),
+        (0.0, _MINUS_3DB),
+        (_MINUS_3DB, 0.0),
+        (0.0, _MINUS_3DB),
+    ),
+}
+
+
+def downmix_weights(channels: int) -> list[tuple[float, float]]:
+    """The left and right weight of each input channel, normalised against clipping.
+
+    Each output's weights sum to one, as FFmpeg's do by default, so a signal
+    at full scale on every input channel reaches full scale and no further.
+    """
+    if channels < 1:
+        raise ValueError(f"a device has at least one channel, not {channels}")
+    layout = _LAYOUTS.get(channels)
+    if layout is None:
+        layout = tuple((1.0, 0.0) if index % 2 == 0 else (0.0, 1.0) for index in range(channels))
+    left = sum(weight[0] for weight in layout)
+    right = sum(weight[1] for weight in layout)
+    return [(weight[0] / left, weight[1] / right) for weight in layout]
+
+
+class PcmConverter:
+    """Converts interleaved s16 PCM from one device format to stereo 48 kHz.
+
+    Stateful: the end of each read is kept so the next one continues it, so
+    one converter serves one stream, read by read, from a single thread.
+    ``numpy`` is the NumPy module, passed in because it is optional.
+    """
+
+    def __init__(self, numpy: Any, channels: int, sample_rate: int) -> None:
+        self._np = numpy
+        self._channels = channels
+        self.sample_rate = sample_rate
+        self._matrix = numpy.asarray(downmix_weights(channels), dtype=numpy.float32)
+        # Input samples per output sample, at the nominal rate and as
+        # corrected for the device's drift.
+        self._nominal_step = sample_rate / PIPE_RATE
+        self._step = self._nominal_step
+        # Box filter length, and the input it still needs from the last read.
+        # Sized from the nominal rate, so a correction never switches it on.
+        self._box = math.ceil(self._step) if self._step > 1 else 1
+        self._box_tail = numpy.zeros((self._box - 1, PIPE_CHANNELS), dtype=numpy.float32)
+        # Where the next output sample falls, in input samples from the start
+        # of the next read; between -1 and ``step - 1``. Negative means just
+        # after ``_last``, the final sample of the previous read. It starts
+        # half a box in, since a smoothed sample describes the middle of the
+        # samples it averages rather than the last of them.
+        self._position = (self._box - 1) / 2
+        self._last = numpy.zeros((1, PIPE_CHANNELS), dtype=numpy.float32)
+
+    def correct(self, ppm: float) -> None:
+        """Take ``ppm`` as how much faster than nominal the device runs.
+
+        From the next read on, that many more input samples go into each
+        output sample - fewer for a negative figure - so the output keeps
+        pace with the wall clock rather than with the device's.
+        """
+        self._step = self._nominal_step * (1 + ppm * 1e-6)
+
+    def __call__(self, chunk: bytes) -> bytes | memoryview:
+        """Convert one read. Returns the converted PCM as bytes-like s16."""
+        if self._channels == PIPE_CHANNELS and self._step == 1:
+            return chunk
+        np = self._np
+        frames = np.frombuffer(chunk, dtype=np.int16)
+        frames = frames[: len(frames) - len(frames) % self._channels]
+        stereo = frames.reshape(-1, self._channels).astype(np.float32) @ self._matrix
+        if self._box > 1:
+            stereo = self._smooth(stereo)
+        if self._step != 1 and len(stereo):
+            stereo = self._resample(stereo)
+        out = np.clip(np.rint(stereo), -32768, 32767).astype(np.int16)
+        return memoryview(out).cast("B")
+
+    def _smooth(self, stereo: Any) -> Any:
+        """Average each sample with those before it, ``box`` in all."""
+        np = self._np
+        padded = np.concatenate((self._box_tail, stereo))
+        self._box_tail = padded[len(padded) - (self._box - 1) :]
+        sums = np.cumsum(padded, axis=0, dtype=np.float64)
+        sums = np.concatenate((np.zeros((1, PIPE_CHANNELS)), sums))
+        return ((sums[self._box :] - sums[: -self._box]) / self._box).astype(np.float32)
+
+    def _resample(self, stereo: Any) -> Any:
+        """Linearly interpolate ``stereo`` onto the 48 kHz grid."""
+        np = self._np
+        count = len(stereo)
+        # Index 0 of ``joined`` is the previous read's last sample, so every
+        # position is shifted up by one and never negative.
+        joined = np.concatenate((self._last, stereo))
+        produced = max(0, math.floor((count - 1 - self._position) / self._step) + 1)
+        where = self._position + 1 + np.arange(produced) * self._step
+        below = where.astype(np.int64)
+        above = np.minimum(below + 1, count)
+        weight = (where - below).astype(np.float32)[:, None]
+        out = joined[below] * (1 - weight) + joined[above] * weight
+        self._position += produced * self._step - count
+        self._last = stereo[-1:]
+        return out
+
+
+def make_converter(channels: int, sample_rate: int) -> PcmConverter | None:
+    """A converter from the device's format, or ``None`` to pass it through.
+
+    ``None`` when NumPy is not installed, and the pipe then carries what the
+    device delivers. A device already in the pipe format still gets one, so
+    its drift can be corrected; until then it costs nothing.
+    """
+    try:
+        import numpy
+    except ImportError:
+        logger.info(
+            "NumPy is not installed; desktop audio is piped as %d ch at %d Hz, uncorrected",
+            channels,
+            sample_rate,
+        )
+        return None
+    return PcmConverter(numpy, channels, sample_rate)
+
+
+__all__ = [
+    "PIPE_CHANNELS",
+    "PIPE_RATE",
+    "PcmConverter",
+    "downmix_weights",
+    "make_converter",
+]
@@ -0,0 +1,257 @@
+"""Manual recordings written as segments, so a crash never costs the recording.
+
+A manual recording used to be one MP4 written straight to the clips folder
+with ``-movflags +faststart``. An MP4's index - the moov atom - is written
+last, so anything that stopped FFmpeg before a clean finish (S-Clip crashing,
+the machine losing power, a driver taking FFmpeg down with it) left a file no
+player would open, however long the recording had run. A clean finish was not
+cheap either: faststart moves the index to the front by rewriting the whole
+file, which for a two-hour recording is gigabytes of extra I/O spent in the
+``SAVING`` state.
+
+A recording is now the replay buffer's segment muxer with the wrap taken off:
+numbered MPEG-TS parts in a session directory under
+:attr:`~sclip.paths.AppPaths.recordings_dir`. Each part is complete and
+playable the moment the next one begins, so a crash costs at most the part
+being written. Stopping is the buffer's streaming lossless join, which reads
+every part once and writes the MP4 once. That is why a recording is always
+written as a fragmented MP4, whatever layout the user picked for clips: the
+faststart layout would rewrite the whole file once more to move its index,
+which is the very cost this exists to remove; see
+:func:`~sclip.core.ffmpeg.mp4_layout_args`.
+
+Each session directory carries a small ``session.json`` naming the MP4 it is
+meant to become and how it was encoded. A session still on disk at the next
+launch was never finished, and :func:`find_unfinished_sessions` turns it up so
+it can be joined then. A recording promoted from the replay buffer (see
+:meth:`~sclip.core.replay_buffer.RollingBuffer.begin_recording`) moves its
+parts into a session of the same shape, and is recovered the same way.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from sclip.contracts import Settings
+from sclip.core.replay_buffer import BufferSpec, join_segments
+
+logger = logging.getLogger(__name__)
+
+
+# Length of one part of a manual recording. Longer than the buffer's segments:
+# nothing is ever trimmed off a recording, so the parts only need to be short
+# enough that a crash loses little, and fewer parts make a cheaper join.
+RECORDING_SEGMENT_SECONDS: int = 10
+
+# The manifest in every session directory.
+_MANIFEST_NAME: str = "session.json"
+
+# Bumped if the manifest's shape changes; an unknown version is left alone.
+_MANIFEST_VERSION: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class RecordingSession:
+    """One recording's parts on disk, and what they should become.
+
+    The encoding fields mirror :class:`~sclip.core.replay_buffer.BufferSpec`,
+    because joining a recording is joining a buffer: they decide whether the
+    join can be lossless and, when it cannot, how to re-encode.
+    """
+
+    directory: Path
+    destination: Path
+    encoder: str
+    preset: str
+    crf: int
+    fps: int
+    variable_frame_rate: bool = False
+    separate_audio: bool = False
+
+    def spec(self, capture_args: Sequence[str] = ()) -> BufferSpec:
+        """The segment-muxer wiring that writes this session's parts."""
+        return BufferSpec(
+            capture_args=capture_args,
+            directory=self.directory,
+            seconds=0,
+            encoder=self.encoder,
+            preset=self.preset,
+            crf=self.crf,
+            segment_seconds=RECORDING_SEGMENT_SECONDS,
+            fps=self.fps,
+            variable_frame_rate=self.variable_frame_rate,
+            wrap=False,
+            separate_audio=self.separate_audio,
+        )
+
+    def parts(self) -> list[Path]:
+        """The parts written so far, in recording order."""
+        return sorted(self.directory.glob("part_*.ts"))
+
+    def discard_parts(self) -> None:
+        """Delete every part, keeping the session itself - for a failed start."""
+        for part in self.parts():
+            with contextlib.suppress(OSError):
+                part.unlink()
+
+    def discard(self) -> None:
+        """Delete the session directory and everything in it."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def open_session(
+    recordings_dir: Path,
+    destination: Path,
+    settings: Settings,
+    *,
+    variable_frame_rate: bool = False,
+) -> RecordingSession:
+    """Create a session directory for a recording bound for ``destination``.
+
+    The manifest is written before any part, so a session can never be found
+    without knowing what it was for. It is written to a temporary name and
+    moved into place, as the settings file is, so a crash mid-write leaves
+    no half a manifest.
+    """
+    directory = recordings_dir / destination.stem
+    suffix = 1
+    while directory.exists():
+        # Two recordings started within the same second share a stem.
+        suffix += 1
+        directory = recordings_dir / f"{destination.stem}_{suffix}"
+    directory.mkdir(parents=True)
+
+    session = RecordingSession(
+        directory=directory,
+        destination=destination,
+        encoder=settings.encoder,
+        preset=settings.preset,
+        crf=int(settings.crf),
+        fps=int(settings.fps),
+        variable_frame_rate=variable_frame_rate,
+        separate_audio=settings.capture_audio and settings.separate_audio_tracks,
+    )
+    manifest = {
+        "version": _MANIFEST_VERSION,
+        "destination": str(destination),
+        "encoder": session.encoder,
+        "preset": session.preset,
+        "crf": session.crf,
+        "fps": session.fps,
+        "variable_frame_rate": session.variable_frame_rate,
+        "separate_audio": session.separate_audio,
+    }
+    tmp_path = directory / f"{_MANIFEST_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, directory / _MANIFEST_NAME)
+    return session
+
+
+def load_session(directory: Path) -> RecordingSession | None:
+    """Read back the session in ``directory``, or ``None`` if it is not one."""
+    try:
+        data = json.loads((directory / _MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as exc:
+        logger.warning("Skipping recording session %s: %s", directory, exc)
+        return None
+    if not isinstance(data, dict) or data.get("version") != _MANIFEST_VERSION:
+        logger.warning("Skipping recording session %s with an unknown manifest", directory)
+        return None
+    try:
+        return RecordingSession(
+            directory=directory,
+            destination=Path(str(data["destination"])),
+            encoder=str(data["encoder"]),
+            preset=str(data["preset"]),
+            crf=int(data["crf"]),
+            fps=int(data["fps"]),
+            variable_frame_rate=bool(data.get("variable_frame_rate", False)),
+            separate_audio=bool(data.get("separate_audio", False)),
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        logger.warning("Skipping recording session %s with a damaged manifest: %s", directory, exc)
+        return None
+
+
+def find_unfinished_sessions(
+    recordings_dir: Path, *, exclude: Sequence[Path] = ()
+) -> list[RecordingSession]:
+    """Every session under ``recordings_dir`` that was never finished, oldest first.
+
+    ``exclude`` names session directories still being recorded into, which
+    are unfinished only in the sense that they are not finished yet.
+    """
+    if not recordings_dir.is_dir():
+        return []
+    skipped = {path.resolve() for path in exclude}
+    sessions: list[RecordingSession] = []
+    for directory in sorted(recordings_dir.iterdir()):
+        if not directory.is_dir() or directory.resolve() in skipped:
+            continue
+        session = load_session(directory)
+        if session is not None:
+            sessions.append(session)
+    return sessions
+
+
+def finish_session(
+    session: RecordingSession,
+    spec: BufferSpec | None = None,
+    *,
+    microphone_level: float = 1.0,
+) -> Path | None:
+    """Join a session's parts into its destination MP4 and remove the session.
+
+    ``spec`` overrides the manifest's encoding details when the caller knows
+    better - the replay buffer knows whether it really dropped repeated
+    frames, where the manifest only knows what the settings asked for.
+    ``microphone_level`` is passed through to :func:`join_segments`. The
+    MP4 is always fragmented; see the module docstring.
+
+    Returns ``None`` if there was nothing to join, or if the join failed; in
+    that case the parts stay where they are, to be tried again at the next
+    launch rather than thrown away.
+    """
+    parts = session.parts()
+    if not parts:
+        logger.warning("Recording session %s has no parts; nothing to save", session.directory)
+        session.discard()
+        return None
+
+    destination = session.destination
+    try:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:
+        logger.error("Cannot write the recording to %s: %s", destination.parent, exc)
+        return None
+    joined = join_segments(
+        parts,
+        destination,
+        spec or session.spec(),
+        scratch=session.directory,
+        fragmented=True,
+        microphone_level=microphone_level,
+    )
+    if not joined:
+        logger.error("Could not join the recording; its parts are kept in %s", session.directory)
+        return None
+    session.discard()
+    logger.info("Recording saved from %d part(s): %s", len(parts), destination)
+    return destination
+
+
+__all__ = [
+    "RECORDING_SEGMENT_SECONDS",
+    "RecordingSession",
+    "find_unfinished_sessions",
+    "finish_session",
+    "load_session",
+    "open_session",
+]
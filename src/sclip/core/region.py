@@ -0,0 +1,226 @@
+"""Capture a part of a display rather than the whole of it.
+
+Every pixel captured is a pixel copied, converted and encoded, whether or not
+anyone wanted it. A 4:3 game on a 16:9 panel leaves a quarter of each frame as
+black bars, and a single window on an ultrawide can be a third of the desktop
+or less. Cropping to the part worth keeping shrinks every stage after the
+crop, so the crop belongs at the very start: ddagrab and gdigrab both accept
+an offset and a size, which means the unwanted pixels are never copied out of
+the desktop at all - not out of GPU memory for a CPU encoder, and not through
+the encoder for any of them.
+
+A region is stored as ``WIDTHxHEIGHT+X+Y``, the X11 geometry notation, with
+the offset measured from the top-left corner of the chosen monitor. A window
+is stored by title and looked up when the capture starts; it is captured where
+it is at that moment, so a window moved mid-session is not followed. Both
+degrade to capturing the whole monitor when they cannot be honoured, because
+a capture of too much is recoverable in an editor and a capture that refused
+to start is not.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+from dataclasses import dataclass
+
+from sclip.contracts import Monitor, Settings
+
+logger = logging.getLogger(__name__)
+
+# ``WIDTHxHEIGHT+X+Y``, tolerant of spaces and the typographic multiplication
+# sign, the same leniency the resolution field allows.
+_REGION_PATTERN = re.compile(r"^\s*(\d+)\s*[xX\xd7]\s*(\d+)\s*\+\s*(\d+)\s*\+\s*(\d+)\s*$")
+
+# Below this a crop is almost certainly a typo, and some encoders refuse
+# frames this small outright.
+_MIN_REGION_SIDE: int = 64
+
+
+@dataclass(frozen=True, slots=True)
+class CaptureRegion:
+    """A rectangle in a monitor's own pixel coordinates."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def describe(self) -> str:
+        """The stored ``WIDTHxHEIGHT+X+Y`` form."""
+        return f"{self.width}x{self.height}+{self.x}+{self.y}"
+
+
+def parse_region(value: str) -> CaptureRegion:
+    """Parse a ``WIDTHxHEIGHT+X+Y`` string, raising :class:`ValueError` if malformed."""
+    match = _REGION_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"Not a WIDTHxHEIGHT+X+Y region: {value!r}")
+    width, height, x, y = (int(group) for group in match.groups())
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Region must have a positive size: {value!r}")
+    return CaptureRegion(x=x, y=y, width=width, height=height)
+
+
+def _even_down(value: int) -> int:
+    return value - value % 2
+
+
+def fit_region(region: CaptureRegion, bounds: tuple[int, int]) -> CaptureRegion | None:
+    """Clamp ``region`` to a display of size ``bounds``, or ``None`` for no crop.
+
+    The part of the region outside the display is dropped rather than the
+    region rejected: a window hanging off the edge of the screen should still
+    capture the part that is on it. Offsets and sides are rounded down to even
+    numbers, since yuv420p stores colour at half resolution and the encoders
+    refuse odd sizes.
+
+    ``None`` covers two cases that both mean "capture the whole display": a
+    region that already covers all of it, where a crop would cost a filter
+    option for nothing, and one too small to be worth keeping, which is
+    logged.
+    """
+    bound_width, bound_height = bounds
+    left = _even_down(min(max(region.x, 0), bound_width))
+    top = _even_down(min(max(region.y, 0), bound_height))
+    right = min(region.x + region.width, bound_width)
+    bottom = min(region.y + region.height, bound_height)
+    width = _even_down(right - left)
+    height = _even_down(bottom - top)
+
+    if width < _MIN_REGION_SIDE or height < _MIN_REGION_SIDE:
+        logger.warning(
+            "Capture region %s leaves too little of a %dx%d display; capturing all of it",
+            region.describe(),
+            bound_width,
+            bound_height,
+        )
+        return None
+    fitted = CaptureRegion(x=left, y=top, width=width, height=height)
+    if fitted.size == (_even_down(bound_width), _even_down(bound_height)):
+        return None
+    return fitted
+
+
+def find_window_bounds(title: str) -> CaptureRegion | None:
+    """Desktop coordinates of the client area of the window titled ``title``.
+
+    The first visible top-level window whose title contains ``title``, ignoring
+    case, wins: nobody types a browser's full title, and a game's title often
+    carries a version number the user would rather not keep in sync. The
+    client area is used rather than the window rectangle so the title bar and
+    borders of a windowed game stay out of the clip.
+
+    Returns ``None`` when nothing matches, the window is minimised, or the
+    platform is not Windows.
+    """
+    if sys.platform != "win32":
+        return None
+    needle = title.strip().casefold()
+    if not needle:
+        return None
+
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+    user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    user32.IsIconic.argtypes = [wintypes.HWND]
+    user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+    user32.ClientToScreen.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.POINT)]
+
+    enum_windows_proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    found: list[int] = []
+
+    def visit(hwnd: int, _lparam: int) -> bool:
+        if not user32.IsWindowVisible(hwnd) or user32.IsIconic(hwnd):
+            return True
+        length = user32.GetWindowTextLengthW(hwnd)
+        if length <= 0:
+            return True
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buffer, length + 1)
+        if needle in buffer.value.casefold():
+            found.append(hwnd)
+            return False  # stop enumerating
+        return True
+
+    user32.EnumWindows(enum_windows_proc(visit), 0)
+    if not found:
+        logger.info("No visible window titled like %r", title)
+        return None
+
+    hwnd = found[0]
+    rect = wintypes.RECT()
+    origin = wintypes.POINT(0, 0)
+    if not user32.GetClientRect(hwnd, ctypes.byref(rect)) or not user32.ClientToScreen(
+        hwnd, ctypes.byref(origin)
+    ):
+        logger.warning(
+            "Could not read the bounds of window %r (error %s)", title, ctypes.get_last_error()
+        )
+        return None
+    return CaptureRegion(x=origin.x, y=origin.y, width=rect.right, height=rect.bottom)
+
+
+def resolve_capture_region(settings: Settings, monitor: Monitor) -> CaptureRegion | None:
+    """The part of ``monitor`` the settings ask to capture, or ``None`` for all of it.
+
+    A window takes precedence over a fixed region when it can be found, and
+    falls back to the region when it cannot - the region is the user's
+    standing choice, the window a request that only holds while it is open.
+    Either one is clamped to the monitor, so a window spanning two displays
+    contributes the part on the display being captured.
+    """
+    bounds = (monitor.width, monitor.height)
+    if settings.capture_window:
+        window = find_window_bounds(settings.capture_window)
+        if window is not None:
+            relative = CaptureRegion(
+                x=window.x - monitor.x,
+                y=window.y - monitor.y,
+                width=window.width,
+                height=window.height,
+            )
+            if (
+                relative.x + relative.width > 0
+                and relative.y + relative.height > 0
+                and relative.x < monitor.width
+                and relative.y < monitor.height
+            ):
+                return fit_region(relative, bounds)
+            logger.warning(
+                "Window %r is not on %s; capturing the configured region instead",
+                settings.capture_window,
+                monitor.name,
+            )
+        else:
+            logger.warning(
+                "Window %r was not found; capturing the configured region instead",
+                settings.capture_window,
+            )
+
+    if not settings.capture_region:
+        return None
+    try:
+        region = parse_region(settings.capture_region)
+    except ValueError:
+        logger.warning("Ignoring unusable capture region %r", settings.capture_region)
+        return None
+    return fit_region(region, bounds)
+
+
+__all__ = [
+    "CaptureRegion",
+    "find_window_bounds",
+    "fit_region",
+    "parse_region",
+    "resolve_capture_region",
+]
@@ -15,35 +15,84 @@ timeline, so the saved clip plays back perfectly smoothly. The cost is a few
 seconds of encoding when a clip is saved, which is a fair price for a clip
 that never judders.
 
+A buffer recorded at a variable frame rate (repeated frames dropped while the
+screen was still) is the one case that always re-encodes: a stream copy would
+carry the gaps into the MP4, and a constant rate is what editors and players
+expect of a clip.
+
+The buffer can hold H.264, HEVC or AV1, and the lossless join keeps whichever
+it holds: HEVC and AV1 buy roughly 40-50% off H.264's size at the same
+quality, which is worth keeping past the save. Where the clip is bound for
+something that only plays H.264, :func:`transcode_to_h264` makes a copy
+afterwards, off the save path. (AV1 in MPEG-TS needs FFmpeg 6.1 or newer.)
+
 Two FFmpeg processes can therefore exist at once: the rolling producer and a
 short-lived stitch job. The producer is never interrupted while a clip is
 being saved, so the user does not miss the next few seconds of action.
+
+Once running, the producer is handed to a
+:class:`~sclip.core.supervisor.ProcessSupervisor`, which reports it if it
+dies mid-session. The buffer does not restart itself - the owner rebuilds the
+capture and calls :meth:`RollingBuffer.start` with ``resume=True``, which
+keeps the segments already on disk and carries on the rotation after them.
+
+A running buffer can also be promoted into an open-ended recording with
+:meth:`RollingBuffer.begin_recording`. The same FFmpeg keeps capturing; each
+segment is moved out of the ring into a recording directory as soon as it is
+finished, before the rotation can come back round to overwrite it, so the
+recording starts with the window already buffered and has no gap where a
+second capture would have started up. The moved segments are joined by
+:func:`join_segments`, exactly as a clip is.
+
+A buffer can also keep an archive tier behind its window (see
+:mod:`sclip.core.archive`): segments that age out of the window are handed to
+it rather than overwritten, and kept downscaled for up to an hour. A save
+that reaches back into the archive is the one kind of clip that always
+re-encodes, since the two tiers do not share a frame size.
+
+A buffer armed with separate audio tracks holds the microphone and desktop
+audio apart in its segments, and a save mixes them: the video is still
+copied, and only the audio is encoded again, at the microphone level the
+settings name at the moment of saving.
 """
 
 from __future__ import annotations
 
 import contextlib
+import errno
+import functools
 import logging
 import math
+import re
+import shutil
 import subprocess
 import threading
 import time
 from collections.abc import Callable, Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from sclip.contracts import BufferTelemetry
+from sclip.contracts import BufferTelemetry, encoder_family
+from sclip.core.archive import ArchiveTier
 from sclip.core.ffmpeg import (
     AUDIO_BITRATE,
+    JobClass,
     build_quality_args,
+    count_video_frames,
     expected_segment_paths,
     iter_argv_flat,
+    mix_audio_filter,
+    mp4_layout_args,
+    mp4_tag_args,
+    probe_media_layout,
     read_stderr_tail,
     remove_quietly,
     run_ffmpeg,
     start_ffmpeg,
     stop_ffmpeg,
+    stream_into_ffmpeg,
 )
+from sclip.core.supervisor import ExitCallback, ProcessExit, ProcessSupervisor, default_supervisor
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +109,46 @@ SEGMENT_SECONDS: int = 2
 # newest segment when we list the directory.
 _CONCAT_RETRIES: int = 1
 
+# An H.264 copy of a finished clip is a one-off for compatibility, not the
+# archive, so it favours speed: veryfast at the user's CRF is within a few
+# percent of medium's size and several times quicker.
+_H264_EXPORT_PRESET: str = "veryfast"
+
+# A transcode of the longest buffer on a slow CPU; anything past this has hung.
+_H264_EXPORT_TIMEOUT: float = 600.0
+
+# The slot number in a segment's file name, as written through BufferSpec.pattern.
+_SEGMENT_NUMBER = re.compile(r"^seg_(\d+)\.ts$")
+
+# File names of a recording's segments, in order. Six digits is over a day
+# of ten-second segments, and keeps a plain sort of the names chronological.
+RECORDING_PART_PATTERN: str = "part_%06d.ts"
+
+# Grace added to one segment's length when finishing a recording waits for the
+# segment being written to be closed. Past that the muxer has stalled, and the
+# recording ends at the last finished segment instead.
+_ROTATION_GRACE: float = 1.0
+
+# How often end_recording looks for that rotation.
+_ROTATION_POLL: float = 0.1
+
+# The pace, in bytes a second, a lossless join is allowed before it is
+# declared hung. Far below any real disk, so only a wedged join trips it.
+_SLOW_DISK_BYTES_PER_SECOND: float = 20e6
+
+# Floor and scale for a re-encode's timeout. Two seconds allowed per second
+# of footage, since even a slow CPU encoder manages half real time.
+_REENCODE_TIMEOUT: float = 300.0
+_REENCODE_SECONDS_PER_SECOND: float = 2.0
+
+# Extra ring slots kept while an archive tier is collecting, so a segment
+# that has aged out of the window is taken by the archive a couple of
+# segments before the rotation would come back round to overwrite it.
+_ARCHIVE_SLACK_SLOTS: int = 2
+
+# The archive tier's directory, inside the buffer's.
+_ARCHIVE_DIRNAME: str = "archive"
+
 # How long to wait after the muxer finishes rotating a segment before we
 # trust the file to be safe for concat. Tuned to be comfortably less than
 # SEGMENT_SECONDS so a retry still completes in well under a second.
@@ -77,7 +166,24 @@ class BufferSpec:
 
     ``encoder``, ``preset`` and ``crf`` describe how the save-time stitch
     should re-encode the clip; they mirror the settings the capture itself
-    used so a saved clip matches the buffered footage.
+    used so a saved clip matches the buffered footage. ``variable_frame_rate``
+    records that the capture drops repeated frames, in which case ``fps`` is
+    the constant rate the stitch restores.
+
+    ``wrap=False`` turns the ring into an open-ended run of numbered
+    segments - a recording that keeps everything - and ``seconds`` is then
+    ignored.
+
+    ``archive_seconds`` keeps that much more footage behind the window, in
+    the downscaled archive tier; ``0`` keeps the window alone.
+
+    ``cores`` holds the capture process to a software encoder's CPU budget;
+    see :func:`~sclip.core.ffmpeg.budget_cores`.
+
+    ``separate_audio`` records that the capture was asked to keep the
+    microphone and desktop audio as two tracks; a join mixes them. It is a
+    request rather than a promise - a pump that did not start leaves one
+    track - so the join looks at a segment before it mixes anything.
     """
 
     capture_args: Sequence[str]  # everything before the segment-muxer flags
@@ -87,6 +193,12 @@ class BufferSpec:
     preset: str = "veryfast"
     crf: int = 20
     segment_seconds: int = SEGMENT_SECONDS
+    fps: int = 60
+    variable_frame_rate: bool = False
+    wrap: bool = True
+    archive_seconds: int = 0
+    cores: frozenset[int] | None = None
+    separate_audio: bool = False
 
     @property
     def segment_wrap(self) -> int:
@@ -97,28 +209,49 @@ class BufferSpec:
         slot holds the segment being written and the rest hold finished
         segments. Since the save step discards that in-progress segment, we
         need ``ceil(seconds / segment_seconds)`` finished slots plus the one
-        in-progress slot - hence the ``+ 1``.
+        in-progress slot - hence the ``+ 1``. An archive tier adds a little
+        slack, so it can take the oldest segment before it is overwritten.
         """
         slots = math.ceil(self.seconds / self.segment_seconds) + 1
+        if self.archive_seconds > 0:
+            slots += _ARCHIVE_SLACK_SLOTS
         return max(2, slots)
 
     @property
     def pattern(self) -> Path:
         """Filename template the muxer writes through."""
-        return self.directory / "seg_%03d.ts"
+        return self.directory / ("seg_%03d.ts" if self.wrap else RECORDING_PART_PATTERN)
+
 
+@dataclass(slots=True)
+class _Recording:
+    """A buffer promoted into a recording: where its segments go, and how many."""
 
-def build_segment_args(spec: BufferSpec) -> list[str]:
+    directory: Path
+    spec: BufferSpec
+    parts: int = 0
+    done: threading.Event = field(default_factory=threading.Event)
+    harvester: threading.Thread | None = None
+
+
+def build_segment_args(spec: BufferSpec, *, start_number: int = 0) -> list[str]:
     """Compose the FFmpeg argv tail that turns a capture into a rolling buffer.
 
     The capture portion (the ddagrab filter, audio inputs, the encoder, ...)
     lives in ``spec.capture_args``. We append the segment muxer options here.
+    ``start_number`` is the slot the first segment is written to; a resumed
+    buffer starts after the newest surviving segment, so the rotation
+    overwrites the oldest footage first just as it would have uninterrupted.
 
     MPEG-TS is the segment format on purpose: a TS stream is self-describing
     and concatenates byte-for-byte, where rolling MP4 segments would each need
     their own moov atom and could not be stitched together cleanly.
     ``-reset_timestamps 1`` restarts each segment's clock at zero so the
     concat demuxer can re-base them without the timeline drifting.
+
+    Without wrap the same muxer writes a recording: segments are numbered on
+    for as long as the capture runs, and each one on disk is finished and
+    playable the moment the next begins.
     """
     return iter_argv_flat(
         [
@@ -128,8 +261,8 @@ def build_segment_args(spec: BufferSpec) -> list[str]:
                 "segment",
                 "-segment_time",
                 str(spec.segment_seconds),
-                "-segment_wrap",
-                str(spec.segment_wrap),
+                *(["-segment_wrap", str(spec.segment_wrap)] if spec.wrap else []),
+                *(["-segment_start_number", str(start_number)] if start_number else []),
                 "-segment_format",
                 "mpegts",
                 "-reset_timestamps",
@@ -140,6 +273,367 @@ def build_segment_args(spec: BufferSpec) -> list[str]:
     )
 
 
+def join_segments(
+    segments: Sequence[Path],
+    destination: Path,
+    spec: BufferSpec | None,
+    *,
+    scratch: Path,
+    fragmented: bool = False,
+    microphone_level: float = 1.0,
+) -> bool:
+    """Join finished segments into one MP4 at ``destination``; True on success.
+
+    Tries a lossless remux first and only re-encodes if that fails.
+
+    This used to always re-encode, on the reasoning that a stream copy
+    leaves a timing seam at every segment join. That is true of the concat
+    *demuxer*, which re-times each input it opens. It is not true of
+    MPEG-TS, a format designed to be concatenated at the byte level: joining
+    the segments as bytes and remuxing the result produces frame intervals
+    uniform to eleven microseconds, against a sixteen-millisecond frame.
+    No seam, no judder, and none of the cost - measured on a real buffer,
+    0.12 seconds against 7.09, with no generation of quality lost on the
+    way through a second encoder.
+
+    A variable-frame-rate buffer goes straight to the re-encode, which is
+    the only step that can put the dropped frames back. ``scratch`` is where
+    the re-encode's concat list is written. ``fragmented`` picks the MP4
+    layout; see :func:`~sclip.core.ffmpeg.mp4_layout_args`.
+
+    Segments with separate audio tracks are mixed on the way through, with
+    the microphone scaled by ``microphone_level``; see :func:`_mix_args`.
+    """
+    mix = _mix_args(segments, spec, microphone_level)
+    if spec is None or not spec.variable_frame_rate:
+        if _try_lossless_join(segments, destination, spec, fragmented=fragmented, mix=mix):
+            return True
+        logger.info("Lossless join unavailable; falling back to a re-encode")
+    # A long buffer means a long re-encode; the timeout has to comfortably
+    # cover stitching the largest window the user could have configured, and
+    # a recording longer than any window.
+    footage = len(segments) * (spec.segment_seconds if spec is not None else SEGMENT_SECONDS)
+    timeout = max(_REENCODE_TIMEOUT, footage * _REENCODE_SECONDS_PER_SECOND)
+    list_file = _write_concat_list(segments, scratch)
+    try:
+        return _run_reencode(
+            list_file, destination, spec, timeout=timeout, fragmented=fragmented, mix=mix
+        )
+    finally:
+        remove_quietly(list_file)
+
+
+def _mix_args(
+    segments: Sequence[Path], spec: BufferSpec | None, microphone_level: float
+) -> list[str]:
+    """Filter and map arguments that fold a split buffer's two tracks into one.
+
+    Empty when the buffer mixed live, and when its newest segment turns out
+    to hold a single track, so the join maps its audio as it always did.
+    The microphone is the first track and the desktop the second; see
+    :func:`~sclip.core.ffmpeg.build_capture_io`.
+    """
+    if spec is None or not spec.separate_audio or not segments:
+        return []
+    layout = probe_media_layout(segments[-1], job=JobClass.SAVE)
+    if layout is None or layout.audio_tracks < 2:
+        return []
+    graph = mix_audio_filter(["0:a:0", "0:a:1"], label="a", weights=(microphone_level, 1.0))
+    return ["-filter_complex", graph, "-map", "0:v", "-map", "[a]"]
+
+
+def _newest_covering(
+    segments: list[Path], seconds: int | None, spec: BufferSpec | None
+) -> list[Path]:
+    """The fewest newest ``segments`` that hold at least ``seconds`` of footage.
+
+    ``None`` - or a length the window cannot cover - keeps them all.
+    """
+    if seconds is None or seconds <= 0:
+        return segments
+    segment_seconds = spec.segment_seconds if spec is not None else SEGMENT_SECONDS
+    count = max(1, math.ceil(seconds / segment_seconds))
+    return segments[-count:]
+
+
+def _write_concat_list(segments: Sequence[Path], directory: Path, name: str = "concat.txt") -> Path:
+    """Generate the concat-demuxer manifest for the supplied segments.
+
+    Written into ``directory`` as ``name``; returns the temp file path. The format is
+    FFmpeg's plain-text concat protocol: ``file '<path>'`` per line, with
+    single quotes around the path so spaces survive intact.
+    """
+    list_file = directory / name
+    with list_file.open("w", encoding="utf-8") as handle:
+        for segment in segments:
+            # FFmpeg's concat demuxer expects forward slashes or
+            # escaped backslashes. ``as_posix`` keeps it portable.
+            handle.write(f"file '{segment.as_posix()}'\n")
+    return list_file
+
+
+def _join_timeout(segments: Sequence[Path], base: float) -> float:
+    """``base`` plus time to move every byte of ``segments`` at a slow disk's pace.
+
+    A clip is a few hundred megabytes at most and always fits in ``base``; a
+    two-hour recording is gigabytes, and must not be abandoned half-joined.
+    """
+    total = 0
+    for segment in segments:
+        with contextlib.suppress(OSError):
+            total += segment.stat().st_size
+    return base + total / _SLOW_DISK_BYTES_PER_SECOND
+
+
+def _try_lossless_join(
+    segments: Sequence[Path],
+    destination: Path,
+    spec: BufferSpec | None,
+    *,
+    fragmented: bool,
+    mix: Sequence[str] = (),
+) -> bool:
+    """Stream the segments into one remux, without touching the pixels.
+
+    The segments are fed through FFmpeg's stdin rather than concatenated
+    into a file first, so a long recording costs one write of its bytes,
+    not two. With ``mix`` the video is still copied, and the audio tracks
+    are mixed and encoded once.
+    """
+    codec_args = (
+        [*mix, "-c:v", "copy", "-c:a", "aac", "-b:a", AUDIO_BITRATE] if mix else ["-c", "copy"]
+    )
+    # HEVC needs the ``hvc1`` tag to open in QuickTime and most browsers;
+    # the stream itself is copied either way, whatever its codec.
+    tag_args = mp4_tag_args(spec.encoder) if spec is not None else []
+    argv = [
+        "-y",
+        # The segments were written with their timestamps reset, so the
+        # joined stream needs fresh, monotonic ones generating.
+        "-fflags",
+        "+genpts",
+        "-f",
+        "mpegts",
+        "-i",
+        "pipe:0",
+        *codec_args,
+        *tag_args,
+        *mp4_layout_args(fragmented=fragmented),
+        str(destination),
+    ]
+    try:
+        result = stream_into_ffmpeg(
+            argv, segments, job=JobClass.SAVE, timeout=_join_timeout(segments, 120.0)
+        )
+    except subprocess.TimeoutExpired:
+        logger.warning("Lossless join timed out")
+        return False
+    except OSError as exc:
+        logger.warning("Could not read the segments to join: %s", exc)
+        return False
+
+    if result.returncode != 0:
+        logger.warning(
+            "Lossless join failed (code %s): %s",
+            result.returncode,
+            result.stderr.strip()[-300:],
+        )
+        return False
+    return destination.exists() and destination.stat().st_size > 0
+
+
+def _run_reencode(
+    list_file: Path,
+    destination: Path,
+    spec: BufferSpec | None,
+    *,
+    timeout: float,
+    fragmented: bool,
+    mix: Sequence[str] = (),
+) -> bool:
+    """Re-encode through the concat demuxer: the fallback path.
+
+    Slower and it costs a generation of quality, but it copes with segments
+    a plain remux will not accept - a mid-buffer settings change that alters
+    the codec, say, which leaves the ring holding two incompatible streams.
+
+    For a variable-frame-rate buffer the output rate is pinned with ``-r``,
+    so each held frame is repeated until the next one and the clip comes
+    out at the constant rate it was captured at.
+    """
+    if spec is None:
+        logger.error("Cannot stitch a clip without an active buffer spec")
+        return False
+
+    rate_args = ["-r", str(spec.fps)] if spec.variable_frame_rate else []
+    argv = [
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        *mix,
+        *_video_encode_args(spec),
+        "-fps_mode",
+        "cfr",
+        *rate_args,
+        "-c:a",
+        "aac",
+        "-b:a",
+        AUDIO_BITRATE,
+        *mp4_tag_args(spec.encoder),
+        *mp4_layout_args(fragmented=fragmented),
+        str(destination),
+    ]
+    try:
+        result = run_ffmpeg(argv, job=JobClass.SAVE, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.error("Clip stitch job timed out")
+        return False
+    if result.returncode != 0:
+        logger.error("Clip stitch failed (code %s): %s", result.returncode, result.stderr.strip())
+        return False
+    return destination.exists() and destination.stat().st_size > 0
+
+
+def _video_encode_args(spec: BufferSpec) -> list[str]:
+    """The video encoder flags for a clip that has to be re-encoded."""
+    tune_args = ["-tune", "hq"] if spec.encoder.endswith("_nvenc") else []
+    return [
+        "-c:v",
+        spec.encoder,
+        "-preset",
+        spec.preset,
+        *tune_args,
+        *build_quality_args(spec.encoder, spec.crf),
+        "-pix_fmt",
+        "yuv420p",
+    ]
+
+
+def _join_across_tiers(
+    archived: Sequence[Path],
+    full: Sequence[Path],
+    destination: Path,
+    spec: BufferSpec,
+    *,
+    scratch: Path,
+    fragmented: bool,
+    microphone_level: float = 1.0,
+) -> bool:
+    """Join archived and full-quality segments into one MP4; True on success.
+
+    The archive is smaller than the window and may not even share its codec,
+    so neither a stream copy nor the concat demuxer can take the two as one
+    run. Each tier goes in as an input of its own instead, the archive is
+    scaled back up to the window's frame size, and the concat filter lays the
+    two end to end at the capture's constant rate. The window's size is read
+    off its newest segment; if ffprobe cannot say, the clip is saved without
+    the archive rather than not at all. Separate audio tracks, which the
+    archive copies as they are, are mixed within each tier first.
+    """
+    if not full:
+        return join_segments(
+            archived,
+            destination,
+            spec,
+            scratch=scratch,
+            fragmented=fragmented,
+            microphone_level=microphone_level,
+        )
+    layout = probe_media_layout(full[-1], job=JobClass.SAVE)
+    if layout is None:
+        logger.warning("Cannot size the archive to the window; saving the window alone")
+        return join_segments(
+            full,
+            destination,
+            spec,
+            scratch=scratch,
+            fragmented=fragmented,
+            microphone_level=microphone_level,
+        )
+
+    graph = (
+        f"[0:v]scale={layout.width}:{layout.height}:flags=bicubic,setsar=1,fps={spec.fps}[old];"
+        f"[1:v]setsar=1,fps={spec.fps}[new];"
+    )
+    if spec.separate_audio and layout.audio_tracks >= 2:
+        weights = (microphone_level, 1.0)
+        graph += (
+            mix_audio_filter(["0:a:0", "0:a:1"], label="olda", weights=weights)
+            + ";"
+            + mix_audio_filter(["1:a:0", "1:a:1"], label="newa", weights=weights)
+            + ";[old][olda][new][newa]concat=n=2:v=1:a=1[v][a]"
+        )
+        output_args = ["-map", "[v]", "-map", "[a]", "-c:a", "aac", "-b:a", AUDIO_BITRATE]
+    elif layout.has_audio:
+        graph += "[old][0:a][new][1:a]concat=n=2:v=1:a=1[v][a]"
+        output_args = ["-map", "[v]", "-map", "[a]", "-c:a", "aac", "-b:a", AUDIO_BITRATE]
+    else:
+        graph += "[old][new]concat=n=2:v=1:a=0[v]"
+        output_args = ["-map", "[v]"]
+
+    footage = (len(archived) + len(full)) * spec.segment_seconds
+    timeout = max(_REENCODE_TIMEOUT, footage * _REENCODE_SECONDS_PER_SECOND)
+    archive_list = _write_concat_list(archived, scratch, "archive.txt")
+    window_list = _write_concat_list(full, scratch)
+    argv = [
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(archive_list),
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(window_list),
+        "-filter_complex",
+        graph,
+        *output_args,
+        *_video_encode_args(spec),
+        *mp4_tag_args(spec.encoder),
+        *mp4_layout_args(fragmented=fragmented),
+        str(destination),
+    ]
+    try:
+        result = run_ffmpeg(argv, job=JobClass.SAVE, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        logger.error("Joining the archive into the clip timed out")
+        return False
+    finally:
+        remove_quietly(archive_list)
+        remove_quietly(window_list)
+    if result.returncode != 0:
+        logger.error(
+            "Joining the archive into the clip failed (code %s): %s",
+            result.returncode,
+            result.stderr.strip()[-300:],
+        )
+        return False
+    return destination.exists() and destination.stat().st_size > 0
+
+
+def _move_segment(source: Path, target: Path) -> None:
+    """Rename ``source`` to ``target``, copying it across when they are on different volumes.
+
+    Only a cross-volume move falls back to a copy. Any other failure - on
+    Windows, the muxer still holding the file - raises as the rename did, so
+    a segment in use is never copied half-written.
+    """
+    try:
+        source.rename(target)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        shutil.move(source, target)
+
+
 class RollingBuffer:
     """Owns the long-running FFmpeg process that maintains the replay window.
 
@@ -149,17 +643,28 @@ class RollingBuffer:
     the process handle and the bookkeeping flags.
     """
 
-    def __init__(self, directory: Path) -> None:
+    def __init__(self, directory: Path, *, supervisor: ProcessSupervisor | None = None) -> None:
         self._directory = directory
         self._lock = threading.RLock()
         self._process: subprocess.Popen[str] | None = None
         self._spec: BufferSpec | None = None
         self._on_error: Callable[[str], None] | None = None
+        self._on_exit: ExitCallback | None = None
+        self._supervisor = supervisor or default_supervisor()
         # Segments that survived the purge at start, as ``name -> mtime``.
         # Anything still carrying its recorded mtime has not been rewritten by
         # this session and must never reach a clip; see
         # _snapshot_segments_locked.
         self._stale_segments: dict[str, float] = {}
+        # Video frames per finished segment, keyed by name with the mtime and
+        # size it was counted at. A finished segment never changes until the
+        # muxer rewrites its slot, so each one is read once rather than on
+        # every telemetry poll.
+        self._frame_counts: dict[str, tuple[float, int, int]] = {}
+        # Set while the buffer is promoted to a recording; see begin_recording.
+        self._recording: _Recording | None = None
+        # The downscaled tier behind the window, when the spec asks for one.
+        self._archive: ArchiveTier | None = None
 
     @property
     def directory(self) -> Path:
@@ -170,6 +675,22 @@ class RollingBuffer:
         with self._lock:
             return self._process is not None and self._process.poll() is None
 
+    @property
+    def is_recording(self) -> bool:
+        with self._lock:
+            return self._recording is not None
+
+    @property
+    def spec(self) -> BufferSpec | None:
+        """The spec the buffer was last started with; ``None`` once stopped.
+
+        It can differ from the current settings - a backend fallback, or a
+        settings change waiting for the next restart - and it is what the
+        segments on disk were actually recorded with.
+        """
+        with self._lock:
+            return self._spec
+
     def set_error_handler(self, handler: Callable[[str], None] | None) -> None:
         """Register a callback for non-fatal errors that occur in the background.
 
@@ -179,13 +700,34 @@ class RollingBuffer:
         with self._lock:
             self._on_error = handler
 
-    def start(self, spec: BufferSpec) -> None:
+    def set_exit_handler(self, handler: ExitCallback | None) -> None:
+        """Register a callback for the muxer dying mid-session.
+
+        Called on the supervisor thread with the supervisor's report, after
+        the buffer has marked itself stopped. Not called for a stop the
+        buffer was asked for, nor for a failure inside :meth:`start`, which
+        raises instead.
+        """
+        with self._lock:
+            self._on_exit = handler
+
+    def start(self, spec: BufferSpec, *, resume: bool = False) -> None:
         """Spawn the rolling muxer with the supplied capture wiring.
 
         Idempotent against the same spec: if the buffer is already running
         we leave it alone. If the spec has changed (different monitor,
         audio device, etc.) we restart so the new clip matches the live
         capture configuration.
+
+        ``resume`` is for starting again after the muxer died: the segments
+        already recorded are kept, so a crash costs the seconds the restart
+        takes rather than the whole window.
+
+        ``spec.directory`` is where the segments go, and it may differ from
+        the directory the buffer was built with - the engine places each
+        session on whichever volume suits it; see :mod:`sclip.core.storage`.
+        Moving clears out the old directory, and a resume across the move
+        starts afresh, since the footage it would have kept is not there.
         """
         with self._lock:
             if self.is_running:
@@ -194,34 +736,141 @@ class RollingBuffer:
                     return
                 logger.info("Replay buffer spec changed; restarting")
                 self._stop_locked()
+            # A muxer that died leaves its archive transcoder running; it is
+            # replaced below, keeping its footage only if this is a resume.
+            self._stop_archive_locked()
+            if spec.directory != self._directory:
+                logger.info("Replay buffer moving from %s to %s", self._directory, spec.directory)
+                self._purge_segments_locked()
+                with contextlib.suppress(OSError):
+                    self._directory.rmdir()
+                self._directory = spec.directory
+                resume = False
 
             self._directory.mkdir(parents=True, exist_ok=True)
-            self._purge_segments_locked()
-            self._remember_survivors_locked()
-
-            argv = build_segment_args(spec)
+            start_number = 0
+            if resume:
+                start_number = self._next_segment_number_locked(spec)
+            else:
+                self._purge_segments_locked()
+                self._remember_survivors_locked()
+                self._frame_counts = {}
+
+            argv = build_segment_args(spec, start_number=start_number)
             logger.info(
-                "Starting replay buffer: seconds=%s segments=%s slots=%s dir=%s",
+                "%s replay buffer: seconds=%s segments=%s slots=%s dir=%s",
+                "Resuming" if resume else "Starting",
                 spec.seconds,
                 spec.segment_seconds,
                 spec.segment_wrap,
                 self._directory,
             )
 
-            self._process = start_ffmpeg(argv)
+            self._process = start_ffmpeg(argv, job=JobClass.CAPTURE, cores=spec.cores, pumped=True)
             self._spec = spec
 
             # If the process exits within a few hundred ms it almost
             # certainly failed to start (wrong audio device, missing
             # codec, etc.). Catch that loudly so the GUI can react.
             self._poll_for_early_exit_locked()
+            process = self._process
+            if process is not None:
+                self._supervisor.watch(
+                    process, "Replay buffer", functools.partial(self._on_process_exit, process)
+                )
+            if spec.archive_seconds > 0 and spec.wrap:
+                self._archive = ArchiveTier(
+                    self._directory / _ARCHIVE_DIRNAME,
+                    seconds=spec.archive_seconds,
+                    segment_seconds=spec.segment_seconds,
+                    collect=self._collect_for_archive,
+                )
+                self._archive.start()
 
     def stop(self) -> None:
-        """Stop the rolling muxer and tidy up the segments on disk."""
+        """Stop the rolling muxer and tidy up the segments on disk.
+
+        A recording in progress keeps everything captured up to the stop -
+        with the muxer gone, the last segment is finished too - and can still
+        be ended with :meth:`end_recording`.
+        """
         with self._lock:
             self._stop_locked()
+            if self._recording is not None:
+                self._harvest_locked(self._recording, include_newest=True)
             self._purge_segments_locked()
 
+    def begin_recording(self, directory: Path) -> None:
+        """Divert the live segments into an open-ended recording.
+
+        The recording opens with every finished segment already in the ring,
+        and from then on a harvester thread moves each segment out of the ring
+        once the muxer has moved on from it. The rotation therefore never gets
+        back round to overwrite anything: the ring stays one or two segments
+        deep while the recording grows, with no second capture process and no
+        encoder beyond the one already running.
+
+        The segments are moved into ``directory`` as
+        :data:`RECORDING_PART_PATTERN`. On the buffer's volume each move is a
+        rename; a buffer kept on a RAM disk copies each segment across
+        instead, which for a two-second segment is still only a few megabytes.
+
+        Raises ``RuntimeError`` when the buffer is not running. A no-op when
+        a recording is already in progress.
+        """
+        with self._lock:
+            spec = self._spec
+            if not self.is_running or spec is None:
+                raise RuntimeError("Cannot record from a replay buffer that is not running")
+            if self._recording is not None:
+                return
+            directory.mkdir(parents=True, exist_ok=True)
+            recording = _Recording(directory=directory, spec=spec)
+            self._harvest_locked(recording, include_newest=False)
+            logger.info(
+                "Replay buffer promoted to a recording with %d segment(s) banked",
+                recording.parts,
+            )
+            recording.harvester = threading.Thread(
+                target=self._run_harvest,
+                args=(recording,),
+                name="sclip-segment-harvest",
+                daemon=True,
+            )
+            self._recording = recording
+            recording.harvester.start()
+
+    def end_recording(self) -> BufferSpec | None:
+        """Stop diverting segments and return the spec they were written with.
+
+        The segment being written when this is called is waited for - at most
+        one segment's length - so the recording runs right up to the stop
+        instead of ending up to a segment short. Every part is in the
+        recording's directory when this returns, ready for
+        :func:`join_segments`; the buffer itself carries on rolling, with the
+        segments written since as its new window.
+
+        Returns ``None`` when no recording was in progress.
+        """
+        with self._lock:
+            recording = self._recording
+            if recording is None:
+                logger.warning("end_recording called with no recording in progress")
+                return None
+            # Only the segment being written is left in the ring after this.
+            self._harvest_locked(recording, include_newest=False)
+            recording.done.set()
+
+        self._wait_for_rotation(recording.spec.segment_seconds + _ROTATION_GRACE)
+
+        with self._lock:
+            self._recording = None
+            self._harvest_locked(recording, include_newest=not self.is_running)
+        if recording.harvester is not None:
+            recording.harvester.join()
+        logger.info("Recording ended with %d segment(s)", recording.parts)
+        return recording.spec
+
     def telemetry(self) -> BufferTelemetry | None:
         """Report what a save would produce at this instant.
 
@@ -234,61 +883,153 @@ class RollingBuffer:
         The file sizes are summed outside the lock: the snapshot is already
         taken, and holding the lock across a burst of ``stat`` calls would put
         disk latency in the path of every ``start``/``stop``/``save``.
+
+        A variable-frame-rate buffer also counts the frames it actually holds,
+        and reports the difference from a full constant rate as skipped. The
+        dropped-frame count comes from the stderr pump and costs no I/O.
+
+        With an archive tier, the segments still waiting to be archived count
+        towards the full-quality figures, since that is how they would be
+        saved; the archived ones are reported on their own.
         """
         with self._lock:
             spec = self._spec
-            if not self.is_running or spec is None:
+            process = self._process
+            if not self.is_running or spec is None or process is None:
                 return None
             segments = self._snapshot_segments_locked()
+            archived: list[Path] = []
+            if self._archive is not None:
+                archived, pending = self._archive.snapshot()
+                segments = pending + segments
+        counters = self._supervisor.counters(process)
+
+        archived_bytes = 0
+        for segment in archived:
+            with contextlib.suppress(OSError):  # trimmed since the snapshot
+                archived_bytes += segment.stat().st_size
 
         total_bytes = 0
+        frames_encoded = 0
         for segment in segments:
             try:
-                total_bytes += segment.stat().st_size
+                stat = segment.stat()
             except OSError:
                 # Rotated away since the snapshot. It costs us its bytes,
                 # not the whole reading.
                 continue
-
+            total_bytes += stat.st_size
+            if spec.variable_frame_rate:
+                frames_encoded += self._frame_count(segment, stat.st_mtime, stat.st_size)
+
+        buffered_seconds = float(len(segments) * spec.segment_seconds)
+        frames_skipped = 0
+        if spec.variable_frame_rate:
+            frames_skipped = max(0, round(spec.fps * buffered_seconds) - frames_encoded)
         return BufferTelemetry(
-            buffered_seconds=float(len(segments) * spec.segment_seconds),
+            buffered_seconds=buffered_seconds,
             window_seconds=spec.seconds,
             segment_count=len(segments),
             segment_capacity=spec.segment_wrap,
             bytes_on_disk=total_bytes,
+            frames_encoded=frames_encoded,
+            frames_skipped=frames_skipped,
+            video_family=encoder_family(spec.encoder),
+            frames_dropped=counters.frames_dropped if counters is not None else 0,
+            archived_seconds=float(len(archived) * spec.segment_seconds),
+            archived_bytes=archived_bytes,
+            archive_window_seconds=spec.archive_seconds,
         )
 
-    def save_clip(self, destination: Path) -> Path | None:
+    def save_clip(
+        self,
+        destination: Path,
+        *,
+        fragmented: bool = False,
+        seconds: int | None = None,
+        microphone_level: float = 1.0,
+    ) -> Path | None:
         """Stitch the finished segments into a single, smooth MP4.
 
         Returns the path to the written file, or ``None`` if there was
         nothing to save. Safe to call while the rolling muxer keeps running:
         the stitch runs in its own short-lived FFmpeg process and only reads
-        the segments, never the muxer's live output.
+        the segments, never the muxer's live output. ``fragmented`` writes a
+        fragmented MP4 rather than a faststart one; see :func:`join_segments`.
+
+        ``seconds`` saves only the newest part of the window, cut on segment
+        boundaries - rounded up to whole segments, so a clip is never shorter
+        than asked. The join then reads and writes only those segments, which
+        is what makes a short clip from a long buffer land almost at once.
+
+        A buffer with an archive tier saves that too, oldest first, unless
+        ``seconds`` is short enough to stay inside the window; see
+        :func:`_join_across_tiers`. ``microphone_level`` scales the microphone
+        when the buffer kept it as a track of its own.
         """
-        with self._lock:
-            if not self.is_running:
-                logger.warning("save_clip called while replay buffer is not running")
+        # Every archive file a join is reading is held until it is done; the
+        # stack releases them, however the save ends.
+        with contextlib.ExitStack() as holds:
+            with self._lock:
+                if not self.is_running:
+                    logger.warning("save_clip called while replay buffer is not running")
+                    return None
+
+                # Snapshot the segment list under the lock so concurrent
+                # rotation cannot reshuffle it underneath us.
+                spec = self._spec
+                archived, segments = self._clip_segments_locked(seconds, holds)
+
+            if not segments and not archived:
+                logger.warning("Replay buffer has no segments yet; nothing to save")
                 return None
 
-            # Snapshot the segment list under the lock so concurrent
-            # rotation cannot reshuffle it underneath us.
-            segments = self._snapshot_segments_locked()
-
-        if not segments:
-            logger.warning("Replay buffer has no segments yet; nothing to save")
-            return None
-
-        destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            return self._join_with_retry(
+                archived,
+                segments,
+                destination,
+                spec,
+                seconds=seconds,
+                holds=holds,
+                fragmented=fragmented,
+                microphone_level=microphone_level,
+            )
 
+    def _join_with_retry(
+        self,
+        archived: list[Path],
+        segments: list[Path],
+        destination: Path,
+        spec: BufferSpec | None,
+        *,
+        seconds: int | None,
+        holds: contextlib.ExitStack,
+        fragmented: bool,
+        microphone_level: float,
+    ) -> Path | None:
+        """The join half of :meth:`save_clip`, with one re-snapshot on failure."""
         for attempt in range(_CONCAT_RETRIES + 1):
-            list_file = self._write_concat_list(segments)
-            try:
-                ok = self._run_concat(list_file, destination)
-            finally:
-                remove_quietly(list_file)
-
-            if ok:
+            if archived and spec is not None:
+                joined = _join_across_tiers(
+                    archived,
+                    segments,
+                    destination,
+                    spec,
+                    scratch=self._directory,
+                    fragmented=fragmented,
+                    microphone_level=microphone_level,
+                )
+            else:
+                joined = join_segments(
+                    segments,
+                    destination,
+                    spec,
+                    scratch=self._directory,
+                    fragmented=fragmented,
+                    microphone_level=microphone_level,
+                )
+            if joined:
                 logger.info("Replay clip saved: %s", destination)
                 return destination
 
@@ -302,8 +1043,8 @@ class RollingBuffer:
                 # Re-snapshot segments - the rolling muxer might have
                 # rotated a slot we were about to read.
                 with self._lock:
-                    segments = self._snapshot_segments_locked()
-                if not segments:
+                    archived, segments = self._clip_segments_locked(seconds, holds)
+                if not segments and not archived:
                     break
 
         self._notify_error("Failed to stitch the replay buffer into a clip")
@@ -311,14 +1052,139 @@ class RollingBuffer:
 
     # --- internals -------------------------------------------------------
 
+    def _clip_segments_locked(
+        self, seconds: int | None, holds: contextlib.ExitStack
+    ) -> tuple[list[Path], list[Path]]:
+        """The archived and full-quality segments a save should join.
+
+        The archive's segments still waiting for the transcoder are full
+        quality, and older than anything in the ring, so they lead the second
+        list. The archive is held, through ``holds``, so none of what is
+        returned is deleted before the join has read it.
+        """
+        full = self._snapshot_segments_locked()
+        archived: list[Path] = []
+        if self._archive is not None:
+            holds.enter_context(self._archive.held())
+            archived, pending = self._archive.snapshot()
+            full = pending + full
+        wanted = len(_newest_covering(archived + full, seconds, self._spec))
+        if wanted <= len(full):
+            return [], full[len(full) - wanted :]
+        return archived[len(archived) - (wanted - len(full)) :], full
+
+    def _collect_for_archive(self) -> None:
+        """Archive-thread callback: hand over what has aged out of the window.
+
+        Never waits for the lock. The owner stops the archive thread while
+        holding it, and a pass skipped now is made up half a segment later,
+        well within the slack the ring keeps for it.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            archive = self._archive
+            spec = self._spec
+            if archive is None or spec is None or self._recording is not None:
+                return
+            finished = self._fresh_segments_locked()[:-1]
+            keep = math.ceil(spec.seconds / spec.segment_seconds)
+            for segment in finished[: max(0, len(finished) - keep)]:
+                try:
+                    archive.accept(segment)
+                except OSError as exc:
+                    logger.debug("Segment %s not archived yet: %s", segment.name, exc)
+                    return
+                self._frame_counts.pop(segment.name, None)
+        finally:
+            self._lock.release()
+
+    def _stop_archive_locked(self) -> None:
+        """Stop the archive transcoder, leaving its footage on disk."""
+        archive = self._archive
+        self._archive = None
+        if archive is not None:
+            archive.stop()
+
+    def _frame_count(self, segment: Path, mtime: float, size: int) -> int:
+        """Video frames in one finished segment, counted once per rewrite."""
+        cached = self._frame_counts.get(segment.name)
+        if cached is not None and cached[:2] == (mtime, size):
+            return cached[2]
+        frames = count_video_frames(segment)
+        self._frame_counts[segment.name] = (mtime, size, frames)
+        return frames
+
+    def _run_harvest(self, recording: _Recording) -> None:
+        """Harvester-thread body: move finished segments into the recording.
+
+        Runs twice a segment, so a finished segment is moved long before the
+        rotation - a whole ring later - could reach its slot again.
+        """
+        interval = recording.spec.segment_seconds / 2
+        while not recording.done.wait(interval):
+            with self._lock:
+                if self._recording is not recording:
+                    return
+                self._harvest_locked(recording, include_newest=False)
+
+    def _harvest_locked(self, recording: _Recording, *, include_newest: bool) -> None:
+        """Move the ring's finished segments into ``recording``, oldest first.
+
+        The newest segment is the one the muxer is writing and stays put
+        unless ``include_newest`` says the muxer is gone. A segment that will
+        not move - Windows refuses to rename a file something still has open -
+        stops the harvest there, so the parts can never fall out of order; the
+        next pass picks it up.
+        """
+        segments = self._fresh_segments_locked()
+        if not include_newest:
+            segments = segments[:-1]
+        for segment in segments:
+            target = recording.directory / (RECORDING_PART_PATTERN % recording.parts)
+            try:
+                _move_segment(segment, target)
+            except OSError as exc:
+                logger.debug("Segment %s not moved yet: %s", segment.name, exc)
+                return
+            recording.parts += 1
+            self._frame_counts.pop(segment.name, None)
+
+    def _wait_for_rotation(self, timeout: float) -> None:
+        """Wait for the muxer to close the segment it is writing.
+
+        Called with only that segment left in the ring, so a second one
+        appearing means the first is finished. Returns early if the muxer
+        stops, since stopping finishes the segment just as well.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self.is_running or len(self._fresh_segments_locked()) > 1:
+                    return
+            time.sleep(_ROTATION_POLL)
+        logger.warning("The segment being written did not finish in time; the recording ends early")
+
     def _stop_locked(self) -> None:
         """Stop the muxer assuming we already hold the lock."""
+        self._stop_archive_locked()
         process = self._process
         if process is None:
             return
 
         self._process = None
         self._spec = None
+        # A stop we asked for is not a crash to report.
+        counters = self._supervisor.unwatch(process)
+        if counters is not None and not counters.is_clean:
+            logger.warning(
+                "Replay buffer session: %d frame(s) dropped, %d timestamp warning(s), "
+                "%d buffer overrun(s), %d error(s)",
+                counters.frames_dropped,
+                counters.timestamp_warnings,
+                counters.buffer_overruns,
+                counters.errors,
+            )
 
         if process.poll() is None:
             exit_code = stop_ffmpeg(process)
@@ -326,6 +1192,30 @@ class RollingBuffer:
         else:
             logger.debug("Replay buffer FFmpeg had already exited (code %s)", process.returncode)
 
+    def _on_process_exit(self, process: subprocess.Popen[str], info: ProcessExit) -> None:
+        """Supervisor callback: the muxer died without being asked to."""
+        with self._lock:
+            if self._process is not process:
+                return  # already stopped or replaced; nothing of ours died
+            self._process = None
+            self._spec = None
+            handler = self._on_exit
+        if handler is not None:
+            try:
+                handler(info)
+            except Exception:
+                logger.exception("Replay buffer exit handler raised")
+
+    def _next_segment_number_locked(self, spec: BufferSpec) -> int:
+        """The slot after the newest segment on disk, for a resumed muxer."""
+        segments = expected_segment_paths(self._directory)
+        if not segments:
+            return 0
+        match = _SEGMENT_NUMBER.match(segments[-1].name)
+        if match is None:
+            return 0
+        return (int(match.group(1)) + 1) % spec.segment_wrap
+
     def _remember_survivors_locked(self) -> None:
         """Note any segment the purge could not remove, with its mtime.
 
@@ -347,9 +1237,10 @@ class RollingBuffer:
         self._stale_segments = survivors
 
     def _purge_segments_locked(self) -> None:
-        """Delete every leftover ``.ts`` segment in the buffer directory."""
+        """Delete every leftover ``.ts`` segment in the buffer directory, and the archive."""
         if not self._directory.exists():
             return
+        shutil.rmtree(self._directory / _ARCHIVE_DIRNAME, ignore_errors=True)
         for segment in self._directory.iterdir():
             if segment.suffix == ".ts" and segment.is_file():
                 remove_quietly(segment)
@@ -381,6 +1272,13 @@ class RollingBuffer:
         carries the exact mtime seen at start has not been touched since; once
         the muxer rewrites that slot the mtime changes and it counts again.
         """
+        segments = self._fresh_segments_locked()
+        if len(segments) > 1:
+            return segments[:-1]
+        return segments
+
+    def _fresh_segments_locked(self) -> list[Path]:
+        """Every segment on disk that this buffer wrote, oldest first."""
         segments = expected_segment_paths(self._directory)
         if self._stale_segments:
             fresh: list[Path] = []
@@ -397,9 +1295,6 @@ class RollingBuffer:
                     len(segments) - len(fresh),
                 )
             segments = fresh
-
-        if len(segments) > 1:
-            return segments[:-1]
         return segments
 
     def _poll_for_early_exit_locked(self) -> None:
@@ -438,156 +1333,6 @@ class RollingBuffer:
         logger.error(message)
         raise RuntimeError(message)
 
-    def _write_concat_list(self, segments: list[Path]) -> Path:
-        """Generate the concat-demuxer manifest for the supplied segments.
-
-        Returns the temp file path. The format is FFmpeg's plain-text
-        concat protocol: ``file '<path>'`` per line, with single quotes
-        around the path so spaces survive intact.
-        """
-        list_file = self._directory / "concat.txt"
-        with list_file.open("w", encoding="utf-8") as handle:
-            for segment in segments:
-                # FFmpeg's concat demuxer expects forward slashes or
-                # escaped backslashes. ``as_posix`` keeps it portable.
-                handle.write(f"file '{segment.as_posix()}'\n")
-        return list_file
-
-    def _run_concat(self, list_file: Path, destination: Path) -> bool:
-        """Join the segments into one MP4; return True on success.
-
-        Tries a lossless remux first and only re-encodes if that fails.
-
-        This used to always re-encode, on the reasoning that a stream copy
-        leaves a timing seam at every segment join. That is true of the concat
-        *demuxer*, which re-times each input it opens. It is not true of
-        MPEG-TS, a format designed to be concatenated at the byte level: joining
-        the segments as bytes and remuxing the result produces frame intervals
-        uniform to eleven microseconds, against a sixteen-millisecond frame.
-        No seam, no judder, and none of the cost - measured on a real buffer,
-        0.12 seconds against 7.09, with no generation of quality lost on the
-        way through a second encoder.
-        """
-        segments = self._segments_from_list(list_file)
-        if segments and self._try_lossless_join(segments, destination):
-            return True
-        logger.info("Lossless join unavailable; falling back to a re-encode")
-        return self._run_reencode(list_file, destination)
-
-    @staticmethod
-    def _segments_from_list(list_file: Path) -> list[Path]:
-        """Read back the concat manifest as plain paths."""
-        try:
-            lines = list_file.read_text(encoding="utf-8").splitlines()
-        except OSError as exc:
-            logger.warning("Could not read the concat list: %s", exc)
-            return []
-        paths: list[Path] = []
-        for line in lines:
-            if line.startswith("file '") and line.endswith("'"):
-                paths.append(Path(line[len("file '") : -1]))
-        return paths
-
-    def _try_lossless_join(self, segments: list[Path], destination: Path) -> bool:
-        """Byte-join the segments and remux, without touching the pixels."""
-        joined = self._directory / "joined.ts"
-        try:
-            with joined.open("wb") as out:
-                for segment in segments:
-                    out.write(segment.read_bytes())
-        except OSError as exc:
-            logger.warning("Could not byte-join the segments: %s", exc)
-            remove_quietly(joined)
-            return False
-
-        argv = [
-            "-y",
-            # The segments were written with their timestamps reset, so the
-            # joined stream needs fresh, monotonic ones generating.
-            "-fflags",
-            "+genpts",
-            "-i",
-            str(joined),
-            "-c",
-            "copy",
-            # ``faststart`` puts the moov atom at the front so the resulting
-            # MP4 is seekable straight from disk and uploadable to most
-            # services without a remux.
-            "-movflags",
-            "+faststart",
-            str(destination),
-        ]
-        try:
-            result = run_ffmpeg(argv, timeout=120.0)
-        except subprocess.TimeoutExpired:
-            logger.warning("Lossless join timed out")
-            remove_quietly(joined)
-            return False
-        finally:
-            remove_quietly(joined)
-
-        if result.returncode != 0:
-            logger.warning(
-                "Lossless join failed (code %s): %s",
-                result.returncode,
-                result.stderr.strip()[-300:],
-            )
-            return False
-        return destination.exists() and destination.stat().st_size > 0
-
-    def _run_reencode(self, list_file: Path, destination: Path) -> bool:
-        """Re-encode through the concat demuxer: the fallback path.
-
-        Slower and it costs a generation of quality, but it copes with segments
-        a plain remux will not accept - a mid-buffer settings change that alters
-        the codec, say, which leaves the ring holding two incompatible streams.
-        """
-        spec = self._spec
-        if spec is None:
-            logger.error("Cannot stitch a clip without an active buffer spec")
-            return False
-
-        tune_args = ["-tune", "hq"] if spec.encoder.endswith("_nvenc") else []
-        argv = [
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(list_file),
-            "-c:v",
-            spec.encoder,
-            "-preset",
-            spec.preset,
-            *tune_args,
-            *build_quality_args(spec.encoder, spec.crf),
-            "-pix_fmt",
-            "yuv420p",
-            "-fps_mode",
-            "cfr",
-            "-c:a",
-            "aac",
-            "-b:a",
-            AUDIO_BITRATE,
-            "-movflags",
-            "+faststart",
-            str(destination),
-        ]
-        try:
-            # A long buffer means a long re-encode; the timeout has to comfortably
-            # cover stitching the largest window the user could have configured.
-            result = run_ffmpeg(argv, timeout=300.0)
-        except subprocess.TimeoutExpired:
-            logger.error("Clip stitch job timed out")
-            return False
-        if result.returncode != 0:
-            logger.error(
-                "Clip stitch failed (code %s): %s", result.returncode, result.stderr.strip()
-            )
-            return False
-        return destination.exists() and destination.stat().st_size > 0
-
     def _notify_error(self, message: str) -> None:
         with self._lock:
             handler = self._on_error
@@ -598,9 +1343,58 @@ class RollingBuffer:
                 logger.exception("Replay buffer error handler raised")
 
 
+def transcode_to_h264(source: Path, destination: Path, *, crf: int) -> bool:
+    """Write an H.264 copy of the clip at ``source``; return True on success.
+
+    Everything plays H.264; not everything plays HEVC or AV1 - older phones,
+    some chat apps, editors without the licence. The audio is already AAC and
+    is copied. Runs on the CPU with libx264 so it never competes with the
+    capture for the hardware encoder, and is meant to be run off the save
+    path: a clip is saved the moment it is asked for, and its copy follows.
+    """
+    argv = [
+        "-y",
+        "-i",
+        str(source),
+        "-map",
+        "0",
+        "-c:v",
+        "libx264",
+        "-preset",
+        _H264_EXPORT_PRESET,
+        *build_quality_args("libx264", crf),
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "copy",
+        "-movflags",
+        "+faststart",
+        str(destination),
+    ]
+    try:
+        result = run_ffmpeg(argv, job=JobClass.BACKGROUND, timeout=_H264_EXPORT_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logger.warning("H.264 export of %s timed out", source.name)
+        remove_quietly(destination)
+        return False
+    if result.returncode != 0:
+        logger.warning(
+            "H.264 export of %s failed (code %s): %s",
+            source.name,
+            result.returncode,
+            result.stderr.strip()[-300:],
+        )
+        remove_quietly(destination)
+        return False
+    return destination.exists() and destination.stat().st_size > 0
+
+
 __all__ = [
+    "RECORDING_PART_PATTERN",
     "SEGMENT_SECONDS",
     "BufferSpec",
     "RollingBuffer",
     "build_segment_args",
+    "join_segments",
+    "transcode_to_h264",
 ]
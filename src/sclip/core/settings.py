@@ -17,7 +17,16 @@ import re
 from pathlib import Path
 from typing import Any
 
-from sclip.contracts import ENCODERS, Hotkey, Settings, encoder_by_codec
+from sclip.contracts import (
+    ENCODERS,
+    MAX_CLIP_BINDINGS,
+    SCALERS,
+    ClipBinding,
+    Hotkey,
+    Settings,
+    encoder_by_codec,
+)
+from sclip.core.region import parse_region
 from sclip.paths import app_paths
 
 logger = logging.getLogger(__name__)
@@ -35,6 +44,15 @@ _MAX_DIMENSION = 16_384  # well past any real display, but bounded
 _FPS_MIN, _FPS_MAX = 1, 240
 _CRF_MIN, _CRF_MAX = 0, 51
 _REPLAY_MIN, _REPLAY_MAX = 5, 600
+# The archive tier, in minutes: with the longest full-quality window, an hour.
+_ARCHIVE_MIN, _ARCHIVE_MAX = 0, 50
+# The replay buffer's disk budget in MiB; 0 means no cap. A terabyte is
+# already past any window the settings allow.
+_BUFFER_BUDGET_MIN, _BUFFER_BUDGET_MAX = 0, 1 << 20
+# A software encoder's share of the cores, in percent; 0 means no limit.
+_CPU_BUDGET_MIN, _CPU_BUDGET_MAX = 0, 100
+# The microphone's share of a save-time mix, in percent; 0 leaves it out.
+_MIC_LEVEL_MIN, _MIC_LEVEL_MAX = 0, 200
 
 # Set of supported encoder codecs derived from the contract so the two
 # definitions never drift apart.
@@ -156,6 +174,16 @@ def _settings_from_dict(data: dict[str, Any]) -> Settings:
         capture_desktop_audio=_coerce_bool(
             data.get("capture_desktop_audio"), defaults.capture_desktop_audio
         ),
+        separate_audio_tracks=_coerce_bool(
+            data.get("separate_audio_tracks"), defaults.separate_audio_tracks
+        ),
+        microphone_level=_coerce_int(
+            data.get("microphone_level"),
+            defaults.microphone_level,
+            _MIC_LEVEL_MIN,
+            _MIC_LEVEL_MAX,
+            "microphone_level",
+        ),
         replay_buffer=_coerce_bool(data.get("replay_buffer"), defaults.replay_buffer),
         replay_seconds=_coerce_int(
             data.get("replay_seconds"),
@@ -164,10 +192,41 @@ def _settings_from_dict(data: dict[str, Any]) -> Settings:
             _REPLAY_MAX,
             "replay_seconds",
         ),
+        archive_minutes=_coerce_int(
+            data.get("archive_minutes"),
+            defaults.archive_minutes,
+            _ARCHIVE_MIN,
+            _ARCHIVE_MAX,
+            "archive_minutes",
+        ),
         monitor=_coerce_str(data.get("monitor"), defaults.monitor),
         clip_hotkey=_coerce_hotkey(data.get("clip_hotkey"), defaults.clip_hotkey),
         record_hotkey=_coerce_hotkey(data.get("record_hotkey"), defaults.record_hotkey),
-        output_dir=_coerce_output_dir(data.get("output_dir"), defaults.output_dir),
+        clip_bindings=_coerce_clip_bindings(data.get("clip_bindings"), defaults.clip_bindings),
+        output_dir=_coerce_directory(data.get("output_dir"), defaults.output_dir, "output_dir"),
+        buffer_dir=_coerce_directory(data.get("buffer_dir"), defaults.buffer_dir, "buffer_dir"),
+        buffer_budget_mb=_coerce_int(
+            data.get("buffer_budget_mb"),
+            defaults.buffer_budget_mb,
+            _BUFFER_BUDGET_MIN,
+            _BUFFER_BUDGET_MAX,
+            "buffer_budget_mb",
+        ),
+        scaler=_coerce_choice(data.get("scaler"), defaults.scaler, SCALERS, "scaler"),
+        cpu_budget_percent=_coerce_int(
+            data.get("cpu_budget_percent"),
+            defaults.cpu_budget_percent,
+            _CPU_BUDGET_MIN,
+            _CPU_BUDGET_MAX,
+            "cpu_budget_percent",
+        ),
+        variable_frame_rate=_coerce_bool(
+            data.get("variable_frame_rate"), defaults.variable_frame_rate
+        ),
+        h264_export=_coerce_bool(data.get("h264_export"), defaults.h264_export),
+        fragmented_mp4=_coerce_bool(data.get("fragmented_mp4"), defaults.fragmented_mp4),
+        capture_region=_coerce_region(data.get("capture_region"), defaults.capture_region),
+        capture_window=_coerce_str(data.get("capture_window"), defaults.capture_window).strip(),
         auto_configure=_coerce_bool(data.get("auto_configure"), defaults.auto_configure),
         check_for_updates=_coerce_bool(data.get("check_for_updates"), defaults.check_for_updates),
     )
@@ -184,12 +243,28 @@ def _settings_to_dict(settings: Settings) -> dict[str, Any]:
         "audio_input": settings.audio_input,
         "capture_audio": settings.capture_audio,
         "capture_desktop_audio": settings.capture_desktop_audio,
+        "separate_audio_tracks": settings.separate_audio_tracks,
+        "microphone_level": settings.microphone_level,
         "replay_buffer": settings.replay_buffer,
         "replay_seconds": settings.replay_seconds,
+        "archive_minutes": settings.archive_minutes,
         "monitor": settings.monitor,
         "clip_hotkey": _hotkey_to_dict(settings.clip_hotkey),
         "record_hotkey": _hotkey_to_dict(settings.record_hotkey),
+        "clip_bindings": [
+            {"hotkey": _hotkey_to_dict(binding.hotkey), "seconds": binding.seconds}
+            for binding in settings.clip_bindings
+        ],
         "output_dir": settings.output_dir,
+        "buffer_dir": settings.buffer_dir,
+        "buffer_budget_mb": settings.buffer_budget_mb,
+        "scaler": settings.scaler,
+        "cpu_budget_percent": settings.cpu_budget_percent,
+        "variable_frame_rate": settings.variable_frame_rate,
+        "h264_export": settings.h264_export,
+        "fragmented_mp4": settings.fragmented_mp4,
+        "capture_region": settings.capture_region,
+        "capture_window": settings.capture_window,
         "auto_configure": settings.auto_configure,
         "check_for_updates": settings.check_for_updates,
     }
@@ -258,6 +333,28 @@ def _coerce_str(value: Any, default: str) -> str:
     return default
 
 
+def _coerce_choice(value: Any, default: str, choices: tuple[str, ...], field_name: str) -> str:
+    """Accept one of a fixed set of names, else fall back to the default."""
+    if isinstance(value, str) and value in choices:
+        return value
+    if value is not None:
+        logger.warning("Invalid %s %r; falling back to %s", field_name, value, default)
+    return default
+
+
+def _coerce_region(value: Any, default: str) -> str:
+    """Accept a blank region or a ``WIDTHxHEIGHT+X+Y`` one, normalised."""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        if not value.strip():
+            return ""
+        with contextlib.suppress(ValueError):
+            return parse_region(value).describe()
+    logger.warning("Invalid capture_region %r; falling back to %r", value, default)
+    return default
+
+
 def _coerce_audio_input(value: Any, default: str) -> str:  # noqa: PLR0911 - early returns per rejection reason are clearer than a flag/break ladder
     """Validate a DirectShow audio-device name loaded from settings.
 
@@ -301,36 +398,33 @@ def _coerce_audio_input(value: Any, default: str) -> str:  # noqa: PLR0911 - ear
     return value
 
 
-def _coerce_output_dir(value: Any, default: str) -> str:  # noqa: PLR0911 - early returns per rejection reason are clearer than a flag/break ladder
-    """Validate a custom clip output directory loaded from settings.
+def _coerce_directory(value: Any, default: str, field: str) -> str:  # noqa: PLR0911 - early returns per rejection reason are clearer than a flag/break ladder
+    """Validate a custom directory loaded from settings - the clips or buffer folder.
 
     Accepts an empty string (meaning "use the platform default") and absolute
     local paths. A non-absolute path is ambiguous (relative to *what*?) and a
     UNC path is a remote-mount footgun - opening one as a write target can
     trigger an outbound SMB auth that leaks the user's NTLM hash. Either
-    pattern falls back to ``""`` so the engine uses :func:`app_paths().clips_dir`.
+    pattern falls back to ``""`` so the engine uses its default location.
     """
     if value is None:
         return default
     if not isinstance(value, str):
-        logger.warning("Invalid output_dir %r; falling back to %r", value, default)
+        logger.warning("Invalid %s %r; falling back to %r", field, value, default)
         return default
     if not value:
         return ""
     # UNC paths begin with two separators on either Windows or POSIX style.
     if value.startswith(("\\\\", "//")):
-        logger.warning(
-            "output_dir %r is a UNC path; falling back to the default location",
-            value,
-        )
+        logger.warning("%s %r is a UNC path; falling back to the default location", field, value)
         return ""
     try:
         is_absolute = Path(value).expanduser().is_absolute()
     except (OSError, ValueError) as exc:
-        logger.warning("output_dir %r could not be parsed (%s); ignoring", value, exc)
+        logger.warning("%s %r could not be parsed (%s); ignoring", field, value, exc)
         return ""
     if not is_absolute:
-        logger.warning("output_dir %r is not absolute; falling back to the default location", value)
+        logger.warning("%s %r is not absolute; falling back to the default location", field, value)
         return ""
     return value
 
@@ -364,6 +458,16 @@ def _coerce_preset(encoder: str, value: Any) -> str:
 
 def _coerce_hotkey(value: Any, default: Hotkey) -> Hotkey:
     """Accept a structured dict or a bare key string."""
+    hotkey = _parse_hotkey(value)
+    if hotkey is not None:
+        return hotkey
+    if value is not None:
+        logger.warning("Invalid hotkey %r; falling back to %s", value, default.to_display())
+    return default
+
+
+def _parse_hotkey(value: Any) -> Hotkey | None:
+    """Read a hotkey from a structured dict or a bare key string, or ``None``."""
     if isinstance(value, Hotkey):
         return value
     if isinstance(value, str) and value:
@@ -378,9 +482,38 @@ def _coerce_hotkey(value: Any, default: Hotkey) -> Hotkey:
                 shift=bool(value.get("shift", False)),
                 alt=bool(value.get("alt", False)),
             )
-    if value is not None:
-        logger.warning("Invalid hotkey %r; falling back to %s", value, default.to_display())
-    return default
+    return None
+
+
+def _coerce_clip_bindings(value: Any, default: tuple[ClipBinding, ...]) -> tuple[ClipBinding, ...]:
+    """Accept a list of ``{"hotkey": ..., "seconds": n}``; drop what cannot be read.
+
+    A damaged entry is dropped rather than failing the whole list, so one bad
+    hand edit costs one binding. A chord bound twice keeps its first length.
+    Lengths share the replay window's bounds, and the list is capped at
+    :data:`MAX_CLIP_BINDINGS`, which is all the settings page can show.
+    """
+    if value is None:
+        return default
+    if not isinstance(value, list):
+        logger.warning("Invalid clip_bindings %r; falling back to the default", value)
+        return default
+
+    bindings: list[ClipBinding] = []
+    for entry in value:
+        hotkey = _parse_hotkey(entry.get("hotkey")) if isinstance(entry, dict) else None
+        if hotkey is None:
+            logger.warning("Dropping unreadable clip binding %r", entry)
+            continue
+        if any(binding.hotkey == hotkey for binding in bindings):
+            continue
+        seconds = _coerce_int(
+            entry.get("seconds"), _REPLAY_MIN, _REPLAY_MIN, _REPLAY_MAX, "clip length"
+        )
+        bindings.append(ClipBinding(hotkey=hotkey, seconds=seconds))
+    if len(bindings) > MAX_CLIP_BINDINGS:
+        logger.warning("Keeping the first %d clip bindings", MAX_CLIP_BINDINGS)
+    return tuple(bindings[:MAX_CLIP_BINDINGS])
 
 
 def _hotkey_to_dict(hotkey: Hotkey) -> dict[str, Any]:
@@ -0,0 +1,411 @@
+"""Where the replay buffer is kept, and how long a window its disk can hold.
+
+The ring used to be sized from the window alone - ``seconds`` over
+``segment_seconds`` slots - in a folder on the profile drive, and nothing
+looked at that drive until FFmpeg ran out of it mid-session. A full disk is
+the one death a restart cannot fix, so the user found out with the buffer
+already gone. :class:`BufferPlanner` settles both questions before the muxer
+starts.
+
+Placement. :attr:`~sclip.contracts.Settings.buffer_dir` names a folder to keep
+the buffer in; blank lets S-Clip choose. The choice prefers a RAM disk - a
+``tmpfs`` such as ``/dev/shm``, or a Windows drive that reports itself as one -
+with room for the whole window several times over: the ring rewrites the same
+few hundred megabytes all session long, which is wear an SSD need not take and
+latency a busy disk need not add to a save. Otherwise the buffer stays in
+:attr:`~sclip.paths.AppPaths.replay_buffer_dir`. A folder the user names gets a
+subfolder of its own, because starting a buffer clears every segment out of
+its directory.
+
+Size. The window costs its bitrate times its length. The bitrate is the one a
+buffer with the same :class:`CaptureProfile` actually measured, when this run
+has had one going, and an estimate from the frame size, rate and quality
+otherwise (:func:`estimate_bitrate`). The window is fitted to the smaller of
+:attr:`~sclip.contracts.Settings.buffer_budget_mb` and the volume's free space
+less a reserve: the archive tier gives way first, then the full-quality
+window, and a window that would be shorter than :data:`MIN_WINDOW_SECONDS` is
+refused rather than armed.
+
+Speed. Once per folder per run, a few megabytes are written there, flushed and
+timed. A volume slower than the capture bitrate is refused outright; one
+without :data:`_THROUGHPUT_HEADROOM` times the bitrate to spare arms with a
+warning, since a save reads the window back while the capture goes on writing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from sclip.contracts import TYPICAL_SIZE_VS_H264, BufferTelemetry, Settings, encoder_family
+from sclip.core.archive import ARCHIVE_CRF, ARCHIVE_MAX_HEIGHT
+from sclip.core.ffmpeg import AUDIO_BITRATE, remove_quietly
+from sclip.core.replay_buffer import SEGMENT_SECONDS, BufferSpec
+
+logger = logging.getLogger(__name__)
+
+
+# The shortest window worth arming, matching the shortest the settings allow.
+# A disk that cannot hold this much is reported rather than used.
+MIN_WINDOW_SECONDS: int = 5
+
+# The buffer's own folder inside one the user picked, or on a RAM disk.
+_BUFFER_DIRNAME: str = "S-Clip replay buffer"
+
+# Bits per pixel per frame of an H.264 capture at the reference CRF. Games
+# run well above desktop footage, and this errs higher still: a window sized
+# from too big an estimate is a few seconds short, one sized from too small an
+# estimate runs out of disk. Every _CRF_HALVING_STEP of CRF halves it, as a
+# rule of thumb for x264 and the hardware encoders alike.
+_H264_BITS_PER_PIXEL: float = 0.12
+_REFERENCE_CRF: int = 20
+_CRF_HALVING_STEP: float = 6.0
+
+# The mixed audio track, in bits a second.
+_AUDIO_BITS_PER_SECOND: int = int(AUDIO_BITRATE.removesuffix("k")) * 1000
+
+# Free space left untouched on the buffer's volume, so the buffer never takes
+# the last of a drive Windows and the game also write to. A small volume keeps
+# a fraction of itself back instead.
+_FREE_SPACE_RESERVE_BYTES: int = 1 << 30
+_FREE_SPACE_RESERVE_FRACTION: float = 0.1
+
+# Automatic placement only picks a RAM disk the window fills no more than
+# this share of: every byte there is memory the game does not get.
+_RAM_DISK_SHARE: float = 0.25
+
+# The write probe: 16 MiB in 1 MiB writes, then an fsync. Random bytes, so a
+# compressing filesystem cannot make the drive look faster than it is.
+_PROBE_BYTES: int = 16 << 20
+_PROBE_CHUNK_BYTES: int = 1 << 20
+_PROBE_NAME: str = "write-probe.tmp"
+
+# A volume should write this many times the capture bitrate: the capture, a
+# save reading the window back, and the archive's transcodes all share it.
+_THROUGHPUT_HEADROOM: float = 3.0
+
+# A measured bitrate is only trusted once the window holds this much footage;
+# the first segments of a session run high while the encoder settles.
+_MIN_OBSERVED_SECONDS: float = 20.0
+
+# GetDriveTypeW's answer for a RAM disk.
+_DRIVE_RAMDISK: int = 6
+
+
+class BufferStorageError(RuntimeError):
+    """No folder available to the replay buffer can hold or keep up with it."""
+
+
+@dataclass(frozen=True, slots=True)
+class CaptureProfile:
+    """What decides a capture's bitrate, and the key measured ones are kept under.
+
+    ``width`` and ``height`` are the encoded size - for a capture scaled down
+    to :attr:`~sclip.contracts.Settings.resolution`, that resolution, which
+    :func:`~sclip.core.ffmpeg.fit_output_size` never exceeds.
+    """
+
+    width: int
+    height: int
+    fps: int
+    encoder: str
+    crf: int
+    audio: bool = True
+
+    def archived(self) -> CaptureProfile:
+        """The same capture as the archive tier keeps it."""
+        height = min(self.height, ARCHIVE_MAX_HEIGHT)
+        width = round(self.width * height / self.height) if self.height else self.width
+        return replace(self, width=width, height=height, encoder="libx264", crf=ARCHIVE_CRF)
+
+
+@dataclass(frozen=True, slots=True)
+class BufferPlan:
+    """Where a buffer goes and how much of the asked-for window it keeps.
+
+    ``seconds`` and ``archive_seconds`` are at most what the settings asked
+    for. ``warning`` is a short note for the capture page when the plan
+    shortened the window or the volume is only just fast enough; blank
+    otherwise.
+    """
+
+    directory: Path
+    seconds: int
+    archive_seconds: int
+    bitrate_bps: float
+    write_bps: float
+    warning: str = ""
+
+
+def estimate_bitrate(profile: CaptureProfile) -> float:
+    """A deliberately high guess at a capture's bitrate, in bits per second."""
+    pixels_per_second = profile.width * profile.height * profile.fps
+    quality = 2 ** ((_REFERENCE_CRF - profile.crf) / _CRF_HALVING_STEP)
+    family = TYPICAL_SIZE_VS_H264.get(encoder_family(profile.encoder), 1.0)
+    video = pixels_per_second * _H264_BITS_PER_PIXEL * quality * family
+    return video + (_AUDIO_BITS_PER_SECOND if profile.audio else 0)
+
+
+def ram_disk_roots() -> list[Path]:
+    """Writable RAM-backed volumes: ``/dev/shm``, or Windows RAM-disk drives."""
+    if sys.platform != "win32":
+        shm = Path("/dev/shm")
+        return [shm] if shm.is_dir() and os.access(shm, os.W_OK) else []
+
+    import ctypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.GetDriveTypeW.argtypes = [ctypes.c_wchar_p]
+    mask = kernel32.GetLogicalDrives()
+    roots: list[Path] = []
+    for index in range(26):
+        if mask & (1 << index):
+            root = f"{chr(ord('A') + index)}:\\"
+            if kernel32.GetDriveTypeW(root) == _DRIVE_RAMDISK:
+                roots.append(Path(root))
+    return roots
+
+
+def measure_write_speed(directory: Path) -> float:
+    """Time a flushed write into ``directory``, in bits per second.
+
+    Raises ``OSError`` when the folder cannot be written to at all.
+    """
+    probe = directory / _PROBE_NAME
+    chunk = os.urandom(_PROBE_CHUNK_BYTES)
+    try:
+        started = time.perf_counter()
+        with probe.open("wb", buffering=0) as handle:
+            for _ in range(_PROBE_BYTES // _PROBE_CHUNK_BYTES):
+                handle.write(chunk)
+            os.fsync(handle.fileno())
+        elapsed = time.perf_counter() - started
+    finally:
+        remove_quietly(probe)
+    return _PROBE_BYTES * 8 / max(elapsed, 1e-6)
+
+
+def _format_rate(bits_per_second: float) -> str:
+    return f"{bits_per_second / 8e6:.0f} MB/s"
+
+
+def _format_window(seconds: int) -> str:
+    minutes, rest = divmod(seconds, 60)
+    return f"{minutes}m {rest:02d}s" if minutes else f"{rest}s"
+
+
+def _reclaimable_bytes(directory: Path) -> int:
+    """Space the folder's own leftovers hold; starting the buffer frees it."""
+    total = 0
+    if directory.is_dir():
+        for path in directory.rglob("*"):
+            try:
+                if path.is_file():
+                    total += path.stat().st_size
+            except OSError:
+                continue
+    return total
+
+
+def _ring_slots(seconds: int, *, archiving: bool) -> int:
+    """Slots the muxer rotates through for a window; see :attr:`BufferSpec.segment_wrap`."""
+    spec = BufferSpec(
+        capture_args=(), directory=Path(), seconds=seconds, archive_seconds=int(archiving)
+    )
+    return spec.segment_wrap
+
+
+def _window_bytes(seconds: int, bytes_per_second: float, *, archiving: bool) -> float:
+    """What a ring of ``seconds`` occupies at its fullest: every slot full."""
+    return _ring_slots(seconds, archiving=archiving) * SEGMENT_SECONDS * bytes_per_second
+
+
+class BufferPlanner:
+    """Places and sizes the replay buffer each time it is armed.
+
+    Remembers, for the life of the run, how fast each folder wrote and what
+    bitrate each capture profile really produced, so only the first arm on a
+    given folder pays for the write probe.
+
+    Thread safety: every public method may be called from any thread.
+    """
+
+    def __init__(self, default_directory: Path) -> None:
+        self._default_directory = default_directory
+        self._lock = threading.Lock()
+        self._write_speeds: dict[Path, float] = {}
+        self._observed: dict[CaptureProfile, float] = {}
+
+    def observe(self, profile: CaptureProfile, telemetry: BufferTelemetry) -> None:
+        """Remember the bitrate a running buffer with ``profile`` is writing at."""
+        if telemetry.buffered_seconds < _MIN_OBSERVED_SECONDS:
+            return
+        with self._lock:
+            self._observed[profile] = telemetry.bitrate_bps
+
+    def bitrate_for(self, profile: CaptureProfile) -> float:
+        """The measured bitrate for ``profile`` when there is one, else the estimate."""
+        with self._lock:
+            observed = self._observed.get(profile)
+        return observed if observed else estimate_bitrate(profile)
+
+    def plan(self, settings: Settings, profile: CaptureProfile) -> BufferPlan:
+        """Choose the buffer's folder and fit the window to it.
+
+        Raises :class:`BufferStorageError` when the window cannot be armed:
+        the folder holds less than :data:`MIN_WINDOW_SECONDS`, or cannot be
+        written as fast as the capture produces footage.
+        """
+        bitrate = self.bitrate_for(profile)
+        archive_bitrate = self.bitrate_for(profile.archived())
+        seconds = int(settings.replay_seconds)
+        archive_seconds = int(settings.archive_minutes) * 60
+        wanted = _window_bytes(seconds, bitrate / 8, archiving=archive_seconds > 0) + (
+            archive_seconds * archive_bitrate / 8
+        )
+
+        directory = self._choose_directory(settings, wanted)
+        available = self._available_bytes(directory, settings)
+        seconds, archive_seconds = self._fit(
+            seconds, archive_seconds, bitrate / 8, archive_bitrate / 8, available
+        )
+        if seconds < MIN_WINDOW_SECONDS:
+            raise BufferStorageError(
+                f"There is not enough space in {directory} for a replay buffer: "
+                f"{available / 1e6:.0f} MB is free for it, and even a "
+                f"{MIN_WINDOW_SECONDS}-second window needs more. Free some space, "
+                "raise the buffer's disk budget, or keep it on another drive."
+            )
+
+        write_bps = self._write_speed(directory)
+        if write_bps < bitrate:
+            raise BufferStorageError(
+                f"{directory} writes at {_format_rate(write_bps)}, slower than the "
+                f"capture's {_format_rate(bitrate)}. Keep the replay buffer on a faster drive."
+            )
+
+        notes: list[str] = []
+        if seconds < int(settings.replay_seconds):
+            notes.append(f"window cut to {_format_window(seconds)} to fit the disk")
+        if archive_seconds < int(settings.archive_minutes) * 60:
+            notes.append(f"history cut to {archive_seconds // 60} min")
+        if write_bps < bitrate * _THROUGHPUT_HEADROOM:
+            notes.append(f"slow drive ({_format_rate(write_bps)})")
+        warning = "; ".join(notes)
+        if warning:
+            logger.warning(
+                "Replay buffer in %s: %s (capture %.1f Mbit/s, disk %.1f Mbit/s, %.0f MB free)",
+                directory,
+                warning,
+                bitrate / 1e6,
+                write_bps / 1e6,
+                available / 1e6,
+            )
+        return BufferPlan(
+            directory=directory,
+            seconds=seconds,
+            archive_seconds=archive_seconds,
+            bitrate_bps=bitrate,
+            write_bps=write_bps,
+            warning=warning[:1].upper() + warning[1:],
+        )
+
+    # --- internals -------------------------------------------------------
+
+    def _choose_directory(self, settings: Settings, wanted_bytes: float) -> Path:
+        """The user's folder if it is usable, a roomy RAM disk, or the default."""
+        configured = settings.buffer_dir.strip() if settings.buffer_dir else ""
+        if configured:
+            directory = Path(configured).expanduser() / _BUFFER_DIRNAME
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError as exc:
+                logger.warning(
+                    "Buffer folder %s is unusable (%s); falling back to %s",
+                    directory,
+                    exc,
+                    self._default_directory,
+                )
+            else:
+                return directory
+        else:
+            for root in ram_disk_roots():
+                try:
+                    free = shutil.disk_usage(root).free
+                except OSError:
+                    continue
+                if wanted_bytes <= free * _RAM_DISK_SHARE:
+                    directory = root / _BUFFER_DIRNAME
+                    try:
+                        directory.mkdir(parents=True, exist_ok=True)
+                    except OSError:
+                        continue
+                    return directory
+        self._default_directory.mkdir(parents=True, exist_ok=True)
+        return self._default_directory
+
+    @staticmethod
+    def _available_bytes(directory: Path, settings: Settings) -> float:
+        """Space the buffer may fill: free less the reserve, within the budget."""
+        usage = shutil.disk_usage(directory)
+        reserve = min(_FREE_SPACE_RESERVE_BYTES, usage.total * _FREE_SPACE_RESERVE_FRACTION)
+        available = max(0.0, usage.free - reserve) + _reclaimable_bytes(directory)
+        if settings.buffer_budget_mb > 0:
+            available = min(available, settings.buffer_budget_mb * float(1 << 20))
+        return available
+
+    @staticmethod
+    def _fit(
+        seconds: int,
+        archive_seconds: int,
+        bytes_per_second: float,
+        archive_bytes_per_second: float,
+        available: float,
+    ) -> tuple[int, int]:
+        """Shorten the archive, then the window, until both fit in ``available``."""
+        if archive_seconds > 0:
+            room = available - _window_bytes(seconds, bytes_per_second, archiving=True)
+            fits = int(max(0.0, room) // (archive_bytes_per_second * 60)) * 60
+            archive_seconds = min(archive_seconds, fits)
+        archiving = archive_seconds > 0
+        if _window_bytes(seconds, bytes_per_second, archiving=archiving) <= available:
+            return seconds, archive_seconds
+        # Each slot beyond the window's own - the one being written, and the
+        # archive's slack - comes out of the same space.
+        overhead = _ring_slots(SEGMENT_SECONDS, archiving=archiving) - 1
+        slots = int(available // (SEGMENT_SECONDS * bytes_per_second)) - overhead
+        return max(0, slots * SEGMENT_SECONDS), archive_seconds
+
+    def _write_speed(self, directory: Path) -> float:
+        with self._lock:
+            known = self._write_speeds.get(directory)
+        if known is not None:
+            return known
+        try:
+            speed = measure_write_speed(directory)
+        except OSError as exc:
+            raise BufferStorageError(
+                f"The replay buffer cannot write to {directory}: {exc}"
+            ) from exc
+        logger.info("%s writes at %s", directory, _format_rate(speed))
+        with self._lock:
+            self._write_speeds[directory] = speed
+        return speed
+
+
+__all__ = [
+    "MIN_WINDOW_SECONDS",
+    "BufferPlan",
+    "BufferPlanner",
+    "BufferStorageError",
+    "CaptureProfile",
+    "estimate_bitrate",
+    "measure_write_speed",
+    "ram_disk_roots",
+]
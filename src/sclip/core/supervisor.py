@@ -0,0 +1,277 @@
+"""Notice when a long-running FFmpeg dies, and say why.
+
+A capture is checked for an early exit once, in the few hundred milliseconds
+after it starts. After that nothing looked at it again. An FFmpeg that died
+twenty minutes in - a GPU driver reset that takes Desktop Duplication with it,
+a headset unplugged from under dshow, a disk that filled up - went unnoticed
+until the user pressed the clip hotkey and got an error, or worse, a clip of
+whatever was on screen before it died.
+
+:class:`ProcessSupervisor` closes that gap. One daemon thread polls every
+process handed to :meth:`~ProcessSupervisor.watch`, so the cost is the same
+for one child as for several, and each watched process has its stderr drained
+by a :class:`~sclip.core.ffmpeg.StderrPump`. The drain is what makes the
+report worth having: by the time a crash is noticed, the pipe has been emptied
+continuously and the last lines FFmpeg wrote are still in memory, where
+:func:`~sclip.core.ffmpeg.read_stderr_tail` would have found a pipe it could
+only read once, after the fact.
+
+Those last lines are sorted into an :class:`ExitReason`, because what to do
+next depends on it. A lost GPU device is worth restarting - the driver comes
+back. A full disk is not, and saying so is more useful than retrying into it.
+
+The supervisor reports; it does not restart. Restarting is the owner's call,
+since only the owner knows how to rebuild the command line (a fresh audio
+pipe, perhaps a different capture backend) and when to give up.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum
+
+from sclip.core.ffmpeg import StderrCounters, StderrPump
+
+logger = logging.getLogger(__name__)
+
+
+# How often the supervisor thread looks at its processes. Death is noticed
+# within this long, which is well inside a segment's length, while the poll
+# itself is a non-blocking ``waitpid`` that costs nothing measurable.
+_POLL_INTERVAL: float = 0.25
+
+# Lines of stderr searched for the reason a process died. The explanation is
+# almost always among the last few; this is generous.
+_CLASSIFY_LINES: int = 50
+
+# How long to wait for a dead process's reader to reach end-of-file before the
+# exit is reported anyway. The pipe's writer is gone, so this is normally
+# immediate; the bound is for a grandchild that inherited the handle.
+_DRAIN_JOIN_TIMEOUT: float = 1.0
+
+# Lines included in an exit report's tail.
+_TAIL_LINES: int = 12
+
+
+class ExitReason(str, Enum):
+    """Why a supervised process ended, as far as its last words tell."""
+
+    # Exited with code 0 without being asked to: the input ran out.
+    ENDED = "ended"
+    # The GPU or the desktop went away under the capture - a driver reset, a
+    # mode change, the secure desktop. Usually recoverable by starting again.
+    DEVICE_LOST = "device_lost"
+    # An audio device or the desktop-audio pipe stopped delivering.
+    INPUT_LOST = "input_lost"
+    # Nowhere left to write. Restarting will not help.
+    DISK_FULL = "disk_full"
+    # Anything else.
+    CRASHED = "crashed"
+
+    @property
+    def is_recoverable(self) -> bool:
+        """Whether starting the process again stands a chance of working."""
+        return self is not ExitReason.DISK_FULL
+
+
+# Substrings, lower-cased, that identify each reason in FFmpeg's stderr. Tried
+# in order; the first match wins, so the most specific reasons come first.
+_REASON_MARKERS: tuple[tuple[ExitReason, tuple[str, ...]], ...] = (
+    (
+        ExitReason.DISK_FULL,
+        ("no space left on device", "not enough space on the disk", "disk quota exceeded"),
+    ),
+    (
+        ExitReason.DEVICE_LOST,
+        (
+            "dxgi_error_device_removed",
+            "dxgi_error_device_reset",
+            "dxgi_error_access_lost",
+            "device removed",
+            "device lost",
+        ),
+    ),
+    (
+        ExitReason.INPUT_LOST,
+        (
+            "could not run graph",
+            "device disconnected",
+            "i/o error",
+            "broken pipe",
+            "error during demuxing",
+        ),
+    ),
+)
+
+
+def classify_exit(returncode: int, stderr_lines: list[str]) -> ExitReason:
+    """Sort an unexpected exit into an :class:`ExitReason`.
+
+    The stderr is searched newest line first, since the line that explains a
+    death is almost always one of the last.
+    """
+    text = "\n".join(reversed(stderr_lines)).lower()
+    for reason, markers in _REASON_MARKERS:
+        if any(marker in text for marker in markers):
+            return reason
+    if returncode == 0:
+        return ExitReason.ENDED
+    return ExitReason.CRASHED
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessExit:
+    """What the supervisor knows about a process that ended on its own."""
+
+    label: str
+    returncode: int
+    reason: ExitReason
+    uptime_seconds: float
+    stderr_tail: tuple[str, ...] = ()
+    counters: StderrCounters = field(default_factory=StderrCounters)
+
+    def describe(self) -> str:
+        """One line fit for a log or an error message."""
+        last = self.stderr_tail[-1] if self.stderr_tail else "no output"
+        return (
+            f"{self.label} FFmpeg stopped after {self.uptime_seconds:.0f}s "
+            f"({self.reason.value}, code {self.returncode}): {last}"
+        )
+
+
+ExitCallback = Callable[[ProcessExit], None]
+
+
+@dataclass(slots=True)
+class _Watched:
+    """One supervised process and the pump draining its stderr."""
+
+    process: subprocess.Popen[str]
+    label: str
+    on_exit: ExitCallback
+    pump: StderrPump
+    started: float
+
+
+class ProcessSupervisor:
+    """Watches long-lived FFmpeg processes and reports the ones that die.
+
+    Thread safety: every method may be called from any thread. ``on_exit``
+    callbacks run on the supervisor thread, outside its lock, one at a time;
+    a callback that blocks holds up reports for the other processes, so an
+    owner with slow work to do in response should hand it to a thread.
+    """
+
+    def __init__(self, *, poll_interval: float = _POLL_INTERVAL) -> None:
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._watched: dict[int, _Watched] = {}
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+
+    def watch(self, process: subprocess.Popen[str], label: str, on_exit: ExitCallback) -> None:
+        """Start supervising ``process``, reporting its death to ``on_exit``.
+
+        From here on the supervisor owns the process's stderr: it is read
+        continuously, and :func:`~sclip.core.ffmpeg.read_stderr_tail` must not
+        be used on it. Call after any startup check that reads stderr itself.
+        """
+        pump = StderrPump(process, name=label.lower().replace(" ", "-"))
+        pump.start()
+        watched = _Watched(process, label, on_exit, pump, time.monotonic())
+        with self._lock:
+            self._watched[id(process)] = watched
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sclip-supervisor", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def unwatch(self, process: subprocess.Popen[str]) -> StderrCounters | None:
+        """Stop supervising ``process``; its exit will not be reported.
+
+        Call before stopping a process deliberately. The stderr pump keeps
+        draining until the pipe closes, so FFmpeg cannot block on a full pipe
+        while it shuts down. Returns what the pump counted, or ``None`` if the
+        process was not being watched.
+        """
+        with self._lock:
+            watched = self._watched.pop(id(process), None)
+        return None if watched is None else watched.pump.counters
+
+    def is_watching(self, process: subprocess.Popen[str]) -> bool:
+        with self._lock:
+            return id(process) in self._watched
+
+    def stderr_tail(self, process: subprocess.Popen[str], lines: int = _TAIL_LINES) -> list[str]:
+        """The last ``lines`` lines a watched process wrote to stderr."""
+        with self._lock:
+            watched = self._watched.get(id(process))
+        if watched is None:
+            return []
+        return watched.pump.tail(lines)
+
+    def counters(self, process: subprocess.Popen[str]) -> StderrCounters | None:
+        """What the pump has counted so far for a watched process."""
+        with self._lock:
+            watched = self._watched.get(id(process))
+        return None if watched is None else watched.pump.counters
+
+    # --- internals -------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._poll_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._watched:
+                    # Nothing to do. A later watch() starts a fresh thread.
+                    self._thread = None
+                    return
+                dead = [w for w in self._watched.values() if w.process.poll() is not None]
+                for watched in dead:
+                    del self._watched[id(watched.process)]
+            for watched in dead:
+                self._report(watched)
+
+    def _report(self, watched: _Watched) -> None:
+        watched.pump.join(timeout=_DRAIN_JOIN_TIMEOUT)
+        returncode = watched.process.returncode
+        lines = watched.pump.tail(_CLASSIFY_LINES)
+        exit_info = ProcessExit(
+            label=watched.label,
+            returncode=returncode,
+            reason=classify_exit(returncode, lines),
+            uptime_seconds=time.monotonic() - watched.started,
+            stderr_tail=tuple(lines[-_TAIL_LINES:]),
+            counters=watched.pump.counters,
+        )
+        logger.warning("%s", exit_info.describe())
+        try:
+            watched.on_exit(exit_info)
+        except Exception:
+            logger.exception("Exit handler for %s FFmpeg failed", watched.label)
+
+
+_SUPERVISOR = ProcessSupervisor()
+
+
+def default_supervisor() -> ProcessSupervisor:
+    """The supervisor shared by every capture in this process."""
+    return _SUPERVISOR
+
+
+__all__ = [
+    "ExitCallback",
+    "ExitReason",
+    "ProcessExit",
+    "ProcessSupervisor",
+    "classify_exit",
+    "default_supervisor",
+]
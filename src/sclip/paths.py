@@ -29,8 +29,11 @@ class AppPaths:
     config_dir: Path
     settings_file: Path
     update_state_file: Path
+    capabilities_file: Path  # what each FFmpeg binary can do; see core.capabilities
+    devices_file: Path  # the audio devices the last launch found; see core.devices
     clips_dir: Path
     replay_buffer_dir: Path
+    recordings_dir: Path  # manual recordings in progress, as segments
     log_file: Path
 
     def ensure_writable(self) -> None:
@@ -43,6 +46,7 @@ class AppPaths:
             self.config_dir,
             self.clips_dir,
             self.replay_buffer_dir,
+            self.recordings_dir,
             self.log_file.parent,
         ):
             path.mkdir(parents=True, exist_ok=True)
@@ -65,7 +69,10 @@ def app_paths() -> AppPaths:
         config_dir=config_dir,
         settings_file=config_dir / "settings.json",
         update_state_file=config_dir / "update-check.json",
+        capabilities_file=config_dir / "ffmpeg-capabilities.json",
+        devices_file=config_dir / "devices.json",
         clips_dir=data_dir / "clips",
         replay_buffer_dir=data_dir / "replay_buffer",
+        recordings_dir=data_dir / "recordings",
         log_file=data_dir / "logs" / "sclip.log",
     )
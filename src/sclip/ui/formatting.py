@@ -7,6 +7,8 @@ them cheap to test.
 
 from __future__ import annotations
 
+import math
+
 
 def format_bytes(num_bytes: int) -> str:
     """Render a byte count in a friendly unit, e.g. ``"1.2 MB"``.
@@ -44,4 +46,19 @@ def format_bitrate(bits_per_second: float) -> str:
     return f"{value:.1f} Gb/s"
 
 
-__all__ = ["format_bitrate", "format_bytes"]
+def format_time_left(seconds: float) -> str:
+    """Render an estimate of time remaining, e.g. ``"about 2 min left"``.
+
+    Rounded up, and to whole minutes past one: an estimate quoted to the
+    second promises a precision it does not have, and one that runs out
+    before the work does reads as broken. Nothing left renders as
+    ``"almost done"`` rather than a zero the work may still overrun.
+    """
+    if seconds <= 0:
+        return "almost done"
+    if seconds < 60:
+        return f"about {math.ceil(seconds / 5) * 5} s left"
+    return f"about {math.ceil(seconds / 60)} min left"
+
+
+__all__ = ["format_bitrate", "format_bytes", "format_time_left"]
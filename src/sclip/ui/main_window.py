@@ -14,13 +14,17 @@ during pytest-qt tests, and it keeps the dependency direction explicit:
 
 from __future__ import annotations
 
+import functools
 import logging
+import sys
+import threading
 from typing import TYPE_CHECKING
 
-from PySide6.QtCore import QEvent, QSize, Qt, Signal, Slot
-from PySide6.QtGui import QAction, QCloseEvent, QIcon
+from PySide6.QtCore import QByteArray, QEvent, QSize, Qt, Signal, Slot
+from PySide6.QtGui import QAction, QCloseEvent, QGuiApplication, QIcon
 from PySide6.QtWidgets import (
     QHBoxLayout,
+    QLabel,
     QMainWindow,
     QMenu,
     QMessageBox,
@@ -34,10 +38,12 @@ from PySide6.QtWidgets import (
 from sclip.contracts import CaptureEngine, DeviceRegistry, Hotkey, Settings, SettingsStore
 from sclip.paths import app_paths
 from sclip.ui.fonts import install_application_fonts
-from sclip.ui.theme import load_stylesheet
+from sclip.ui.theme import SPACING_MD, SPACING_SM, load_stylesheet
 from sclip.version import __version__
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from sclip.hotkeys import HotkeyListener
     from sclip.ui.pages import CapturePage, SettingsPage
 
@@ -53,6 +59,12 @@ _PAGE_LIBRARY: int = 1
 _PAGE_SETTINGS: int = 2
 _PAGE_ABOUT: int = 3
 
+# WM_DEVICECHANGE with DBT_DEVNODES_CHANGED is how Windows tells every
+# top-level window that a device was added or removed somewhere. It does not
+# say which, and one USB headset sends several; the registry copes with both.
+_WM_DEVICECHANGE: int = 0x0219
+_DBT_DEVNODES_CHANGED: int = 0x0007
+
 
 class MainWindow(QMainWindow):
     """The S-Clip main window.
@@ -68,6 +80,8 @@ class MainWindow(QMainWindow):
     # ``Slot`` on this object marshals execution onto the GUI thread via Qt's
     # queued connection machinery -- safer than ``QMetaObject.invokeMethod``.
     _hotkey_clip_requested = Signal()
+    # Carries the length in seconds of a clip bound in Settings.clip_bindings.
+    _hotkey_clip_length_requested = Signal(int)
     _hotkey_record_requested = Signal()
 
     # Signals fired from the capture engine's listener callbacks, which run on
@@ -77,6 +91,10 @@ class MainWindow(QMainWindow):
     _engine_clip_saved = Signal(object)
     _engine_error = Signal(str)
 
+    # Carries the first-run recommendation (a Settings, or None when detection
+    # failed) from its worker thread, bridged the same way.
+    _first_run_tuned = Signal(object)
+
     def __init__(
         self,
         engine: CaptureEngine,
@@ -105,6 +123,10 @@ class MainWindow(QMainWindow):
         # Quit-from-tray flag: ``closeEvent`` normally minimises to tray, but
         # the tray menu's Quit action sets this so we really close.
         self._force_quit: bool = False
+        # True while a first-run recommendation is being worked out. A save by
+        # the user clears it, so the recommendation cannot overwrite their
+        # choices when it lands.
+        self._tuning: bool = False
 
         self.setWindowTitle("S-Clip")
         # Frameless: S-Clip paints its own title bar (see TitleBar) so the
@@ -129,6 +151,7 @@ class MainWindow(QMainWindow):
 
         self._connect_hotkey_signals()
         self._connect_engine_signals()
+        self._watch_for_hardware()
         self._start_update_check()
         self._register_settings_hotkeys(self._current_settings)
 
@@ -180,7 +203,7 @@ class MainWindow(QMainWindow):
 
         saved = getattr(self._settings_page, "settings_saved", None)
         if saved is not None:
-            saved.connect(self._apply_settings)
+            saved.connect(self._on_settings_saved)
 
     def _safe_make_page(self, name: str, factory: object) -> QWidget:
         """Try to build a page; on failure log and return a placeholder.
@@ -230,6 +253,22 @@ class MainWindow(QMainWindow):
         self._update_banner = UpdateBanner(central)
         outer.addWidget(self._update_banner)
 
+        # -- First-run tuning notice ------------------------------------
+        # Shown only while tune_for_this_pc is working, on the first launch.
+        self._tuning_notice = QWidget(central)
+        self._tuning_notice.setObjectName("TuningNotice")
+        self._tuning_notice.setVisible(False)
+        notice_layout = QHBoxLayout(self._tuning_notice)
+        notice_layout.setContentsMargins(SPACING_MD, SPACING_SM, SPACING_SM, SPACING_SM)
+        notice_text = QLabel(
+            "Tuning S-Clip for this PC... Capture works meanwhile, on standard settings.",
+            self._tuning_notice,
+        )
+        notice_text.setObjectName("TuningNoticeText")
+        notice_layout.addWidget(notice_text)
+        notice_layout.addStretch(1)
+        outer.addWidget(self._tuning_notice)
+
         # -- Body: sidebar + pages --------------------------------------
         body = QWidget(central)
         body_layout = QHBoxLayout(body)
@@ -439,6 +478,9 @@ class MainWindow(QMainWindow):
         self._hotkey_clip_requested.connect(
             self._on_clip_requested, Qt.ConnectionType.QueuedConnection
         )
+        self._hotkey_clip_length_requested.connect(
+            self._on_clip_length_requested, Qt.ConnectionType.QueuedConnection
+        )
         self._hotkey_record_requested.connect(
             self._on_record_requested, Qt.ConnectionType.QueuedConnection
         )
@@ -456,9 +498,23 @@ class MainWindow(QMainWindow):
             self._on_engine_clip_saved, Qt.ConnectionType.QueuedConnection
         )
         self._engine_error.connect(self._on_engine_error, Qt.ConnectionType.QueuedConnection)
+        self._first_run_tuned.connect(self._on_first_run_tuned, Qt.ConnectionType.QueuedConnection)
         self._engine.add_clip_listener(self._engine_clip_saved.emit)
         self._engine.add_error_listener(self._engine_error.emit)
 
+    def _watch_for_hardware(self) -> None:
+        """Have the device registry look again whenever hardware comes or goes.
+
+        Qt announces displays itself. Audio endpoints it does not, so on
+        Windows :meth:`nativeEvent` picks out the device-change broadcast.
+        Either way the registry only tells its listeners - the settings page,
+        the engine - if the lists it reports actually changed.
+        """
+        app = QGuiApplication.instance()
+        if isinstance(app, QGuiApplication):
+            app.screenAdded.connect(self._on_hardware_changed)
+            app.screenRemoved.connect(self._on_hardware_changed)
+
     def _register_settings_hotkeys(self, settings: Settings) -> None:
         """Install (or refresh) the global hotkey bindings from ``settings``."""
         # Re-emit the signals from the listener thread; the signal then hops
@@ -471,6 +527,11 @@ class MainWindow(QMainWindow):
             settings.record_hotkey,
             self._hotkey_record_requested.emit,
         )
+        for binding in settings.clip_bindings:
+            self._hotkey_listener.register(
+                binding.hotkey,
+                functools.partial(self._hotkey_clip_length_requested.emit, binding.seconds),
+            )
 
     # -- slots --------------------------------------------------------------
 
@@ -506,6 +567,14 @@ class MainWindow(QMainWindow):
             return
         self._set_current_page(index)
 
+    @Slot(object)
+    def _on_settings_saved(self, settings: Settings) -> None:
+        """Apply a save from the settings page; it outranks first-run tuning."""
+        if self._tuning:
+            logger.info("Settings saved before first-run tuning finished; keeping them")
+            self._tuning = False
+        self._apply_settings(settings)
+
     @Slot(object)
     def _apply_settings(self, settings: Settings) -> None:
         """Re-apply ``settings`` after the user saves them.
@@ -533,6 +602,8 @@ class MainWindow(QMainWindow):
         # firing after a rename.
         self._hotkey_listener.unregister(previous.clip_hotkey)
         self._hotkey_listener.unregister(previous.record_hotkey)
+        for binding in previous.clip_bindings:
+            self._hotkey_listener.unregister(binding.hotkey)
         self._register_settings_hotkeys(current)
 
     def _refresh_tray_labels(self, settings: Settings) -> None:
@@ -579,10 +650,86 @@ class MainWindow(QMainWindow):
         except Exception:
             logger.exception("Capture page failed to refresh from settings")
 
+    def _refresh_settings_page(self, settings: Settings) -> None:
+        """Show ``settings`` on the settings page, if it supports it.
+
+        Guarded with :func:`getattr` for the same reason as
+        :meth:`_refresh_capture_page`.
+        """
+        refresh_hook = getattr(self._settings_page, "refresh_from_settings", None)
+        if refresh_hook is None:
+            return
+        try:
+            refresh_hook(settings)
+        except Exception:
+            logger.exception("Settings page failed to refresh from settings")
+
+    # -- first-run tuning ---------------------------------------------------
+
+    def tune_for_this_pc(self, recommend: Callable[[], Settings | None]) -> None:
+        """Work out first-run settings in the background, then adopt them.
+
+        ``recommend`` probes the hardware and returns the settings to use, or
+        ``None`` if it could not. It runs on a worker thread because probing
+        takes seconds on a bad day, and before this the window did not appear
+        until it was done: a first launch looked like a launch that had hung.
+        Now the window opens at once on the built-in defaults, says what it is
+        doing, and switches to the tuned settings when they arrive - unless the
+        user has saved settings of their own in the meantime, which win.
+
+        Public so :mod:`sclip.app` can start it once the window is showing.
+        """
+        self._tuning = True
+        self._tuning_notice.setVisible(True)
+
+        def work() -> None:
+            try:
+                result = recommend()
+            except Exception:
+                # ``recommend`` is expected to swallow its own failures; this
+                # is the backstop that keeps the notice from staying up forever.
+                logger.exception("First-run tuning failed unexpectedly")
+                result = None
+            self._first_run_tuned.emit(result)
+
+        threading.Thread(target=work, name="sclip-first-run-tuning", daemon=True).start()
+
+    @Slot(object)
+    def _on_first_run_tuned(self, result: object) -> None:
+        """Save and apply the first-run recommendation, if it still applies."""
+        self._tuning_notice.setVisible(False)
+        if not self._tuning:
+            return
+        self._tuning = False
+        if not isinstance(result, Settings):
+            return
+        try:
+            self._settings_store.save(result)
+        except Exception:
+            logger.exception("Could not save the first-run recommendation; using defaults")
+            return
+        self._refresh_settings_page(result)
+        self._apply_settings(result)
+
     # -- action handlers ----------------------------------------------------
 
     @Slot()
+    def _on_hardware_changed(self, *_args: object) -> None:
+        try:
+            self._device_registry.refresh()
+        except Exception:
+            logger.exception("Could not refresh the device lists")
+
     def _on_clip_requested(self) -> None:
+        """Save the whole replay window; the clip hotkey and the tray action."""
+        self._request_clip(None)
+
+    @Slot(int)
+    def _on_clip_length_requested(self, seconds: int) -> None:
+        """Save the newest ``seconds`` of the window, for a clip binding."""
+        self._request_clip(seconds)
+
+    def _request_clip(self, seconds: int | None) -> None:
         """Kick off saving the rolling replay buffer's last N seconds to disk.
 
         The save is asynchronous: :meth:`CaptureEngine.save_replay_clip` no
@@ -598,7 +745,7 @@ class MainWindow(QMainWindow):
             self._show_tray_message("S-Clip", "Replay buffer is not running.")
             return
         try:
-            self._engine.save_replay_clip()
+            self._engine.save_replay_clip(seconds)
         except Exception:
             logger.exception("Saving replay clip failed")
             self._show_tray_message(
@@ -753,6 +900,14 @@ class MainWindow(QMainWindow):
                 title_bar.set_maximised(self.isMaximized())
         super().changeEvent(event)
 
+    def nativeEvent(
+        self, eventType: QByteArray | bytes | bytearray | memoryview, message: int, /
+    ) -> object:
+        """Notice Windows announcing that a device was plugged in or removed."""
+        if _is_device_change(eventType, message):
+            self._on_hardware_changed()
+        return super().nativeEvent(eventType, message)
+
     def closeEvent(self, event: QCloseEvent) -> None:
         """Intercept window close to minimise into the tray.
 
@@ -780,6 +935,21 @@ class MainWindow(QMainWindow):
         self.hide()
 
 
+def _is_device_change(
+    event_type: QByteArray | bytes | bytearray | memoryview, message: int
+) -> bool:
+    """Whether a native event is Windows' "a device came or went" message."""
+    if sys.platform != "win32":
+        return False
+    raw = event_type.data() if isinstance(event_type, QByteArray) else bytes(event_type)
+    if raw != b"windows_generic_MSG":
+        return False
+    from ctypes import wintypes
+
+    msg = wintypes.MSG.from_address(int(message))
+    return msg.message == _WM_DEVICECHANGE and msg.wParam == _DBT_DEVNODES_CHANGED
+
+
 # -- lazy page imports -----------------------------------------------------
 # Lazy because parallel agents may land the page modules after this file is
 # committed. We catch the ImportError at the call site and substitute a
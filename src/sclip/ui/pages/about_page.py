@@ -27,7 +27,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from sclip.core.ffmpeg import find_ffmpeg, run_ffmpeg
+from sclip.core.capabilities import ffmpeg_capabilities
+from sclip.core.ffmpeg import find_ffmpeg
 from sclip.ui.assets.icons import icon
 from sclip.ui.theme import (
     SPACING_LG,
@@ -105,33 +106,34 @@ class _FFmpegProbeSignals(QObject):
 class _FFmpegProbeWorker(QRunnable):
     """Resolve the FFmpeg path and version on a worker thread.
 
-    Both steps can block: ``find_ffmpeg`` walks the filesystem, and probing
-    the version spawns the binary. Doing this work here keeps page
-    construction instant - the GUI thread never waits on a subprocess.
+    Both steps can block: ``find_ffmpeg`` walks the filesystem the first time,
+    and the version comes from the capability manifest, which asks the binary
+    itself whenever FFmpeg has changed since it was last seen. Doing this work
+    here keeps page construction instant - the GUI thread never waits on a
+    subprocess.
     """
 
     def run(self) -> None:  # pragma: no cover - exercised at runtime only
-        path_text = ""
         version_text = ""
 
         # find_ffmpeg raises FFmpegNotFoundError (and potentially other
         # filesystem errors) on a broken install; treat any failure as
         # "not found" so the page still shows a sensible value.
         try:
-            path_text = str(find_ffmpeg())
+            binary = find_ffmpeg()
         except Exception as exc:
             logger.info("Could not resolve FFmpeg: %s", exc)
             self.signals.finished.emit("", "")
             return
+        path_text = str(binary)
 
-        # The version lives on the first line of ``ffmpeg -version``, e.g.
-        # "ffmpeg version 7.1-essentials_build ...". We want just the token
-        # after the word "version".
         try:
-            result = run_ffmpeg(["-version"])
-            version_text = _parse_ffmpeg_version(result.stdout or "")
+            capabilities = ffmpeg_capabilities(binary)
         except Exception as exc:
             logger.warning("FFmpeg version probe failed: %s", exc)
+            capabilities = None
+        if capabilities is not None:
+            version_text = capabilities.version
 
         self.signals.finished.emit(path_text, version_text)
 
@@ -140,20 +142,6 @@ class _FFmpegProbeWorker(QRunnable):
         self.signals = _FFmpegProbeSignals()
 
 
-def _parse_ffmpeg_version(stdout: str) -> str:
-    """Pull the version token out of ``ffmpeg -version`` output.
-
-    Returns an empty string when the output is empty or unexpectedly shaped,
-    so the caller can fall back to a friendly placeholder.
-    """
-    first_line = stdout.strip().splitlines()[0] if stdout.strip() else ""
-    tokens = first_line.split()
-    # Expect "ffmpeg version <token> ..."; the token sits at index 2.
-    if len(tokens) >= 3 and tokens[0] == "ffmpeg" and tokens[1] == "version":
-        return tokens[2]
-    return ""
-
-
 # ---------------------------------------------------------------------------
 # The page
 # ---------------------------------------------------------------------------
@@ -493,6 +493,48 @@ class CapturePage(QWidget):
         self._segments_value = _stat_row(stats, "SEGMENTS", box)
         layout.addLayout(stats)
 
+        # Only a variable-frame-rate buffer has skipped frames to report, so the
+        # row lives in its own widget and is hidden for a constant-rate one.
+        self._skipped_row = QWidget(box)
+        skipped = QVBoxLayout(self._skipped_row)
+        skipped.setContentsMargins(0, 0, 0, 0)
+        self._skipped_value = _stat_row(skipped, "SKIPPED", self._skipped_row)
+        self._skipped_row.setVisible(False)
+        layout.addWidget(self._skipped_row)
+
+        # Dropped frames are a problem worth showing only when there are some.
+        self._dropped_row = QWidget(box)
+        dropped = QVBoxLayout(self._dropped_row)
+        dropped.setContentsMargins(0, 0, 0, 0)
+        self._dropped_value = _stat_row(dropped, "DROPPED", self._dropped_row)
+        self._dropped_row.setVisible(False)
+        layout.addWidget(self._dropped_row)
+
+        # Likewise only an HEVC or AV1 buffer has a saving over H.264 to show.
+        self._saving_row = QWidget(box)
+        saving = QVBoxLayout(self._saving_row)
+        saving.setContentsMargins(0, 0, 0, 0)
+        self._saving_value = _stat_row(saving, "VS H.264", self._saving_row)
+        self._saving_row.setVisible(False)
+        layout.addWidget(self._saving_row)
+
+        # The archive tier only exists when extended history is switched on.
+        self._archive_row = QWidget(box)
+        archive = QVBoxLayout(self._archive_row)
+        archive.setContentsMargins(0, 0, 0, 0)
+        self._archive_value = _stat_row(archive, "ARCHIVE", self._archive_row)
+        self._archive_row.setVisible(False)
+        layout.addWidget(self._archive_row)
+
+        # Arming had to compromise - a shortened window, or a slow drive.
+        self._storage_row = QWidget(box)
+        storage = QVBoxLayout(self._storage_row)
+        storage.setContentsMargins(0, 0, 0, 0)
+        self._storage_value = _stat_row(storage, "STORAGE", self._storage_row)
+        self._storage_value.setWordWrap(True)
+        self._storage_row.setVisible(False)
+        layout.addWidget(self._storage_row)
+
         box.setVisible(False)
         self._telemetry_box = box
         return box
@@ -744,6 +786,22 @@ class CapturePage(QWidget):
         self._disk_value.setText(format_bytes(telemetry.bytes_on_disk))
         self._bitrate_value.setText(format_bitrate(telemetry.bitrate_bps))
         self._segments_value.setText(f"{telemetry.segment_count} / {telemetry.segment_capacity}")
+        self._skipped_row.setVisible(telemetry.frames_encoded > 0)
+        self._skipped_value.setText(
+            f"{telemetry.frames_skipped:,} frames ({telemetry.skipped_fraction:.0%})"
+        )
+        self._dropped_row.setVisible(telemetry.frames_dropped > 0)
+        self._dropped_value.setText(f"{telemetry.frames_dropped:,} frames")
+        self._saving_row.setVisible(telemetry.video_family != "h264")
+        self._saving_value.setText(f"~{format_bytes(telemetry.bytes_saved_vs_h264)} saved")
+        self._archive_row.setVisible(telemetry.archive_window_seconds > 0)
+        self._archive_value.setText(
+            f"{int(telemetry.archived_seconds // 60)} of "
+            f"{telemetry.archive_window_seconds // 60} min, "
+            f"{format_bytes(telemetry.archived_bytes)}"
+        )
+        self._storage_row.setVisible(bool(telemetry.storage_note))
+        self._storage_value.setText(telemetry.storage_note)
 
     def _render_state(self, state: CaptureState) -> None:
         """Turn an engine state into pixels - orb, pill, copy and buttons.
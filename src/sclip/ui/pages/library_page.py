@@ -65,11 +65,11 @@ from sclip.ui.widgets import IconButton
 # FFmpeg discovery is best-effort -- the library still lists clips without it,
 # we just fall back to a "No preview" placeholder for the thumbnails.
 try:  # pragma: no cover - exercised only when FFmpeg cannot be imported
-    from sclip.core.ffmpeg import ffprobe_path, find_ffmpeg, popen_kwargs
+    from sclip.core.ffmpeg import JobClass, ffprobe_path, find_ffmpeg, run_at_priority
 except ImportError:  # pragma: no cover
     find_ffmpeg = None  # type: ignore[assignment]
     ffprobe_path = None  # type: ignore[assignment]
-    popen_kwargs = None  # type: ignore[assignment]
+    run_at_priority = None  # type: ignore[assignment]
 
 
 logger = logging.getLogger(__name__)
@@ -187,17 +187,9 @@ class _ThumbnailWorker(QRunnable):
             str(self._thumb),
         ]
         try:
-            kwargs = popen_kwargs() if popen_kwargs is not None else {}
-            result = subprocess.run(
-                argv,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                timeout=20.0,
-                check=False,
-                **kwargs,
-            )
+            if run_at_priority is None:
+                raise OSError("FFmpeg support is unavailable")
+            result = run_at_priority(argv, job=JobClass.BACKGROUND, timeout=20.0)
         except (OSError, subprocess.TimeoutExpired) as exc:
             logger.warning("Thumbnail generation failed for %s: %s", self._clip, exc)
             self.signals.failed.emit(str(self._clip))
@@ -286,17 +278,9 @@ class _DurationWorker(QRunnable):
     def _run(self, argv: list[str], *, timeout: float) -> str | None:
         """Run a probe command, returning combined output or ``None`` on error."""
         try:
-            kwargs = popen_kwargs() if popen_kwargs is not None else {}
-            result = subprocess.run(
-                argv,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                timeout=timeout,
-                check=False,
-                **kwargs,
-            )
+            if run_at_priority is None:
+                raise OSError("FFmpeg support is unavailable")
+            result = run_at_priority(argv, job=JobClass.BACKGROUND, timeout=timeout)
         except (OSError, subprocess.TimeoutExpired) as exc:
             logger.debug("Duration probe failed for %s: %s", self._clip, exc)
             return None
@@ -32,6 +32,7 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
 from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
@@ -55,16 +56,23 @@ from PySide6.QtWidgets import (
 
 from sclip.contracts import (
     ENCODERS,
+    MAX_CLIP_BINDINGS,
+    SCALERS,
+    ClipBinding,
     DeviceRegistry,
     Hotkey,
     Settings,
     SettingsStore,
     encoder_by_codec,
+    encoder_family,
     encoder_label,
 )
-from sclip.core.benchmark import EncoderTrial
+from sclip.core.benchmark import BenchmarkProgress, EncoderTrial
+from sclip.core.ffmpeg import JobCancelledError
 from sclip.core.hardware import Recommendation, assess_settings, recommend_measured
+from sclip.core.region import parse_region, resolve_capture_region
 from sclip.paths import app_paths
+from sclip.ui.formatting import format_time_left
 from sclip.ui.theme import SPACING_LG, SPACING_MD, SPACING_SM, SPACING_XL, SPACING_XS
 from sclip.ui.widgets import Card, HotkeyEdit, IconButton, SegmentedControl
 
@@ -78,19 +86,48 @@ def _verdict_text(trial: EncoderTrial) -> str:
             f"{trial.encoder} does not run on this PC. Pick another encoder, or use Automatic mode."
         )
     if trial.sustains_capture:
+        picture = ""
+        if trial.ssim is not None:
+            picture = (
+                f" The picture scores SSIM {trial.ssim:.3f} at "
+                f"{trial.bitrate_bps / 1_000_000:.1f} Mb/s."
+            )
         return (
             f"Comfortable: {trial.encoder} {trial.preset} encodes "
             f"{trial.achieved_fps:.0f} fps at {trial.width}x{trial.height}, "
             f"{trial.headroom:.1f} times faster than the {trial.fps} fps you asked for."
+            f"{picture}{_usage_text(trial)}{_pipeline_text(trial)}"
         )
     # Naming the shortfall in frames-per-second is more use than a ratio,
     # because it is the same unit as the setting the user would change.
     return (
         f"Too slow: {trial.encoder} {trial.preset} manages only "
-        f"{trial.achieved_fps:.0f} fps at {trial.width}x{trial.height}. Capturing "
-        f"{trial.fps} fps needs more room than that once the game is running too, "
-        "so clips will stutter. Try a faster preset, a hardware encoder, or a "
-        "lower resolution."
+        f"{trial.achieved_fps:.0f} fps at {trial.width}x{trial.height}."
+        f"{_usage_text(trial)}{_pipeline_text(trial)} Capturing {trial.fps} fps needs "
+        "more room than that once the game is running too, so clips will stutter. Try a "
+        "faster preset, a hardware encoder, or a lower resolution."
+    )
+
+
+def _usage_text(trial: EncoderTrial) -> str:
+    """What the encode cost the machine, as a sentence; empty if it was not measured."""
+    if trial.usage is None or trial.cores_used <= 0:
+        return ""
+    return (
+        f" It kept {trial.cores_used:.1f} cores busy and peaked at "
+        f"{trial.usage.peak_rss_bytes / 1_048_576:.0f} MB of memory."
+    )
+
+
+def _pipeline_text(trial: EncoderTrial) -> str:
+    """What the whole capture was measured to cost, as a sentence; empty if it was not."""
+    pipeline = trial.pipeline
+    if pipeline is None or not pipeline.available:
+        return ""
+    dropped = f", dropping {pipeline.frames_dropped} frames" if pipeline.frames_dropped else ""
+    return (
+        f" The whole capture, audio and disk included, ran {pipeline.speed:.1f} times "
+        f"faster than real time and needs {pipeline.cores_at_real_time:.1f} cores{dropped}."
     )
 
 
@@ -104,6 +141,14 @@ class _HardwareSignals(QObject):
 
     # Emits the worker's return value, or ``None`` if it raised.
     finished = Signal(object)
+    # Emits a BenchmarkProgress for each trial as it completes.
+    progressed = Signal(object)
+    # Emitted instead of ``finished`` when the user stopped the work.
+    cancelled = Signal()
+
+
+# What a worker runs: handed the progress callback and the cancel event.
+_HardwareWork = Callable[[Callable[[BenchmarkProgress], None], threading.Event], object]
 
 
 class _HardwareWorker(QRunnable):
@@ -114,16 +159,24 @@ class _HardwareWorker(QRunnable):
     from ``medium`` downwards, so this can run for tens of seconds. Doing that
     on the GUI thread would freeze the window mid-measurement, and a frozen
     window during a benchmark looks exactly like a crash.
+
+    Each trial is passed back as it completes, through ``progressed``, and
+    setting :attr:`cancel` stops the work at the FFmpeg it is running. The
+    signals object lives on the GUI thread, so both arrive there queued.
     """
 
-    def __init__(self, work: Callable[[], object]) -> None:
+    def __init__(self, work: _HardwareWork) -> None:
         super().__init__()
         self._work = work
         self.signals = _HardwareSignals()
+        self.cancel = threading.Event()
 
     def run(self) -> None:  # pragma: no cover - exercised at runtime only
         try:
-            result = self._work()
+            result = self._work(self.signals.progressed.emit, self.cancel)
+        except JobCancelledError:
+            self.signals.cancelled.emit()
+            return
         except Exception:
             # Hardware probing touches FFmpeg and the device layer, so it has
             # plenty of ways to fail. None of them should take the settings
@@ -134,6 +187,102 @@ class _HardwareWorker(QRunnable):
         self.signals.finished.emit(result)
 
 
+class _TrialTable(QWidget):
+    """The trials of a benchmark in progress, one row each, with a way to stop it.
+
+    Rows are added as trials complete, so a long search shows what it has
+    found so far rather than a bare "Measuring...". The table outlives the
+    run: once the verdict is in, the rows are the evidence for it. The page
+    keeps one in each card that can start a benchmark, as it does verdicts.
+    """
+
+    _HEADERS: tuple[str, ...] = ("Encoder", "Preset", "Scene", "Speed", "Cores", "")
+
+    def __init__(self, on_cancel: Callable[[], None], parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(SPACING_SM)
+
+        self._grid = QGridLayout()
+        self._grid.setContentsMargins(0, 0, 0, 0)
+        self._grid.setHorizontalSpacing(SPACING_MD)
+        self._grid.setVerticalSpacing(SPACING_XS)
+        for column, header in enumerate(self._HEADERS):
+            label = QLabel(header, self)
+            label.setProperty("role", "label")
+            self._grid.addWidget(label, 0, column)
+        layout.addLayout(self._grid)
+        self._rows: list[list[QLabel]] = []
+
+        footer = QHBoxLayout()
+        footer.setContentsMargins(0, 0, 0, 0)
+        self._status = QLabel("", self)
+        self._status.setObjectName("FieldHint")
+        footer.addWidget(self._status)
+        footer.addStretch(1)
+        self._cancel_button = IconButton(text="Stop", role="ghost", parent=self)
+        self._cancel_button.clicked.connect(on_cancel)
+        footer.addWidget(self._cancel_button)
+        layout.addLayout(footer)
+        self.setVisible(False)
+
+    def start(self) -> None:
+        """Empty the table and show it, ready for a run."""
+        for row in self._rows:
+            for label in row:
+                self._grid.removeWidget(label)
+                label.deleteLater()
+        self._rows = []
+        self._status.setText("Starting...")
+        self._cancel_button.setEnabled(True)
+        self._cancel_button.setVisible(True)
+        self.setVisible(True)
+
+    def add(self, progress: BenchmarkProgress) -> None:
+        """Add the trial just finished and re-estimate the time left."""
+        trial = progress.trial
+        scene = trial.scene or "-"
+        if not trial.available:
+            cells = (trial.encoder, trial.preset, scene, "-", "-", "does not run")
+        else:
+            cells = (
+                trial.encoder,
+                trial.preset,
+                scene,
+                f"{trial.achieved_fps:.0f} fps",
+                f"{trial.cores_used:.1f}" if trial.cores_used > 0 else "-",
+                "keeps up" if trial.sustains_capture else "too slow",
+            )
+        row: list[QLabel] = []
+        for column, text in enumerate(cells):
+            label = QLabel(text, self)
+            label.setProperty("role", "value")
+            # Row 0 is the headers.
+            self._grid.addWidget(label, len(self._rows) + 1, column)
+            row.append(label)
+        self._rows.append(row)
+        self._status.setText(
+            f"{progress.completed} of up to {progress.planned} trials, "
+            f"{format_time_left(progress.eta_seconds)}"
+        )
+
+    def stopping(self) -> None:
+        """Acknowledge a stop before the FFmpeg it kills has gone."""
+        self._status.setText("Stopping...")
+        self._cancel_button.setEnabled(False)
+
+    def finish(self) -> None:
+        """The run is over: keep the rows, drop the controls. Hidden if it found nothing."""
+        self._status.setText("")
+        self._cancel_button.setVisible(False)
+        self.setVisible(bool(self._rows))
+
+    def rows(self) -> list[list[str]]:
+        """The text of every trial row, top to bottom."""
+        return [[label.text() for label in row] for row in self._rows]
+
+
 # Width / height as ``WIDTHxHEIGHT`` - tolerant of stray spaces and the
 # typographic multiplication sign so a paste from anywhere still validates.
 _RESOLUTION_PATTERN = re.compile(r"^\s*(\d{2,5})\s*[xX\xd7]\s*(\d{2,5})\s*$")
@@ -154,6 +303,10 @@ _NUMERIC_INPUT_WIDTH: int = 150
 # The label column is fixed-width so labels and inputs line up across cards.
 _LABEL_COLUMN_WIDTH: int = 150
 
+# Lengths the short-clip slots start at before the user binds them, one per
+# slot up to MAX_CLIP_BINDINGS: a moment, a play, a round.
+_SHORT_CLIP_DEFAULT_SECONDS: tuple[int, ...] = (10, 30, 60)
+
 # The two mode indices on the segmented control. Naming them keeps the
 # index/auto_configure mapping legible everywhere it is read.
 _MODE_AUTOMATIC: int = 0
@@ -181,15 +334,20 @@ class _ErrorLabels:
     """Bundle the small inline error labels so we can clear them in one go."""
 
     resolution: QLabel
+    capture_region: QLabel
     output_dir: QLabel
     clip_hotkey: QLabel
     record_hotkey: QLabel
+    clip_bindings: QLabel
 
 
 class SettingsPage(QWidget):
     """User-editable settings, persisted via :class:`SettingsStore`."""
 
     settings_saved = Signal(object)  # carries the freshly saved Settings
+    # Fired from the device registry's scan thread when a device came or
+    # went; queued onto the GUI thread before the pickers are touched.
+    _devices_changed = Signal()
 
     def __init__(
         self,
@@ -216,6 +374,8 @@ class SettingsPage(QWidget):
         self._pool = QThreadPool(self)
         self._pool.setMaxThreadCount(1)
         self._measuring = False
+        # The run in flight, kept so Stop can reach its cancel event.
+        self._worker: _HardwareWorker | None = None
 
         # Created before the cards that host them: building a card populates
         # its fields, which fires the change handlers, which clear these.
@@ -227,11 +387,19 @@ class SettingsPage(QWidget):
             # to wrap. Without this it lays out as one line and is clipped by
             # the card the moment the window is anything less than wide.
             label.setWordWrap(True)
+        # The live table of trials, one per card like the verdicts above.
+        self._trial_tables = (
+            _TrialTable(self._on_stop_measuring, self),
+            _TrialTable(self._on_stop_measuring, self),
+        )
 
         self._build_ui()
         self._populate_from_settings(self._working)
         self._validate_all()
 
+        self._devices_changed.connect(self._on_devices_changed, Qt.ConnectionType.QueuedConnection)
+        device_registry.add_change_listener(self._devices_changed.emit)
+
     # ---------------------------------------------------- UI assembly
 
     def _build_ui(self) -> None:
@@ -249,9 +417,11 @@ class SettingsPage(QWidget):
         # builder can drop the relevant label straight into its grid.
         self._errors = _ErrorLabels(
             resolution=self._make_error_label(),
+            capture_region=self._make_error_label(),
             output_dir=self._make_error_label(),
             clip_hotkey=self._make_error_label(),
             record_hotkey=self._make_error_label(),
+            clip_bindings=self._make_error_label(),
         )
 
         # -- Scrolling card stack ------------------------------------------
@@ -434,6 +604,7 @@ class SettingsPage(QWidget):
         card.body_layout().addWidget(benchmark_hint)
 
         # Where the measurement result lands. Hidden until there is one.
+        card.body_layout().addWidget(self._trial_tables[0])
         card.body_layout().addWidget(self._recommended_verdict)
 
         # Populate the value labels from the current working copy.
@@ -567,6 +738,9 @@ class SettingsPage(QWidget):
         self._monitor_combo.currentIndexChanged.connect(self._on_monitor_changed)
         self._add_field_row(grid, 7, "Monitor", self._monitor_combo)
 
+        self._build_software_encode_rows(card, grid, first_row=8)
+        self._build_capture_area_rows(card, grid, first_row=12)
+
         # Advanced mode accepts any combination of these fields, including
         # ones this machine cannot sustain. That failure is silent - the clip
         # saves, it just stutters - so there has to be a way to ask.
@@ -575,13 +749,74 @@ class SettingsPage(QWidget):
         check_row = QHBoxLayout()
         check_row.setContentsMargins(0, 0, 0, 0)
         check_row.addWidget(self._check_button)
+        # The same check on a real recording, for footage the generated
+        # scenes do not resemble.
+        self._check_clip_button = IconButton(text="Test on a clip...", role="ghost", parent=card)
+        self._check_clip_button.clicked.connect(self._on_check_setup_on_clip)
+        check_row.addWidget(self._check_clip_button)
         check_row.addStretch(1)
         card.body_layout().addLayout(check_row)
 
+        card.body_layout().addWidget(self._trial_tables[1])
         card.body_layout().addWidget(self._check_verdict)
 
         return card
 
+    def _build_software_encode_rows(self, card: Card, grid: QGridLayout, *, first_row: int) -> None:
+        """Add the fields only a CPU encoder heeds to the video card, from ``first_row`` down."""
+        # Resize algorithm - only consulted when the resolution above is
+        # smaller than the monitor and a CPU encoder does the resizing.
+        self._scaler_combo = QComboBox(card)
+        for scaler in SCALERS:
+            self._scaler_combo.addItem(scaler.replace("_", " "), scaler)
+        self._size_input(self._scaler_combo)
+        self._scaler_combo.currentIndexChanged.connect(self._on_scaler_changed)
+        self._add_field_row(grid, first_row, "Scaling", self._scaler_combo)
+        self._add_spanning_widget(
+            grid,
+            first_row + 1,
+            self._make_hint_label("used when the resolution is below the monitor's; fastest first"),
+        )
+
+        # CPU budget - how much of the machine a software encoder may take.
+        self._cpu_budget_spin = QSpinBox(card)
+        self._cpu_budget_spin.setRange(0, 100)
+        self._cpu_budget_spin.setSingleStep(5)
+        self._cpu_budget_spin.setSuffix(" %")
+        self._cpu_budget_spin.setSpecialValueText("No limit")
+        self._size_numeric_input(self._cpu_budget_spin)
+        self._cpu_budget_spin.valueChanged.connect(self._on_cpu_budget_changed)
+        self._add_field_row(grid, first_row + 2, "Encoder CPU budget", self._cpu_budget_spin)
+        self._add_spanning_widget(
+            grid,
+            first_row + 3,
+            self._make_hint_label("share of the cores a CPU encoder may use; the rest stay free"),
+        )
+
+    def _build_capture_area_rows(self, card: Card, grid: QGridLayout, *, first_row: int) -> None:
+        """Add the capture-area fields to the video card, from ``first_row`` down."""
+        # A fixed crop of the monitor, or a window found by title when the
+        # capture starts. Both blank captures the whole monitor.
+        self._region_edit = QLineEdit(card)
+        self._region_edit.setPlaceholderText("whole monitor, or e.g. 1440x1080+240+0")
+        self._size_input(self._region_edit)
+        self._region_edit.textChanged.connect(self._on_region_changed)
+        self._add_field_row(grid, first_row, "Capture area", self._region_edit)
+        self._add_spanning_widget(grid, first_row + 1, self._errors.capture_region)
+
+        self._window_edit = QLineEdit(card)
+        self._window_edit.setPlaceholderText("part of a window title, e.g. Minecraft")
+        self._size_input(self._window_edit)
+        self._window_edit.textChanged.connect(self._on_window_changed)
+        self._add_field_row(grid, first_row + 2, "Window", self._window_edit)
+        self._add_spanning_widget(
+            grid,
+            first_row + 3,
+            self._make_hint_label(
+                "only that window is recorded, if it is open when capture starts"
+            ),
+        )
+
     def _build_audio_card(self, parent: QWidget) -> Card:
         card = Card("Audio", parent=parent)
         grid = self._make_card_grid(card)
@@ -611,6 +846,30 @@ class SettingsPage(QWidget):
             ),
         )
 
+        # With both sources on, the capture either mixes them live or keeps
+        # them as two tracks for the save to mix; the level only applies to
+        # the latter, so it follows the switch.
+        self._separate_tracks_check = QCheckBox(
+            "Keep microphone and desktop audio as separate tracks", card
+        )
+        self._separate_tracks_check.toggled.connect(self._on_separate_tracks_toggled)
+        self._add_spanning_widget(grid, 4, self._separate_tracks_check)
+
+        self._mic_level_spin = QSpinBox(card)
+        self._mic_level_spin.setRange(0, 200)
+        self._mic_level_spin.setSingleStep(10)
+        self._mic_level_spin.setSuffix(" %")
+        self._size_numeric_input(self._mic_level_spin)
+        self._mic_level_spin.valueChanged.connect(self._on_mic_level_changed)
+        self._add_field_row(grid, 5, "Microphone level", self._mic_level_spin)
+        self._add_spanning_widget(
+            grid,
+            6,
+            self._make_hint_label(
+                "applied when a clip is saved, so it can be changed after the fact"
+            ),
+        )
+
         self._populate_audio_combos()
         return card
 
@@ -629,6 +888,47 @@ class SettingsPage(QWidget):
         self._replay_seconds_spin.valueChanged.connect(self._on_replay_seconds_changed)
         self._add_field_row(grid, 1, "Buffer length", self._replay_seconds_spin)
 
+        self._vfr_check = QCheckBox("Skip repeated frames while the screen is still", card)
+        self._vfr_check.toggled.connect(self._on_vfr_toggled)
+        self._add_spanning_widget(grid, 2, self._vfr_check)
+        self._add_spanning_widget(
+            grid,
+            3,
+            self._make_hint_label(
+                "Lighter on the encoder and the disk during menus and loading screens. "
+                "Saved clips are re-encoded to a steady frame rate, so saving takes longer."
+            ),
+        )
+
+        # Only meaningful for an HEVC or AV1 encoder; see _update_export_enabled.
+        self._h264_export_check = QCheckBox("Also save an H.264 copy of each clip", card)
+        self._h264_export_check.toggled.connect(self._on_h264_export_toggled)
+        self._add_spanning_widget(grid, 4, self._h264_export_check)
+        self._add_spanning_widget(
+            grid,
+            5,
+            self._make_hint_label(
+                "For players and apps that cannot open HEVC or AV1. The copy is made "
+                "in the background after the clip is saved."
+            ),
+        )
+
+        self._archive_minutes_spin = QSpinBox(card)
+        self._archive_minutes_spin.setRange(0, 50)
+        self._archive_minutes_spin.setSuffix(" min")
+        self._archive_minutes_spin.setSpecialValueText("Off")
+        self._size_numeric_input(self._archive_minutes_spin)
+        self._archive_minutes_spin.valueChanged.connect(self._on_archive_minutes_changed)
+        self._add_field_row(grid, 6, "Extended history", self._archive_minutes_spin)
+        self._add_spanning_widget(
+            grid,
+            7,
+            self._make_hint_label(
+                "Keeps older footage behind the buffer at reduced resolution, converted "
+                "in the background. Clips that reach back into it take longer to save."
+            ),
+        )
+
         return card
 
     def _build_hotkeys_card(self, parent: QWidget) -> Card:
@@ -647,6 +947,46 @@ class SettingsPage(QWidget):
         self._add_field_row(grid, 2, "Toggle recording", self._record_hotkey_widget)
         self._add_spanning_widget(grid, 3, self._errors.record_hotkey)
 
+        # Short clips: each slot is a chord plus a length, packed into column 1
+        # like the clips-folder field. A slot with no chord is simply unused.
+        self._binding_hotkeys: list[HotkeyEdit] = []
+        self._binding_seconds: list[QSpinBox] = []
+        for slot in range(MAX_CLIP_BINDINGS):
+            slot_widget = QWidget(card)
+            slot_layout = QHBoxLayout(slot_widget)
+            slot_layout.setContentsMargins(0, 0, 0, 0)
+            slot_layout.setSpacing(SPACING_XS)
+
+            hotkey_edit = HotkeyEdit(parent=slot_widget)
+            hotkey_edit.hotkey_changed.connect(lambda _hotkey: self._on_bindings_changed())
+            slot_layout.addWidget(hotkey_edit, 1)
+
+            seconds_spin = QSpinBox(slot_widget)
+            seconds_spin.setRange(5, 600)
+            seconds_spin.setSuffix(" s")
+            self._size_numeric_input(seconds_spin)
+            seconds_spin.valueChanged.connect(lambda _value: self._on_bindings_changed())
+            slot_layout.addWidget(seconds_spin)
+
+            clear_button = IconButton(text="Clear", role="ghost", parent=slot_widget)
+            clear_button.clicked.connect(lambda _checked=False, s=slot: self._clear_binding(s))
+            slot_layout.addWidget(clear_button)
+
+            self._binding_hotkeys.append(hotkey_edit)
+            self._binding_seconds.append(seconds_spin)
+            self._add_field_row(grid, 4 + slot, f"Short clip {slot + 1}", slot_widget)
+
+        first_free = 4 + MAX_CLIP_BINDINGS
+        self._add_spanning_widget(grid, first_free, self._errors.clip_bindings)
+        self._add_spanning_widget(
+            grid,
+            first_free + 1,
+            self._make_hint_label(
+                "Saves just the last few seconds of the replay buffer. Short clips "
+                "save almost instantly, however long the buffer is."
+            ),
+        )
+
         return card
 
     def _build_storage_card(self, parent: QWidget) -> Card:
@@ -677,6 +1017,59 @@ class SettingsPage(QWidget):
         self._add_field_row(grid, 0, "Clips folder", folder_widget)
         self._add_spanning_widget(grid, 1, self._errors.output_dir)
 
+        self._fragmented_check = QCheckBox("Save clips as fragmented MP4", card)
+        self._fragmented_check.toggled.connect(self._on_fragmented_toggled)
+        self._add_spanning_widget(grid, 2, self._fragmented_check)
+        self._add_spanning_widget(
+            grid,
+            3,
+            self._make_hint_label(
+                "Long clips save faster, with half the writing to disk. "
+                "A few older video editors cannot open them. Recordings are always saved "
+                "this way."
+            ),
+        )
+
+        # Where the replay buffer rolls, laid out like the clips folder above.
+        buffer_widget = QWidget(card)
+        buffer_layout = QHBoxLayout(buffer_widget)
+        buffer_layout.setContentsMargins(0, 0, 0, 0)
+        buffer_layout.setSpacing(SPACING_XS)
+
+        self._buffer_dir_edit = QLineEdit(buffer_widget)
+        self._buffer_dir_edit.setReadOnly(True)
+        self._buffer_dir_edit.setPlaceholderText("(automatic)")
+        self._size_input(self._buffer_dir_edit)
+        buffer_layout.addWidget(self._buffer_dir_edit, 1)
+
+        buffer_change = IconButton(text="Change…", role="ghost", parent=buffer_widget)
+        buffer_change.clicked.connect(self._on_change_buffer_dir)
+        buffer_layout.addWidget(buffer_change)
+
+        buffer_reset = IconButton(text="Automatic", role="ghost", parent=buffer_widget)
+        buffer_reset.clicked.connect(self._on_reset_buffer_dir)
+        buffer_layout.addWidget(buffer_reset)
+
+        self._add_field_row(grid, 4, "Replay buffer folder", buffer_widget)
+
+        self._buffer_budget_spin = QSpinBox(card)
+        self._buffer_budget_spin.setRange(0, 1 << 20)
+        self._buffer_budget_spin.setSingleStep(512)
+        self._buffer_budget_spin.setSuffix(" MB")
+        self._buffer_budget_spin.setSpecialValueText("No limit")
+        self._size_numeric_input(self._buffer_budget_spin)
+        self._buffer_budget_spin.valueChanged.connect(self._on_buffer_budget_changed)
+        self._add_field_row(grid, 5, "Buffer disk budget", self._buffer_budget_spin)
+        self._add_spanning_widget(
+            grid,
+            6,
+            self._make_hint_label(
+                "Automatic keeps the buffer on a RAM disk when one has room, and on this "
+                "PC's main drive otherwise. A window too long for the budget or the free "
+                "space is shortened when the buffer starts."
+            ),
+        )
+
         return card
 
     def _build_updates_card(self, parent: QWidget) -> Card:
@@ -741,6 +1134,19 @@ class SettingsPage(QWidget):
 
         self._mic_combo.blockSignals(False)
 
+    def _on_devices_changed(self) -> None:
+        """Re-list monitors and microphones after a hot-plug, keeping the picks.
+
+        The working values are re-selected rather than the persisted ones, so
+        an unsaved edit survives. A pick whose device just left stays selected
+        (``_set_combo_to_value`` adds it back) - unplugging a headset should
+        not quietly change what the user chose.
+        """
+        self._populate_monitor_combo()
+        self._populate_audio_combos()
+        self._set_combo_to_value(self._monitor_combo, self._working.monitor)
+        self._set_combo_to_value(self._mic_combo, self._working.audio_input or "")
+
     def _populate_preset_combo(self, codec: str) -> None:
         self._preset_combo.blockSignals(True)
         self._preset_combo.clear()
@@ -771,6 +1177,16 @@ class SettingsPage(QWidget):
         self._quality_spin.blockSignals(False)
 
         self._set_combo_to_value(self._monitor_combo, settings.monitor)
+        self._set_combo_to_value(self._scaler_combo, settings.scaler)
+        self._cpu_budget_spin.blockSignals(True)
+        self._cpu_budget_spin.setValue(settings.cpu_budget_percent)
+        self._cpu_budget_spin.blockSignals(False)
+        self._region_edit.blockSignals(True)
+        self._region_edit.setText(settings.capture_region)
+        self._region_edit.blockSignals(False)
+        self._window_edit.blockSignals(True)
+        self._window_edit.setText(settings.capture_window)
+        self._window_edit.blockSignals(False)
 
         # Audio.
         self._capture_audio_check.blockSignals(True)
@@ -781,6 +1197,13 @@ class SettingsPage(QWidget):
         self._capture_desktop_check.setChecked(settings.capture_desktop_audio)
         self._capture_desktop_check.blockSignals(False)
 
+        self._separate_tracks_check.blockSignals(True)
+        self._separate_tracks_check.setChecked(settings.separate_audio_tracks)
+        self._separate_tracks_check.blockSignals(False)
+        self._mic_level_spin.blockSignals(True)
+        self._mic_level_spin.setValue(settings.microphone_level)
+        self._mic_level_spin.blockSignals(False)
+
         self._apply_audio_enabled_state(settings.capture_audio)
 
         # Updates.
@@ -789,23 +1212,58 @@ class SettingsPage(QWidget):
         self._check_updates_check.blockSignals(False)
         self._set_combo_to_value(self._mic_combo, settings.audio_input or "")
 
-        # Replay buffer.
-        self._replay_buffer_check.blockSignals(True)
-        self._replay_buffer_check.setChecked(settings.replay_buffer)
-        self._replay_buffer_check.blockSignals(False)
-        self._replay_seconds_spin.blockSignals(True)
-        self._replay_seconds_spin.setValue(settings.replay_seconds)
-        self._replay_seconds_spin.blockSignals(False)
-        self._replay_seconds_spin.setEnabled(settings.replay_buffer)
+        self._populate_replay_card(settings)
 
         # Hotkeys - set_hotkey does not re-emit, so no signal blocking needed.
         self._clip_hotkey_widget.set_hotkey(settings.clip_hotkey)
         self._record_hotkey_widget.set_hotkey(settings.record_hotkey)
+        for slot, (edit, spin) in enumerate(
+            zip(self._binding_hotkeys, self._binding_seconds, strict=True)
+        ):
+            binding = settings.clip_bindings[slot] if slot < len(settings.clip_bindings) else None
+            edit.set_hotkey(binding.hotkey if binding is not None else None)
+            spin.blockSignals(True)
+            spin.setValue(
+                binding.seconds if binding is not None else _SHORT_CLIP_DEFAULT_SECONDS[slot]
+            )
+            spin.blockSignals(False)
+
+        self._populate_storage_card(settings)
 
-        # Storage.
+    def _populate_storage_card(self, settings: Settings) -> None:
         self._output_dir_edit.blockSignals(True)
         self._output_dir_edit.setText(settings.output_dir or "")
         self._output_dir_edit.blockSignals(False)
+        self._fragmented_check.blockSignals(True)
+        self._fragmented_check.setChecked(settings.fragmented_mp4)
+        self._fragmented_check.blockSignals(False)
+        self._buffer_dir_edit.setText(settings.buffer_dir or "")
+        self._buffer_budget_spin.blockSignals(True)
+        self._buffer_budget_spin.setValue(settings.buffer_budget_mb)
+        self._buffer_budget_spin.blockSignals(False)
+
+    def _populate_replay_card(self, settings: Settings) -> None:
+        self._replay_buffer_check.blockSignals(True)
+        self._replay_buffer_check.setChecked(settings.replay_buffer)
+        self._replay_buffer_check.blockSignals(False)
+        self._replay_seconds_spin.blockSignals(True)
+        self._replay_seconds_spin.setValue(settings.replay_seconds)
+        self._replay_seconds_spin.blockSignals(False)
+        self._replay_seconds_spin.setEnabled(settings.replay_buffer)
+        self._archive_minutes_spin.blockSignals(True)
+        self._archive_minutes_spin.setValue(settings.archive_minutes)
+        self._archive_minutes_spin.blockSignals(False)
+        self._archive_minutes_spin.setEnabled(settings.replay_buffer)
+        self._vfr_check.blockSignals(True)
+        self._vfr_check.setChecked(settings.variable_frame_rate)
+        self._vfr_check.blockSignals(False)
+        self._vfr_check.setEnabled(settings.replay_buffer)
+        self._h264_export_check.blockSignals(True)
+        self._h264_export_check.setChecked(settings.h264_export)
+        self._h264_export_check.blockSignals(False)
+        self._h264_export_check.setEnabled(
+            settings.replay_buffer and encoder_family(settings.encoder) != "h264"
+        )
 
     @staticmethod
     def _set_combo_to_value(combo: QComboBox, value: Any) -> None:
@@ -832,6 +1290,17 @@ class SettingsPage(QWidget):
         self._invalidate_verdict()
         self._update_save_state()
 
+    def _on_region_changed(self, value: str) -> None:
+        self._working.capture_region = value
+        self._validate_capture_region()
+        self._invalidate_verdict()
+        self._update_save_state()
+
+    def _on_window_changed(self, value: str) -> None:
+        self._working.capture_window = value.strip()
+        self._invalidate_verdict()
+        self._update_save_state()
+
     def _on_fps_changed(self, value: int) -> None:
         self._working.fps = int(value)
         self._invalidate_verdict()
@@ -843,6 +1312,7 @@ class SettingsPage(QWidget):
             return
         self._working.encoder = str(codec)
         self._invalidate_verdict()
+        self._update_export_enabled()
         self._populate_preset_combo(self._working.encoder)
         # Pick the first preset on a fresh encoder; the user can change it.
         if self._preset_combo.count() > 0:
@@ -870,6 +1340,20 @@ class SettingsPage(QWidget):
         if data is None:
             return
         self._working.monitor = str(data)
+        self._invalidate_verdict()
+        self._update_save_state()
+
+    def _on_scaler_changed(self, _index: int) -> None:
+        data = self._scaler_combo.currentData()
+        if data is None:
+            return
+        self._working.scaler = str(data)
+        self._invalidate_verdict()
+        self._update_save_state()
+
+    def _on_cpu_budget_changed(self, value: int) -> None:
+        self._working.cpu_budget_percent = int(value)
+        self._invalidate_verdict()
         self._update_save_state()
 
     def _on_check_updates_toggled(self, checked: bool) -> None:
@@ -885,6 +1369,8 @@ class SettingsPage(QWidget):
         """Grey out the per-source audio controls when capture is switched off."""
         self._mic_combo.setEnabled(enabled)
         self._capture_desktop_check.setEnabled(enabled)
+        self._separate_tracks_check.setEnabled(enabled)
+        self._mic_level_spin.setEnabled(enabled and self._separate_tracks_check.isChecked())
 
     def _on_mic_changed(self, _index: int) -> None:
         data = self._mic_combo.currentData()
@@ -895,28 +1381,77 @@ class SettingsPage(QWidget):
         self._working.capture_desktop_audio = bool(checked)
         self._update_save_state()
 
+    def _on_separate_tracks_toggled(self, checked: bool) -> None:
+        self._working.separate_audio_tracks = bool(checked)
+        self._mic_level_spin.setEnabled(checked and self._working.capture_audio)
+        self._update_save_state()
+
+    def _on_mic_level_changed(self, value: int) -> None:
+        self._working.microphone_level = int(value)
+        self._update_save_state()
+
     def _on_replay_buffer_toggled(self, checked: bool) -> None:
         self._working.replay_buffer = bool(checked)
         self._replay_seconds_spin.setEnabled(checked)
+        self._archive_minutes_spin.setEnabled(checked)
+        self._vfr_check.setEnabled(checked)
+        self._update_export_enabled()
         self._update_save_state()
 
     def _on_replay_seconds_changed(self, value: int) -> None:
         self._working.replay_seconds = int(value)
         self._update_save_state()
 
+    def _on_archive_minutes_changed(self, value: int) -> None:
+        self._working.archive_minutes = int(value)
+        self._update_save_state()
+
+    def _on_vfr_toggled(self, checked: bool) -> None:
+        self._working.variable_frame_rate = bool(checked)
+        self._update_save_state()
+
+    def _on_h264_export_toggled(self, checked: bool) -> None:
+        self._working.h264_export = bool(checked)
+        self._update_save_state()
+
+    def _on_fragmented_toggled(self, checked: bool) -> None:
+        self._working.fragmented_mp4 = bool(checked)
+        self._update_save_state()
+
+    def _update_export_enabled(self) -> None:
+        """An H.264 copy of an H.264 clip would be the same clip twice."""
+        self._h264_export_check.setEnabled(
+            self._working.replay_buffer and encoder_family(self._working.encoder) != "h264"
+        )
+
     def _on_clip_hotkey_changed(self, hotkey: Hotkey) -> None:
         self._working.clip_hotkey = hotkey
         self._validate_clip_hotkey()
         # The record hotkey's validity depends on this one (chord-clash check),
         # so re-run it whenever the clip hotkey moves.
         self._validate_record_hotkey()
+        self._validate_clip_bindings()
         self._update_save_state()
 
     def _on_record_hotkey_changed(self, hotkey: Hotkey) -> None:
         self._working.record_hotkey = hotkey
         self._validate_record_hotkey()
+        self._validate_clip_bindings()
+        self._update_save_state()
+
+    def _on_bindings_changed(self) -> None:
+        self._working.clip_bindings = tuple(
+            ClipBinding(hotkey=hotkey, seconds=spin.value())
+            for edit, spin in zip(self._binding_hotkeys, self._binding_seconds, strict=True)
+            if (hotkey := edit.hotkey()) is not None
+        )
+        self._validate_clip_bindings()
         self._update_save_state()
 
+    def _clear_binding(self, slot: int) -> None:
+        self._binding_hotkeys[slot].set_hotkey(None)
+        self._on_bindings_changed()
+
     def _on_change_output_dir(self) -> None:
         start = self._working.output_dir or str(app_paths().clips_dir)
         chosen = QFileDialog.getExistingDirectory(self, "Choose clips folder", start)
@@ -937,6 +1472,24 @@ class SettingsPage(QWidget):
         self._validate_output_dir()
         self._update_save_state()
 
+    def _on_change_buffer_dir(self) -> None:
+        start = self._working.buffer_dir or str(app_paths().replay_buffer_dir)
+        chosen = QFileDialog.getExistingDirectory(self, "Choose replay buffer folder", start)
+        if not chosen:
+            return
+        self._working.buffer_dir = chosen
+        self._buffer_dir_edit.setText(chosen)
+        self._update_save_state()
+
+    def _on_reset_buffer_dir(self) -> None:
+        self._working.buffer_dir = ""
+        self._buffer_dir_edit.clear()
+        self._update_save_state()
+
+    def _on_buffer_budget_changed(self, value: int) -> None:
+        self._working.buffer_budget_mb = int(value)
+        self._update_save_state()
+
     # ---------------------------------------------------- Mode handling
 
     def _on_mode_changed(self, index: int) -> None:
@@ -995,9 +1548,12 @@ class SettingsPage(QWidget):
         base = self._working.copy()
         registry = self._device_registry
         self._begin_measuring("Measuring your hardware...")
-        worker = _HardwareWorker(lambda: recommend_measured(base, registry))
-        worker.signals.finished.connect(self._on_hardware_measured)
-        self._pool.start(worker)
+        self._start_worker(
+            lambda on_trial, cancel: recommend_measured(
+                base, registry, on_trial=on_trial, cancel=cancel
+            ),
+            self._on_hardware_measured,
+        )
 
     def _on_hardware_measured(self, recommendation: object) -> None:
         """Adopt a freshly measured configuration, or leave the form alone."""
@@ -1036,14 +1592,73 @@ class SettingsPage(QWidget):
         stutters, because frames that missed their deadline were replaced by
         repeats. This puts a number on it before that happens.
         """
+        self._check_setup(None)
+
+    def _on_check_setup_on_clip(self) -> None:
+        """Run the same check on a clip the user picks, from the library by default."""
+        if self._measuring:
+            return
+        start = self._working.output_dir or str(app_paths().clips_dir)
+        chosen, _filter = QFileDialog.getOpenFileName(
+            self, "Choose a clip to test on", start, "Videos (*.mp4 *.mkv *.mov *.ts)"
+        )
+        if chosen:
+            self._check_setup(Path(chosen))
+
+    def _check_setup(self, clip: Path | None) -> None:
         if self._measuring:
             return
         candidate = self._working.copy()
+        source = self._selected_capture_size()
         self._begin_measuring("Measuring...")
-        worker = _HardwareWorker(lambda: assess_settings(candidate))
-        worker.signals.finished.connect(self._on_setup_checked)
+        self._start_worker(
+            lambda on_trial, cancel: assess_settings(
+                candidate, source=source, clip=clip, on_trial=on_trial, cancel=cancel
+            ),
+            self._on_setup_checked,
+        )
+
+    def _start_worker(self, work: _HardwareWork, on_finished: Callable[[object], None]) -> None:
+        """Hand ``work`` to the pool, its trials to the tables and its result to ``on_finished``."""
+        worker = _HardwareWorker(work)
+        worker.signals.finished.connect(on_finished)
+        worker.signals.progressed.connect(self._on_trial_measured)
+        worker.signals.cancelled.connect(self._on_measuring_cancelled)
+        self._worker = worker
         self._pool.start(worker)
 
+    def _on_trial_measured(self, progress: object) -> None:
+        """Show a trial the moment it completes, before the verdict is in."""
+        if not isinstance(progress, BenchmarkProgress):
+            return
+        for table in self._trial_tables:
+            table.add(progress)
+
+    def _on_stop_measuring(self) -> None:
+        """Stop the benchmark in flight; its FFmpeg is killed where it stands."""
+        if self._worker is None:
+            return
+        self._worker.cancel.set()
+        for table in self._trial_tables:
+            table.stopping()
+
+    def _on_measuring_cancelled(self) -> None:
+        self._end_measuring()
+        self._set_benchmark_verdict("Stopped. Settings are unchanged.")
+
+    def _selected_capture_size(self) -> tuple[int, int] | None:
+        """Size of what the edited settings would grab, so a check covers crop and resize."""
+        try:
+            monitors = self._device_registry.monitors()
+        except Exception:
+            logger.exception("Could not enumerate monitors")
+            return None
+        for monitor in monitors:
+            if monitor.name == self._working.monitor:
+                region = resolve_capture_region(self._working, monitor)
+                return region.size if region is not None else (monitor.width, monitor.height)
+        return None
+
     def _on_setup_checked(self, trial: object) -> None:
         """Report what the chosen configuration actually managed."""
         self._end_measuring()
@@ -1057,12 +1672,19 @@ class SettingsPage(QWidget):
         self._measuring = True
         self._redetect_button.setEnabled(False)
         self._check_button.setEnabled(False)
+        self._check_clip_button.setEnabled(False)
+        for table in self._trial_tables:
+            table.start()
         self._set_benchmark_verdict(message)
 
     def _end_measuring(self) -> None:
         self._measuring = False
+        self._worker = None
         self._redetect_button.setEnabled(True)
         self._check_button.setEnabled(True)
+        self._check_clip_button.setEnabled(True)
+        for table in self._trial_tables:
+            table.finish()
 
     def _invalidate_verdict(self) -> None:
         """Drop a measurement that no longer describes the form.
@@ -1076,6 +1698,8 @@ class SettingsPage(QWidget):
             # A measurement in flight owns the label; it will write the result.
             return
         self._set_benchmark_verdict("")
+        for table in self._trial_tables:
+            table.setVisible(False)
 
     def _set_benchmark_verdict(self, text: str, *, is_warning: bool = False) -> None:
         """Show a measurement result on both cards, or clear it when empty."""
@@ -1122,6 +1746,25 @@ class SettingsPage(QWidget):
         self._restore_mode_from_working()
         self._validate_all()
 
+    def refresh_from_settings(self, settings: Settings) -> None:
+        """Take ``settings`` as the saved state, and show it unless the user is editing.
+
+        The host window calls this when settings were saved from somewhere
+        other than this page - the first-run tuning, which finishes after the
+        page was built on the defaults. Edits the user has not saved yet are
+        left on screen: Save still writes them, and Cancel now goes back to
+        ``settings``.
+        """
+        editing = self._working != self._persisted
+        self._persisted = settings.copy()
+        if editing:
+            logger.info("Settings changed elsewhere; keeping the unsaved edits on the page")
+            return
+        self._working = self._persisted.copy()
+        self._populate_from_settings(self._working)
+        self._restore_mode_from_working()
+        self._validate_all()
+
     def _restore_mode_from_working(self) -> None:
         """Move the toggle and refresh the mode UI to match the working copy.
 
@@ -1158,6 +1801,23 @@ class SettingsPage(QWidget):
         self._clear_error(self._errors.resolution)
         return True
 
+    def _validate_capture_region(self) -> bool:
+        text = self._region_edit.text()
+        if not text.strip():
+            self._working.capture_region = ""
+            self._clear_error(self._errors.capture_region)
+            return True
+        try:
+            region = parse_region(text)
+        except ValueError:
+            self._show_error(
+                self._errors.capture_region, "Use WIDTHxHEIGHT+X+Y, e.g. 1440x1080+240+0."
+            )
+            return False
+        self._working.capture_region = region.describe()
+        self._clear_error(self._errors.capture_region)
+        return True
+
     def _validate_output_dir(self) -> bool:
         value = self._output_dir_edit.text().strip()
         if not value:
@@ -1203,12 +1863,27 @@ class SettingsPage(QWidget):
         self._clear_error(self._errors.record_hotkey)
         return True
 
+    def _validate_clip_bindings(self) -> bool:
+        taken = {self._working.clip_hotkey, self._working.record_hotkey}
+        for binding in self._working.clip_bindings:
+            if binding.hotkey in taken:
+                self._show_error(
+                    self._errors.clip_bindings,
+                    f"{binding.hotkey.to_display()} is already bound to another action.",
+                )
+                return False
+            taken.add(binding.hotkey)
+        self._clear_error(self._errors.clip_bindings)
+        return True
+
     def _validate_all(self) -> bool:
         results = [
             self._validate_resolution(),
+            self._validate_capture_region(),
             self._validate_output_dir(),
             self._validate_clip_hotkey(),
             self._validate_record_hotkey(),
+            self._validate_clip_bindings(),
         ]
         self._is_valid = all(results)
         self._update_save_state()
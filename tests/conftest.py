@@ -8,7 +8,9 @@ they are exercising rather than on plumbing. In particular we provide:
 * a stand-in FFmpeg binary that mimics just enough of the real thing for
   the device-listing and replay-buffer tests; and
 * a monkeypatch helper that retargets :func:`sclip.paths.app_paths` at a
-  temp directory so anything that resolves data paths sees the test sandbox.
+  temp directory so anything that resolves data paths sees the test sandbox;
+  and
+* a writer for minimal MPEG-TS files with a known number of video frames.
 """
 
 from __future__ import annotations
@@ -18,6 +20,7 @@ import os
 import stat
 import sys
 import textwrap
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
@@ -73,8 +76,11 @@ def monkeypatch_app_paths(
         config_dir=config_dir,
         settings_file=config_dir / "settings.json",
         update_state_file=config_dir / "update-check.json",
+        capabilities_file=config_dir / "ffmpeg-capabilities.json",
+        devices_file=config_dir / "devices.json",
         clips_dir=data_dir / "clips",
         replay_buffer_dir=data_dir / "replay_buffer",
+        recordings_dir=data_dir / "recordings",
         log_file=data_dir / "logs" / "sclip.log",
     )
 
@@ -325,13 +331,16 @@ def install_fake_ffmpeg(
     """
     from sclip.core import ffmpeg as ffmpeg_module
 
-    def fake_argv_with_binary(binary: Path, args: object) -> list[str]:
+    def fake_argv_with_binary(
+        binary: Path, args: object, *, loglevel: str = "error", stats: bool = False
+    ) -> list[str]:
         return [
             sys.executable,
             str(binary),
             "-hide_banner",
             "-loglevel",
-            "error",
+            loglevel,
+            "-stats" if stats else "-nostats",
             *list(args),  # accept any iterable of strings
         ]
 
@@ -371,3 +380,33 @@ def fake_ffmpeg_on_path(
 
     monkeypatch.setenv("PATH", os.pathsep.join([str(bin_dir), os.environ.get("PATH", "")]))
     return wrapper
+
+
+# ------------------------------------------------------------------------ mpeg-ts
+
+
+def _ts_packet(pid: int, payload: bytes, *, start: bool) -> bytes:
+    """One 188-byte transport packet carrying ``payload``, padded out."""
+    header = bytes([0x47, (0x40 if start else 0) | (pid >> 8), pid & 0xFF, 0x10])
+    return (header + payload).ljust(188, b"\xff")
+
+
+@pytest.fixture()
+def write_ts() -> Callable[[Path, int], Path]:
+    """Return a writer for MPEG-TS files holding ``frames`` video pictures.
+
+    Each picture is a video PES start followed by a continuation packet, and
+    an audio PES start is interleaved after it, so a frame counter has to tell
+    the three apart. A PAT leads the file the way a real muxer's would.
+    """
+
+    def write(path: Path, frames: int) -> Path:
+        packets = [_ts_packet(0x0000, b"\x00\x00\xb0\x0d", start=True)]
+        for _ in range(frames):
+            packets.append(_ts_packet(0x0100, b"\x00\x00\x01\xe0\x00\x00", start=True))
+            packets.append(_ts_packet(0x0100, b"\x00\x00\x00\x01\x65", start=False))
+            packets.append(_ts_packet(0x0101, b"\x00\x00\x01\xc0\x00\x00", start=True))
+        path.write_bytes(b"".join(packets))
+        return path
+
+    return write
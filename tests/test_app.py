@@ -140,7 +140,7 @@ def test_disabled_engine_refuses_every_capture_action() -> None:
 # ------------------------------------------------------ first-run tuning
 
 
-def test_first_run_tuning_is_skipped_once_settings_exist(
+def test_first_run_is_judged_by_the_settings_file(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -152,58 +152,38 @@ def test_first_run_tuning_is_skipped_once_settings_exist(
     import sclip.app as app_module
 
     settings_file = tmp_path / "settings.json"
-    settings_file.write_text("{}", encoding="utf-8")
     monkeypatch.setattr(
         app_module, "app_paths", lambda: SimpleNamespace(settings_file=settings_file)
     )
 
-    store = _InMemorySettingsStore()
-    store.save(Settings(fps=30))
-    app_module._apply_first_run_recommendation(store, _EmptyDeviceRegistry())
-
-    assert store.load().fps == 30  # untouched
+    assert app_module._is_first_run()
+    settings_file.write_text("{}", encoding="utf-8")
+    assert not app_module._is_first_run()
 
 
-def test_first_run_tuning_persists_a_recommendation(
-    tmp_path: Path,
-    monkeypatch: pytest.MonkeyPatch,
-) -> None:
+def test_first_run_tuning_produces_a_recommendation() -> None:
     import sclip.app as app_module
 
-    monkeypatch.setattr(
-        app_module,
-        "app_paths",
-        lambda: SimpleNamespace(settings_file=tmp_path / "absent.json"),
-    )
-
-    store = _InMemorySettingsStore()
-    app_module._apply_first_run_recommendation(store, _EmptyDeviceRegistry())
+    recommended = app_module._recommend_first_run_settings(_EmptyDeviceRegistry())
 
-    # The concrete values depend on the host, but something must be written.
-    assert isinstance(store.load(), Settings)
+    # The concrete values depend on the host, but something must come back.
+    assert isinstance(recommended, Settings)
 
 
 def test_first_run_tuning_survives_a_detection_failure(
-    tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    """Hardware probing is best-effort; failing it must not block startup."""
+    """Hardware probing is best-effort; failing it must not break startup."""
     import sclip.app as app_module
     import sclip.core.hardware as hardware_module
 
-    monkeypatch.setattr(
-        app_module,
-        "app_paths",
-        lambda: SimpleNamespace(settings_file=tmp_path / "absent.json"),
-    )
-
     def explode(*_args: object, **_kwargs: object) -> None:
         raise RuntimeError("hardware probe blew up")
 
     monkeypatch.setattr(hardware_module, "recommend_settings", explode)
 
-    # Must not raise; the app falls back to the built-in defaults.
-    app_module._apply_first_run_recommendation(_InMemorySettingsStore(), _EmptyDeviceRegistry())
+    # Must not raise; the app keeps the built-in defaults.
+    assert app_module._recommend_first_run_settings(_EmptyDeviceRegistry()) is None
 
 
 # ------------------------------------------------------------- builders
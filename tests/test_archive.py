@@ -0,0 +1,140 @@
+"""Tests for the replay buffer's archive tier in :mod:`sclip.core.archive`.
+
+FFmpeg is never run: the transcode is swapped for a fake that writes a small
+file, or fails, and the tier's thread is never started - each test drives
+the transcoder one step at a time, so what is on disk afterwards can be
+checked exactly.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from sclip.core import archive
+from sclip.core.archive import ARCHIVE_MAX_HEIGHT, ArchiveTier, build_archive_args
+
+
+@pytest.fixture()
+def tier(tmp_path: Path) -> ArchiveTier:
+    directory = tmp_path / "archive"
+    directory.mkdir()
+    return ArchiveTier(directory, seconds=6, segment_seconds=2, collect=lambda: None)
+
+
+def _segment(directory: Path, name: str) -> Path:
+    segment = directory / name
+    segment.write_bytes(b"ts")
+    return segment
+
+
+def _fake_transcode(monkeypatch: pytest.MonkeyPatch, *, returncode: int = 0) -> list[str]:
+    sources: list[str] = []
+
+    def fake_run(argv: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        sources.append(Path(argv[argv.index("-i") + 1]).name)
+        if returncode == 0:
+            Path(argv[-1]).write_bytes(b"small")
+        return subprocess.CompletedProcess(argv, returncode, "", "boom")
+
+    monkeypatch.setattr(archive, "run_ffmpeg", fake_run)
+    return sources
+
+
+def test_the_archive_is_downscaled_with_its_audio_copied(tmp_path: Path) -> None:
+    argv = build_archive_args(tmp_path / "in.ts", tmp_path / "out.part")
+
+    assert argv[argv.index("-vf") + 1] == f"scale=-2:'min(ih,{ARCHIVE_MAX_HEIGHT})'"
+    assert argv[argv.index("-c:a") + 1] == "copy"
+    assert argv[argv.index("-f") + 1] == "mpegts"
+
+
+def test_accepted_segments_wait_in_order(tmp_path: Path, tier: ArchiveTier) -> None:
+    for name in ("seg_004.ts", "seg_000.ts"):
+        tier.accept(_segment(tmp_path, name))
+
+    archived, pending = tier.snapshot()
+
+    assert archived == []
+    assert [p.name for p in pending] == ["raw_000000.ts", "raw_000001.ts"]
+
+
+def test_a_transcoded_segment_replaces_its_full_quality_copy(
+    tmp_path: Path, tier: ArchiveTier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sources = _fake_transcode(monkeypatch)
+    tier.accept(_segment(tmp_path, "seg_000.ts"))
+
+    assert tier._transcode_oldest()
+    assert not tier._transcode_oldest()
+
+    assert sources == ["raw_000000.ts"]
+    assert sorted(p.name for p in tier.directory.iterdir()) == ["arc_000000.ts"]
+
+
+def test_a_segment_that_will_not_transcode_is_dropped(
+    tmp_path: Path, tier: ArchiveTier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _fake_transcode(monkeypatch, returncode=1)
+    tier.accept(_segment(tmp_path, "seg_000.ts"))
+
+    assert tier._transcode_oldest()
+
+    assert list(tier.directory.iterdir()) == []
+
+
+def test_the_archive_is_trimmed_to_its_length(
+    tmp_path: Path, tier: ArchiveTier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _fake_transcode(monkeypatch)
+    for index in range(5):
+        tier.accept(_segment(tmp_path, f"seg_{index:03d}.ts"))
+        tier._transcode_oldest()
+
+    archived, _pending = tier.snapshot()
+
+    # Six seconds of two-second segments is three.
+    assert [p.name for p in archived] == ["arc_000002.ts", "arc_000003.ts", "arc_000004.ts"]
+
+
+def test_nothing_is_deleted_while_a_save_holds_the_tier(
+    tmp_path: Path, tier: ArchiveTier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _fake_transcode(monkeypatch)
+    tier.accept(_segment(tmp_path, "seg_000.ts"))
+    _archived, (raw,) = tier.snapshot()
+
+    with tier.held():
+        tier._transcode_oldest()
+        assert raw.exists(), "a save may still be reading the full-quality copy"
+        # ...but it is no longer offered as waiting, so nothing is saved twice.
+        assert tier.snapshot() == ([tier.directory / "arc_000000.ts"], [])
+
+    assert not raw.exists()
+
+
+def test_a_transcoder_far_behind_drops_the_oldest_waiting(
+    tmp_path: Path, tier: ArchiveTier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(archive, "_PENDING_LIMIT_SECONDS", 4)
+    for index in range(3):
+        tier.accept(_segment(tmp_path, f"seg_{index:03d}.ts"))
+
+    _archived, pending = tier.snapshot()
+
+    assert [p.name for p in pending] == ["raw_000001.ts", "raw_000002.ts"]
+    assert not (tier.directory / "raw_000000.ts").exists()
+
+
+def test_a_restarted_tier_numbers_on_after_what_it_kept(tmp_path: Path, tier: ArchiveTier) -> None:
+    _segment(tier.directory, "arc_000007.ts")
+    tier.start()
+    try:
+        tier.accept(_segment(tmp_path, "seg_000.ts"))
+    finally:
+        tier.stop()
+
+    _archived, pending = tier.snapshot()
+    assert [p.name for p in pending] == ["raw_000008.ts"]
@@ -9,18 +9,52 @@ that the ladder walk settles on the highest quality preset that still keeps up.
 from __future__ import annotations
 
 import subprocess
-from collections.abc import Iterator
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
 from sclip.contracts import Settings
 from sclip.core import benchmark as bench
 from sclip.core import hardware
-from sclip.core.benchmark import EncoderTrial, benchmark_encoder, find_best_configuration
-from sclip.core.ffmpeg import FFmpegNotFoundError
+from sclip.core.benchmark import (
+    HUD_SCENE,
+    BenchmarkProgress,
+    BitrateTrial,
+    DecimationTrial,
+    EncoderTrial,
+    PipelineTrial,
+    benchmark_encoder,
+    clip_scene,
+    compare_codecs,
+    find_best_configuration,
+    measure_frame_decimation,
+    measure_pipeline,
+    worst_trial,
+)
+from sclip.core.ffmpeg import (
+    FFmpegNotFoundError,
+    FFmpegResult,
+    JobCancelledError,
+    ResourceUsage,
+)
 
 
-def _trial(encoder: str, preset: str, achieved: float, *, fps: int = 60) -> EncoderTrial:
+@pytest.fixture(autouse=True)
+def _unknown_ffmpeg(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Nothing here depends on the FFmpeg this machine has, or records anything about it."""
+    monkeypatch.setattr(bench, "ffmpeg_capabilities", lambda *_args: None)
+    monkeypatch.setattr(hardware, "ffmpeg_capabilities", lambda *_args: None)
+    monkeypatch.setattr(hardware, "record_probe", lambda *_args, **_kwargs: None)
+
+
+def _trial(
+    encoder: str, preset: str, achieved: float, *, fps: int = 60, ssim: float | None = None
+) -> EncoderTrial:
     return EncoderTrial(
         encoder=encoder,
         preset=preset,
@@ -29,6 +63,7 @@ def _trial(encoder: str, preset: str, achieved: float, *, fps: int = 60) -> Enco
         fps=fps,
         available=True,
         achieved_fps=achieved,
+        ssim=ssim,
     )
 
 
@@ -72,22 +107,60 @@ class TestEncoderTrial:
         assert "2560x1440" in described
         assert "comfortable" in described
 
+    def test_the_cpu_a_trial_cost_is_reported_per_core(self) -> None:
+        usage = ResourceUsage(user_seconds=3.0, peak_rss_bytes=250 << 20, wall_seconds=1.5)
+        trial = replace(_trial("libx264", "veryfast", 200.0), usage=usage)
+
+        assert trial.cores_used == pytest.approx(2.0)
+        assert trial.fps_per_core == pytest.approx(100.0)
+        assert "busy on 2.0 cores, peak 250 MB" in trial.describe()
+        assert _trial("libx264", "veryfast", 200.0).fps_per_core is None
+
 
 class TestBenchmarkEncoder:
+    def test_an_encoder_the_build_lacks_is_not_run(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        build = SimpleNamespace(has_encoder=lambda codec: codec == "libx264")
+        monkeypatch.setattr(bench, "ffmpeg_capabilities", lambda *_args: build)
+
+        def explode(*_args: object, **_kwargs: object) -> ResourceUsage:
+            raise AssertionError("an encoder FFmpeg lacks should not be timed")
+
+        monkeypatch.setattr(bench, "_time_encode", explode)
+        trial = benchmark_encoder("h264_amf", "speed", width=1920, height=1080, fps=60)
+        assert not trial.available
+
     def test_rate_is_taken_from_the_difference_between_two_runs(
         self, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         # Both runs pay a 0.5s fixed start-up cost. 90 frames then cost 1.0s and
         # 180 frames cost 2.0s, so the honest rate is 90 fps, not the 60 fps a
         # single timed run would have reported.
-        def fake_time(*_args: object, frames: int, **_kwargs: object) -> float:
-            return 0.5 + frames / 90.0
+        def fake_time(*_args: object, frames: int, **_kwargs: object) -> ResourceUsage:
+            return ResourceUsage(wall_seconds=0.5 + frames / 90.0)
 
         monkeypatch.setattr(bench, "_time_encode", fake_time)
         trial = benchmark_encoder("h264_nvenc", "p5", width=2560, height=1440, fps=60)
         assert trial.available
         assert trial.achieved_fps == pytest.approx(90.0)
 
+    def test_the_cpu_time_is_the_encodes_own_too(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        # Start-up costs 0.2 CPU seconds either way; 90 frames then cost a
+        # further 2.0, spread over the 1.0s they take, so two cores.
+        def fake_time(*_args: object, frames: int, **_kwargs: object) -> ResourceUsage:
+            return ResourceUsage(
+                user_seconds=0.2 + frames / 45.0,
+                peak_rss_bytes=frames << 20,
+                wall_seconds=0.5 + frames / 90.0,
+            )
+
+        monkeypatch.setattr(bench, "_time_encode", fake_time)
+        trial = benchmark_encoder("libx264", "veryfast", width=1920, height=1080, fps=60)
+
+        assert trial.usage is not None
+        assert trial.usage.cpu_seconds == pytest.approx(2.0)
+        assert trial.cores_used == pytest.approx(2.0)
+        assert trial.usage.peak_rss_bytes == 180 << 20
+
     def test_startup_cost_does_not_leak_into_the_result(
         self, monkeypatch: pytest.MonkeyPatch
     ) -> None:
@@ -96,8 +169,10 @@ class TestBenchmarkEncoder:
         rates = []
         for startup in (0.1, 2.0):
 
-            def fake_time(*_a: object, frames: int, _s: float = startup, **_k: object) -> float:
-                return _s + frames / 120.0
+            def fake_time(
+                *_a: object, frames: int, _s: float = startup, **_k: object
+            ) -> ResourceUsage:
+                return ResourceUsage(wall_seconds=_s + frames / 120.0)
 
             monkeypatch.setattr(bench, "_time_encode", fake_time)
             rates.append(
@@ -115,7 +190,7 @@ class TestBenchmarkEncoder:
         monkeypatch.setattr(
             bench,
             "_time_encode",
-            lambda *_a, frames, **_k: 1.0 if frames > 100 else 1.5,
+            lambda *_a, frames, **_k: ResourceUsage(wall_seconds=1.0 if frames > 100 else 1.5),
         )
         trial = benchmark_encoder("libx264", "ultrafast", width=1920, height=1080, fps=60)
         assert trial.available
@@ -148,20 +223,379 @@ class TestBenchmarkEncoder:
         trial = benchmark_encoder("libx264", "medium", width=1920, height=1080, fps=60)
         assert not trial.available
 
+    def test_a_cancel_is_not_mistaken_for_a_missing_encoder(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def cancelled(*_args: object, **_kwargs: object) -> None:
+            raise JobCancelledError("cancelled")
+
+        monkeypatch.setattr(bench, "run_ffmpeg", cancelled)
+        with pytest.raises(JobCancelledError):
+            benchmark_encoder("libx264", "medium", width=1920, height=1080, fps=60)
+
     def test_a_nonzero_exit_marks_the_encoder_unavailable(
         self, monkeypatch: pytest.MonkeyPatch
     ) -> None:
         monkeypatch.setattr(
             bench,
             "run_ffmpeg",
-            lambda *_a, **_k: subprocess.CompletedProcess(
-                args=[], returncode=1, stdout="", stderr=""
-            ),
+            lambda *_a, **_k: FFmpegResult(args=[], returncode=1, stdout="", stderr=""),
         )
         trial = benchmark_encoder("h264_nvenc", "p5", width=2560, height=1440, fps=60)
         assert not trial.available
 
 
+class TestResizedTrials:
+    def _argv_of_trial(self, monkeypatch: pytest.MonkeyPatch, encoder: str) -> list[str]:
+        seen: list[list[str]] = []
+
+        def fake_run(args: list[str], **_kwargs: object) -> FFmpegResult:
+            seen.append(list(args))
+            return FFmpegResult(args=[], returncode=0, stdout="", stderr="")
+
+        monkeypatch.setattr(bench, "run_ffmpeg", fake_run)
+        benchmark_encoder(encoder, "veryfast", width=1920, height=1080, fps=60, source=(3840, 2160))
+        return seen[0]
+
+    def test_a_cpu_encoder_is_charged_for_the_software_resize(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        argv = self._argv_of_trial(monkeypatch, "libx264")
+        assert argv[argv.index("-i") + 1].startswith("testsrc2=size=3840x2160:rate=60")
+        assert argv[argv.index("-vf") + 1].startswith("scale=1920:1080:")
+
+    def test_a_hardware_encoder_is_measured_at_the_encoded_size(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # The GPU resize is not something a lavfi source can stand in for.
+        argv = self._argv_of_trial(monkeypatch, "h264_nvenc")
+        assert argv[argv.index("-i") + 1].startswith("testsrc2=size=1920x1080:rate=60")
+        assert "-vf" not in argv
+
+
+class TestBudgetedTrials:
+    def test_a_cpu_encoder_is_timed_on_the_capture_s_cores(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(bench, "budget_cores", lambda _encoder, _percent: frozenset({6, 7}))
+        seen: list[tuple[list[str], object]] = []
+
+        def fake_run(args: list[str], **kwargs: object) -> FFmpegResult:
+            seen.append((list(args), kwargs.get("cores")))
+            return FFmpegResult(args=[], returncode=0, stdout="", stderr="")
+
+        monkeypatch.setattr(bench, "run_ffmpeg", fake_run)
+        trial = benchmark_encoder(
+            "libx264", "veryfast", width=1920, height=1080, fps=60, cpu_budget=25
+        )
+
+        argv, cores = seen[0]
+        assert argv[argv.index("-threads") + 1] == "2"
+        assert cores == frozenset({6, 7})
+        assert trial.cores == 2
+        assert "on 2 cores" in trial.describe()
+
+
+class TestPictureScores:
+    @staticmethod
+    def _run_scored(
+        monkeypatch: pytest.MonkeyPatch, stderr: str, *, scene: object = None
+    ) -> tuple[EncoderTrial, list[list[str]]]:
+        seen: list[list[str]] = []
+
+        def fake_run(args: list[str], **_kwargs: object) -> FFmpegResult:
+            seen.append(list(args))
+            if "-lavfi" in args:
+                return FFmpegResult(args=[], returncode=0, stdout="", stderr=stderr)
+            Path(args[-1]).write_bytes(b"x" * 15_000)
+            return FFmpegResult(args=[], returncode=0, stdout="", stderr="")
+
+        monkeypatch.setattr(bench, "run_ffmpeg", fake_run)
+        extra = {"scene": scene} if scene is not None else {}
+        trial = benchmark_encoder(
+            "libx264", "veryfast", width=1920, height=1080, fps=60, seconds=0.5, **extra
+        )
+        return trial, seen
+
+    def test_the_trial_is_scored_against_its_own_scene(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        stderr = (
+            "[Parsed_ssim_5 @ 0x1] SSIM Y:0.990 (20.0) U:0.99 V:0.99 All:0.985000 (18.2)\n"
+            "[Parsed_psnr_6 @ 0x2] PSNR y:44.1 u:46.0 v:46.2 average:44.750000 min:40 max:50\n"
+        )
+        trial, seen = self._run_scored(monkeypatch, stderr)
+
+        assert (trial.ssim, trial.psnr) == (pytest.approx(0.985), pytest.approx(44.75))
+        # 15,000 bytes for 60 frames at 60 fps is 120 kb/s.
+        assert trial.bitrate_bps == pytest.approx(120_000)
+        score = seen[-1]
+        assert score[score.index("-i", 2) + 1] == seen[0][seen[0].index("-i") + 1]
+        assert "trim=end_frame=60" in score[score.index("-lavfi") + 1]
+
+    def test_scores_ffmpeg_did_not_report_are_left_unknown(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        trial, _seen = self._run_scored(monkeypatch, "nothing useful")
+
+        assert trial.available
+        assert trial.ssim is None
+
+    def test_a_library_clip_is_looped_and_fitted_to_the_trial(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        clip = tmp_path / "clip_20260101.mp4"
+
+        _trial, seen = self._run_scored(monkeypatch, "", scene=clip_scene(clip))
+
+        encode = seen[0]
+        assert encode[encode.index("-i") - 2 : encode.index("-i") + 2] == [
+            "-stream_loop",
+            "-1",
+            "-i",
+            str(clip),
+        ]
+        assert encode[encode.index("-vf") + 1] == "scale=1920:1080,fps=60"
+
+    def test_the_worst_scene_decides(self) -> None:
+        fast_but_ugly = replace(_trial("libx264", "veryfast", 300.0, ssim=0.90), scene="motion")
+        slow_but_clean = replace(_trial("libx264", "veryfast", 200.0, ssim=0.99), scene="hud")
+
+        worst = worst_trial([fast_but_ugly, slow_but_clean])
+
+        assert (worst.scene, worst.achieved_fps, worst.ssim) == ("hud", 200.0, 0.90)
+
+    def test_the_heaviest_cpu_use_is_the_one_kept(self) -> None:
+        light = replace(_trial("libx264", "veryfast", 300.0), usage=ResourceUsage(1.0, 0, 0, 1.0))
+        heavy = replace(_trial("libx264", "veryfast", 400.0), usage=ResourceUsage(3.0, 0, 0, 1.0))
+
+        worst = worst_trial([light, heavy])
+
+        assert (worst.achieved_fps, worst.cores_used) == (300.0, pytest.approx(3.0))
+
+    def test_the_hud_scene_keeps_a_fixed_overlay_over_moving_content(self) -> None:
+        source = HUD_SCENE.input_args(width=1280, height=720, fps=30)[-1]
+
+        assert source.startswith("testsrc2=size=1280x720:rate=30,scroll=")
+        assert "drawgrid" in source
+
+
+def _pipeline(encoder: str, speed: float, *, dropped: int = 0) -> PipelineTrial:
+    # Six seconds of 60 fps footage, written in 6 / speed seconds.
+    return PipelineTrial(
+        encoder,
+        "veryfast",
+        2560,
+        1440,
+        60,
+        available=True,
+        frames=360,
+        wall_seconds=6.0 / speed,
+        cpu_seconds=12.0,
+        frames_dropped=dropped,
+        bytes_written=30_000_000,
+        segments=3,
+    )
+
+
+def _no_pipeline(encoder: str, preset: str, **_kwargs: object) -> PipelineTrial:
+    return PipelineTrial(encoder, preset, 1920, 1080, 60, available=False)
+
+
+class TestPipelineTrial:
+    def test_the_figures_come_from_what_was_written(self) -> None:
+        pipeline = _pipeline("libx264", 2.0)
+
+        assert pipeline.speed == pytest.approx(2.0)
+        assert pipeline.cores_at_real_time == pytest.approx(2.0)
+        assert pipeline.disk_bps == pytest.approx(10_000_000)
+
+    def test_drops_fail_a_pipeline_however_fast(self) -> None:
+        assert _pipeline("libx264", 4.0).sustains_capture
+        assert not _pipeline("libx264", 4.0, dropped=3).sustains_capture
+
+    def test_a_measured_pipeline_replaces_the_fixed_allowance(self) -> None:
+        # 2x on the encode alone falls short of the 3x a CPU encoder is held
+        # to; the whole pipeline measured at 1.6x says the allowance was too
+        # cautious here.
+        encode_only = _trial("libx264", "veryfast", 120.0)
+        assert not encode_only.sustains_capture
+
+        measured = replace(encode_only, pipeline=_pipeline("libx264", 1.6))
+
+        assert measured.required_headroom == pytest.approx(1.5 * 2.0 / 1.6)
+        assert measured.sustains_capture
+        assert "whole pipeline 1.6x" in measured.describe()
+        assert not replace(encode_only, pipeline=_pipeline("libx264", 1.2)).sustains_capture
+
+    def test_the_trial_runs_the_buffers_own_command_line(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        ran: list[list[str]] = []
+
+        def fake_run(argv: list[str], **_kwargs: object) -> tuple[ResourceUsage, int]:
+            ran.append(argv)
+            pattern = Path(argv[-1])
+            for index in range(3):
+                (pattern.parent / f"seg_{index:03d}.ts").write_bytes(b"ts" * 100)
+            pcm = next(Path(arg) for arg in argv if arg.endswith("desktop.pcm"))
+            assert pcm.stat().st_size == 7 * 48000 * 2 * 2
+            return ResourceUsage(user_seconds=4.5, peak_rss_bytes=300 << 20, wall_seconds=3.0), 0
+
+        monkeypatch.setattr(bench, "_run_pipeline", fake_run)
+        monkeypatch.setattr(bench, "count_video_frames", lambda _path: 120)
+
+        trial = measure_pipeline(
+            "libx264", "veryfast", width=1920, height=1080, fps=60, directory=tmp_path
+        )
+
+        (argv,) = ran
+        assert argv[argv.index("-t") + 1] == "6"
+        assert argv[argv.index("-segment_format") + 1] == "mpegts"
+        assert argv[argv.index("lavfi") + 2].endswith(",format=bgra")
+        assert "sine=frequency=440:sample_rate=48000" in argv
+        assert Path(argv[-1]).parent.parent == tmp_path
+        assert (trial.segments, trial.frames, trial.bytes_written) == (3, 360, 600)
+        assert trial.speed == pytest.approx(2.0)
+        assert (trial.cpu_seconds, trial.peak_rss_bytes) == (4.5, 300 << 20)
+        assert list(tmp_path.iterdir()) == [], "the scratch folder is removed"
+
+    def test_a_resized_capture_generates_the_display_and_scales_it(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ran: list[list[str]] = []
+        monkeypatch.setattr(bench, "_run_pipeline", lambda argv, **_kw: ran.append(argv))
+
+        trial = measure_pipeline(
+            "libx264",
+            "veryfast",
+            width=1920,
+            height=1080,
+            fps=60,
+            source=(3840, 2160),
+            microphone=False,
+            desktop_audio=False,
+        )
+
+        (argv,) = ran
+        assert "size=3840x2160" in argv[argv.index("lavfi") + 2]
+        assert "scale=1920:1080" in argv[argv.index("-filter_complex") + 1]
+        assert "-an" in argv
+        assert not trial.available
+
+
+class TestFrameDecimation:
+    def _measure(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        write_ts: Callable[[Path, int], Path],
+        *,
+        vfr_exit: int = 0,
+    ) -> tuple[DecimationTrial | None, list[list[str]]]:
+        # Six seconds at 60 fps is 360 frames; a picture changing once a second
+        # leaves six after decimation. The fake writes exactly that, with sizes
+        # in proportion, so the arithmetic on top can be checked.
+        seen: list[list[str]] = []
+
+        def fake_run(args: list[str], **_kwargs: object) -> FFmpegResult:
+            seen.append(list(args))
+            decimating = "-vf" in args
+            if decimating and vfr_exit:
+                return FFmpegResult(args=[], returncode=vfr_exit)
+            write_ts(Path(args[-1]), 6 if decimating else 360)
+            usage = ResourceUsage(user_seconds=1.0 if decimating else 4.0, wall_seconds=1.0)
+            return FFmpegResult(args=[], returncode=0, usage=usage)
+
+        monkeypatch.setattr(bench, "run_ffmpeg", fake_run)
+        trial = measure_frame_decimation(
+            "libx264", "veryfast", width=1920, height=1080, fps=60, seconds=6.0
+        )
+        return trial, seen
+
+    def test_the_saving_is_counted_from_the_files_written(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        trial, _seen = self._measure(monkeypatch, write_ts)
+        assert trial is not None
+        assert (trial.frames_total, trial.frames_kept) == (360, 6)
+        assert trial.skipped_fraction == pytest.approx(354 / 360)
+        assert trial.bytes_saving > 0.9
+        assert trial.cpu_saving == pytest.approx(0.75)
+
+    def test_the_source_is_mostly_static_and_decimated_like_a_capture(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        _trial, (cfr, vfr) = self._measure(monkeypatch, write_ts)
+        assert "testsrc2=size=1920x1080:rate=1,fps=60" in cfr
+        assert cfr[cfr.index("-fps_mode") + 1] == "cfr"
+        assert vfr[vfr.index("-vf") + 1] == "mpdecimate=max=59"
+        assert vfr[vfr.index("-fps_mode") + 1] == "vfr"
+
+    def test_a_failed_encode_yields_no_figures(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        trial, _seen = self._measure(monkeypatch, write_ts, vfr_exit=1)
+        assert trial is None
+
+    def test_the_scratch_files_are_removed(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        _trial, seen = self._measure(monkeypatch, write_ts)
+        assert not any(Path(argv[-1]).exists() for argv in seen)
+
+
+# Frames written per codec by the fake FFmpeg below: HEVC comes out smaller, as
+# it would at the same quality, and AV1 is missing from this "build".
+_CODEC_FRAMES: dict[str, int] = {"libx264": 100, "hevc_nvenc": 60}
+
+
+class TestCodecComparison:
+    def _compare(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> tuple[list[BitrateTrial], list[list[str]]]:
+        seen: list[list[str]] = []
+
+        def fake_run(args: list[str], **_kwargs: object) -> FFmpegResult:
+            seen.append(list(args))
+            encoder = args[args.index("-c:v") + 1]
+            if encoder not in _CODEC_FRAMES:
+                return FFmpegResult(args=[], returncode=1)
+            write_ts(Path(args[-1]), _CODEC_FRAMES[encoder])
+            return FFmpegResult(args=[], returncode=0, stdout="", stderr="")
+
+        monkeypatch.setattr(bench, "run_ffmpeg", fake_run)
+        trials = compare_codecs(
+            [("libx264", "veryfast"), ("hevc_nvenc", "p5"), ("libsvtav1", "10")],
+            width=1920,
+            height=1080,
+            fps=60,
+        )
+        return trials, seen
+
+    def test_each_format_is_weighed_on_the_same_moving_clip(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        _trials, seen = self._compare(monkeypatch, write_ts)
+        sources = {argv[argv.index("-i") + 1] for argv in seen}
+        assert sources == {"testsrc2=size=1920x1080:rate=60"}
+        assert all(argv[argv.index("-f", argv.index("-c:v")) + 1] == "mpegts" for argv in seen)
+
+    def test_the_saving_is_measured_against_h264(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        (h264, hevc), _seen = self._compare(monkeypatch, write_ts)
+        assert (h264.family, hevc.family) == ("h264", "hevc")
+        assert hevc.saving_against(h264) == pytest.approx(0.4, abs=0.01)
+        assert hevc.bitrate_bps < h264.bitrate_bps
+
+    def test_a_missing_encoder_is_left_out_rather_than_failing(
+        self, monkeypatch: pytest.MonkeyPatch, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        trials, seen = self._compare(monkeypatch, write_ts)
+        assert [trial.encoder for trial in trials] == ["libx264", "hevc_nvenc"]
+        assert len(seen) == 3
+
+
 class TestFindBestConfiguration:
     def test_the_first_sustainable_encoder_wins_without_walking_further(
         self, monkeypatch: pytest.MonkeyPatch
@@ -239,6 +673,109 @@ class TestFindBestConfiguration:
         assert best is None
         assert attempts  # the failed trials are still reportable to the user
 
+    def test_a_scored_ladder_walks_on_to_the_fastest_preset_above_the_floor(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # fast is the first to keep up; faster costs a sliver of SSIM for more
+        # room, and veryfast costs too much to be worth it.
+        scores = {
+            "medium": (2.0, 0.990),
+            "fast": (3.2, 0.985),
+            "faster": (4.0, 0.982),
+            "veryfast": (5.0, 0.975),
+        }
+
+        def fake(encoder: str, preset: str, **_kwargs: object) -> EncoderTrial:
+            speed, ssim = scores[preset]
+            return _trial(encoder, preset, 60 * speed, ssim=ssim)
+
+        monkeypatch.setattr(bench, "benchmark_encoder", fake)
+        best, attempts = find_best_configuration(["libx264"], width=2560, height=1440, fps=60)
+
+        assert best is not None
+        assert best.preset == "faster"
+        assert [t.preset for t in attempts] == ["medium", "fast", "faster", "veryfast"]
+
+    def test_ranking_by_efficiency_measures_every_encoder(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Both keep up; the software encoder is faster but burns six cores to
+        # get there, so frames per core puts the hardware one first.
+        def fake(encoder: str, preset: str, **_kwargs: object) -> EncoderTrial:
+            gpu = encoder == "h264_nvenc"
+            usage = ResourceUsage(user_seconds=0.5 if gpu else 6.0, wall_seconds=1.0)
+            return replace(_trial(encoder, preset, 60 * (2.0 if gpu else 8.0)), usage=usage)
+
+        monkeypatch.setattr(bench, "benchmark_encoder", fake)
+        best, attempts = find_best_configuration(
+            ["libx264", "h264_nvenc"], width=2560, height=1440, fps=60, rank_by_efficiency=True
+        )
+
+        assert best is not None
+        assert best.encoder == "h264_nvenc"
+        assert {trial.encoder for trial in attempts} == {"libx264", "h264_nvenc"}
+
+    def test_each_trial_is_reported_as_it_completes(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        speeds = {"medium": 2.0, "fast": 2.2, "faster": 2.5, "veryfast": 3.6}
+        clock = iter(range(100))
+        monkeypatch.setattr(bench.time, "monotonic", lambda: float(next(clock)))
+        monkeypatch.setattr(
+            bench,
+            "benchmark_encoder",
+            lambda encoder, preset, **_k: _trial(encoder, preset, 60 * speeds[preset]),
+        )
+        reports: list[BenchmarkProgress] = []
+
+        find_best_configuration(
+            ["libx264"], width=2560, height=1440, fps=60, on_trial=reports.append
+        )
+
+        assert [report.trial.preset for report in reports] == list(speeds)
+        # Six libx264 presets could be tried; two trials took a second each.
+        second = reports[1]
+        assert (second.completed, second.planned, second.remaining) == (2, 6, 4)
+        assert second.eta_seconds == pytest.approx(4.0)
+
+    def test_a_cancel_stops_the_search_between_trials(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cancel = threading.Event()
+        ran: list[str] = []
+
+        def fake(encoder: str, preset: str, **_kwargs: object) -> EncoderTrial:
+            ran.append(preset)
+            return _trial(encoder, preset, 60.0)
+
+        monkeypatch.setattr(bench, "benchmark_encoder", fake)
+        with pytest.raises(JobCancelledError):
+            find_best_configuration(
+                ["libx264"],
+                width=2560,
+                height=1440,
+                fps=60,
+                on_trial=lambda _progress: cancel.set(),
+                cancel=cancel,
+            )
+
+        assert ran == ["medium"]
+
+    def test_every_scene_is_measured_and_the_worst_one_judged(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def fake(encoder: str, preset: str, *, scene: object, **_kwargs: object) -> EncoderTrial:
+            hard = scene is bench.HUD_SCENE and preset == "medium"
+            return _trial(encoder, preset, 60 * (2.0 if hard else 6.0))
+
+        monkeypatch.setattr(bench, "benchmark_encoder", fake)
+        best, attempts = find_best_configuration(
+            ["libx264"], width=2560, height=1440, fps=60, scenes=bench.BENCHMARK_SCENES
+        )
+
+        # medium keeps up with the motion but not with the HUD, so it is out.
+        assert best is not None
+        assert best.preset == "fast"
+        assert attempts[0].achieved_fps == pytest.approx(120.0)
+
 
 class TestRecommendationUsesTheBenchmark:
     @pytest.fixture
@@ -263,10 +800,51 @@ class TestRecommendationUsesTheBenchmark:
             raise AssertionError("the benchmark should not run on first launch")
 
         monkeypatch.setattr(hardware, "measure_encoder_choice", explode)
-        monkeypatch.setattr(hardware, "detect_best_encoder", lambda: "h264_nvenc")
+        monkeypatch.setattr(hardware, "detect_best_encoder", lambda *_: "h264_nvenc")
         result = hardware.recommend_settings(Settings(), registry)  # type: ignore[arg-type]
         assert result.encoder == "h264_nvenc"
 
+    def test_tuning_keeps_the_chosen_codec_family(
+        self, monkeypatch: pytest.MonkeyPatch, registry: object
+    ) -> None:
+        captured: dict[str, object] = {}
+
+        def fake_measure(**kwargs: object) -> tuple[str, str, list[EncoderTrial]]:
+            captured.update(kwargs)
+            return "hevc_nvenc", "p5", []
+
+        monkeypatch.setattr(hardware, "measure_encoder_choice", fake_measure)
+        base = Settings(encoder="libx265", preset="superfast", h264_export=True)
+        result = hardware.recommend_settings(base, registry, benchmark=True)  # type: ignore[arg-type]
+        assert captured["family"] == "hevc"
+        assert result.encoder == "hevc_nvenc"
+        assert result.h264_export
+
+    def test_a_recommendation_keeps_the_users_audio_mix(
+        self, monkeypatch: pytest.MonkeyPatch, registry: object
+    ) -> None:
+        # Re-detect replaces the whole form, so anything it does not tune
+        # has to come through unchanged.
+        monkeypatch.setattr(hardware, "detect_best_encoder", lambda *_: "libx264")
+        base = Settings(separate_audio_tracks=True, microphone_level=40)
+        result = hardware.recommend_settings(base, registry)  # type: ignore[arg-type]
+        assert result.separate_audio_tracks
+        assert result.microphone_level == 40
+
+    def test_a_family_with_no_working_encoder_falls_back_to_h264(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        probed: list[str] = []
+
+        def probe(codec: str, **_kwargs: object) -> bool:
+            probed.append(codec)
+            return codec == "libx264"
+
+        monkeypatch.setattr(hardware, "_probe_encoder", probe)
+        assert hardware.detect_best_encoder("av1") == "libx264"
+        # The family's own probes run together, so only their set is fixed.
+        assert set(probed[:2]) == {"av1_nvenc", "libsvtav1"}
+
     def test_benchmark_mode_measures_at_the_chosen_display(
         self, monkeypatch: pytest.MonkeyPatch, registry: object
     ) -> None:
@@ -284,6 +862,23 @@ class TestRecommendationUsesTheBenchmark:
         assert result.encoder == "h264_nvenc"
         assert result.preset == "p5"
 
+    def test_benchmark_mode_measures_only_the_cropped_region(
+        self, monkeypatch: pytest.MonkeyPatch, registry: object
+    ) -> None:
+        # A 4:3 game on the 16:9 panel encodes no black bars, so the machine
+        # is measured on the pixels it will actually encode.
+        captured: dict[str, object] = {}
+
+        def fake_measure(**kwargs: object) -> tuple[str, str, list[EncoderTrial]]:
+            captured.update(kwargs)
+            return "h264_nvenc", "p5", []
+
+        monkeypatch.setattr(hardware, "measure_encoder_choice", fake_measure)
+        base = Settings(capture_region="1920x1440+320+0")
+        result = hardware.recommend_settings(base, registry, benchmark=True)  # type: ignore[arg-type]
+        assert (captured["width"], captured["height"]) == (1920, 1440)
+        assert result.capture_region == "1920x1440+320+0"
+
     def test_measure_falls_back_to_the_probe_when_nothing_keeps_up(
         self, monkeypatch: pytest.MonkeyPatch
     ) -> None:
@@ -295,7 +890,7 @@ class TestRecommendationUsesTheBenchmark:
             _trial("libx264", "veryfast", 90.0),
         ]
         monkeypatch.setattr(hardware, "find_best_configuration", lambda *_a, **_k: (None, attempts))
-        monkeypatch.setattr(hardware, "detect_best_encoder", lambda: "libx264")
+        monkeypatch.setattr(hardware, "detect_best_encoder", lambda *_: "libx264")
         encoder, preset, reported = hardware.measure_encoder_choice(width=3840, height=2160, fps=60)
         assert encoder == "libx264"
         assert preset == "veryfast"
@@ -311,9 +906,192 @@ class TestRecommendationUsesTheBenchmark:
             return _trial(encoder, preset, 120.0)
 
         monkeypatch.setattr(hardware, "benchmark_encoder", fake_benchmark)
+        monkeypatch.setattr(hardware, "measure_pipeline", _no_pipeline)
         settings = Settings(resolution="1920x1080", fps=120, encoder="libx264", preset="medium")
         hardware.assess_settings(settings)
         assert captured["encoder"] == "libx264"
         assert captured["preset"] == "medium"
         assert (captured["width"], captured["height"]) == (1920, 1080)
         assert captured["fps"] == 120
+
+    def test_assess_settings_reports_each_scene(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(
+            hardware,
+            "benchmark_encoder",
+            lambda encoder, preset, *, scene, **_k: replace(
+                _trial(encoder, preset, 240.0), scene=scene.name
+            ),
+        )
+        monkeypatch.setattr(hardware, "measure_pipeline", _no_pipeline)
+        reports: list[BenchmarkProgress] = []
+
+        hardware.assess_settings(Settings(), on_trial=reports.append)
+
+        assert [report.trial.scene for report in reports] == [
+            scene.name for scene in bench.BENCHMARK_SCENES
+        ]
+        assert reports[-1].remaining == 0
+
+    def test_assess_settings_measures_what_a_resized_capture_encodes(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # A 16:10 display captured at "1920x1080" really encodes 1728x1080.
+        captured: dict[str, object] = {}
+
+        def fake_benchmark(encoder: str, preset: str, **kwargs: object) -> EncoderTrial:
+            captured.update(kwargs)
+            return _trial(encoder, preset, 120.0)
+
+        monkeypatch.setattr(hardware, "benchmark_encoder", fake_benchmark)
+        monkeypatch.setattr(hardware, "measure_pipeline", _no_pipeline)
+        hardware.assess_settings(Settings(resolution="1920x1080"), source=(2560, 1600))
+        assert (captured["width"], captured["height"]) == (1728, 1080)
+        assert captured["source"] == (2560, 1600)
+
+    def test_assess_settings_judges_by_the_whole_pipeline(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        captured: dict[str, object] = {}
+
+        def fake_pipeline(encoder: str, preset: str, **kwargs: object) -> PipelineTrial:
+            captured.update(kwargs)
+            return _pipeline(encoder, 1.6)
+
+        monkeypatch.setattr(hardware, "benchmark_encoder", lambda e, p, **_k: _trial(e, p, 120.0))
+        monkeypatch.setattr(hardware, "measure_pipeline", fake_pipeline)
+        settings = Settings(
+            encoder="libx264",
+            preset="veryfast",
+            audio_input="",
+            capture_desktop_audio=True,
+            buffer_dir=str(tmp_path),
+        )
+
+        trial = hardware.assess_settings(settings)
+
+        assert trial.pipeline is not None
+        assert trial.sustains_capture
+        assert (captured["microphone"], captured["desktop_audio"]) == (False, True)
+        assert captured["directory"] == tmp_path
+
+    def test_a_display_too_big_to_sustain_is_recommended_at_a_smaller_size(
+        self, monkeypatch: pytest.MonkeyPatch, registry: object
+    ) -> None:
+        # Nothing keeps up at the native 1440p, but 1080p does.
+        def fake_measure(*, width: int, **_kwargs: object) -> tuple[str, str, list[EncoderTrial]]:
+            speed = 60 * 3.5 if width <= 1920 else 60 * 1.5
+            return "libx264", "veryfast", [_trial("libx264", "veryfast", speed)]
+
+        monkeypatch.setattr(hardware, "measure_encoder_choice", fake_measure)
+        recommendation = hardware.recommend_measured(Settings(), registry)  # type: ignore[arg-type]
+        assert recommendation.settings.resolution == "1920x1080"
+        assert recommendation.trial is not None
+
+
+class TestParallelProbes:
+    """``detect_best_encoder`` probes a whole family at once."""
+
+    def test_a_higher_rank_wins_even_when_it_answers_last(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        libx264_answered = threading.Event()
+
+        def probe(codec: str, **_kwargs: object) -> bool:
+            if codec == "libx264":
+                libx264_answered.set()
+                return True
+            # NVENC only answers after the software encoder has passed.
+            assert libx264_answered.wait(5.0)
+            return codec == "h264_nvenc"
+
+        monkeypatch.setattr(hardware, "_probe_encoder", probe)
+
+        assert hardware.detect_best_encoder() == "h264_nvenc"
+
+    def test_the_rest_are_cancelled_once_the_answer_is_known(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cancelled: list[str] = []
+
+        def probe(codec: str, *, cancel: threading.Event, **_kwargs: object) -> bool:
+            if codec == "h264_nvenc":
+                return True
+            # Everything else hangs until told to stop, as a wedged driver would.
+            if cancel.wait(5.0):
+                cancelled.append(codec)
+            return False
+
+        monkeypatch.setattr(hardware, "_probe_encoder", probe)
+
+        assert hardware.detect_best_encoder() == "h264_nvenc"
+        # The pool is not waited on, so the losers report in their own time.
+        deadline = time.monotonic() + 5.0
+        while len(cancelled) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sorted(cancelled) == ["h264_amf", "h264_qsv", "libx264"]
+
+    def test_a_probe_past_the_shared_deadline_counts_as_a_failure(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(hardware, "_PROBE_DEADLINE", 0.2)
+
+        def probe(codec: str, *, cancel: threading.Event, **_kwargs: object) -> bool:
+            if codec == "h264_nvenc":
+                cancel.wait(5.0)
+            return codec == "h264_qsv"
+
+        monkeypatch.setattr(hardware, "_probe_encoder", probe)
+
+        assert hardware.detect_best_encoder() == "h264_qsv"
+
+    def test_a_cancelled_probe_has_not_passed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def cancelled_run(*_args: object, **_kwargs: object) -> FFmpegResult:
+            raise JobCancelledError("stopped")
+
+        monkeypatch.setattr(hardware, "run_ffmpeg", cancelled_run)
+
+        assert not hardware._probe_encoder("h264_nvenc", cancel=threading.Event())
+
+    def test_what_the_manifest_knows_is_not_probed_again(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        build = SimpleNamespace(
+            has_encoder=lambda codec: codec != "h264_amf",
+            probes={"h264_nvenc": False},
+        )
+        monkeypatch.setattr(hardware, "ffmpeg_capabilities", lambda *_args: build)
+        probed: list[str] = []
+
+        def probe(codec: str, **_kwargs: object) -> bool:
+            probed.append(codec)
+            return True
+
+        monkeypatch.setattr(hardware, "_probe_encoder", probe)
+
+        # NVENC failed last time and AMF is not in the build, so QSV wins, and
+        # libx264 below it is not worth asking about.
+        assert hardware.detect_best_encoder() == "h264_qsv"
+        assert probed == ["h264_qsv"]
+
+    def test_a_known_pass_needs_no_probe_at_all(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        build = SimpleNamespace(has_encoder=lambda _codec: True, probes={"h264_nvenc": True})
+        monkeypatch.setattr(hardware, "ffmpeg_capabilities", lambda *_args: build)
+
+        def explode(codec: str, **_kwargs: object) -> bool:
+            raise AssertionError(f"{codec} should not have been probed")
+
+        monkeypatch.setattr(hardware, "_probe_encoder", explode)
+
+        assert hardware.detect_best_encoder() == "h264_nvenc"
+
+    def test_a_probe_that_answers_is_recorded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        recorded: list[tuple[str, bool]] = []
+        monkeypatch.setattr(
+            hardware, "record_probe", lambda codec, passed: recorded.append((codec, passed))
+        )
+        monkeypatch.setattr(
+            hardware, "run_ffmpeg", lambda argv, **_k: FFmpegResult(argv, 1, "", "no device")
+        )
+
+        assert not hardware._probe_encoder("h264_amf")
+        assert recorded == [("h264_amf", False)]
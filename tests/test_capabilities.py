@@ -0,0 +1,151 @@
+"""Tests for the FFmpeg capability manifest in :mod:`sclip.core.capabilities`.
+
+FFmpeg is never run: the binary is a placeholder file, so its size and
+modification time are real, and ``run_ffmpeg`` is swapped for a fake that
+answers ``-version``, ``-encoders`` and ``-filters`` with trimmed copies of
+what a real build prints, counting how often it was asked. The manifest goes
+to a temp folder, and the process's own memory of it is emptied per test, so
+"a later launch" is simply a test forgetting that memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from sclip.core import capabilities
+from sclip.core.capabilities import ffmpeg_capabilities, record_probe
+from sclip.core.ffmpeg import FFmpegResult
+
+_VERSION = "ffmpeg version 7.1-essentials_build-www.gyan.dev Copyright (c) 2000-2024\n"
+
+_ENCODERS = """\
+Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V....D libvpx-vp9           libvpx VP9 (codec vp9)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+_FILTERS = """\
+Filters:
+  T.. = Timeline support
+  | = Source or sink filter
+ ... ddagrab           |->V       Grab Windows Desktop images using Desktop Duplication API
+ T.. mpdecimate        V->V       Remove near-duplicate frames.
+ ..C scale_d3d11       V->V       Scale video using Direct3D11
+"""
+
+_ANSWERS = {"-version": _VERSION, "-encoders": _ENCODERS, "-filters": _FILTERS}
+
+
+@pytest.fixture()
+def binary(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A placeholder FFmpeg, with the manifest and memory pointed at the sandbox."""
+    placeholder = tmp_path / "ffmpeg" / "ffmpeg.exe"
+    placeholder.parent.mkdir()
+    placeholder.write_bytes(b"MZ")
+    fake_paths = SimpleNamespace(capabilities_file=tmp_path / "config" / "manifest.json")
+    monkeypatch.setattr(capabilities, "app_paths", lambda: fake_paths)
+    monkeypatch.setattr(capabilities, "find_ffmpeg", lambda: placeholder)
+    monkeypatch.setattr(capabilities, "_known", {})
+    return placeholder
+
+
+@pytest.fixture()
+def asked(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Every flag the binary was asked about, in order."""
+    flags: list[str] = []
+
+    def fake_run(argv: list[str], **_kwargs: object) -> FFmpegResult:
+        flags.append(argv[0])
+        return FFmpegResult(argv, 0, _ANSWERS.get(argv[0], ""), "")
+
+    monkeypatch.setattr(capabilities, "run_ffmpeg", fake_run)
+    return flags
+
+
+def _forget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Drop what this process remembers, as a fresh launch would."""
+    monkeypatch.setattr(capabilities, "_known", {})
+
+
+def test_a_new_binary_is_asked_what_it_can_do(binary: Path, asked: list[str]) -> None:
+    found = ffmpeg_capabilities()
+
+    assert found is not None
+    assert found.version == "7.1-essentials_build-www.gyan.dev"
+    assert found.encoders == {"libx264", "h264_nvenc", "libvpx-vp9", "aac"}
+    assert found.filters == {"ddagrab", "mpdecimate", "scale_d3d11"}
+    assert sorted(asked) == ["-encoders", "-filters", "-version"]
+
+
+def test_a_later_launch_reads_the_manifest_instead(
+    binary: Path, asked: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first = ffmpeg_capabilities()
+    asked.clear()
+    _forget(monkeypatch)
+
+    again = ffmpeg_capabilities()
+
+    assert asked == []
+    assert again == first
+
+
+def test_a_replaced_binary_is_asked_again(
+    binary: Path, asked: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ffmpeg_capabilities()
+    asked.clear()
+    _forget(monkeypatch)
+    binary.write_bytes(b"MZ, but a newer build")
+
+    assert ffmpeg_capabilities() is not None
+    assert sorted(asked) == ["-encoders", "-filters", "-version"]
+
+
+def test_a_binary_that_lists_no_encoders_is_unknown_and_not_recorded(
+    binary: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        capabilities, "run_ffmpeg", lambda argv, **_k: FFmpegResult(argv, 0, "", "")
+    )
+
+    assert ffmpeg_capabilities() is None
+    assert not capabilities.app_paths().capabilities_file.exists()
+
+
+def test_probe_results_are_kept_with_the_binary(
+    binary: Path, asked: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    record_probe("h264_nvenc", False)
+    record_probe("libx264", True)
+    _forget(monkeypatch)
+
+    found = ffmpeg_capabilities()
+
+    assert found is not None
+    assert dict(found.probes) == {"h264_nvenc": False, "libx264": True}
+
+
+def test_a_corrupt_manifest_is_rebuilt(binary: Path, asked: list[str]) -> None:
+    manifest = capabilities.app_paths().capabilities_file
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text("{not json", encoding="utf-8")
+
+    assert ffmpeg_capabilities() is not None
+    assert str(binary) in json.loads(manifest.read_text(encoding="utf-8"))["binaries"]
+
+
+def test_no_ffmpeg_means_unknown(binary: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    os.remove(binary)
+
+    assert ffmpeg_capabilities() is None
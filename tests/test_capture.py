@@ -18,7 +18,10 @@ from __future__ import annotations
 
 import threading
 import time
+from collections.abc import Callable
+from dataclasses import replace
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -29,7 +32,12 @@ from sclip.contracts import (
     Settings,
 )
 from sclip.core import capture as capture_module
+from sclip.core import recording as recording_module
+from sclip.core import storage as storage_module
 from sclip.core.capture import FFmpegCaptureEngine
+from sclip.core.recording import load_session, open_session
+from sclip.core.replay_buffer import BufferSpec
+from sclip.core.supervisor import ExitReason, ProcessExit
 from sclip.paths import AppPaths
 
 # Upper bound on how long save_replay_clip itself may take. The fake stitch
@@ -49,7 +57,8 @@ class _FakeRollingBuffer:
     """A drop-in stand-in for :class:`~sclip.core.replay_buffer.RollingBuffer`.
 
     It implements only the surface the capture engine touches: ``start``,
-    ``stop``, ``is_running``, ``set_error_handler`` and ``save_clip``. The
+    ``stop``, ``is_running``, ``set_error_handler``, ``set_exit_handler``,
+    ``save_clip`` and the recording promotion. The
     ``start`` method is a no-op flag flip - no FFmpeg process is involved -
     and ``save_clip`` sleeps to imitate a slow re-encode so a test can prove
     the engine did not block on it.
@@ -73,17 +82,64 @@ class _FakeRollingBuffer:
         # the stitch happened off the calling thread.
         self.save_thread_name: str | None = None
         self.save_calls = 0
+        self.exit_handler: Callable[[ProcessExit], None] | None = None
+        # ``resume`` of every start, and how many upcoming starts should fail.
+        self.starts: list[bool] = []
+        self.specs: list[BufferSpec] = []
+        self.failing_starts = 0
+        self.is_recording = False
+        self.saved_fragmented = False
+        self.saved_seconds: int | None = None
+        self.saved_microphone_level = 1.0
 
     def set_error_handler(self, handler: object) -> None:
         self._error_handler = handler
 
-    def start(self, spec: object) -> None:
+    def set_exit_handler(self, handler: Callable[[ProcessExit], None] | None) -> None:
+        self.exit_handler = handler
+
+    def start(self, spec: BufferSpec, *, resume: bool = False) -> None:
+        self.starts.append(resume)
+        self.specs.append(spec)
+        if self.failing_starts:
+            self.failing_starts -= 1
+            raise RuntimeError("Replay buffer FFmpeg exited immediately (code 1).")
         self.is_running = True
 
+    def die(self, reason: ExitReason = ExitReason.DEVICE_LOST, *, uptime: float = 5.0) -> None:
+        """Play the supervisor reporting the muxer's death."""
+        self.is_running = False
+        assert self.exit_handler is not None
+        self.exit_handler(
+            ProcessExit(label="Replay buffer", returncode=1, reason=reason, uptime_seconds=uptime)
+        )
+
     def stop(self) -> None:
         self.is_running = False
 
-    def save_clip(self, destination: Path) -> Path | None:
+    def begin_recording(self, directory: Path) -> None:
+        if not self.is_running:
+            raise RuntimeError("Cannot record from a replay buffer that is not running")
+        self.is_recording = True
+        # The banked window, moved into the recording.
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "part_000000.ts").write_bytes(b"FAKE_PART\n")
+
+    def end_recording(self) -> None:
+        self.is_recording = False
+
+    @property
+    def spec(self) -> BufferSpec | None:
+        return self.specs[-1] if self.is_running and self.specs else None
+
+    def save_clip(
+        self,
+        destination: Path,
+        *,
+        fragmented: bool = False,
+        seconds: int | None = None,
+        microphone_level: float = 1.0,
+    ) -> Path | None:
         """Pretend to stitch a clip, then succeed, raise, or report an error.
 
         The three modes exist to exercise the engine's worker-completion
@@ -92,6 +148,9 @@ class _FakeRollingBuffer:
         handler before returning ``None`` (R4 H1 regression).
         """
         self.save_calls += 1
+        self.saved_fragmented = fragmented
+        self.saved_seconds = seconds
+        self.saved_microphone_level = microphone_level
         self.save_thread_name = threading.current_thread().name
         if self._stitch_seconds:
             time.sleep(self._stitch_seconds)
@@ -134,6 +193,12 @@ class _FakeDeviceRegistry:
     def audio_devices(self) -> list[AudioDevice]:
         return []
 
+    def refresh(self) -> None:
+        pass
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        pass
+
 
 @pytest.fixture()
 def sandbox_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
@@ -153,11 +218,19 @@ def sandbox_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
         config_dir=tmp_path / "config",
         settings_file=tmp_path / "config" / "settings.json",
         update_state_file=tmp_path / "config" / "update-check.json",
+        capabilities_file=tmp_path / "config" / "ffmpeg-capabilities.json",
+        devices_file=tmp_path / "config" / "devices.json",
         clips_dir=data_dir / "clips",
         replay_buffer_dir=data_dir / "replay_buffer",
+        recordings_dir=data_dir / "recordings",
         log_file=data_dir / "logs" / "sclip.log",
     )
     monkeypatch.setattr(capture_module, "app_paths", lambda: fake_paths)
+    # Keep automatic placement off any real RAM disk, and skip the write probe.
+    monkeypatch.setattr(storage_module, "ram_disk_roots", lambda: [])
+    monkeypatch.setattr(storage_module, "measure_write_speed", lambda _directory: 1e12)
+    # Try every backend, whatever FFmpeg this machine happens to have.
+    monkeypatch.setattr(capture_module, "ffmpeg_capabilities", lambda *_args: None)
     return tmp_path
 
 
@@ -286,6 +359,102 @@ def test_save_replay_clip_notifies_clip_listener_when_done(
         engine.shutdown()
 
 
+def test_the_clip_layout_follows_the_setting(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False, capture_desktop_audio=False, fragmented_mp4=True))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+        engine.save_replay_clip()
+
+        assert _wait_for(lambda: engine.state is CaptureState.BUFFERING)
+        assert buffer.saved_fragmented
+    finally:
+        engine.shutdown()
+
+
+def test_the_h264_copy_follows_the_encoder_the_buffer_runs(
+    sandbox_paths: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    exports: list[int] = []
+
+    def fake_transcode(_source: Path, _destination: Path, *, crf: int) -> bool:
+        exports.append(crf)
+        return False
+
+    monkeypatch.setattr(capture_module, "transcode_to_h264", fake_transcode)
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(
+        Settings(
+            capture_audio=False,
+            capture_desktop_audio=False,
+            encoder="hevc_nvenc",
+            crf=28,
+            h264_export=True,
+        )
+    )
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+        # An H.264 buffer with the switch to HEVC still pending: the clip is
+        # already H.264, so no copy is made.
+        buffer.specs[-1] = replace(buffer.specs[-1], encoder="libx264", crf=20)
+        engine.save_replay_clip()
+        assert _wait_for(lambda: engine.state is CaptureState.BUFFERING)
+        assert exports == []
+
+        # An HEVC buffer at its own CRF: the copy follows that, not the settings.
+        buffer.specs[-1] = replace(buffer.specs[-1], encoder="hevc_nvenc", crf=24)
+        engine.save_replay_clip()
+        assert _wait_for(lambda: exports == [24])
+    finally:
+        engine.shutdown()
+
+
+def test_a_short_clip_asks_the_buffer_for_its_length(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False, capture_desktop_audio=False))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+        engine.save_replay_clip(10)
+
+        assert _wait_for(lambda: engine.state is CaptureState.BUFFERING)
+        assert buffer.saved_seconds == 10
+    finally:
+        engine.shutdown()
+
+
+def test_a_new_microphone_level_is_used_without_rearming_the_buffer(
+    sandbox_paths: Path,
+) -> None:
+    """Split tracks are mixed at save, so the footage already buffered is kept."""
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    settings = Settings(capture_audio=False, capture_desktop_audio=False)
+    store.save(settings)
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+        store.save(replace(settings, microphone_level=40))
+        engine.reload_settings()
+        assert buffer.starts == [False]
+
+        engine.save_replay_clip()
+        assert _wait_for(lambda: engine.state is CaptureState.BUFFERING)
+        assert buffer.saved_microphone_level == pytest.approx(0.4)
+
+        # Anything else still re-arms it.
+        store.save(replace(settings, microphone_level=40, fps=30))
+        engine.reload_settings()
+        assert buffer.starts == [False, False]
+    finally:
+        engine.shutdown()
+
+
 def test_save_replay_clip_is_a_no_op_when_not_buffering(
     fast_engine: FFmpegCaptureEngine,
 ) -> None:
@@ -413,3 +582,344 @@ def test_a_second_save_while_one_is_in_flight_is_ignored(
         assert buffer.save_calls == 1, "a second save worker should not have started"
     finally:
         engine.shutdown()
+
+
+# ------------------------------------------------------------- supervision
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = _NOTIFY_TIMEOUT_SECONDS) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture()
+def quick_restarts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(capture_module, "_RESTART_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(capture_module, "_RESTART_BACKOFF_MAX", 0.02)
+
+
+@pytest.fixture()
+def instant_join(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """Stand in for the FFmpeg join that turns a recording's parts into an MP4."""
+    joins: list[list[str]] = []
+
+    def fake_join(segments: list[Path], destination: Path, *_args: object, **_kw: object) -> bool:
+        joins.append([segment.name for segment in segments])
+        destination.write_bytes(b"FAKE_RECORDING\n")
+        return True
+
+    monkeypatch.setattr(recording_module, "join_segments", fake_join)
+    return joins
+
+
+def _engine_with(buffer: _FakeRollingBuffer) -> FFmpegCaptureEngine:
+    return FFmpegCaptureEngine(
+        _FakeSettingsStore(),
+        _FakeDeviceRegistry(),
+        buffer_factory=lambda _directory: buffer,
+    )
+
+
+@pytest.mark.usefixtures("quick_restarts")
+def test_a_buffer_that_dies_is_resumed_without_an_error(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    errors: list[str] = []
+    engine.add_error_listener(errors.append)
+    try:
+        engine.start_replay_buffer()
+        buffer.die()
+
+        assert _wait_for(lambda: buffer.is_running)
+        # The first start is fresh; the restart keeps the banked segments.
+        assert buffer.starts == [False, True]
+        assert engine.state is CaptureState.BUFFERING
+        assert errors == []
+    finally:
+        engine.shutdown()
+
+
+@pytest.mark.usefixtures("quick_restarts")
+def test_repeated_failures_end_in_one_error(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    errors: list[str] = []
+    engine.add_error_listener(errors.append)
+    try:
+        engine.start_replay_buffer()
+        # Every restart fails on both backends.
+        buffer.failing_starts = 100
+        buffer.die()
+
+        assert _wait_for(lambda: engine.state is CaptureState.ERROR)
+        assert len(errors) == 1
+        assert errors[0].startswith("The replay buffer could not be restarted")
+        restarts = buffer.starts[1:]
+        assert all(restarts) and len(restarts) == 2 * capture_module._MAX_BUFFER_RESTARTS
+    finally:
+        engine.shutdown()
+
+
+def test_a_full_disk_is_reported_rather_than_retried(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    errors: list[str] = []
+    engine.add_error_listener(errors.append)
+    try:
+        engine.start_replay_buffer()
+        buffer.die(ExitReason.DISK_FULL)
+
+        assert errors == ["The replay buffer stopped: the disk is full."]
+        assert engine.state is CaptureState.ERROR
+        assert buffer.starts == [False]
+    finally:
+        engine.shutdown()
+
+
+def test_the_window_is_fitted_to_the_disk_budget(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False, replay_seconds=30, buffer_budget_mb=20))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+
+        (spec,) = buffer.specs
+        assert 0 < spec.seconds < 30
+        assert spec.directory == sandbox_paths / "data" / "replay_buffer"
+    finally:
+        engine.shutdown()
+
+
+def test_a_software_encoder_is_held_to_the_cpu_budget(
+    sandbox_paths: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(capture_module, "budget_cores", lambda _encoder, percent: frozenset({6, 7}))
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False, cpu_budget_percent=25))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+
+        (spec,) = buffer.specs
+        assert spec.cores == frozenset({6, 7})
+        assert spec.capture_args[list(spec.capture_args).index("-threads") + 1] == "2"
+    finally:
+        engine.shutdown()
+
+
+def test_an_ffmpeg_without_ddagrab_goes_straight_to_gdigrab(
+    sandbox_paths: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    build = SimpleNamespace(has_filter=lambda name: name != "ddagrab")
+    monkeypatch.setattr(capture_module, "ffmpeg_capabilities", lambda *_args: build)
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+
+        (spec,) = buffer.specs
+        assert "gdigrab" in spec.capture_args
+    finally:
+        engine.shutdown()
+
+
+def test_a_window_the_disk_cannot_hold_is_refused(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False, buffer_budget_mb=1))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    errors: list[str] = []
+    engine.add_error_listener(errors.append)
+    try:
+        with pytest.raises(RuntimeError, match="not enough space"):
+            engine.start_replay_buffer()
+
+        assert buffer.starts == []
+        assert engine.state is CaptureState.ERROR
+        assert len(errors) == 1
+    finally:
+        engine.shutdown()
+
+
+@pytest.mark.usefixtures("quick_restarts")
+def test_a_restart_keeps_the_buffer_where_it_was(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+        # Settings that would place a fresh buffer elsewhere.
+        store.save(Settings(capture_audio=False, buffer_dir=str(sandbox_paths / "elsewhere")))
+        buffer.die()
+
+        assert _wait_for(lambda: buffer.is_running)
+        assert buffer.specs[1].directory == buffer.specs[0].directory
+    finally:
+        engine.shutdown()
+
+
+def test_stopping_the_buffer_cancels_a_pending_restart(sandbox_paths: Path) -> None:
+    # Real backoff: the restart is still sleeping when the user stops.
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    try:
+        engine.start_replay_buffer()
+        buffer.die()
+        engine.stop_replay_buffer()
+        time.sleep(capture_module._RESTART_BACKOFF_BASE + 0.3)
+
+        assert buffer.starts == [False]
+        assert engine.state is CaptureState.IDLE
+    finally:
+        engine.shutdown()
+
+
+def test_a_device_arriving_cuts_a_restart_backoff_short(sandbox_paths: Path) -> None:
+    # Real backoff: without the device change the restart would still sleep.
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    try:
+        engine.start_replay_buffer()
+        buffer.die()
+        engine._on_devices_changed()
+
+        assert _wait_for(
+            lambda: buffer.is_running, timeout=capture_module._RESTART_BACKOFF_BASE / 2
+        )
+        assert buffer.starts == [False, True]
+    finally:
+        engine.shutdown()
+
+
+def test_a_death_after_a_long_run_starts_a_fresh_count(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    try:
+        engine.start_replay_buffer()
+        engine._restart_failures = capture_module._MAX_BUFFER_RESTARTS
+        buffer.die(uptime=capture_module._STABLE_UPTIME + 1)
+
+        assert engine.state is CaptureState.BUFFERING
+        assert engine._restart_failures == 1
+    finally:
+        engine.shutdown()
+
+
+# ------------------------------------------------------- promoted recording
+
+
+@pytest.mark.usefixtures("instant_join")
+def test_recording_while_buffering_promotes_the_buffer(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    clips: list[Path] = []
+    engine.add_clip_listener(clips.append)
+    try:
+        engine.start_replay_buffer()
+        engine.start_manual_recording()
+
+        assert engine.state is CaptureState.RECORDING
+        assert buffer.is_recording
+        # No second capture: the buffer's own FFmpeg is the recording.
+        assert engine._manual_process is None
+        assert buffer.starts == [False]
+
+        saved = engine.stop_manual_recording()
+
+        assert saved is not None and saved.name.startswith("recording_")
+        assert saved.parent == sandbox_paths / "data" / "clips"
+        assert clips == [saved]
+        # The session's parts were joined and cleared away.
+        assert list((sandbox_paths / "data" / "recordings").iterdir()) == []
+        assert not buffer.is_recording
+        assert buffer.is_running
+        assert engine.state is CaptureState.BUFFERING
+    finally:
+        engine.shutdown()
+
+
+@pytest.mark.usefixtures("instant_join")
+def test_a_promoted_recording_keeps_the_buffers_frame_rate_mode(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    store = _FakeSettingsStore()
+    store.save(Settings(capture_audio=False, capture_desktop_audio=False, variable_frame_rate=True))
+    engine = FFmpegCaptureEngine(store, _FakeDeviceRegistry(), buffer_factory=lambda _d: buffer)
+    try:
+        engine.start_replay_buffer()
+        # A capture that cannot decimate runs at a constant rate whatever the setting.
+        buffer.specs[-1] = replace(buffer.specs[-1], variable_frame_rate=False)
+        engine.start_manual_recording()
+
+        session = engine._manual_session
+        assert session is not None
+        assert not load_session(session.directory).variable_frame_rate
+        engine.stop_manual_recording()
+    finally:
+        engine.shutdown()
+
+
+@pytest.mark.usefixtures("instant_join")
+def test_stopping_the_buffer_saves_a_promoted_recording(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    clips: list[Path] = []
+    engine.add_clip_listener(clips.append)
+    try:
+        engine.start_replay_buffer()
+        engine.start_manual_recording()
+        engine.stop_replay_buffer()
+
+        assert len(clips) == 1
+        assert engine.state is CaptureState.IDLE
+    finally:
+        engine.shutdown()
+
+
+@pytest.mark.usefixtures("instant_join")
+def test_a_buffer_lost_mid_recording_still_saves_what_it_banked(sandbox_paths: Path) -> None:
+    buffer = _FakeRollingBuffer(sandbox_paths)
+    engine = _engine_with(buffer)
+    clips: list[Path] = []
+    errors: list[str] = []
+    engine.add_clip_listener(clips.append)
+    engine.add_error_listener(errors.append)
+    try:
+        engine.start_replay_buffer()
+        engine.start_manual_recording()
+        buffer.die(ExitReason.DISK_FULL)
+
+        assert _wait_for(lambda: len(clips) == 1)
+        assert errors == ["The replay buffer stopped: the disk is full."]
+        assert engine.state is CaptureState.ERROR
+    finally:
+        engine.shutdown()
+
+
+def test_unfinished_recordings_are_recovered_and_announced(
+    sandbox_paths: Path, instant_join: list[list[str]]
+) -> None:
+    recordings_dir = sandbox_paths / "data" / "recordings"
+    destination = sandbox_paths / "data" / "clips" / "recording_crashed.mp4"
+    orphan = open_session(recordings_dir, destination, Settings())
+    (orphan.directory / "part_000000.ts").write_bytes(b"a")
+    (orphan.directory / "part_000001.ts").write_bytes(b"b")
+    engine = FFmpegCaptureEngine(
+        _FakeSettingsStore(), _FakeDeviceRegistry(), buffer_factory=_FakeRollingBuffer
+    )
+    clips: list[Path] = []
+    engine.add_clip_listener(clips.append)
+    try:
+        assert engine.recover_recordings() == [destination]
+        assert clips == [destination]
+        assert instant_join == [["part_000000.ts", "part_000001.ts"]]
+        assert not orphan.directory.exists()
+    finally:
+        engine.shutdown()
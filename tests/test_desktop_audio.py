@@ -4,15 +4,30 @@ The loop itself is testable without WASAPI: it asks a stream how many frames
 are ready, writes either those frames or silence, and paces itself. Standing in
 a fake stream and a fake pipe exercises exactly the behaviour that was wrong,
 on any machine, without needing a loopback device or a sound to be playing.
+A clocked stream that hands over audio in real time, as a device does, lets
+the figures the pump reports about itself - CPU per second of audio, writes
+per second, jitter - be checked as well. Clock drift is measured over hours,
+so it is tested against a simulated device fed to the meter on a made-up
+timeline rather than in real time.
 """
 
 from __future__ import annotations
 
+import random
 import threading
 import time
 from typing import Any
 
-from sclip.core.desktop_audio import _READ_FRAMES, DesktopAudioPump
+import pytest
+
+from sclip.core import desktop_audio
+from sclip.core.desktop_audio import (
+    _READ_FRAMES,
+    _WRITE_LATENCY,
+    DesktopAudioPump,
+    PumpStats,
+    _DriftMeter,
+)
 
 _RATE = 48000
 _CHANNELS = 2
@@ -35,26 +50,69 @@ class _Stream:
         return self._payload
 
 
+class _ClockedStream:
+    """Loopback stream stand-in that produces audio in real time.
+
+    Like a WASAPI endpoint it hands over whole device periods, here 10 ms,
+    as they fall due, and the samples are non-zero so they cannot be
+    mistaken for padding.
+    """
+
+    _PERIOD = _RATE // 100
+
+    def __init__(self, ppm: float = 0.0) -> None:
+        self._rate = _RATE * (1 + ppm * 1e-6)
+        self._started = time.monotonic()
+        self._delivered = 0
+
+    def get_read_available(self) -> int:
+        ready = int((time.monotonic() - self._started) * self._rate) - self._delivered
+        return ready - ready % self._PERIOD
+
+    def read(self, frames: int, exception_on_overflow: bool = True) -> bytes:
+        self._delivered += frames
+        return b"\x01" * (frames * _CHANNELS * 2)
+
+
+class _Converter:
+    """Converter stand-in: doubles each byte value and records corrections."""
+
+    sample_rate = _RATE
+
+    def __init__(self) -> None:
+        self.corrections: list[float] = []
+
+    def correct(self, ppm: float) -> None:
+        self.corrections.append(ppm)
+
+    def __call__(self, chunk: bytes) -> bytes:
+        return bytes(2 * value for value in chunk)
+
+
 class _Pipe:
-    """Records what the pump writes; never refuses."""
+    """Records what the pump writes, and what it wrote from; never refuses."""
 
     def __init__(self, accept: int = 10_000) -> None:
         self.writes: list[bytes] = []
+        self.sources: set[int] = set()
         self._accept = accept
 
-    def write(self, data: bytes) -> bool:
+    def write(self, data: bytes | memoryview) -> bool:
         if len(self.writes) >= self._accept:
             return False
-        self.writes.append(data)
+        # A view is only valid until the pump reuses its buffer, as with a
+        # real pipe, so what arrived is copied here.
+        self.writes.append(bytes(data))
+        self.sources.add(id(data.obj) if isinstance(data, memoryview) else id(data))
         return True
 
 
-def _pump_for(stream: Any, pipe: Any, seconds: float) -> DesktopAudioPump:
+def _pump_for(stream: Any, pipe: Any, seconds: float) -> PumpStats:
     """Run the write loop on a thread for a short while, then stop it."""
     pump = DesktopAudioPump()
+    result: list[PumpStats] = []
     thread = threading.Thread(
-        target=pump._pump_until_stopped,
-        args=(stream, pipe, _RATE, _CHANNELS),
+        target=lambda: result.append(pump._pump_until_stopped(stream, pipe, _RATE, _CHANNELS)),
         daemon=True,
     )
     thread.start()
@@ -62,7 +120,7 @@ def _pump_for(stream: Any, pipe: Any, seconds: float) -> DesktopAudioPump:
     pump._stop_event.set()
     thread.join(timeout=5.0)
     assert not thread.is_alive(), "the pump loop did not stop when asked"
-    return pump
+    return result[0]
 
 
 def test_silence_still_keeps_the_pipe_moving() -> None:
@@ -101,7 +159,8 @@ def test_real_audio_is_forwarded_rather_than_replaced() -> None:
     _pump_for(stream, pipe, seconds=0.3)
 
     assert stream.reads > 0, "ready frames were never read"
-    assert payload in pipe.writes, "captured audio was not forwarded"
+    # Reads are gathered into larger writes, so look in what the reader saw.
+    assert payload in b"".join(pipe.writes), "captured audio was not forwarded"
 
 
 def test_the_loop_paces_itself_instead_of_spinning() -> None:
@@ -164,3 +223,154 @@ def test_a_stream_without_get_read_available_still_works() -> None:
 
     assert stream.reads > 0, "the fallback path never read from the stream"
     assert pipe.writes
+
+
+def test_writes_are_batched_rather_than_made_per_read() -> None:
+    """Each WriteFile is a syscall; one per device period is far too many."""
+    stream = _ClockedStream()
+    pipe = _Pipe()
+
+    stats = _pump_for(stream, pipe, seconds=1.0)
+
+    assert 0.8 < stats.audio_seconds < 1.2
+    assert stats.writes_per_second <= 1.5 / _WRITE_LATENCY
+    assert set(b"".join(pipe.writes)) == {1}, "silence was mixed into flowing audio"
+
+
+def test_silence_comes_from_the_pumps_own_buffer() -> None:
+    """Padding is copied into one preallocated buffer, not made per write."""
+    pipe = _Pipe()
+
+    _pump_for(_Stream(available=0), pipe, seconds=0.3)
+
+    assert len(pipe.writes) > 1
+    assert len(pipe.sources) == 1
+
+
+def test_the_pump_reports_what_it_cost() -> None:
+    """CPU per second of audio and jitter are measured, and stay small."""
+    stats = _pump_for(_ClockedStream(), _Pipe(), seconds=1.0)
+
+    assert stats.writes > 0
+    # A loop that polled or spun would use most of a core.
+    assert stats.cpu_per_audio_second < 0.25
+    assert stats.worst_jitter < _WRITE_LATENCY
+
+
+def test_reads_go_through_the_converter_on_their_way_to_the_pipe() -> None:
+    """What the pipe carries is the converter's output, not the device's."""
+    payload = b"\x01" * _CHUNK_BYTES
+    stream = _Stream(available=_READ_FRAMES, payload=payload)
+    pipe = _Pipe()
+    pump = DesktopAudioPump()
+    thread = threading.Thread(
+        target=pump._pump_until_stopped,
+        args=(stream, pipe, _RATE, _CHANNELS, _Converter()),
+        daemon=True,
+    )
+    thread.start()
+    time.sleep(0.2)
+    pump._stop_event.set()
+    thread.join(timeout=5.0)
+
+    assert set(b"".join(pipe.writes)) == {2}
+
+
+# ---------------------------------------------------------------- drift
+
+
+def _simulate_session(meter: _DriftMeter, ppm: float, hours: float) -> None:
+    """Feed ``meter`` a device drifting by ``ppm`` through a long session.
+
+    Audio plays in bursts of up to a few minutes with silences in between,
+    as a game session does. Whole 10 ms periods are delivered, each read
+    late by a random fraction of a period as a busy pump would be.
+    """
+    rng = random.Random(49)
+    rate = _RATE * (1 + ppm * 1e-6)
+    period = _RATE // 100
+    now = 0.0
+    while now < hours * 3600:
+        burst = rng.uniform(5, 300)
+        produced = 0.0
+        delivered = 0
+        started = now
+        while now - started < burst:
+            now += period / rate
+            produced += period
+            if rng.random() < 0.1:
+                continue  # the pump was busy; this period waits for the next read
+            read = int(produced) - delivered
+            meter.observe(read, 0, now + rng.uniform(0, 0.005))
+            delivered += read
+        now += rng.uniform(1, 120)
+
+
+@pytest.mark.parametrize("ppm", [-180.0, 0.0, 95.0])
+def test_drift_is_measured_over_a_long_session(ppm: float) -> None:
+    meter = _DriftMeter(_RATE)
+
+    _simulate_session(meter, ppm, hours=2)
+
+    assert meter.ppm is not None
+    assert abs(meter.ppm - ppm) < 2
+
+
+def test_drift_is_not_reported_before_it_has_settled() -> None:
+    meter = _DriftMeter(_RATE)
+
+    for tick in range(1, 1000):  # ten seconds of a wildly fast device
+        meter.observe(2 * _RATE // 100, 0, tick / 100)
+
+    assert meter.seconds > 9
+    assert meter.ppm is None
+
+
+def test_a_backlog_after_silence_is_not_counted_as_drift(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Audio that piled up before a read was not produced after it."""
+    monkeypatch.setattr(desktop_audio, "_DRIFT_SETTLE", 1.0)
+    meter = _DriftMeter(_RATE)
+    now = 0.0
+    for _ in range(3):
+        # Resuming after a silence, four reads' worth is already waiting.
+        for backlog in (3, 2, 1, 0):
+            meter.observe(_READ_FRAMES, backlog * _READ_FRAMES, now)
+        for _ in range(200):
+            now += 0.01
+            meter.observe(_RATE // 100, 0, now)
+        now += 5.0
+
+    assert meter.ppm is not None
+    assert abs(meter.ppm) < 1
+
+
+def test_the_pump_corrects_the_converter_for_measured_drift(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(desktop_audio, "_DRIFT_SETTLE", 0.5)
+    monkeypatch.setattr(desktop_audio, "_DRIFT_UPDATE", 0.1)
+    convert = _Converter()
+    pump = DesktopAudioPump()
+    result: list[PumpStats] = []
+    thread = threading.Thread(
+        target=lambda: result.append(
+            pump._pump_until_stopped(_ClockedStream(ppm=50_000), _Pipe(), _RATE, _CHANNELS, convert)
+        ),
+        daemon=True,
+    )
+    thread.start()
+    time.sleep(1.0)
+    live = pump.drift_ppm
+    pump._stop_event.set()
+    thread.join(timeout=5.0)
+
+    stats = result[0]
+    assert live is not None
+    assert stats.drift_ppm is not None
+    assert convert.corrections, "the converter was never told about the drift"
+    # A second of real time cannot resolve a few ppm, so the device runs 5%
+    # fast: far past the clamp, which is all the converter should be given.
+    assert stats.drift_ppm > desktop_audio._MAX_DRIFT_PPM
+    assert set(convert.corrections) == {desktop_audio._MAX_DRIFT_PPM}
@@ -9,7 +9,9 @@ fast and deterministic.
 from __future__ import annotations
 
 import subprocess
+import threading
 from dataclasses import dataclass
+from pathlib import Path
 
 import pytest
 
@@ -223,28 +225,164 @@ def test_monitors_returns_empty_when_screeninfo_fails(
 # --------------------------------------------------------------- refresh()
 
 
-def test_refresh_invalidates_cached_results(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setattr(devices_module, "_resolve_ffmpeg", lambda: "C:/fake/ffmpeg.exe")
+@pytest.fixture()
+def dshow(monkeypatch: pytest.MonkeyPatch) -> dict[str, object]:
+    """A dshow probe whose output the test controls, counting its runs.
 
-    # First call returns one device; refresh; next call returns two.
-    state: dict[str, str] = {"blob": _REAL_DSHOW_OUTPUT}
+    ``blob`` is what FFmpeg prints, or ``None`` for a probe that times out.
+    Monitors come from a fake screeninfo reporting ``monitors``.
+    """
+    state: dict[str, object] = {"blob": _REAL_DSHOW_OUTPUT, "runs": 0, "monitors": []}
+    monkeypatch.setattr(devices_module, "_resolve_ffmpeg", lambda: "C:/fake/ffmpeg.exe")
 
     def fake_run(*_args: object, **_kwargs: object) -> _FakeCompletedProcess:
-        return _FakeCompletedProcess(returncode=1, stderr=state["blob"])
+        state["runs"] = int(state["runs"]) + 1  # type: ignore[call-overload]
+        if state["blob"] is None:
+            raise subprocess.TimeoutExpired(cmd="ffmpeg", timeout=15.0)
+        return _FakeCompletedProcess(returncode=1, stderr=str(state["blob"]))
 
     monkeypatch.setattr(subprocess, "run", fake_run)
+    _install_fake_screeninfo(monkeypatch, lambda: state["monitors"])
+    return state
+
+
+def _listen(registry: SystemDeviceRegistry) -> threading.Event:
+    changed = threading.Event()
+    registry.add_change_listener(changed.set)
+    return changed
+
+
+def _settle(registry: SystemDeviceRegistry) -> None:
+    """Wait for any background scan to finish."""
+    for thread in threading.enumerate():
+        if thread.name == "sclip-device-scan":
+            thread.join(5.0)
+
 
+def test_refresh_picks_up_a_new_device_and_says_so(dshow: dict[str, object]) -> None:
     registry = SystemDeviceRegistry()
     first = registry.audio_devices()
+    changed = _listen(registry)
 
     # Swap the source data and verify the cache still serves the first result.
-    state["blob"] = ""
-    cached = registry.audio_devices()
-    assert cached == first
+    dshow["blob"] = ""
+    assert registry.audio_devices() == first
 
-    # After refresh, the next call sees the new (empty) source.
+    # After refresh the scan sees the new (empty) source, and tells us.
     registry.refresh()
+    assert changed.wait(5.0)
+    assert registry.audio_devices() == []
+
+
+def test_a_refresh_that_finds_the_same_devices_is_silent(dshow: dict[str, object]) -> None:
+    registry = SystemDeviceRegistry()
+    registry.monitors()
+    registry.audio_devices()
+    changed = _listen(registry)
+
+    registry.refresh()
+    _settle(registry)
+
+    assert dshow["runs"] == 2
+    assert not changed.is_set()
+
+
+def test_a_refresh_reports_a_new_monitor(dshow: dict[str, object]) -> None:
+    registry = SystemDeviceRegistry()
+    assert registry.monitors() == []
+    changed = _listen(registry)
+    dshow["monitors"] = [_fake_screeninfo_monitor(x=0, y=0, width=1920, height=1080)]
+
+    registry.refresh()
+
+    assert changed.is_set()
+    assert [m.width for m in registry.monitors()] == [1920]
+
+
+def test_a_probe_that_fails_keeps_the_devices_it_had(dshow: dict[str, object]) -> None:
+    registry = SystemDeviceRegistry()
+    first = registry.audio_devices()
+    changed = _listen(registry)
+    dshow["blob"] = None
+
+    registry.refresh()
+    _settle(registry)
+
+    assert registry.audio_devices() == first
+    assert not changed.is_set()
+
+
+# ------------------------------------------------------------- device file
+
+
+def test_a_first_launch_waits_for_the_probe_and_remembers_it(
+    dshow: dict[str, object], tmp_path: Path
+) -> None:
+    cache = tmp_path / "devices.json"
+
+    devices = SystemDeviceRegistry(cache).audio_devices()
+
+    assert dshow["runs"] == 1
+    assert AudioDevice(name="Line In (Focusrite USB Audio)", kind="input") in devices
+    assert cache.exists()
+
+
+def test_a_later_launch_answers_from_the_file_then_checks(
+    dshow: dict[str, object], tmp_path: Path
+) -> None:
+    cache = tmp_path / "devices.json"
+    remembered = SystemDeviceRegistry(cache).audio_devices()
+    # The headset was unplugged while S-Clip was closed.
+    dshow["blob"] = ""
+
+    registry = SystemDeviceRegistry(cache)
+    changed = _listen(registry)
+
+    assert registry.audio_devices() == remembered
+    assert changed.wait(5.0)
     assert registry.audio_devices() == []
+    assert SystemDeviceRegistry(cache).audio_devices() == []
+
+
+def test_a_refresh_before_the_first_lookup_still_remembers_the_devices(
+    dshow: dict[str, object], tmp_path: Path
+) -> None:
+    cache = tmp_path / "devices.json"
+    registry = SystemDeviceRegistry(cache)
+    changed = _listen(registry)
+
+    registry.refresh()
+    _settle(registry)
+
+    # Nothing was known before, so nothing changed - but the next launch
+    # should not have to wait for the probe.
+    assert not changed.is_set()
+    assert cache.exists()
+    assert SystemDeviceRegistry(cache).audio_devices() == registry.audio_devices()
+
+
+def test_an_unreadable_file_means_probing_again(dshow: dict[str, object], tmp_path: Path) -> None:
+    cache = tmp_path / "devices.json"
+    cache.write_text("{not json", encoding="utf-8")
+
+    assert SystemDeviceRegistry(cache).audio_devices() != []
+    assert dshow["runs"] == 1
+
+
+def test_a_failing_listener_does_not_silence_the_others(dshow: dict[str, object]) -> None:
+    registry = SystemDeviceRegistry()
+    registry.monitors()
+
+    def explode() -> None:
+        raise RuntimeError("listener broke")
+
+    registry.add_change_listener(explode)
+    changed = _listen(registry)
+    dshow["monitors"] = [_fake_screeninfo_monitor(x=0, y=0, width=1920, height=1080)]
+
+    registry.refresh()
+
+    assert changed.is_set()
 
 
 # ------------------------------------------------------------- live FFmpeg
@@ -0,0 +1,710 @@
+"""Tests for the capture command lines built in :mod:`sclip.core.ffmpeg`.
+
+Nothing here runs FFmpeg. The argv is the contract between the settings and the
+capture, so these pin down the parts of it that a wrong guess would turn into a
+stuttering or unplayable clip rather than an error message.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from sclip.contracts import Monitor
+from sclip.core import ffmpeg as ffmpeg_module
+from sclip.core.ffmpeg import (
+    AudioConfig,
+    CapturePlan,
+    JobCancelledError,
+    JobClass,
+    MediaLayout,
+    ResourceUsage,
+    StderrPump,
+    VideoBackend,
+    _argv_with_binary,
+    apply_job_priority,
+    budget_cores,
+    build_capture_io,
+    build_encoder_args,
+    build_quality_args,
+    count_video_frames,
+    encoder_thread_args,
+    fit_output_size,
+    frames_can_be_decimated,
+    mix_audio_filter,
+    mp4_layout_args,
+    mp4_tag_args,
+    popen_kwargs,
+    probe_media_layout,
+    run_at_priority,
+    stream_into_ffmpeg,
+    wait_for_exit,
+)
+from sclip.core.region import CaptureRegion
+
+
+def _plan(
+    encoder: str = "libx264",
+    *,
+    output_size: tuple[int, int] | None = None,
+    scaler: str = "bilinear",
+    variable_frame_rate: bool = False,
+    region: CaptureRegion | None = None,
+    cores: frozenset[int] | None = None,
+) -> CapturePlan:
+    return CapturePlan(
+        monitor=Monitor(name="Main", x=0, y=0, width=3840, height=2160, is_primary=True),
+        monitor_index=0,
+        fps=60,
+        encoder=encoder,
+        preset="veryfast" if encoder == "libx264" else "p5",
+        crf=21,
+        audio=AudioConfig(),
+        output_size=output_size,
+        scaler=scaler,
+        variable_frame_rate=variable_frame_rate,
+        region=region,
+        cores=cores,
+    )
+
+
+def _graph(argv: list[str]) -> str:
+    return argv[argv.index("-filter_complex") + 1]
+
+
+# ------------------------------------------------------------------ output size
+
+
+class TestFitOutputSize:
+    def test_matching_the_display_needs_no_resize(self) -> None:
+        assert fit_output_size((1920, 1080), (1920, 1080)) is None
+
+    def test_a_larger_target_never_upscales(self) -> None:
+        assert fit_output_size((1920, 1080), (3840, 2160)) is None
+
+    def test_a_same_shaped_target_is_used_exactly(self) -> None:
+        assert fit_output_size((3840, 2160), (1920, 1080)) == (1920, 1080)
+
+    def test_the_aspect_ratio_survives_a_differently_shaped_target(self) -> None:
+        # A 16:10 display asked for 16:9 is fitted inside the box, not squashed.
+        assert fit_output_size((2560, 1600), (1920, 1080)) == (1728, 1080)
+
+    def test_both_sides_come_out_even(self) -> None:
+        width, height = fit_output_size((2560, 1440), (1001, 1001)) or (0, 0)
+        assert width % 2 == 0 and height % 2 == 0
+
+
+# ------------------------------------------------------------------ resize stage
+
+
+class TestResizeStage:
+    def test_native_capture_has_no_resize(self) -> None:
+        graph = _graph(
+            build_capture_io(
+                _plan(), backend=VideoBackend.DDAGRAB, keyframe_seconds=2, force_keyframes=True
+            )
+        )
+        assert "scale" not in graph
+
+    def test_nvenc_resizes_on_the_gpu_and_never_downloads(self) -> None:
+        graph = _graph(
+            build_capture_io(
+                _plan("h264_nvenc", output_size=(1920, 1080)),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+            )
+        )
+        assert "scale_d3d11=width=1920:height=1080" in graph
+        assert "hwdownload" not in graph
+
+    def test_a_downloading_hardware_encoder_resizes_before_the_copy(self) -> None:
+        # Shrinking the frame first is what makes the copy out of GPU memory cheap.
+        graph = _graph(
+            build_capture_io(
+                _plan("h264_amf", output_size=(1920, 1080)),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+            )
+        )
+        assert graph.index("scale_d3d11") < graph.index("hwdownload")
+
+    def test_a_cpu_encoder_resizes_in_software_with_the_chosen_scaler(self) -> None:
+        graph = _graph(
+            build_capture_io(
+                _plan(output_size=(1920, 1080), scaler="fast_bilinear"),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+            )
+        )
+        assert "scale_d3d11" not in graph
+        assert graph.index("hwdownload") < graph.index("scale=1920:1080:flags=fast_bilinear")
+        # Resize and colour conversion are one swscale pass, not two.
+        assert "flags=fast_bilinear,format=yuv420p" in graph
+
+    def test_gdigrab_is_resized_through_the_filter_graph(self) -> None:
+        argv = build_capture_io(
+            _plan(output_size=(1280, 720)),
+            backend=VideoBackend.GDIGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+        )
+        assert _graph(argv).startswith("[0:v]scale=1280:720:")
+        assert argv[argv.index("-map") + 1] == "[v]"
+
+    @pytest.mark.parametrize("backend", list(VideoBackend))
+    def test_an_unresized_capture_maps_its_source_directly(self, backend: VideoBackend) -> None:
+        argv = build_capture_io(_plan(), backend=backend, keyframe_seconds=2, force_keyframes=True)
+        expected = "0:v" if backend is VideoBackend.GDIGRAB else "[v]"
+        assert argv[argv.index("-map") + 1] == expected
+
+
+# ------------------------------------------------------------ variable frame rate
+
+
+def _fps_mode(argv: list[str]) -> str:
+    return argv[argv.index("-fps_mode") + 1]
+
+
+class TestVariableFrameRate:
+    def test_a_constant_rate_capture_keeps_every_frame(self) -> None:
+        argv = build_capture_io(
+            _plan(), backend=VideoBackend.DDAGRAB, keyframe_seconds=2, force_keyframes=True
+        )
+        assert "mpdecimate" not in _graph(argv)
+        assert _fps_mode(argv) == "cfr"
+
+    def test_repeats_are_dropped_after_the_download_in_a_planar_format(self) -> None:
+        argv = build_capture_io(
+            _plan(variable_frame_rate=True),
+            backend=VideoBackend.DDAGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+        )
+        graph = _graph(argv)
+        assert graph.index("hwdownload") < graph.index("format=yuv420p,mpdecimate")
+        assert _fps_mode(argv) == "vfr"
+
+    def test_a_still_screen_keeps_a_frame_a_second(self) -> None:
+        # Without the heartbeat nothing reaches the encoder, no keyframe arrives
+        # and the segment muxer stops rotating until something moves.
+        graph = _graph(
+            build_capture_io(
+                _plan(variable_frame_rate=True),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+            )
+        )
+        assert "mpdecimate=max=59" in graph
+
+    def test_decimation_follows_a_software_resize_without_a_second_conversion(self) -> None:
+        graph = _graph(
+            build_capture_io(
+                _plan(output_size=(1920, 1080), variable_frame_rate=True),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+            )
+        )
+        assert graph.count("format=yuv420p") == 1
+        assert graph.index("scale=1920:1080") < graph.index("mpdecimate")
+
+    def test_nvenc_on_gpu_surfaces_stays_at_a_constant_rate(self) -> None:
+        argv = build_capture_io(
+            _plan("h264_nvenc", variable_frame_rate=True),
+            backend=VideoBackend.DDAGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+        )
+        assert "mpdecimate" not in _graph(argv)
+        assert "hwdownload" not in _graph(argv)
+        assert _fps_mode(argv) == "cfr"
+        assert not frames_can_be_decimated("h264_nvenc", VideoBackend.DDAGRAB)
+
+    def test_gdigrab_decimates_through_the_filter_graph(self) -> None:
+        argv = build_capture_io(
+            _plan(variable_frame_rate=True),
+            backend=VideoBackend.GDIGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+        )
+        assert _graph(argv) == "[0:v]format=yuv420p,mpdecimate=max=59[v]"
+        assert argv[argv.index("-map") + 1] == "[v]"
+        assert frames_can_be_decimated("h264_nvenc", VideoBackend.GDIGRAB)
+
+
+class TestCountVideoFrames:
+    def test_counts_only_the_video_pictures(
+        self, tmp_path: Path, write_ts: Callable[[Path, int], Path]
+    ) -> None:
+        assert count_video_frames(write_ts(tmp_path / "seg.ts", 7)) == 7
+
+    def test_looks_past_an_adaptation_field(self, tmp_path: Path) -> None:
+        # A keyframe's first packet usually carries a PCR in an adaptation field,
+        # which pushes the PES start code further into the packet.
+        adaptation = bytes([7, 0x10]) + b"\x00" * 6
+        header = bytes([0x47, 0x41, 0x00, 0x30])
+        packet = (header + adaptation + b"\x00\x00\x01\xe0").ljust(188, b"\xff")
+        path = tmp_path / "seg.ts"
+        path.write_bytes(packet * 3)
+        assert count_video_frames(path) == 3
+
+    def test_an_unreadable_file_counts_nothing(self, tmp_path: Path) -> None:
+        assert count_video_frames(tmp_path / "missing.ts") == 0
+
+
+# ------------------------------------------------------------------ region crop
+
+_PILLARBOX = CaptureRegion(x=480, y=0, width=2880, height=2160)
+
+
+class TestRegionCrop:
+    def test_ddagrab_crops_in_the_grab_itself(self) -> None:
+        # Cropping in the source means the pixels outside never leave the
+        # desktop - not even into the copy out of GPU memory.
+        graph = _graph(
+            build_capture_io(
+                _plan(region=_PILLARBOX),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+            )
+        )
+        source = graph.split(",")[0]
+        assert ":offset_x=480:offset_y=0:video_size=2880x2160" in source
+        assert graph.index("video_size") < graph.index("hwdownload")
+
+    def test_gdigrab_grabs_only_the_region_in_desktop_coordinates(self) -> None:
+        plan = _plan(region=_PILLARBOX)
+        plan = CapturePlan(
+            monitor=Monitor(name="Side", x=3840, y=0, width=3840, height=2160, is_primary=False),
+            monitor_index=1,
+            fps=plan.fps,
+            encoder=plan.encoder,
+            preset=plan.preset,
+            crf=plan.crf,
+            audio=plan.audio,
+            region=_PILLARBOX,
+        )
+        argv = build_capture_io(
+            plan, backend=VideoBackend.GDIGRAB, keyframe_seconds=2, force_keyframes=True
+        )
+        assert argv[argv.index("-offset_x") + 1] == str(3840 + 480)
+        assert argv[argv.index("-video_size") + 1] == "2880x2160"
+
+    def test_the_capture_size_is_the_region(self) -> None:
+        assert _plan(region=_PILLARBOX).capture_size == (2880, 2160)
+        assert _plan().capture_size == (3840, 2160)
+
+
+class TestStandInInputs:
+    _PICTURE = ("-f", "lavfi", "-i", "testsrc2=size=3840x2160:rate=60,format=bgra")
+    _TONE = ("-f", "lavfi", "-i", "sine=frequency=440")
+
+    def test_stand_ins_replace_the_grab_and_the_microphone(self) -> None:
+        plan = replace(_plan(), audio=AudioConfig(microphone="tone", desktop_pipe="desktop.pcm"))
+
+        argv = build_capture_io(
+            plan,
+            backend=VideoBackend.GDIGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+            video_input=self._PICTURE,
+            microphone_input=self._TONE,
+        )
+
+        assert argv[1:5] == list(self._PICTURE)
+        assert argv[5:9] == list(self._TONE)
+        assert "gdigrab" not in argv and "dshow" not in argv
+        # The desktop PCM is read as the pump's pipe would be, and mixed.
+        assert argv[argv.index("desktop.pcm") - 1] == "-i"
+        assert _graph(argv).startswith("[1:a][2:a]amix")
+
+    def test_a_stand_in_cannot_take_ddagrabs_place(self) -> None:
+        with pytest.raises(ValueError, match="gdigrab"):
+            build_capture_io(
+                _plan(),
+                backend=VideoBackend.DDAGRAB,
+                keyframe_seconds=2,
+                force_keyframes=True,
+                video_input=self._PICTURE,
+            )
+
+
+# ------------------------------------------------------------------ audio tracks
+
+
+class TestSeparateAudioTracks:
+    _BOTH = AudioConfig(microphone="Mic", desktop_pipe="desktop.pcm", separate_tracks=True)
+
+    @staticmethod
+    def _maps(argv: list[str]) -> list[str]:
+        return [argv[index + 1] for index, flag in enumerate(argv) if flag == "-map"]
+
+    def test_the_two_sources_are_written_as_tracks_of_their_own(self) -> None:
+        argv = build_capture_io(
+            replace(_plan(), audio=self._BOTH),
+            backend=VideoBackend.DDAGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+        )
+
+        assert "amix" not in _graph(argv)
+        # Microphone first, then desktop: the save mixes them in that order.
+        assert self._maps(argv) == ["[v]", "0:a", "1:a"]
+        assert argv[argv.index("-c:a") + 1] == "aac"
+
+    def test_one_source_is_never_split(self) -> None:
+        audio = replace(self._BOTH, desktop_pipe="")
+
+        argv = build_capture_io(
+            replace(_plan(), audio=audio),
+            backend=VideoBackend.DDAGRAB,
+            keyframe_seconds=2,
+            force_keyframes=True,
+        )
+
+        assert not audio.split
+        assert self._maps(argv) == ["[v]", "0:a"]
+
+    def test_a_save_time_mix_scales_the_microphone(self) -> None:
+        graph = mix_audio_filter(["0:a:0", "0:a:1"], label="a", weights=(0.5, 1.0))
+
+        assert graph.startswith("[0:a:0][0:a:1]amix=inputs=2:")
+        assert ":normalize=0:weights=0.5 1," in graph
+        assert graph.endswith("[a]")
+
+
+# ------------------------------------------------------------------ HEVC and AV1
+
+
+class TestNewerFormats:
+    def test_x265_shares_x264s_quality_scale(self) -> None:
+        assert build_quality_args("libx265", 23) == ["-crf", "23"]
+
+    def test_svt_av1_stretches_the_slider_onto_its_wider_scale(self) -> None:
+        assert build_quality_args("libsvtav1", 51) == ["-crf", "63"]
+        assert build_quality_args("libsvtav1", 21) == ["-crf", "26"]
+
+    def test_hardware_encoders_use_their_vendors_knob(self) -> None:
+        nvenc = build_quality_args("av1_nvenc", 21)
+        assert nvenc[nvenc.index("-cq") + 1] == "21"
+        assert "-global_quality" in build_quality_args("hevc_qsv", 21)
+
+    def test_only_hevc_needs_an_mp4_tag(self) -> None:
+        assert mp4_tag_args("libx265") == ["-tag:v", "hvc1"]
+        assert mp4_tag_args("hevc_amf") == ["-tag:v", "hvc1"]
+        assert mp4_tag_args("libx264") == []
+        assert mp4_tag_args("av1_nvenc") == []
+
+    def test_a_saved_mp4_is_front_loaded_or_fragmented(self) -> None:
+        assert mp4_layout_args(fragmented=False) == ["-movflags", "+faststart"]
+        flags = mp4_layout_args(fragmented=True)[1].split("+")
+        # empty_moov is what makes it seekable without a second pass.
+        assert set(flags) == {"frag_keyframe", "empty_moov", "default_base_moof"}
+
+
+# ------------------------------------------------------------------ stderr pump
+
+
+def _pump(max_lines: int = 200) -> StderrPump:
+    # Never started: feed() is the whole of the parsing, and needs no process.
+    return StderrPump(subprocess.Popen.__new__(subprocess.Popen), max_lines=max_lines)
+
+
+class TestStderrPump:
+    def test_a_long_lived_capture_asks_for_warnings_and_progress(self) -> None:
+        argv = _argv_with_binary(Path("ffmpeg"), ["-i", "x"], loglevel="level+warning", stats=True)
+        assert argv[1:5] == ["-hide_banner", "-loglevel", "level+warning", "-stats"]
+
+    def test_a_short_job_stays_quiet(self) -> None:
+        argv = _argv_with_binary(Path("ffmpeg"), ["-i", "x"])
+        assert argv[3:5] == ["error", "-nostats"]
+
+    def test_progress_lines_carry_the_drop_and_dup_totals(self) -> None:
+        pump = _pump()
+        pump.feed("frame=  120 fps= 60 q=23.0 size=N/A time=00:00:02.00 dup=1 drop=4 speed=1x")
+        pump.feed("frame=  240 fps= 60 q=23.0 size=N/A time=00:00:04.00 dup=1 drop=9 speed=1x")
+
+        counters = pump.counters
+        assert (counters.frames_dropped, counters.frames_duplicated) == (9, 1)
+        # Progress is a running total, not news: it is not kept in the tail.
+        assert pump.tail() == []
+        assert counters.lines == 0
+
+    def test_capture_warnings_are_counted_by_kind(self) -> None:
+        pump = _pump()
+        pump.feed("[mpegts @ 0x1] [warning] Past duration 0.999 too large")
+        pump.feed("[dshow @ 0x2] [warning] real-time buffer [Mic] [audio input] too full or near")
+        pump.feed("[h264_nvenc @ 0x3] [error] OpenEncodeSessionEx failed")
+
+        counters = pump.counters
+        assert counters.timestamp_warnings == 1
+        assert counters.buffer_overruns == 1
+        assert (counters.warnings, counters.errors, counters.lines) == (2, 1, 3)
+        assert not counters.is_clean
+
+    def test_the_tail_is_bounded(self) -> None:
+        pump = _pump(max_lines=5)
+        for index in range(100):
+            pump.feed(f"[info] line {index}")
+        assert pump.tail(lines=100) == [f"[info] line {index}" for index in range(95, 100)]
+        assert pump.counters.lines == 100
+
+
+class TestStreamIntoFFmpeg:
+    """A stand-in "FFmpeg" that copies its stdin to the file it is given."""
+
+    @pytest.fixture()
+    def cat(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        script = (
+            "import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[-1], 'wb'))"
+        )
+
+        def argv(_binary: Path, args: object, **_kwargs: object) -> list[str]:
+            return [sys.executable, "-c", script, *list(args)]  # type: ignore[call-overload]
+
+        monkeypatch.setattr(ffmpeg_module, "_argv_with_binary", argv)
+
+    @pytest.mark.usefixtures("cat")
+    def test_the_sources_arrive_back_to_back(self, tmp_path: Path) -> None:
+        sources = []
+        for index, payload in enumerate((b"first", b"x" * (3 << 20), b"last")):
+            source = tmp_path / f"part_{index}.ts"
+            source.write_bytes(payload)
+            sources.append(source)
+        output = tmp_path / "out.bin"
+
+        result = stream_into_ffmpeg(
+            ["-i", "pipe:0", str(output)], sources, job=JobClass.SAVE, binary=Path("ffmpeg")
+        )
+
+        assert result.returncode == 0
+        assert output.read_bytes() == b"first" + b"x" * (3 << 20) + b"last"
+
+    @pytest.mark.usefixtures("cat")
+    def test_a_missing_source_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(OSError):
+            stream_into_ffmpeg(
+                [str(tmp_path / "out.bin")],
+                [tmp_path / "gone.ts"],
+                job=JobClass.SAVE,
+                binary=Path("ffmpeg"),
+            )
+
+
+class TestProbeMediaLayout:
+    @staticmethod
+    def _answer(monkeypatch: pytest.MonkeyPatch, stdout: str, returncode: int = 0) -> None:
+        monkeypatch.setattr(ffmpeg_module, "ffprobe_path", lambda: Path("ffprobe"))
+        monkeypatch.setattr(
+            ffmpeg_module,
+            "run_at_priority",
+            lambda argv, **_kw: subprocess.CompletedProcess(argv, returncode, stdout, "bad"),
+        )
+
+    def test_reads_the_frame_size_and_the_audio(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self._answer(
+            monkeypatch,
+            '{"streams": [{"codec_type": "video", "width": 1920, "height": 1080},'
+            ' {"codec_type": "audio"}]}',
+        )
+
+        assert probe_media_layout(tmp_path / "seg.ts", job=JobClass.SAVE) == MediaLayout(
+            1920, 1080, 1
+        )
+
+    @pytest.mark.parametrize(
+        ("stdout", "returncode"),
+        [("", 1), ("not json", 0), ('{"streams": [{"codec_type": "audio"}]}', 0)],
+    )
+    def test_anything_unreadable_is_none(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, stdout: str, returncode: int
+    ) -> None:
+        self._answer(monkeypatch, stdout, returncode)
+
+        assert probe_media_layout(tmp_path / "seg.ts", job=JobClass.SAVE) is None
+
+
+class TestCpuBudget:
+    @pytest.fixture(autouse=True)
+    def _eight_cores(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(os, "sched_getaffinity", lambda _pid: set(range(8)), raising=False)
+
+    def test_the_budget_takes_the_top_cores(self) -> None:
+        assert budget_cores("libx264", 25) == frozenset({6, 7})
+
+    def test_a_tiny_budget_still_leaves_one_core(self) -> None:
+        assert budget_cores("libx264", 1) == frozenset({7})
+
+    @pytest.mark.parametrize(
+        ("encoder", "percent"), [("libx264", 0), ("libx264", 100), ("h264_nvenc", 25)]
+    )
+    def test_no_limit(self, encoder: str, percent: int) -> None:
+        assert budget_cores(encoder, percent) is None
+
+    def test_each_library_takes_its_thread_count_its_own_way(self) -> None:
+        assert encoder_thread_args("libx264", 2) == ["-threads", "2"]
+        assert encoder_thread_args("libx265", 2) == ["-x265-params", "pools=2"]
+        assert encoder_thread_args("libsvtav1", 2) == ["-svtav1-params", "lp=2"]
+        assert encoder_thread_args("hevc_nvenc", 2) == []
+
+    def test_a_budgeted_capture_limits_the_encoder_threads(self) -> None:
+        args = build_encoder_args(
+            _plan(cores=frozenset({6, 7})),
+            keyframe_seconds=2,
+            force_keyframes=True,
+            frames_on_gpu=False,
+        )
+        assert args[args.index("-threads") + 1] == "2"
+
+    def test_an_unbudgeted_capture_leaves_the_threads_to_ffmpeg(self) -> None:
+        args = build_encoder_args(
+            _plan(), keyframe_seconds=2, force_keyframes=True, frames_on_gpu=False
+        )
+        assert "-threads" not in args
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX niceness")
+class TestJobPriority:
+    @staticmethod
+    def _report(job: JobClass, code: str, cores: frozenset[int] | None = None) -> str:
+        """What a child started for ``job`` prints once it has been given its priority.
+
+        The child waits for a line on stdin before it looks, so the parent
+        has set the priority by then.
+        """
+        with subprocess.Popen(
+            [sys.executable, "-c", f"import os, sys; sys.stdin.readline(); print({code})"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            **popen_kwargs(job=job),
+        ) as process:
+            apply_job_priority(process, job, cores)
+            stdout, _ = process.communicate("go\n", timeout=30)
+        return stdout.strip()
+
+    def _niceness_of(self, job: JobClass) -> int:
+        return int(self._report(job, "os.getpriority(os.PRIO_PROCESS, 0)"))
+
+    def test_no_code_runs_in_the_child_before_it_execs(self) -> None:
+        for job in JobClass:
+            assert "preexec_fn" not in popen_kwargs(job=job)
+
+    def test_background_jobs_run_at_the_lowest_priority(self) -> None:
+        assert self._niceness_of(JobClass.BACKGROUND) == 19
+
+    def test_saves_keep_our_own_priority(self) -> None:
+        assert self._niceness_of(JobClass.SAVE) == os.getpriority(os.PRIO_PROCESS, 0)
+
+    def test_a_capture_starts_even_without_the_privilege_to_raise_it(self) -> None:
+        assert self._niceness_of(JobClass.CAPTURE) <= os.getpriority(os.PRIO_PROCESS, 0)
+
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="no affinity API")
+    def test_a_budgeted_job_is_held_to_its_cores(self) -> None:
+        core = max(os.sched_getaffinity(0))
+        cores = frozenset({core})
+        report = self._report(JobClass.SAVE, "sorted(os.sched_getaffinity(0))", cores)
+        assert report == f"[{core}]"
+
+    def test_a_helper_command_runs_at_its_priority(self) -> None:
+        result = run_at_priority(
+            [sys.executable, "-c", "import os; print(os.getpriority(os.PRIO_PROCESS, 0))"],
+            job=JobClass.BACKGROUND,
+            timeout=30,
+        )
+        # Started before its priority is applied; it may look too soon, never at a wrong value.
+        assert int(result.stdout) in {19, os.getpriority(os.PRIO_PROCESS, 0)}
+
+
+class TestResourceUsage:
+    def test_the_difference_of_two_runs_is_the_work_between_them(self) -> None:
+        short = ResourceUsage(user_seconds=1.0, system_seconds=0.5, wall_seconds=1.0)
+        long = ResourceUsage(
+            user_seconds=5.0, system_seconds=0.5, peak_rss_bytes=200 << 20, wall_seconds=3.0
+        )
+
+        marginal = long.beyond(short)
+
+        assert (marginal.cpu_seconds, marginal.wall_seconds) == (4.0, 2.0)
+        assert marginal.cores == pytest.approx(2.0)
+        # Memory is not additive: the longer run's peak stands.
+        assert marginal.peak_rss_bytes == 200 << 20
+
+    def test_cores_are_unknown_without_a_wall_clock(self) -> None:
+        assert ResourceUsage(user_seconds=3.0).cores == 0.0
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX wait4")
+    def test_a_reaped_child_reports_its_own_cpu_and_memory(self) -> None:
+        # A child that spins for a moment and holds 50 MB; the parent's own
+        # figures must not be what comes back.
+        script = (
+            "import sys, time\n"
+            "block = bytearray(50 << 20)\n"
+            "end = time.process_time() + 0.3\n"
+            "while time.process_time() < end: pass\n"
+            "sys.exit(3)\n"
+        )
+        process = subprocess.Popen([sys.executable, "-c", script], text=True)
+
+        usage = wait_for_exit(process, timeout=30)
+
+        assert process.returncode == 3
+        assert usage.cpu_seconds >= 0.25
+        assert 50 << 20 <= usage.peak_rss_bytes < 1 << 30
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX wait4")
+    def test_a_child_still_running_at_the_deadline_is_left_running(self) -> None:
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            with pytest.raises(subprocess.TimeoutExpired):
+                wait_for_exit(process, timeout=0.1)
+            assert process.poll() is None
+        finally:
+            process.kill()
+            process.wait()
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX wait4")
+    def test_a_long_wait_does_not_spin(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        looks = 0
+        real_wait4 = os.wait4
+
+        def counting_wait4(pid: int, options: int) -> tuple[int, int, Any]:
+            nonlocal looks
+            looks += 1
+            return real_wait4(pid, options)
+
+        monkeypatch.setattr(ffmpeg_module.os, "wait4", counting_wait4)
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(1)"])
+
+        wait_for_exit(process, timeout=30)
+
+        # Backing off to a 50 ms poll is about thirty looks a second.
+        assert looks < 60
+
+    def test_a_cancel_kills_the_child_it_is_waiting_on(self) -> None:
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        started = time.monotonic()
+
+        with pytest.raises(JobCancelledError):
+            wait_for_exit(process, timeout=30, cancel=cancel)
+
+        assert time.monotonic() - started < 10
+        assert process.returncode is not None
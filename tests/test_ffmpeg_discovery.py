@@ -33,6 +33,8 @@ def roots(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
 
     monkeypatch.setattr(paths_module, "app_paths", lambda: fake)
     monkeypatch.setattr(ffmpeg_module.shutil, "which", lambda _name: None)
+    # Each test searches afresh rather than inheriting another's answer.
+    monkeypatch.setattr(ffmpeg_module, "_FOUND", {})
     return fake
 
 
@@ -124,3 +126,28 @@ def test_a_directory_named_like_the_binary_is_ignored(roots: SimpleNamespace) ->
 
     with pytest.raises(FFmpegNotFoundError):
         find_ffmpeg()
+
+
+def test_the_answer_is_remembered_while_the_binary_exists(
+    roots: SimpleNamespace,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    on_path = {"ffmpeg": _place(tmp_path / "system")}
+    searches: list[str] = []
+
+    def which(name: str) -> str | None:
+        searches.append(name)
+        found = on_path.get(name)
+        return str(found) if found is not None else None
+
+    monkeypatch.setattr(ffmpeg_module.shutil, "which", which)
+    first = find_ffmpeg()
+    assert find_ffmpeg() == first
+    assert len(searches) == 1
+
+    # FFmpeg removed under a running S-Clip: the next call looks again.
+    first.unlink()
+    on_path["ffmpeg"] = _place(tmp_path / "elsewhere")
+    assert find_ffmpeg() == on_path["ffmpeg"]
+    assert len(searches) == 2
@@ -21,7 +21,14 @@ import pytest
 from PySide6.QtGui import QAction, QCloseEvent
 from pytestqt.qtbot import QtBot
 
-from sclip.contracts import BufferTelemetry, CaptureState, Hotkey, Settings
+from sclip.contracts import (
+    AudioDevice,
+    BufferTelemetry,
+    CaptureState,
+    ClipBinding,
+    Hotkey,
+    Settings,
+)
 from sclip.ui import main_window as main_window_module
 from sclip.ui.main_window import (
     _PAGE_ABOUT,
@@ -46,6 +53,7 @@ class _Engine:
         self.calls: list[str] = []
         self.reloaded = 0
         self.raise_on_save = False
+        self.clip_seconds: list[int | None] = []
         self._clip_listeners: list[Callable[[Path], None]] = []
         self._error_listeners: list[Callable[[str], None]] = []
         self._state_listeners: list[Callable[[CaptureState], None]] = []
@@ -63,14 +71,18 @@ class _Engine:
     def stop_replay_buffer(self) -> None:
         self.calls.append("stop_buffer")
 
-    def save_replay_clip(self) -> None:
+    def save_replay_clip(self, seconds: int | None = None) -> None:
         self.calls.append("save_clip")
+        self.clip_seconds.append(seconds)
         if self.raise_on_save:
             raise RuntimeError("engine exploded")
 
     def telemetry(self) -> BufferTelemetry | None:
         return None
 
+    def recover_recordings(self) -> list[Path]:
+        return []
+
     def reload_settings(self) -> None:
         self.reloaded += 1
 
@@ -99,11 +111,22 @@ class _Store:
 
 
 class _Devices:
+    def __init__(self) -> None:
+        self.audio: list[AudioDevice] = []
+        self.refreshes = 0
+        self.listeners: list[Callable[[], None]] = []
+
     def monitors(self) -> list[Any]:
         return []
 
     def audio_devices(self) -> list[Any]:
-        return []
+        return list(self.audio)
+
+    def refresh(self) -> None:
+        self.refreshes += 1
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        self.listeners.append(listener)
 
 
 class _Hotkeys:
@@ -112,11 +135,13 @@ class _Hotkeys:
     def __init__(self) -> None:
         self.registered: list[Hotkey] = []
         self.unregistered: list[Hotkey] = []
+        self.callbacks: dict[Hotkey, Callable[[], None]] = {}
         self.started = False
         self.stopped = False
 
     def register(self, hotkey: Hotkey, callback: Callable[[], None]) -> None:
         self.registered.append(hotkey)
+        self.callbacks[hotkey] = callback
 
     def unregister(self, hotkey: Hotkey) -> None:
         self.unregistered.append(hotkey)
@@ -254,6 +279,19 @@ def test_applying_settings_rebinds_the_hotkeys(window: MainWindow, hotkeys: _Hot
     assert hotkeys.registered == [updated.clip_hotkey, updated.record_hotkey]
 
 
+def test_a_clip_binding_saves_its_own_length(
+    qtbot: QtBot, window: MainWindow, engine: _Engine, hotkeys: _Hotkeys
+) -> None:
+    engine.state = CaptureState.BUFFERING
+    binding = ClipBinding(Hotkey(key="F7"), 10)
+    window._apply_settings(Settings(clip_bindings=(binding,)))
+
+    hotkeys.callbacks[binding.hotkey]()
+
+    # The listener thread's emit is queued onto the GUI thread.
+    qtbot.waitUntil(lambda: engine.clip_seconds == [10])
+
+
 def test_applying_settings_asks_the_engine_to_reload(window: MainWindow, engine: _Engine) -> None:
     window._apply_settings(Settings(replay_seconds=45))
     assert engine.reloaded == 1
@@ -278,6 +316,96 @@ def test_applying_settings_updates_the_tray_labels(window: MainWindow) -> None:
     assert "F8" in window._tray_clip_action.text()
 
 
+# --------------------------------------------------------- first-run tuning
+
+
+def test_first_run_tuning_is_saved_and_applied_when_it_lands(
+    qtbot: QtBot, window: MainWindow, store: _Store, engine: _Engine
+) -> None:
+    tuned = Settings(encoder="h264_nvenc", fps=144)
+
+    window.tune_for_this_pc(lambda: tuned)
+    # The window is up and saying so while the recommendation is worked out.
+    assert window._tuning_notice.isVisibleTo(window)
+
+    qtbot.waitUntil(lambda: engine.reloaded == 1)
+    assert store.settings == tuned
+    assert not window._tuning_notice.isVisibleTo(window)
+    page = window._settings_page
+    assert page is not None
+    assert page._persisted == tuned
+    assert page._working == tuned
+
+
+def test_first_run_tuning_leaves_unsaved_edits_alone(
+    qtbot: QtBot, window: MainWindow, engine: _Engine
+) -> None:
+    page = window._settings_page
+    assert isinstance(page, settings_page.SettingsPage)
+    page._working.fps = 30
+    tuned = Settings(encoder="h264_nvenc", fps=144)
+
+    window.tune_for_this_pc(lambda: tuned)
+    qtbot.waitUntil(lambda: engine.reloaded == 1)
+
+    # The edit is still there to save; Cancel would go back to the tuned settings.
+    assert page._working.fps == 30
+    assert page._persisted == tuned
+
+
+def test_a_save_during_first_run_tuning_wins(
+    qtbot: QtBot, window: MainWindow, store: _Store
+) -> None:
+    """Settings the user chose must not be overwritten by a late recommendation."""
+    window.tune_for_this_pc(lambda: Settings(fps=144))
+    window._on_settings_saved(Settings(fps=30))
+    qtbot.waitUntil(lambda: not window._tuning_notice.isVisibleTo(window))
+
+    assert window._current_settings.fps == 30
+    assert store.settings == Settings()
+
+
+def test_failed_first_run_tuning_keeps_the_defaults(
+    qtbot: QtBot, window: MainWindow, store: _Store, engine: _Engine
+) -> None:
+    window.tune_for_this_pc(lambda: None)
+    qtbot.waitUntil(lambda: not window._tuning_notice.isVisibleTo(window))
+
+    assert store.settings == Settings()
+    assert engine.reloaded == 0
+
+
+# ----------------------------------------------------------------- hot-plug
+
+
+def test_a_new_screen_has_the_registry_look_again(window: MainWindow) -> None:
+    devices = window._device_registry
+    assert isinstance(devices, _Devices)
+
+    window._on_hardware_changed(object())
+
+    assert devices.refreshes == 1
+
+
+def test_a_plugged_in_microphone_appears_in_settings_without_losing_the_pick(
+    qtbot: QtBot, window: MainWindow
+) -> None:
+    devices = window._device_registry
+    assert isinstance(devices, _Devices)
+    page = window._settings_page
+    assert isinstance(page, settings_page.SettingsPage)
+    page._working.audio_input = "Old Headset"
+    page._set_combo_to_value(page._mic_combo, "Old Headset")
+
+    devices.audio = [AudioDevice(name="USB Mic", kind="input")]
+    for listener in devices.listeners:
+        listener()
+
+    mic = page._mic_combo
+    qtbot.waitUntil(lambda: mic.findData("USB Mic") >= 0)
+    assert mic.currentData() == "Old Headset"
+
+
 # --------------------------------------------------------------- clip save
 
 
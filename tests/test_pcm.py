@@ -0,0 +1,139 @@
+"""Tests for the pump's PCM conversion in :mod:`sclip.core.pcm`.
+
+The channel weights are plain arithmetic and are checked everywhere. The
+converter itself needs NumPy, an optional dependency, so those tests skip
+without it. They feed synthetic tones through in the 1024-frame reads the
+pump makes and compare what comes out against the same tone generated
+directly at 48 kHz. A drifting device is simulated by generating more or
+fewer samples per second than its nominal rate.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import pytest
+
+from sclip.core.pcm import PIPE_RATE, downmix_weights, make_converter
+
+_READ = 1024
+
+
+@pytest.fixture()
+def np() -> Any:
+    return pytest.importorskip("numpy")
+
+
+def _convert(np: Any, frames: Any, channels: int, rate: int) -> Any:
+    """Run ``frames`` through a converter read by read; stereo s16 out."""
+    convert = make_converter(channels, rate)
+    assert convert is not None
+    pcm = frames.astype(np.int16)
+    out = [
+        np.frombuffer(bytes(convert(pcm[start : start + _READ].tobytes())), dtype=np.int16)
+        for start in range(0, len(pcm), _READ)
+    ]
+    return np.concatenate(out).reshape(-1, 2)
+
+
+def _tone(np: Any, frequency: float, rate: int, seconds: float, channels: int) -> Any:
+    t = np.arange(int(rate * seconds)) / rate
+    wave = np.sin(2 * np.pi * frequency * t) * 8000
+    return np.repeat(wave[:, None], channels, axis=1)
+
+
+# ------------------------------------------------------------------ weights
+
+
+@pytest.mark.parametrize("channels", [1, 2, 3, 4, 6, 8])
+def test_each_side_sums_to_one_so_nothing_clips(channels: int) -> None:
+    weights = downmix_weights(channels)
+
+    assert len(weights) == channels
+    assert math.isclose(sum(left for left, _ in weights), 1.0)
+    assert math.isclose(sum(right for _, right in weights), 1.0)
+
+
+def test_surround_keeps_the_centre_in_the_middle_and_drops_the_lfe() -> None:
+    weights = downmix_weights(8)
+
+    centre, lfe = weights[2], weights[3]
+    assert centre[0] == centre[1] > 0
+    assert lfe == (0.0, 0.0)
+    # Front left is heard on the left only, and louder than any surround.
+    assert weights[0][1] == 0.0
+    assert weights[0][0] > max(left for left, _ in weights[4:])
+
+
+# ---------------------------------------------------------------- converter
+
+
+def test_a_surround_device_comes_out_stereo_at_full_scale(np: Any) -> None:
+    frames = np.full((PIPE_RATE, 8), 32767)
+
+    out = _convert(np, frames, channels=8, rate=PIPE_RATE)
+
+    assert out.shape == (PIPE_RATE, 2)
+    assert out.min() == out.max() == 32767
+
+
+def test_a_device_already_in_the_pipe_format_is_passed_through(np: Any) -> None:
+    convert = make_converter(2, PIPE_RATE)
+    chunk = bytes(range(256)) * 16
+
+    assert convert is not None
+    assert convert(chunk) is chunk
+
+
+def test_one_side_stays_on_its_side(np: Any) -> None:
+    frames = np.zeros((4 * _READ, 6))
+    frames[:, 0] = 10000  # front left only
+
+    out = _convert(np, frames, channels=6, rate=PIPE_RATE)
+
+    assert (out[:, 0] > 0).all()
+    assert (out[:, 1] == 0).all()
+
+
+@pytest.mark.parametrize("rate", [44100, 88200, 96000, 192000])
+def test_a_tone_survives_the_rate_change_without_seams(np: Any, rate: int) -> None:
+    seconds = 2.0
+    out = _convert(np, _tone(np, 1000, rate, seconds, channels=2), channels=2, rate=rate)
+
+    # One second of device audio is one second of pipe audio, read after read.
+    assert abs(len(out) - seconds * PIPE_RATE) <= 1
+    expected = _tone(np, 1000, PIPE_RATE, seconds, channels=1)[: len(out), 0]
+    # A seam between reads would show as a spike far above this. The first
+    # sample is left out: it averages in the silence before the stream began.
+    assert np.abs(out[1:, 0] - expected[1:]).max() < 0.01 * 8000
+
+
+def test_content_above_the_new_limit_is_damped(np: Any) -> None:
+    rate = 96000
+    out = _convert(np, _tone(np, 44000, rate, 1.0, channels=2), channels=2, rate=rate)
+
+    # Without the box filter a 44 kHz tone folds back at nearly full level.
+    assert np.sqrt(np.mean(out[:, 0].astype(float) ** 2)) < 0.2 * 8000 / math.sqrt(2)
+
+
+@pytest.mark.parametrize(("channels", "rate"), [(2, PIPE_RATE), (8, 96000)])
+@pytest.mark.parametrize("ppm", [-300.0, 450.0])
+def test_a_drifting_device_is_brought_back_to_wall_time(
+    np: Any, channels: int, rate: int, ppm: float
+) -> None:
+    seconds = 10
+    # What the device really delivers in ``seconds`` of wall time.
+    delivered = round(rate * (1 + ppm * 1e-6) * seconds)
+    frames = np.full((delivered, channels), 1000)
+    convert = make_converter(channels, rate)
+    assert convert is not None
+    convert.correct(ppm)
+
+    produced = sum(
+        len(convert(frames[start : start + _READ].astype(np.int16).tobytes())) // 4
+        for start in range(0, delivered, _READ)
+    )
+
+    # Uncorrected, the pipe would be off by ``ppm`` of the whole run.
+    assert abs(produced - PIPE_RATE * seconds) <= 1
@@ -11,7 +11,7 @@ from __future__ import annotations
 import pytest
 from pytestqt.qtbot import QtBot
 
-from sclip.ui.formatting import format_bitrate, format_bytes
+from sclip.ui.formatting import format_bitrate, format_bytes, format_time_left
 from sclip.ui.widgets import BufferMeter
 
 # ------------------------------------------------------------- format_bytes
@@ -77,6 +77,23 @@ def test_bitrate_and_size_units_differ_on_purpose() -> None:
     assert format_bitrate(1000.0) == "1.0 kb/s"
 
 
+# --------------------------------------------------------- format_time_left
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (0.0, "almost done"),
+        (3.2, "about 5 s left"),
+        (41.0, "about 45 s left"),
+        (60.0, "about 1 min left"),
+        (61.0, "about 2 min left"),
+    ],
+)
+def test_time_left_is_rounded_up_to_a_plain_estimate(value: float, expected: str) -> None:
+    assert format_time_left(value) == expected
+
+
 # -------------------------------------------------------------- BufferMeter
 
 
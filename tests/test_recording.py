@@ -0,0 +1,189 @@
+"""Tests for the segmented manual recordings in :mod:`sclip.core.recording`.
+
+Nothing here runs FFmpeg: the join is swapped for a fake that records the
+parts it was handed, which is all the session bookkeeping needs to be checked
+against - the order of the parts, and what is left on disk afterwards.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from sclip.contracts import Settings
+from sclip.core import recording, replay_buffer
+from sclip.core.recording import (
+    RECORDING_SEGMENT_SECONDS,
+    find_unfinished_sessions,
+    finish_session,
+    load_session,
+    open_session,
+)
+from sclip.core.replay_buffer import BufferSpec
+
+
+@pytest.fixture()
+def recordings_dir(tmp_path: Path) -> Path:
+    return tmp_path / "recordings"
+
+
+@pytest.fixture()
+def destination(tmp_path: Path) -> Path:
+    return tmp_path / "clips" / "recording_20260101_120000.mp4"
+
+
+def _fake_join(
+    monkeypatch: pytest.MonkeyPatch, *, succeed: bool = True
+) -> list[tuple[list[str], bool]]:
+    joins: list[tuple[list[str], bool]] = []
+
+    def join(
+        segments: list[Path],
+        target: Path,
+        spec: BufferSpec,
+        *,
+        scratch: Path,
+        fragmented: bool,
+        microphone_level: float,
+    ) -> bool:
+        joins.append(([segment.name for segment in segments], spec.variable_frame_rate))
+        if succeed:
+            target.write_bytes(b"mp4")
+        return succeed
+
+    monkeypatch.setattr(recording, "join_segments", join)
+    return joins
+
+
+def test_a_session_round_trips_through_its_manifest(
+    recordings_dir: Path, destination: Path
+) -> None:
+    settings = Settings(encoder="hevc_nvenc", crf=28, fps=30, separate_audio_tracks=True)
+    session = open_session(recordings_dir, destination, settings, variable_frame_rate=True)
+
+    assert session.separate_audio
+    assert load_session(session.directory) == session
+    # Written via a temporary name; nothing of that is left behind.
+    assert [p.name for p in session.directory.iterdir()] == ["session.json"]
+
+
+def test_the_parts_are_numbered_segments_that_never_wrap(
+    recordings_dir: Path, destination: Path
+) -> None:
+    spec = open_session(recordings_dir, destination, Settings()).spec(["-i", "x"])
+
+    assert not spec.wrap
+    assert spec.segment_seconds == RECORDING_SEGMENT_SECONDS
+    assert spec.pattern.name == "part_%06d.ts"
+
+
+def test_two_sessions_for_one_name_get_their_own_directories(
+    recordings_dir: Path, destination: Path
+) -> None:
+    first = open_session(recordings_dir, destination, Settings())
+    second = open_session(recordings_dir, destination, Settings())
+
+    assert first.directory != second.directory
+
+
+def test_unfinished_sessions_skip_the_live_one_and_damaged_manifests(
+    recordings_dir: Path, destination: Path
+) -> None:
+    orphan = open_session(recordings_dir, destination, Settings())
+    live = open_session(recordings_dir, destination.with_name("live.mp4"), Settings())
+    damaged = recordings_dir / "damaged"
+    damaged.mkdir()
+    (damaged / "session.json").write_text("{not json", encoding="utf-8")
+    future = recordings_dir / "future"
+    future.mkdir()
+    (future / "session.json").write_text(json.dumps({"version": 99}), encoding="utf-8")
+
+    found = find_unfinished_sessions(recordings_dir, exclude=[live.directory])
+
+    assert found == [orphan]
+
+
+def test_no_recordings_folder_means_nothing_to_recover(tmp_path: Path) -> None:
+    assert find_unfinished_sessions(tmp_path / "missing") == []
+
+
+def test_finishing_joins_the_parts_in_order_and_clears_the_session(
+    recordings_dir: Path, destination: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    joins = _fake_join(monkeypatch)
+    session = open_session(recordings_dir, destination, Settings())
+    for index in (10, 2, 1):
+        (session.directory / f"part_{index:06d}.ts").write_bytes(b"ts")
+
+    assert finish_session(session) == destination
+    assert joins == [(["part_000001.ts", "part_000002.ts", "part_000010.ts"], False)]
+    assert destination.exists()
+    assert not session.directory.exists()
+
+
+def test_a_spec_from_the_buffer_overrides_the_manifest(
+    recordings_dir: Path, destination: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    joins = _fake_join(monkeypatch)
+    session = open_session(recordings_dir, destination, Settings())
+    (session.directory / "part_000000.ts").write_bytes(b"ts")
+    buffer_spec = BufferSpec(
+        capture_args=(), directory=session.directory, seconds=30, variable_frame_rate=True
+    )
+
+    finish_session(session, buffer_spec)
+
+    assert joins[0][1] is True
+
+
+def test_a_session_without_parts_is_discarded(
+    recordings_dir: Path, destination: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    joins = _fake_join(monkeypatch)
+    session = open_session(recordings_dir, destination, Settings())
+
+    assert finish_session(session) is None
+    assert joins == []
+    assert not session.directory.exists()
+
+
+def test_a_failed_join_keeps_the_parts_for_next_time(
+    recordings_dir: Path, destination: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _fake_join(monkeypatch, succeed=False)
+    session = open_session(recordings_dir, destination, Settings())
+    (session.directory / "part_000000.ts").write_bytes(b"ts")
+
+    assert finish_session(session) is None
+    assert find_unfinished_sessions(recordings_dir) == [session]
+
+
+@pytest.mark.parametrize("clips_fragmented", [False, True])
+def test_a_recording_is_never_rewritten_for_faststart(
+    recordings_dir: Path,
+    destination: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    clips_fragmented: bool,
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_stream(
+        argv: list[str], _sources: object, **_kwargs: object
+    ) -> subprocess.CompletedProcess[str]:
+        calls.append(argv)
+        Path(argv[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(argv, 0, "", "")
+
+    monkeypatch.setattr(replay_buffer, "stream_into_ffmpeg", fake_stream)
+    settings = Settings(fragmented_mp4=clips_fragmented)
+    session = open_session(recordings_dir, destination, settings)
+    (session.directory / "part_000000.ts").write_bytes(b"ts")
+
+    assert finish_session(session) == destination
+    # Whatever the clip setting, the join writes the file once, fragmented.
+    (argv,) = calls
+    assert "+faststart" not in argv
+    assert argv[argv.index("-movflags") + 1].startswith("frag_keyframe")
@@ -0,0 +1,101 @@
+"""Tests for capture-region parsing and fitting in :mod:`sclip.core.region`.
+
+The window lookup itself is Windows-only and is stood in for here; what is
+worth pinning down is the arithmetic that turns a region or a window into a
+crop the grab will accept, and the fallbacks when it cannot be honoured.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from sclip.contracts import Monitor, Settings
+from sclip.core import region as region_module
+from sclip.core.region import CaptureRegion, fit_region, parse_region, resolve_capture_region
+
+_SECOND_MONITOR = Monitor(name="Side", x=2560, y=0, width=1920, height=1080, is_primary=False)
+
+
+class TestParseRegion:
+    def test_reads_the_geometry_notation(self) -> None:
+        assert parse_region("1440x1080+240+0") == CaptureRegion(x=240, y=0, width=1440, height=1080)
+
+    def test_tolerates_spacing_and_the_multiplication_sign(self) -> None:
+        assert parse_region(" 1440 \xd7 1080 + 240 + 0 ").size == (1440, 1080)
+
+    @pytest.mark.parametrize("value", ["", "1440x1080", "1440x1080+240", "0x1080+0+0", "-1x2+3+4"])
+    def test_rejects_anything_else(self, value: str) -> None:
+        with pytest.raises(ValueError):
+            parse_region(value)
+
+    def test_describe_round_trips(self) -> None:
+        assert parse_region("1440x1080+240+0").describe() == "1440x1080+240+0"
+
+
+class TestFitRegion:
+    def test_a_region_inside_the_display_is_kept(self) -> None:
+        region = CaptureRegion(x=240, y=0, width=1440, height=1080)
+        assert fit_region(region, (1920, 1080)) == region
+
+    def test_the_whole_display_needs_no_crop(self) -> None:
+        assert fit_region(CaptureRegion(x=0, y=0, width=1920, height=1080), (1920, 1080)) is None
+
+    def test_the_part_off_screen_is_dropped(self) -> None:
+        # A window hanging off the left edge still captures what is visible.
+        fitted = fit_region(CaptureRegion(x=-200, y=100, width=800, height=600), (1920, 1080))
+        assert fitted == CaptureRegion(x=0, y=100, width=600, height=600)
+
+    def test_offsets_and_sides_come_out_even(self) -> None:
+        fitted = fit_region(CaptureRegion(x=101, y=51, width=801, height=601), (1920, 1080))
+        assert fitted is not None
+        assert all(value % 2 == 0 for value in (fitted.x, fitted.y, fitted.width, fitted.height))
+
+    def test_a_sliver_captures_the_whole_display_instead(self) -> None:
+        assert fit_region(CaptureRegion(x=1900, y=0, width=400, height=1080), (1920, 1080)) is None
+
+
+class TestResolveCaptureRegion:
+    def test_nothing_configured_captures_the_whole_monitor(self) -> None:
+        assert resolve_capture_region(Settings(), _SECOND_MONITOR) is None
+
+    def test_a_region_is_clamped_to_the_monitor(self) -> None:
+        settings = Settings(capture_region="1440x1200+240+0")
+        fitted = resolve_capture_region(settings, _SECOND_MONITOR)
+        assert fitted == CaptureRegion(x=240, y=0, width=1440, height=1080)
+
+    def test_a_window_is_translated_into_monitor_coordinates(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # The window sits at desktop x=3000 - 440 pixels into the second monitor.
+        monkeypatch.setattr(
+            region_module,
+            "find_window_bounds",
+            lambda _title: CaptureRegion(x=3000, y=100, width=1280, height=720),
+        )
+        settings = Settings(capture_window="Minecraft", capture_region="800x600+0+0")
+        fitted = resolve_capture_region(settings, _SECOND_MONITOR)
+        assert fitted == CaptureRegion(x=440, y=100, width=1280, height=720)
+
+    def test_a_missing_window_falls_back_to_the_region(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(region_module, "find_window_bounds", lambda _title: None)
+        settings = Settings(capture_window="Minecraft", capture_region="800x600+0+0")
+        assert resolve_capture_region(settings, _SECOND_MONITOR) == CaptureRegion(
+            x=0, y=0, width=800, height=600
+        )
+
+    def test_a_window_on_another_monitor_falls_back_to_the_region(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(
+            region_module,
+            "find_window_bounds",
+            lambda _title: CaptureRegion(x=100, y=100, width=1280, height=720),
+        )
+        assert resolve_capture_region(Settings(capture_window="Game"), _SECOND_MONITOR) is None
+
+    def test_an_unusable_region_captures_the_whole_monitor(self) -> None:
+        assert (
+            resolve_capture_region(Settings(capture_region="most of it"), _SECOND_MONITOR) is None
+        )
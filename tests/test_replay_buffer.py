@@ -12,13 +12,23 @@ from __future__ import annotations
 
 import errno
 import os
+import subprocess
 import time
 from collections.abc import Callable
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
 
-from sclip.core.replay_buffer import BufferSpec, RollingBuffer
+from sclip.core import replay_buffer
+from sclip.core.archive import ArchiveTier
+from sclip.core.ffmpeg import MediaLayout
+from sclip.core.replay_buffer import (
+    RECORDING_PART_PATTERN,
+    BufferSpec,
+    RollingBuffer,
+    build_segment_args,
+)
 
 # How long we let the fake FFmpeg buffer run before we look for segments.
 # The fake writes its segments synchronously on startup, so this is mostly a
@@ -154,6 +164,28 @@ def test_start_is_idempotent_with_same_spec(
         buffer.stop()
 
 
+@pytest.mark.slow
+def test_a_spec_for_another_directory_moves_the_buffer(
+    patched_ffmpeg: Path,
+    buffer_dir: Path,
+    tmp_path: Path,
+) -> None:
+    """The engine places each session; the buffer follows the spec and tidies up."""
+    leftover = buffer_dir / "seg_000.ts"
+    leftover.write_bytes(b"old")
+    elsewhere = tmp_path / "ram" / "buffer"
+    buffer = RollingBuffer(buffer_dir)
+    try:
+        buffer.start(_make_spec(elsewhere), resume=True)
+        time.sleep(_WARMUP_SECONDS)
+
+        assert buffer.directory == elsewhere
+        assert list(elsewhere.glob("seg_*.ts"))
+        assert not buffer_dir.exists()
+    finally:
+        buffer.stop()
+
+
 @pytest.mark.slow
 def test_save_clip_returns_none_when_buffer_not_running(
     patched_ffmpeg: Path,
@@ -275,7 +307,12 @@ def _stat_vanishing_after_listing(doomed: Path) -> Callable[..., os.stat_result]
 
 
 def _running_buffer(
-    directory: Path, *, seconds: int = 30, segment_seconds: int = 2
+    directory: Path,
+    *,
+    seconds: int = 30,
+    segment_seconds: int = 2,
+    variable_frame_rate: bool = False,
+    encoder: str = "libx264",
 ) -> RollingBuffer:
     """A buffer that believes it is running, without spawning FFmpeg."""
     buffer = RollingBuffer(directory)
@@ -285,6 +322,9 @@ def _running_buffer(
         directory=directory,
         seconds=seconds,
         segment_seconds=segment_seconds,
+        fps=60,
+        variable_frame_rate=variable_frame_rate,
+        encoder=encoder,
     )
     return buffer
 
@@ -442,3 +482,643 @@ def test_expected_segment_paths_skips_a_file_that_disappears_while_sorting(
 
     # The surviving segments are still returned, in mtime order.
     assert [p.name for p in listed] == ["seg_000.ts", "seg_002.ts"]
+
+
+# ------------------------------------------------------------ variable frame rate
+
+
+def _write_frame_segments(
+    directory: Path, frame_counts: list[int], write_ts: Callable[[Path, int], Path]
+) -> None:
+    """Write real TS segments holding the given frame counts, oldest first."""
+    for index, frames in enumerate(frame_counts):
+        segment = write_ts(directory / f"seg_{index:03d}.ts", frames)
+        os.utime(segment, (1_000_000 + index, 1_000_000 + index))
+
+
+def test_a_variable_rate_buffer_reports_the_frames_it_skipped(
+    buffer_dir: Path, write_ts: Callable[[Path, int], Path]
+) -> None:
+    # Two finished two-second segments at 60 fps would hold 240 frames at a
+    # constant rate; a still screen left 30 and 90 in them. The third segment
+    # is still being written and counts for nothing.
+    _write_frame_segments(buffer_dir, [30, 90, 5], write_ts)
+    buffer = _running_buffer(buffer_dir, variable_frame_rate=True)
+
+    telemetry = buffer.telemetry()
+
+    assert telemetry is not None
+    assert telemetry.frames_encoded == 120
+    assert telemetry.frames_skipped == 120
+    assert telemetry.skipped_fraction == pytest.approx(0.5)
+
+
+def test_a_constant_rate_buffer_does_not_count_frames(
+    buffer_dir: Path,
+    write_ts: Callable[[Path, int], Path],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _write_frame_segments(buffer_dir, [120, 120, 5], write_ts)
+    buffer = _running_buffer(buffer_dir)
+
+    def unexpected(_path: Path) -> int:
+        raise AssertionError("a constant-rate buffer has nothing to count")
+
+    monkeypatch.setattr(replay_buffer, "count_video_frames", unexpected)
+    telemetry = buffer.telemetry()
+
+    assert telemetry is not None
+    assert (telemetry.frames_encoded, telemetry.frames_skipped) == (0, 0)
+
+
+def test_a_finished_segment_is_counted_once(
+    buffer_dir: Path,
+    write_ts: Callable[[Path, int], Path],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Telemetry polls once a second; rereading every segment each time would
+    # put the whole window's worth of disk reads behind a progress meter.
+    _write_frame_segments(buffer_dir, [60, 60, 5], write_ts)
+    buffer = _running_buffer(buffer_dir, variable_frame_rate=True)
+    reads: list[str] = []
+    real_count = replay_buffer.count_video_frames
+
+    def counting(path: Path) -> int:
+        reads.append(path.name)
+        return real_count(path)
+
+    monkeypatch.setattr(replay_buffer, "count_video_frames", counting)
+    buffer.telemetry()
+    buffer.telemetry()
+
+    assert sorted(reads) == ["seg_000.ts", "seg_001.ts"]
+
+
+def test_a_variable_rate_clip_is_re_encoded_at_a_constant_rate(
+    buffer_dir: Path,
+    clips_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A stream copy would carry the gaps into the MP4, so the join is skipped."""
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir, variable_frame_rate=True)
+    calls: list[list[str]] = []
+
+    def fake_run(argv: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        calls.append(argv)
+        Path(argv[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(argv, 0, "", "")
+
+    monkeypatch.setattr(replay_buffer, "run_ffmpeg", fake_run)
+    destination = clips_dir / "clip.mp4"
+
+    assert buffer.save_clip(destination) == destination
+    assert len(calls) == 1
+    argv = calls[0]
+    assert "concat" in argv and "copy" not in argv
+    assert argv[argv.index("-fps_mode") + 1] == "cfr"
+    assert argv[argv.index("-r") + 1] == "60"
+
+
+# ------------------------------------------------------------------ HEVC and AV1
+
+
+def _recording_run(monkeypatch: pytest.MonkeyPatch, *, returncode: int = 0) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def fake_run(argv: list[str], **_kwargs: object) -> subprocess.CompletedProcess[str]:
+        calls.append(argv)
+        if returncode == 0:
+            Path(argv[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(argv, returncode, "", "boom")
+
+    def fake_stream(
+        argv: list[str], _sources: object, **kwargs: object
+    ) -> subprocess.CompletedProcess[str]:
+        return fake_run(argv, **kwargs)
+
+    monkeypatch.setattr(replay_buffer, "run_ffmpeg", fake_run)
+    # The lossless join pipes the segments in rather than running FFmpeg plainly.
+    monkeypatch.setattr(replay_buffer, "stream_into_ffmpeg", fake_stream)
+    return calls
+
+
+def test_an_hevc_buffer_is_joined_without_re_encoding(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir, encoder="hevc_nvenc")
+    calls = _recording_run(monkeypatch)
+
+    assert buffer.save_clip(clips_dir / "clip.mp4") is not None
+    (argv,) = calls
+    assert argv[argv.index("-c") + 1] == "copy"
+    # hev1, FFmpeg's default, will not open in QuickTime or most browsers.
+    assert argv[argv.index("-tag:v") + 1] == "hvc1"
+
+
+@pytest.mark.parametrize("encoder", ["libx264", "libsvtav1"])
+def test_other_formats_are_joined_untagged(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch, encoder: str
+) -> None:
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir, encoder=encoder)
+    calls = _recording_run(monkeypatch)
+
+    assert buffer.save_clip(clips_dir / "clip.mp4") is not None
+    assert "-tag:v" not in calls[0]
+
+
+@pytest.mark.parametrize("variable_frame_rate", [False, True])
+def test_a_fragmented_clip_skips_the_faststart_rewrite(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch, variable_frame_rate: bool
+) -> None:
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir, variable_frame_rate=variable_frame_rate)
+    calls = _recording_run(monkeypatch)
+
+    assert buffer.save_clip(clips_dir / "clip.mp4", fragmented=True) is not None
+    (argv,) = calls
+    assert argv[argv.index("-movflags") + 1] == "frag_keyframe+empty_moov+default_base_moof"
+    assert "+faststart" not in argv
+
+
+# --------------------------------------------------------------- archive tier
+
+
+def _archiving_buffer(directory: Path, *, archive_seconds: int = 60) -> RollingBuffer:
+    """A running buffer with a ten-second window and an archive tier behind it.
+
+    The tier's thread is never started: the tests hand segments over and
+    look at the result one step at a time.
+    """
+    buffer = _running_buffer(directory, seconds=10, segment_seconds=2)
+    assert buffer._spec is not None
+    buffer._spec = replace(buffer._spec, archive_seconds=archive_seconds)
+    buffer._archive = ArchiveTier(
+        directory / "archive",
+        seconds=archive_seconds,
+        segment_seconds=2,
+        collect=buffer._collect_for_archive,
+    )
+    buffer._archive.directory.mkdir()
+    return buffer
+
+
+def test_an_archive_gives_the_ring_slack_to_hand_segments_over() -> None:
+    plain = BufferSpec(capture_args=(), directory=Path("/tmp/x"), seconds=10)
+
+    assert replace(plain, archive_seconds=600).segment_wrap == plain.segment_wrap + 2
+
+
+def test_only_what_has_aged_out_of_the_window_is_archived(buffer_dir: Path) -> None:
+    _write_segments(buffer_dir, 9)
+    buffer = _archiving_buffer(buffer_dir)
+
+    buffer._collect_for_archive()
+
+    # Eight finished, five of them the window: the oldest three move.
+    assert sorted(p.name for p in buffer_dir.glob("seg_*.ts")) == [
+        f"seg_{index:03d}.ts" for index in range(3, 9)
+    ]
+    assert buffer._archive is not None
+    _archived, pending = buffer._archive.snapshot()
+    assert [p.name for p in pending] == ["raw_000000.ts", "raw_000001.ts", "raw_000002.ts"]
+
+
+def test_a_save_joins_the_archive_ahead_of_the_window(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_segments(buffer_dir, 9)
+    buffer = _archiving_buffer(buffer_dir)
+    buffer._collect_for_archive()
+    assert buffer._archive is not None
+    (buffer._archive.directory / "raw_000000.ts").rename(
+        buffer._archive.directory / "arc_000000.ts"
+    )
+    tiers: list[tuple[list[str], list[str]]] = []
+
+    def fake_tiers(
+        archived: list[Path], full: list[Path], destination: Path, *_a: object, **_kw: object
+    ) -> bool:
+        tiers.append(([p.name for p in archived], [p.name for p in full]))
+        destination.write_bytes(b"mp4")
+        return True
+
+    monkeypatch.setattr(replay_buffer, "_join_across_tiers", fake_tiers)
+
+    assert buffer.save_clip(clips_dir / "all.mp4") is not None
+    assert tiers == [
+        (
+            ["arc_000000.ts"],
+            ["raw_000001.ts", "raw_000002.ts", *(f"seg_{index:03d}.ts" for index in range(3, 8))],
+        )
+    ]
+
+
+def test_a_short_clip_inside_the_window_stays_lossless(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_segments(buffer_dir, 9)
+    buffer = _archiving_buffer(buffer_dir)
+    buffer._collect_for_archive()
+    assert buffer._archive is not None
+    (buffer._archive.directory / "raw_000000.ts").rename(
+        buffer._archive.directory / "arc_000000.ts"
+    )
+    calls = _recording_run(monkeypatch)
+
+    assert buffer.save_clip(clips_dir / "short.mp4", seconds=6) is not None
+    (argv,) = calls
+    assert argv[argv.index("-c") + 1] == "copy"
+
+
+def test_the_archive_is_scaled_up_to_the_window(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    archived = [tmp_path / "arc_000000.ts"]
+    full = [tmp_path / "seg_000.ts"]
+    monkeypatch.setattr(
+        replay_buffer,
+        "probe_media_layout",
+        lambda _path, **_kw: MediaLayout(width=2560, height=1440, audio_tracks=1),
+    )
+    calls = _recording_run(monkeypatch)
+
+    joined = replay_buffer._join_across_tiers(
+        archived,
+        full,
+        tmp_path / "clip.mp4",
+        _make_spec(tmp_path),
+        scratch=tmp_path,
+        fragmented=False,
+    )
+
+    assert joined
+    (argv,) = calls
+    graph = argv[argv.index("-filter_complex") + 1]
+    assert "[0:v]scale=2560:1440" in graph
+    assert graph.endswith("concat=n=2:v=1:a=1[v][a]")
+    # The concat lists are scratch files, gone once the join is done.
+    assert not (tmp_path / "archive.txt").exists()
+
+
+# ------------------------------------------------------------------ split audio
+
+
+def _probe_tracks(monkeypatch: pytest.MonkeyPatch, tracks: int) -> None:
+    monkeypatch.setattr(
+        replay_buffer,
+        "probe_media_layout",
+        lambda _path, **_kw: MediaLayout(width=1920, height=1080, audio_tracks=tracks),
+    )
+
+
+def test_split_tracks_are_mixed_at_save_while_the_video_is_copied(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir)
+    assert buffer._spec is not None
+    buffer._spec = replace(buffer._spec, separate_audio=True)
+    _probe_tracks(monkeypatch, 2)
+    calls = _recording_run(monkeypatch)
+
+    assert buffer.save_clip(clips_dir / "clip.mp4", microphone_level=0.5) is not None
+    (argv,) = calls
+    assert argv[argv.index("-c:v") + 1] == "copy"
+    assert argv[argv.index("-c:a") + 1] == "aac"
+    graph = argv[argv.index("-filter_complex") + 1]
+    assert graph.startswith("[0:a:0][0:a:1]amix")
+    assert "weights=0.5 1" in graph
+    assert argv.count("-map") == 2 and "[a]" in argv
+
+
+def test_a_split_buffer_that_kept_one_track_is_copied_as_it_is(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The pump not starting leaves the microphone alone; there is nothing to mix."""
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir)
+    assert buffer._spec is not None
+    buffer._spec = replace(buffer._spec, separate_audio=True)
+    _probe_tracks(monkeypatch, 1)
+    calls = _recording_run(monkeypatch)
+
+    assert buffer.save_clip(clips_dir / "clip.mp4") is not None
+    (argv,) = calls
+    assert argv[argv.index("-c") + 1] == "copy"
+    assert "-filter_complex" not in argv
+
+
+def test_split_tracks_are_mixed_in_each_tier_before_the_tiers_are_joined(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _probe_tracks(monkeypatch, 2)
+    calls = _recording_run(monkeypatch)
+
+    joined = replay_buffer._join_across_tiers(
+        [tmp_path / "arc_000000.ts"],
+        [tmp_path / "seg_000.ts"],
+        tmp_path / "clip.mp4",
+        replace(_make_spec(tmp_path), separate_audio=True),
+        scratch=tmp_path,
+        fragmented=False,
+        microphone_level=1.5,
+    )
+
+    assert joined
+    (argv,) = calls
+    graph = argv[argv.index("-filter_complex") + 1]
+    assert "[0:a:0][0:a:1]amix" in graph and "[1:a:0][1:a:1]amix" in graph
+    assert graph.count("weights=1.5 1") == 2
+    assert graph.endswith("[old][olda][new][newa]concat=n=2:v=1:a=1[v][a]")
+
+
+def test_without_a_frame_size_the_window_is_saved_alone(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(replay_buffer, "probe_media_layout", lambda _path, **_kw: None)
+    joined: list[list[str]] = []
+
+    def fake_join(segments: list[Path], *_args: object, **_kw: object) -> bool:
+        joined.append([segment.name for segment in segments])
+        return True
+
+    monkeypatch.setattr(replay_buffer, "join_segments", fake_join)
+
+    assert replay_buffer._join_across_tiers(
+        [tmp_path / "arc_000000.ts"],
+        [tmp_path / "seg_000.ts"],
+        tmp_path / "clip.mp4",
+        _make_spec(tmp_path),
+        scratch=tmp_path,
+        fragmented=False,
+    )
+    assert joined == [["seg_000.ts"]]
+
+
+def test_telemetry_reports_each_tier(buffer_dir: Path) -> None:
+    _write_segments(buffer_dir, 9, size=1000)
+    buffer = _archiving_buffer(buffer_dir, archive_seconds=120)
+    buffer._collect_for_archive()
+    assert buffer._archive is not None
+    (buffer._archive.directory / "raw_000000.ts").write_bytes(b"\0" * 100)
+    (buffer._archive.directory / "raw_000000.ts").rename(
+        buffer._archive.directory / "arc_000000.ts"
+    )
+
+    telemetry = buffer.telemetry()
+
+    assert telemetry is not None
+    assert telemetry.archived_seconds == 2.0
+    assert telemetry.archived_bytes == 100
+    assert telemetry.archive_window_seconds == 120
+    # The two still waiting are full quality, and counted with the window.
+    assert telemetry.buffered_seconds == 14.0
+    assert telemetry.bytes_on_disk == 7 * 1000
+    assert telemetry.total_seconds == 16.0
+
+
+def test_a_short_clip_joins_only_the_newest_segments_it_needs(
+    buffer_dir: Path, clips_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Five seconds of two-second segments is the newest three, not the window."""
+    _write_segments(buffer_dir, 8)
+    buffer = _running_buffer(buffer_dir, seconds=30, segment_seconds=2)
+    joined: list[list[str]] = []
+
+    def fake_join(segments: list[Path], destination: Path, *_args: object, **_kw: object) -> bool:
+        joined.append([segment.name for segment in segments])
+        destination.write_bytes(b"mp4")
+        return True
+
+    monkeypatch.setattr(replay_buffer, "join_segments", fake_join)
+
+    assert buffer.save_clip(clips_dir / "short.mp4", seconds=5) is not None
+    assert buffer.save_clip(clips_dir / "full.mp4") is not None
+    # The newest segment is still being written and is never part of a clip.
+    assert joined == [
+        ["seg_004.ts", "seg_005.ts", "seg_006.ts"],
+        [f"seg_{index:03d}.ts" for index in range(7)],
+    ]
+
+
+def test_telemetry_estimates_the_saving_over_h264(buffer_dir: Path) -> None:
+    _write_segments(buffer_dir, 4)
+    telemetry = _running_buffer(buffer_dir, encoder="libsvtav1").telemetry()
+    assert telemetry is not None
+    assert telemetry.video_family == "av1"
+    assert telemetry.bytes_saved_vs_h264 == pytest.approx(telemetry.bytes_on_disk, abs=1)
+
+
+def test_an_h264_buffer_reports_no_saving(buffer_dir: Path) -> None:
+    _write_segments(buffer_dir, 4)
+    telemetry = _running_buffer(buffer_dir).telemetry()
+    assert telemetry is not None
+    assert telemetry.video_family == "h264"
+    assert telemetry.bytes_saved_vs_h264 == 0
+
+
+def test_the_h264_copy_re_encodes_video_and_copies_audio(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = _recording_run(monkeypatch)
+    source = tmp_path / "clip.mp4"
+    copy = tmp_path / "clip_h264.mp4"
+
+    assert replay_buffer.transcode_to_h264(source, copy, crf=23)
+    (argv,) = calls
+    assert argv[argv.index("-i") + 1] == str(source)
+    assert argv[argv.index("-c:v") + 1] == "libx264"
+    assert argv[argv.index("-crf") + 1] == "23"
+    assert argv[argv.index("-c:a") + 1] == "copy"
+    assert argv[-1] == str(copy)
+
+
+def test_a_failed_h264_copy_leaves_nothing_behind(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _recording_run(monkeypatch, returncode=1)
+    copy = tmp_path / "clip_h264.mp4"
+    copy.write_bytes(b"partial")
+
+    assert not replay_buffer.transcode_to_h264(tmp_path / "clip.mp4", copy, crf=23)
+    assert not copy.exists()
+
+
+# ------------------------------------------------------------------ supervision
+
+
+def test_a_resumed_muxer_continues_after_the_newest_segment() -> None:
+    from sclip.core.replay_buffer import build_segment_args
+
+    spec = BufferSpec(capture_args=(), directory=Path("/tmp/x"), seconds=30)
+    argv = build_segment_args(spec, start_number=5)
+    assert argv[argv.index("-segment_start_number") + 1] == "5"
+    assert "-segment_start_number" not in build_segment_args(spec)
+
+
+def test_the_next_slot_wraps_with_the_rotation(buffer_dir: Path) -> None:
+    buffer = _running_buffer(buffer_dir, seconds=6, segment_seconds=2)  # 4 slots
+    spec = buffer._spec
+    assert spec is not None
+    assert buffer._next_segment_number_locked(spec) == 0  # nothing on disk yet
+    _write_segments(buffer_dir, 3)
+    assert buffer._next_segment_number_locked(spec) == 3
+    last_slot = buffer_dir / "seg_003.ts"
+    last_slot.write_bytes(b"\0")
+    os.utime(last_slot, (1_000_100, 1_000_100))
+    assert buffer._next_segment_number_locked(spec) == 0
+
+
+def test_a_death_is_passed_to_the_exit_handler(buffer_dir: Path) -> None:
+    from sclip.core.supervisor import ExitReason, ProcessExit
+
+    buffer = _running_buffer(buffer_dir)
+    process = buffer._process
+    reports: list[ProcessExit] = []
+    buffer.set_exit_handler(reports.append)
+    info = ProcessExit(
+        label="Replay buffer", returncode=1, reason=ExitReason.CRASHED, uptime_seconds=9.0
+    )
+
+    buffer._on_process_exit(_FakeProcess(), info)  # type: ignore[arg-type]
+    assert reports == []  # not our process: already replaced or stopped
+
+    buffer._on_process_exit(process, info)  # type: ignore[arg-type]
+    assert reports == [info]
+    assert not buffer.is_running
+
+
+# ------------------------------------------------------- promoted recording
+
+
+def test_promoting_moves_the_banked_window_into_the_recording(buffer_dir: Path) -> None:
+    _write_segments(buffer_dir, 5)
+    buffer = _running_buffer(buffer_dir)
+    session_dir = buffer_dir.parent / "recording"
+    try:
+        buffer.begin_recording(session_dir)
+
+        parts = sorted(session_dir.glob("part_*.ts"))
+        assert len(parts) == 4
+        # Only the segment the muxer is still writing stays in the ring.
+        assert [p.name for p in buffer_dir.glob("*.ts")] == ["seg_004.ts"]
+        assert buffer.is_recording
+    finally:
+        assert buffer._recording is not None
+        buffer._recording.done.set()
+
+
+def test_a_recording_keeps_every_segment_past_the_wrap_in_order(buffer_dir: Path) -> None:
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir, seconds=2)  # two slots: the ring wraps at once
+    session_dir = buffer_dir.parent / "recording"
+    buffer.begin_recording(session_dir)
+    # The muxer wraps back to slot 0 and moves on; then it is stopped.
+    for index, name in enumerate(("seg_000.ts", "seg_001.ts")):
+        segment = buffer_dir / name
+        segment.write_bytes(name.encode())
+        os.utime(segment, (1_000_100 + index, 1_000_100 + index))
+    buffer._process = None
+
+    spec = buffer.end_recording()
+
+    parts = sorted(session_dir.glob("part_*.ts"))
+    assert spec is not None and spec.segment_seconds == 2
+    assert len(parts) == 5
+    assert [p.read_bytes() for p in parts[-2:]] == [b"seg_000.ts", b"seg_001.ts"]
+    assert not buffer.is_recording
+
+
+def test_a_buffer_on_another_volume_copies_its_segments_across(
+    buffer_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_segments(buffer_dir, 3)
+    buffer = _running_buffer(buffer_dir)
+    session_dir = buffer_dir.parent / "recording"
+
+    def cross_device(self: Path, target: Path) -> Path:
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(Path, "rename", cross_device)
+    try:
+        buffer.begin_recording(session_dir)
+
+        assert len(list(session_dir.glob("part_*.ts"))) == 2
+        assert [p.name for p in buffer_dir.glob("*.ts")] == ["seg_002.ts"]
+    finally:
+        assert buffer._recording is not None
+        buffer._recording.done.set()
+
+
+def test_ending_without_a_recording_returns_none(buffer_dir: Path) -> None:
+    assert _running_buffer(buffer_dir).end_recording() is None
+
+
+def test_recording_needs_a_running_buffer(buffer_dir: Path) -> None:
+    with pytest.raises(RuntimeError):
+        RollingBuffer(buffer_dir).begin_recording(buffer_dir.parent / "recording")
+
+
+def test_an_unwrapped_spec_numbers_its_parts_without_end() -> None:
+    spec = BufferSpec(capture_args=(), directory=Path("/tmp/x"), seconds=0, wrap=False)
+    argv = build_segment_args(spec)
+
+    assert "-segment_wrap" not in argv
+    assert argv[-1] == str(Path("/tmp/x") / RECORDING_PART_PATTERN)
+
+
+def test_the_lossless_join_streams_the_parts_in_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    parts = _write_segments(tmp_path, 3)
+    for part in parts:
+        part.write_bytes(part.name.encode())
+    streamed: list[bytes] = []
+
+    def fake_stream(
+        argv: list[str], sources: list[Path], **_kwargs: object
+    ) -> subprocess.CompletedProcess[str]:
+        streamed.extend(source.read_bytes() for source in sources)
+        assert argv[argv.index("-i") + 1] == "pipe:0"
+        Path(argv[-1]).write_bytes(b"mp4")
+        return subprocess.CompletedProcess(argv, 0, "", "")
+
+    monkeypatch.setattr(replay_buffer, "stream_into_ffmpeg", fake_stream)
+    destination = tmp_path / "joined.mp4"
+
+    assert replay_buffer.join_segments(parts, destination, _make_spec(tmp_path), scratch=tmp_path)
+    assert streamed == [b"seg_000.ts", b"seg_001.ts", b"seg_002.ts"]
+    # Nothing but the output is left behind: no intermediate transport stream.
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "joined.mp4",
+        "seg_000.ts",
+        "seg_001.ts",
+        "seg_002.ts",
+    ]
+
+
+@pytest.mark.slow
+def test_a_promoted_recording_is_saved_while_the_buffer_rolls_on(
+    patched_ffmpeg: Path, buffer_dir: Path, clips_dir: Path
+) -> None:
+    buffer = RollingBuffer(buffer_dir)
+    try:
+        buffer.start(_make_spec(buffer_dir))
+        time.sleep(_WARMUP_SECONDS)
+        session_dir = buffer_dir.parent / "recording"
+        buffer.begin_recording(session_dir)
+        time.sleep(0.3)
+
+        spec = buffer.end_recording()
+        assert spec is not None
+        parts = sorted(session_dir.glob("part_*.ts"))
+        destination = clips_dir / "recording.mp4"
+
+        assert replay_buffer.join_segments(parts, destination, spec, scratch=session_dir)
+        assert destination.exists()
+        assert buffer.is_running
+    finally:
+        buffer.stop()
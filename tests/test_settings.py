@@ -14,7 +14,7 @@ from pathlib import Path
 
 import pytest
 
-from sclip.contracts import Hotkey, Settings
+from sclip.contracts import ClipBinding, Hotkey, Settings
 from sclip.core.settings import JsonSettingsStore
 
 # --------------------------------------------------------------------------- load
@@ -67,10 +67,23 @@ def test_save_then_load_round_trips_every_field(tmp_settings_file: Path) -> None
         capture_desktop_audio=False,
         replay_buffer=False,
         replay_seconds=60,
+        archive_minutes=45,
         monitor="Monitor 2",
         clip_hotkey=Hotkey(key="F8", ctrl=True, shift=True),
         record_hotkey=Hotkey(key="F9", alt=True),
+        clip_bindings=(ClipBinding(Hotkey(key="F7"), 10),),
         output_dir="D:/clips",
+        buffer_dir="R:/",
+        buffer_budget_mb=4096,
+        scaler="lanczos",
+        cpu_budget_percent=50,
+        separate_audio_tracks=True,
+        microphone_level=150,
+        variable_frame_rate=True,
+        h264_export=True,
+        fragmented_mp4=True,
+        capture_region="1440x1080+240+0",
+        capture_window="Minecraft",
         auto_configure=False,
     )
     store = JsonSettingsStore(tmp_settings_file)
@@ -206,6 +219,27 @@ def test_unknown_encoder_falls_back_to_libx264(
     assert any("videotoaster_3000" in record.getMessage() for record in caplog.records)
 
 
+def test_unknown_scaler_falls_back_to_the_default(tmp_settings_file: Path) -> None:
+    # The value is passed to swscale verbatim, so only known names get through.
+    tmp_settings_file.write_text(json.dumps({"scaler": "neighbor;rm"}), encoding="utf-8")
+
+    loaded = JsonSettingsStore(tmp_settings_file).load()
+
+    assert loaded.scaler == Settings().scaler
+
+
+def test_a_capture_region_is_normalised_or_dropped(tmp_settings_file: Path) -> None:
+    # The region reaches ddagrab's options verbatim, so a value that does not
+    # parse is discarded rather than passed through.
+    tmp_settings_file.write_text(
+        json.dumps({"capture_region": " 1440 X 1080 + 240 + 0 "}), encoding="utf-8"
+    )
+    assert JsonSettingsStore(tmp_settings_file).load().capture_region == "1440x1080+240+0"
+
+    tmp_settings_file.write_text(json.dumps({"capture_region": "1440:1080"}), encoding="utf-8")
+    assert JsonSettingsStore(tmp_settings_file).load().capture_region == ""
+
+
 @pytest.mark.parametrize(
     ("written_fps", "expected_fps"),
     [
@@ -230,6 +264,30 @@ def test_fps_outside_supported_range_is_clamped_or_rejected(
     assert loaded.fps == expected_fps
 
 
+def test_the_archive_is_capped_so_the_buffer_reaches_an_hour(tmp_settings_file: Path) -> None:
+    tmp_settings_file.write_text(json.dumps({"archive_minutes": 90}), encoding="utf-8")
+
+    assert JsonSettingsStore(tmp_settings_file).load().archive_minutes == 50
+
+
+def test_a_negative_buffer_budget_means_no_cap(tmp_settings_file: Path) -> None:
+    tmp_settings_file.write_text(json.dumps({"buffer_budget_mb": -5}), encoding="utf-8")
+
+    assert JsonSettingsStore(tmp_settings_file).load().buffer_budget_mb == 0
+
+
+def test_a_cpu_budget_past_the_whole_machine_is_clamped(tmp_settings_file: Path) -> None:
+    tmp_settings_file.write_text(json.dumps({"cpu_budget_percent": 250}), encoding="utf-8")
+
+    assert JsonSettingsStore(tmp_settings_file).load().cpu_budget_percent == 100
+
+
+def test_a_microphone_level_past_double_is_clamped(tmp_settings_file: Path) -> None:
+    tmp_settings_file.write_text(json.dumps({"microphone_level": 900}), encoding="utf-8")
+
+    assert JsonSettingsStore(tmp_settings_file).load().microphone_level == 200
+
+
 def test_hotkey_round_trip_preserves_modifiers(tmp_settings_file: Path) -> None:
     """A hotkey written with every modifier set should re-emerge identical."""
     chord = Hotkey(key="F12", ctrl=True, shift=True, alt=True)
@@ -243,6 +301,35 @@ def test_hotkey_round_trip_preserves_modifiers(tmp_settings_file: Path) -> None:
     assert reloaded.record_hotkey == Hotkey(key="A", alt=True)
 
 
+def test_clip_bindings_drop_what_cannot_be_read(tmp_settings_file: Path) -> None:
+    """A bad entry costs itself, not the list; lengths clamp; the list is capped."""
+    f1 = {"key": "F1"}
+    tmp_settings_file.write_text(
+        json.dumps(
+            {
+                "clip_bindings": [
+                    {"hotkey": {"key": ""}, "seconds": 10},
+                    {"hotkey": f1, "seconds": 1},
+                    {"hotkey": f1, "seconds": 30},
+                    "F2",
+                    {"hotkey": {"key": "F3"}, "seconds": 9000},
+                    {"hotkey": {"key": "F4"}, "seconds": 30},
+                    {"hotkey": {"key": "F5"}, "seconds": 30},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    loaded = JsonSettingsStore(tmp_settings_file).load()
+
+    assert loaded.clip_bindings == (
+        ClipBinding(Hotkey(key="F1"), 5),
+        ClipBinding(Hotkey(key="F3"), 600),
+        ClipBinding(Hotkey(key="F4"), 30),
+    )
+
+
 def test_save_normalises_invalid_settings_on_write(tmp_settings_file: Path) -> None:
     """If a programmatic caller hands us nonsense, the file on disk is still sane."""
     # ``Settings`` is mutable on purpose so the GUI can edit a draft; here we
@@ -325,6 +412,14 @@ def test_hostile_output_dir_is_rejected(
     assert any("output_dir" in record.getMessage() for record in caplog.records)
 
 
+def test_a_unc_buffer_dir_is_rejected(tmp_settings_file: Path) -> None:
+    tmp_settings_file.write_text(
+        json.dumps({"buffer_dir": "//attacker.example.com/share"}), encoding="utf-8"
+    )
+
+    assert JsonSettingsStore(tmp_settings_file).load().buffer_dir == ""
+
+
 def test_legitimate_output_dir_is_preserved(tmp_settings_file: Path) -> None:
     """An ordinary absolute path is accepted; empty string is the explicit opt-out."""
     legit = "D:/Recordings/S-Clip"
@@ -356,10 +451,21 @@ def test_settings_copy_round_trips_every_field() -> None:
         capture_desktop_audio=False,
         replay_buffer=False,
         replay_seconds=120,
+        archive_minutes=20,
         monitor="Monitor 3",
         clip_hotkey=Hotkey(key="F11", ctrl=True),
         record_hotkey=Hotkey(key="F12", alt=True),
+        clip_bindings=(ClipBinding(Hotkey(key="F7"), 10), ClipBinding(Hotkey(key="F6"), 60)),
         output_dir="D:/clips",
+        buffer_dir="R:/",
+        buffer_budget_mb=2048,
+        scaler="fast_bilinear",
+        cpu_budget_percent=25,
+        variable_frame_rate=True,
+        h264_export=True,
+        fragmented_mp4=True,
+        capture_region="1920x1080+0+0",
+        capture_window="Game",
         auto_configure=False,
     )
 
@@ -11,11 +11,14 @@ fabricated results, which is also how the worker calls them at runtime.
 
 from __future__ import annotations
 
+from dataclasses import replace
+
 import pytest
 from PySide6.QtWidgets import QApplication
 
 from sclip.contracts import Settings
-from sclip.core.benchmark import EncoderTrial
+from sclip.core.benchmark import BenchmarkProgress, EncoderTrial
+from sclip.core.ffmpeg import ResourceUsage
 from sclip.core.hardware import Recommendation
 from sclip.ui.pages import settings_page as page_module
 from sclip.ui.pages.settings_page import SettingsPage, _verdict_text
@@ -46,6 +49,12 @@ class _Registry:
     def audio_devices(self) -> list[object]:
         return []
 
+    def refresh(self) -> None:
+        pass
+
+    def add_change_listener(self, listener: object) -> None:
+        pass
+
 
 def _trial(encoder: str, preset: str, achieved: float, *, available: bool = True) -> EncoderTrial:
     return EncoderTrial(
@@ -84,6 +93,11 @@ class TestVerdictText:
         text = _verdict_text(_trial("h264_nvenc", "p5", 0.0, available=False))
         assert "does not run on this PC" in text
 
+    def test_what_the_encode_cost_the_machine_is_spelled_out(self) -> None:
+        usage = ResourceUsage(user_seconds=3.5, peak_rss_bytes=400 << 20, wall_seconds=1.0)
+        text = _verdict_text(replace(_trial("libx264", "medium", 110.0), usage=usage))
+        assert "kept 3.5 cores busy and peaked at 400 MB" in text
+
 
 class TestMeasurementResults:
     def test_a_recommendation_is_adopted_and_explained(self, page: SettingsPage) -> None:
@@ -151,6 +165,46 @@ class TestStaleVerdicts:
         assert page._check_verdict.text() == "Measuring..."
 
 
+class TestLiveTrials:
+    def test_trials_appear_as_they_complete(self, page: SettingsPage) -> None:
+        page._begin_measuring("Measuring...")
+        page._on_trial_measured(BenchmarkProgress(_trial("h264_nvenc", "p5", 133.0), 1, 5, 4.0))
+        page._on_trial_measured(
+            BenchmarkProgress(_trial("libx264", "medium", 0.0, available=False), 2, 3, 6.0)
+        )
+
+        table = page._trial_tables[1]
+        assert table.rows() == [
+            ["h264_nvenc", "p5", "-", "133 fps", "-", "keeps up"],
+            ["libx264", "medium", "-", "-", "-", "does not run"],
+        ]
+        assert "2 of up to 3 trials, about 5 s left" in table._status.text()
+
+    def test_stop_cancels_the_run_in_flight(
+        self, page: SettingsPage, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        started: list[object] = []
+        monkeypatch.setattr(page._pool, "start", started.append)
+        page._on_check_setup()
+
+        page._on_stop_measuring()
+
+        (worker,) = started
+        assert worker.cancel.is_set()  # type: ignore[attr-defined]
+        page._on_measuring_cancelled()
+        assert page._check_button.isEnabled()
+        assert "Stopped" in page._check_verdict.text()
+
+    def test_a_new_run_starts_with_an_empty_table(self, page: SettingsPage) -> None:
+        page._begin_measuring("Measuring...")
+        page._on_trial_measured(BenchmarkProgress(_trial("h264_nvenc", "p5", 133.0), 1, 5, 4.0))
+        page._end_measuring()
+
+        page._begin_measuring("Measuring...")
+
+        assert page._trial_tables[0].rows() == []
+
+
 class TestMeasuringState:
     def test_buttons_are_disabled_while_measuring(self, page: SettingsPage) -> None:
         page._begin_measuring("Measuring...")
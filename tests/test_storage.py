@@ -0,0 +1,202 @@
+"""Tests for the replay buffer's placement and sizing in :mod:`sclip.core.storage`.
+
+Nothing here depends on the disk the tests run on: free space is swapped for a
+fixed figure, the RAM disks for temp folders, and the write probe for a fake
+that reports whatever speed the test asks for and counts how often it ran.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import NamedTuple
+
+import pytest
+
+from sclip.contracts import BufferTelemetry, Settings
+from sclip.core import storage
+from sclip.core.storage import (
+    BufferPlanner,
+    BufferStorageError,
+    CaptureProfile,
+    estimate_bitrate,
+)
+
+_PROFILE = CaptureProfile(width=1920, height=1080, fps=60, encoder="libx264", crf=20)
+
+
+class _Usage(NamedTuple):
+    total: int
+    used: int
+    free: int
+
+
+@pytest.fixture()
+def free_bytes(monkeypatch: pytest.MonkeyPatch) -> dict[str, int]:
+    """Every volume reports this much free space, out of a terabyte."""
+    space = {"free": 500 << 30}
+
+    def disk_usage(_path: object) -> _Usage:
+        return _Usage(total=1 << 40, used=0, free=space["free"])
+
+    monkeypatch.setattr(shutil, "disk_usage", disk_usage)
+    return space
+
+
+@pytest.fixture()
+def probes(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """Folders the write probe ran in; every one writes at 1 Gbit/s."""
+    ran: list[Path] = []
+
+    def measure(directory: Path) -> float:
+        ran.append(directory)
+        return 1e9
+
+    monkeypatch.setattr(storage, "measure_write_speed", measure)
+    monkeypatch.setattr(storage, "ram_disk_roots", lambda: [])
+    return ran
+
+
+@pytest.fixture()
+def planner(tmp_path: Path, free_bytes: dict[str, int], probes: list[Path]) -> BufferPlanner:
+    return BufferPlanner(tmp_path / "default")
+
+
+def test_the_estimate_follows_quality_and_codec() -> None:
+    base = estimate_bitrate(_PROFILE)
+
+    assert estimate_bitrate(CaptureProfile(1920, 1080, 60, "libx264", 26)) == pytest.approx(
+        (base - 192_000) / 2 + 192_000
+    )
+    assert estimate_bitrate(CaptureProfile(1920, 1080, 60, "hevc_nvenc", 20)) < base
+
+
+def test_the_archive_profile_is_downscaled_to_the_archive_height() -> None:
+    archived = CaptureProfile(2560, 1440, 60, "hevc_nvenc", 20).archived()
+
+    assert (archived.width, archived.height) == (960, 540)
+    assert archived.encoder == "libx264"
+
+
+def test_a_roomy_disk_keeps_the_whole_window(planner: BufferPlanner, tmp_path: Path) -> None:
+    plan = planner.plan(Settings(replay_seconds=120, archive_minutes=10), _PROFILE)
+
+    assert plan.directory == tmp_path / "default"
+    assert (plan.seconds, plan.archive_seconds) == (120, 600)
+    assert plan.warning == ""
+
+
+def test_the_budget_takes_the_archive_before_the_window(planner: BufferPlanner) -> None:
+    settings = Settings(replay_seconds=60, archive_minutes=30, buffer_budget_mb=300)
+
+    plan = planner.plan(settings, _PROFILE)
+
+    assert plan.seconds == 60
+    assert 0 < plan.archive_seconds < 30 * 60
+    assert plan.warning.startswith("History cut to")
+
+
+def test_a_tight_budget_shortens_the_window(planner: BufferPlanner) -> None:
+    plan = planner.plan(Settings(replay_seconds=600, buffer_budget_mb=100), _PROFILE)
+
+    assert storage.MIN_WINDOW_SECONDS <= plan.seconds < 600
+    assert plan.seconds * plan.bitrate_bps / 8 <= 100 << 20
+    assert plan.warning.startswith("Window cut to")
+
+
+def test_a_disk_without_room_for_the_shortest_window_is_refused(
+    planner: BufferPlanner, free_bytes: dict[str, int]
+) -> None:
+    # Nothing free beyond the reserve.
+    free_bytes["free"] = 1 << 30
+
+    with pytest.raises(BufferStorageError, match="not enough space"):
+        planner.plan(Settings(), _PROFILE)
+
+
+def test_a_drive_slower_than_the_capture_is_refused(
+    planner: BufferPlanner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(storage, "measure_write_speed", lambda _directory: 1e6)
+
+    with pytest.raises(BufferStorageError, match="slower than the capture"):
+        planner.plan(Settings(), _PROFILE)
+
+
+def test_a_drive_only_just_fast_enough_arms_with_a_warning(
+    planner: BufferPlanner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bitrate = estimate_bitrate(_PROFILE)
+    monkeypatch.setattr(storage, "measure_write_speed", lambda _directory: bitrate * 1.5)
+
+    plan = planner.plan(Settings(), _PROFILE)
+
+    assert plan.seconds == Settings().replay_seconds
+    assert plan.warning.startswith("Slow drive")
+
+
+def test_each_folder_is_probed_once(planner: BufferPlanner, probes: list[Path]) -> None:
+    planner.plan(Settings(), _PROFILE)
+    planner.plan(Settings(replay_seconds=90), _PROFILE)
+
+    assert len(probes) == 1
+
+
+def test_a_chosen_folder_gets_a_subfolder_of_its_own(
+    planner: BufferPlanner, tmp_path: Path
+) -> None:
+    chosen = tmp_path / "fast-drive"
+
+    plan = planner.plan(Settings(buffer_dir=str(chosen)), _PROFILE)
+
+    assert plan.directory.parent == chosen
+    assert plan.directory.is_dir()
+
+
+def test_automatic_placement_prefers_a_roomy_ram_disk(
+    planner: BufferPlanner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ram = tmp_path / "shm"
+    ram.mkdir()
+    monkeypatch.setattr(storage, "ram_disk_roots", lambda: [ram])
+
+    plan = planner.plan(Settings(replay_seconds=30), _PROFILE)
+
+    assert plan.directory.parent == ram
+
+
+def test_a_ram_disk_the_window_would_crowd_is_passed_over(
+    planner: BufferPlanner,
+    tmp_path: Path,
+    free_bytes: dict[str, int],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ram = tmp_path / "shm"
+    ram.mkdir()
+    monkeypatch.setattr(storage, "ram_disk_roots", lambda: [ram])
+    free_bytes["free"] = 2 << 30
+
+    plan = planner.plan(Settings(replay_seconds=600), _PROFILE)
+
+    assert plan.directory == tmp_path / "default"
+
+
+def test_a_measured_bitrate_replaces_the_estimate(planner: BufferPlanner) -> None:
+    telemetry = BufferTelemetry(
+        buffered_seconds=30.0,
+        window_seconds=30,
+        segment_count=15,
+        segment_capacity=16,
+        bytes_on_disk=30 * 1_000_000,
+    )
+
+    planner.observe(_PROFILE, telemetry)
+
+    assert planner.bitrate_for(_PROFILE) == pytest.approx(8e6)
+    other = CaptureProfile(1280, 720, 60, "libx264", 20)
+    assert planner.bitrate_for(other) == estimate_bitrate(other)
+
+
+def test_the_write_probe_measures_and_tidies_up(tmp_path: Path) -> None:
+    assert storage.measure_write_speed(tmp_path) > 0
+    assert list(tmp_path.iterdir()) == []
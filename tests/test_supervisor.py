@@ -0,0 +1,129 @@
+"""Tests for the FFmpeg process supervisor in :mod:`sclip.core.supervisor`.
+
+The supervisor is process-agnostic, so these watch short Python children that
+write to stderr and exit the way a dying FFmpeg would. Nothing here needs
+FFmpeg installed.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from sclip.core.supervisor import ExitReason, ProcessExit, ProcessSupervisor, classify_exit
+
+_REPORT_TIMEOUT: float = 5.0
+
+
+def _child(script: str) -> subprocess.Popen[str]:
+    return subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+class TestClassifyExit:
+    @pytest.mark.parametrize(
+        ("line", "reason"),
+        [
+            ("av_interleaved_write_frame(): No space left on device", ExitReason.DISK_FULL),
+            ("Failed to capture frame: DXGI_ERROR_ACCESS_LOST", ExitReason.DEVICE_LOST),
+            ("[dshow @ 0x1] Could not run graph", ExitReason.INPUT_LOST),
+            ("Error during demuxing: I/O error", ExitReason.INPUT_LOST),
+            ("Segmentation fault", ExitReason.CRASHED),
+        ],
+    )
+    def test_the_last_words_name_the_reason(self, line: str, reason: ExitReason) -> None:
+        assert classify_exit(1, ["frame=  100 fps=60", line]) is reason
+
+    def test_a_clean_exit_nobody_asked_for_has_ended(self) -> None:
+        assert classify_exit(0, []) is ExitReason.ENDED
+
+    def test_only_a_full_disk_is_beyond_a_restart(self) -> None:
+        assert not ExitReason.DISK_FULL.is_recoverable
+        assert ExitReason.DEVICE_LOST.is_recoverable
+
+
+class TestProcessSupervisor:
+    def test_a_death_is_reported_with_its_stderr(self) -> None:
+        supervisor = ProcessSupervisor(poll_interval=0.02)
+        reports: list[ProcessExit] = []
+        reported = threading.Event()
+
+        def on_exit(info: ProcessExit) -> None:
+            reports.append(info)
+            reported.set()
+
+        process = _child(
+            "import sys; sys.stderr.write('starting\\nNo space left on device\\n'); sys.exit(3)"
+        )
+        supervisor.watch(process, "Replay buffer", on_exit)
+
+        assert reported.wait(_REPORT_TIMEOUT)
+        (info,) = reports
+        assert (info.label, info.returncode, info.reason) == (
+            "Replay buffer",
+            3,
+            ExitReason.DISK_FULL,
+        )
+        assert info.stderr_tail[-1] == "No space left on device"
+        assert not supervisor.is_watching(process)
+
+    def test_an_unwatched_process_dies_quietly(self) -> None:
+        supervisor = ProcessSupervisor(poll_interval=0.02)
+        reported = threading.Event()
+        process = _child("import sys; sys.stdin.read(); sys.exit(1)")
+        supervisor.watch(process, "Manual recording", lambda _info: reported.set())
+
+        supervisor.unwatch(process)
+        assert process.stdin is not None
+        process.stdin.close()
+        process.wait(timeout=_REPORT_TIMEOUT)
+
+        assert not reported.wait(0.3)
+
+    def test_the_stderr_ring_is_bounded(self) -> None:
+        # A chatty process must not grow the supervisor's memory without bound,
+        # and must not block on a full pipe either: the drain keeps up.
+        supervisor = ProcessSupervisor(poll_interval=0.02)
+        reported = threading.Event()
+        reports: list[ProcessExit] = []
+
+        def on_exit(info: ProcessExit) -> None:
+            reports.append(info)
+            reported.set()
+
+        process = _child(
+            "import sys\nfor i in range(50000): sys.stderr.write(f'line {i}\\n')\nsys.exit(1)"
+        )
+        supervisor.watch(process, "Replay buffer", on_exit)
+
+        assert reported.wait(_REPORT_TIMEOUT)
+        assert reports[0].stderr_tail[-1] == "line 49999"
+
+    def test_the_report_carries_what_the_pump_counted(self) -> None:
+        supervisor = ProcessSupervisor(poll_interval=0.02)
+        reported = threading.Event()
+        reports: list[ProcessExit] = []
+
+        def on_exit(info: ProcessExit) -> None:
+            reports.append(info)
+            reported.set()
+
+        process = _child(
+            "import sys\n"
+            "sys.stderr.write('frame=  60 fps=60 drop=7 speed=1x\\r')\n"
+            "sys.stderr.write('[warning] Past duration 0.5 too large\\n')\n"
+            "sys.exit(1)"
+        )
+        supervisor.watch(process, "Replay buffer", on_exit)
+
+        assert reported.wait(_REPORT_TIMEOUT)
+        counters = reports[0].counters
+        assert (counters.frames_dropped, counters.timestamp_warnings) == (7, 1)
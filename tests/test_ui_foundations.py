@@ -33,6 +33,9 @@ class _Engine:
     def telemetry(self) -> BufferTelemetry | None:
         return self._telemetry
 
+    def recover_recordings(self) -> list[Path]:
+        return []
+
     def start_manual_recording(self) -> None:
         return
 
@@ -45,7 +48,7 @@ class _Engine:
     def stop_replay_buffer(self) -> None:
         return
 
-    def save_replay_clip(self) -> None:
+    def save_replay_clip(self, seconds: int | None = None) -> None:
         return
 
     def shutdown(self) -> None: